@@ -0,0 +1,56 @@
+"""serpapi_cache + serpapi_query_stats tabellen
+
+Revision ID: 20261019_019
+Revises: 20260521_018
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+revision = "20261019_019"
+down_revision = "20260521_018"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    tables = inspect(conn).get_table_names()
+
+    if "serpapi_cache" not in tables:
+        op.create_table(
+            "serpapi_cache",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("engine", sa.String(50), nullable=False),
+            sa.Column("query", sa.String(500), nullable=False),
+            sa.Column("start", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("day", sa.Date(), nullable=False),
+            sa.Column("response", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("engine", "query", "start", "day", name="uq_serpapi_cache_key"),
+        )
+        op.create_index("ix_serpapi_cache_id", "serpapi_cache", ["id"])
+        op.create_index("ix_serpapi_cache_day", "serpapi_cache", ["day"])
+
+    if "serpapi_query_stats" not in tables:
+        op.create_table(
+            "serpapi_query_stats",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("engine", sa.String(50), nullable=False),
+            sa.Column("query", sa.String(500), nullable=False),
+            sa.Column("runs", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("results", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("emailed_results", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("last_run_at", sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("engine", "query", name="uq_serpapi_query_stat"),
+        )
+        op.create_index("ix_serpapi_query_stats_id", "serpapi_query_stats", ["id"])
+
+
+def downgrade():
+    op.drop_table("serpapi_query_stats")
+    op.drop_index("ix_serpapi_cache_day", "serpapi_cache")
+    op.drop_table("serpapi_cache")
@@ -0,0 +1,38 @@
+"""sitemap_urls tabel (incrementele sitemap-scraping)
+
+Revision ID: 20261019_020
+Revises: 20261019_019
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+revision = "20261019_020"
+down_revision = "20261019_019"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    if "sitemap_urls" in inspect(conn).get_table_names():
+        return
+
+    op.create_table(
+        "sitemap_urls",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("url", sa.String(1000), nullable=False),
+        sa.Column("site", sa.String(100), nullable=True),
+        sa.Column("lastmod", sa.String(40), nullable=True),
+        sa.Column("checked_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_sitemap_urls_id", "sitemap_urls", ["id"])
+    op.create_index("ix_sitemap_urls_url", "sitemap_urls", ["url"], unique=True)
+
+
+def downgrade():
+    op.drop_index("ix_sitemap_urls_url", "sitemap_urls")
+    op.drop_index("ix_sitemap_urls_id", "sitemap_urls")
+    op.drop_table("sitemap_urls")
@@ -0,0 +1,30 @@
+"""quality_score kolom op scraped_vacancies
+
+Revision ID: 20261019_021
+Revises: 20261019_020
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+revision = "20261019_021"
+down_revision = "20261019_020"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = Inspector.from_engine(bind)
+    cols = [c["name"] for c in inspector.get_columns("scraped_vacancies")]
+
+    if "quality_score" not in cols:
+        op.add_column(
+            "scraped_vacancies",
+            sa.Column("quality_score", sa.Float(), nullable=True),
+        )
+
+
+def downgrade():
+    op.drop_column("scraped_vacancies", "quality_score")
@@ -0,0 +1,41 @@
+"""llm_cache tabel
+
+Revision ID: 20261019_022
+Revises: 20261019_021
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+revision = "20261019_022"
+down_revision = "20261019_021"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    if "llm_cache" in inspect(conn).get_table_names():
+        return
+
+    op.create_table(
+        "llm_cache",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("key", sa.String(64), nullable=False),
+        sa.Column("model", sa.String(100), nullable=False),
+        sa.Column("response", sa.Text(), nullable=False),
+        sa.Column("hits", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("last_hit_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_llm_cache_id", "llm_cache", ["id"])
+    op.create_index("ix_llm_cache_key", "llm_cache", ["key"], unique=True)
+    op.create_index("ix_llm_cache_last_hit_at", "llm_cache", ["last_hit_at"])
+
+
+def downgrade():
+    op.drop_index("ix_llm_cache_last_hit_at", "llm_cache")
+    op.drop_index("ix_llm_cache_key", "llm_cache")
+    op.drop_table("llm_cache")
@@ -0,0 +1,39 @@
+"""embeddings tabel
+
+Revision ID: 20261019_023
+Revises: 20261019_022
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+revision = "20261019_023"
+down_revision = "20261019_022"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    if "embeddings" in inspect(conn).get_table_names():
+        return
+
+    op.create_table(
+        "embeddings",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("owner_type", sa.String(20), nullable=False),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("model", sa.String(100), nullable=False),
+        sa.Column("content_hash", sa.String(40), nullable=False),
+        sa.Column("dim", sa.Integer(), nullable=False),
+        sa.Column("vector", sa.LargeBinary(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("owner_type", "owner_id", "model", name="uq_embedding_owner_model"),
+    )
+    op.create_index("ix_embeddings_id", "embeddings", ["id"])
+
+
+def downgrade():
+    op.drop_table("embeddings")
@@ -0,0 +1,51 @@
+"""application_tasks tabel (apply-pipeline)
+
+Revision ID: 20261019_024
+Revises: 20261019_023
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+revision = "20261019_024"
+down_revision = "20261019_023"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    if "application_tasks" in inspect(conn).get_table_names():
+        return
+
+    op.create_table(
+        "application_tasks",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("application_id", sa.Integer(), sa.ForeignKey("applications.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("kind", sa.String(20), nullable=False, server_default="apply"),
+        sa.Column("status", sa.String(20), nullable=False, server_default="queued"),
+        sa.Column("cv_id", sa.Integer(), sa.ForeignKey("candidate_cvs.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("cv_data", sa.LargeBinary(), nullable=True),
+        sa.Column("motivation_letter", sa.Text(), nullable=True),
+        sa.Column("extracted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("scored_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("candidate_notified_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("employer_notified_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("claim_checked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_application_tasks_id", "application_tasks", ["id"])
+    op.create_index("ix_application_tasks_application_id", "application_tasks", ["application_id"], unique=True)
+    op.create_index("ix_application_tasks_status", "application_tasks", ["status"])
+    op.create_index("ix_application_tasks_next_attempt_at", "application_tasks", ["next_attempt_at"])
+
+
+def downgrade():
+    op.drop_table("application_tasks")
@@ -0,0 +1,49 @@
+"""llm_usage_daily tabel
+
+Revision ID: 20261019_025
+Revises: 20261019_024
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+revision = "20261019_025"
+down_revision = "20261019_024"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    if "llm_usage_daily" in inspect(conn).get_table_names():
+        return
+
+    op.create_table(
+        "llm_usage_daily",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("feature", sa.String(64), nullable=False),
+        sa.Column("model", sa.String(100), nullable=False),
+        sa.Column("calls", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("cache_hits", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("errors", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error_classes", sa.Text(), nullable=True),
+        sa.Column("prompt_tokens", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("completion_tokens", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("characters", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("cost_usd", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("latency_ms_total", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("latency_hist", sa.Text(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("day", "feature", "model", name="uq_llm_usage_daily"),
+    )
+    op.create_index("ix_llm_usage_daily_id", "llm_usage_daily", ["id"])
+    op.create_index("ix_llm_usage_daily_day", "llm_usage_daily", ["day"])
+
+
+def downgrade():
+    op.drop_index("ix_llm_usage_daily_day", "llm_usage_daily")
+    op.drop_index("ix_llm_usage_daily_id", "llm_usage_daily")
+    op.drop_table("llm_usage_daily")
@@ -0,0 +1,33 @@
+"""digest-kolommen op candidate_cvs
+
+Revision ID: 20261019_026
+Revises: 20261019_025
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+revision = "20261019_026"
+down_revision = "20261019_025"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = Inspector.from_engine(bind)
+    cols = [c["name"] for c in inspector.get_columns("candidate_cvs")]
+
+    if "digest" not in cols:
+        op.add_column("candidate_cvs", sa.Column("digest", sa.Text(), nullable=True))
+    if "digest_hash" not in cols:
+        op.add_column("candidate_cvs", sa.Column("digest_hash", sa.String(64), nullable=True))
+    if "digested_at" not in cols:
+        op.add_column("candidate_cvs", sa.Column("digested_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    op.drop_column("candidate_cvs", "digested_at")
+    op.drop_column("candidate_cvs", "digest_hash")
+    op.drop_column("candidate_cvs", "digest")
@@ -0,0 +1,46 @@
+"""tts_cache tabel
+
+Revision ID: 20261019_027
+Revises: 20261019_026
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+revision = "20261019_027"
+down_revision = "20261019_026"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    if "tts_cache" in inspect(conn).get_table_names():
+        return
+
+    op.create_table(
+        "tts_cache",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("key", sa.String(64), nullable=False),
+        sa.Column("storage_key", sa.String(255), nullable=False),
+        sa.Column("etag", sa.String(64), nullable=False),
+        sa.Column("model", sa.String(50), nullable=False),
+        sa.Column("voice", sa.String(50), nullable=False),
+        sa.Column("speed", sa.Float(), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("size_bytes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("hits", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("last_hit_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_tts_cache_id", "tts_cache", ["id"])
+    op.create_index("ix_tts_cache_key", "tts_cache", ["key"], unique=True)
+    op.create_index("ix_tts_cache_last_hit_at", "tts_cache", ["last_hit_at"])
+
+
+def downgrade():
+    op.drop_index("ix_tts_cache_last_hit_at", "tts_cache")
+    op.drop_index("ix_tts_cache_key", "tts_cache")
+    op.drop_table("tts_cache")
@@ -0,0 +1,36 @@
+"""voorbereide openingsberichten van Lisa op application_tasks
+
+Revision ID: 20261019_028
+Revises: 20261019_027
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+revision = "20261019_028"
+down_revision = "20261019_027"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = Inspector.from_engine(bind)
+    cols = [c["name"] for c in inspector.get_columns("application_tasks")]
+
+    if "opening_prepared_at" not in cols:
+        op.add_column("application_tasks", sa.Column("opening_prepared_at", sa.DateTime(timezone=True), nullable=True))
+    if "opening_language" not in cols:
+        op.add_column("application_tasks", sa.Column("opening_language", sa.String(5), nullable=True))
+    if "chat_opening" not in cols:
+        op.add_column("application_tasks", sa.Column("chat_opening", sa.Text(), nullable=True))
+    if "interview_opening" not in cols:
+        op.add_column("application_tasks", sa.Column("interview_opening", sa.Text(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("application_tasks", "interview_opening")
+    op.drop_column("application_tasks", "chat_opening")
+    op.drop_column("application_tasks", "opening_language")
+    op.drop_column("application_tasks", "opening_prepared_at")
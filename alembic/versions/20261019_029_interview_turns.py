@@ -0,0 +1,111 @@
+"""interview_turns tabel (append-only transcript van virtuele interviews)
+
+Revision ID: 20261019_029
+Revises: 20261019_028
+Create Date: 2026-10-19
+"""
+import json
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+revision = "20261019_029"
+down_revision = "20261019_028"
+branch_labels = None
+depends_on = None
+
+ROLES = ("recruiter", "candidate")
+
+sessions = sa.table(
+    "virtual_interview_sessions",
+    sa.column("id", sa.Integer),
+    sa.column("transcript", sa.Text),
+)
+turns = sa.table(
+    "interview_turns",
+    sa.column("session_id", sa.Integer),
+    sa.column("seq", sa.Integer),
+    sa.column("role", sa.SmallInteger),
+    sa.column("content", sa.Text),
+    sa.column("created_at", sa.DateTime(timezone=True)),
+)
+
+
+def _parse_timestamp(value):
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def backfill(conn):
+    """Zet JSON-transcripts om naar beurten, voor sessies die nog geen beurten hebben (per sessie één bulk insert)."""
+    rows = conn.execute(
+        sa.select(sessions.c.id, sessions.c.transcript).where(
+            sessions.c.transcript.isnot(None),
+            ~sa.exists().where(turns.c.session_id == sessions.c.id),
+        )
+    )
+    for session_id, raw in rows.fetchall():
+        try:
+            transcript = json.loads(raw)
+        except ValueError:
+            continue
+        batch = []
+        for turn in transcript if isinstance(transcript, list) else []:
+            if not isinstance(turn, dict) or not turn.get("content"):
+                continue
+            batch.append({
+                "session_id": session_id,
+                "seq": len(batch),
+                "role": ROLES.index(turn.get("role")) if turn.get("role") in ROLES else 1,
+                "content": turn["content"],
+                "created_at": _parse_timestamp(turn.get("timestamp")) or datetime.now(timezone.utc),
+            })
+        if batch:
+            op.bulk_insert(turns, batch)
+
+
+def upgrade():
+    conn = op.get_bind()
+    # De tabel kan al bestaan (create_all bij het opstarten); de backfill moet dan toch draaien
+    if "interview_turns" not in inspect(conn).get_table_names():
+        op.create_table(
+            "interview_turns",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("session_id", sa.Integer(), nullable=False),
+            sa.Column("seq", sa.Integer(), nullable=False),
+            sa.Column("role", sa.SmallInteger(), nullable=False),
+            sa.Column("content", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.ForeignKeyConstraint(["session_id"], ["virtual_interview_sessions.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("session_id", "seq", name="uq_interview_turns_session_seq"),
+        )
+
+    backfill(conn)
+
+
+def downgrade():
+    # Beurten terugzetten in het JSON-blob voordat de tabel verdwijnt
+    conn = op.get_bind()
+    transcripts = {}
+    rows = conn.execute(
+        sa.select(turns.c.session_id, turns.c.role, turns.c.content, turns.c.created_at)
+        .order_by(turns.c.session_id, turns.c.seq)
+    )
+    for session_id, role, content, created_at in rows.fetchall():
+        transcripts.setdefault(session_id, []).append({
+            "role": ROLES[role],
+            "content": content,
+            "timestamp": created_at.isoformat() if created_at else None,
+        })
+    for session_id, transcript in transcripts.items():
+        conn.execute(
+            sessions.update()
+            .where(sessions.c.id == session_id)
+            .values(transcript=json.dumps(transcript, ensure_ascii=False))
+        )
+    op.drop_table("interview_turns")
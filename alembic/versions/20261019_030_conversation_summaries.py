@@ -0,0 +1,36 @@
+"""conversation_summaries tabel (doorlopende samenvatting van lange gesprekken)
+
+Revision ID: 20261019_030
+Revises: 20261019_029
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+revision = "20261019_030"
+down_revision = "20261019_029"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    if "conversation_summaries" in inspect(conn).get_table_names():
+        return
+
+    op.create_table(
+        "conversation_summaries",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(20), nullable=False),
+        sa.Column("ref_id", sa.Integer(), nullable=False),
+        sa.Column("summary", sa.Text(), nullable=False),
+        sa.Column("covered", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("kind", "ref_id", name="uq_conversation_summaries_kind_ref"),
+    )
+
+
+def downgrade():
+    op.drop_table("conversation_summaries")
@@ -0,0 +1,56 @@
+"""interview_completion_tasks tabel (afronden van virtuele interviews op de achtergrond)
+
+Revision ID: 20261019_031
+Revises: 20261019_030
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+revision = "20261019_031"
+down_revision = "20261019_030"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    if "interview_completion_tasks" in inspect(conn).get_table_names():
+        return
+
+    op.create_table(
+        "interview_completion_tasks",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "session_id", sa.Integer(),
+            sa.ForeignKey("virtual_interview_sessions.id", ondelete="CASCADE"), nullable=False,
+        ),
+        sa.Column("application_id", sa.Integer(), sa.ForeignKey("applications.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="queued"),
+        sa.Column("language", sa.String(5), nullable=False, server_default="nl"),
+        sa.Column("followup_wanted", sa.Boolean(), nullable=True),
+        sa.Column("scored_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("decided_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("followup_checked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("employer_notified_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("invite_sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_interview_completion_tasks_id", "interview_completion_tasks", ["id"])
+    op.create_index(
+        "ix_interview_completion_tasks_session_id", "interview_completion_tasks", ["session_id"], unique=True
+    )
+    op.create_index("ix_interview_completion_tasks_application_id", "interview_completion_tasks", ["application_id"])
+    op.create_index("ix_interview_completion_tasks_status", "interview_completion_tasks", ["status"])
+    op.create_index("ix_interview_completion_tasks_next_attempt_at", "interview_completion_tasks", ["next_attempt_at"])
+
+
+def downgrade():
+    op.drop_table("interview_completion_tasks")
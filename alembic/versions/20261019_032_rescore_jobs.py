@@ -0,0 +1,57 @@
+"""rescore_jobs tabel + invoer-hashes op ai_results (batch-herberekening na vacaturewijziging)
+
+Revision ID: 20261019_032
+Revises: 20261019_031
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+revision = "20261019_032"
+down_revision = "20261019_031"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    cols = [c["name"] for c in inspector.get_columns("ai_results")]
+    if "cv_hash" not in cols:
+        op.add_column("ai_results", sa.Column("cv_hash", sa.String(64), nullable=True))
+    if "vacancy_hash" not in cols:
+        op.add_column("ai_results", sa.Column("vacancy_hash", sa.String(64), nullable=True))
+
+    if "rescore_jobs" in inspector.get_table_names():
+        return
+
+    op.create_table(
+        "rescore_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("vacancy_id", sa.Integer(), sa.ForeignKey("vacancies.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("requested_by", sa.Integer(), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("status", sa.String(20), nullable=False, server_default="queued"),
+        sa.Column("force", sa.Boolean(), nullable=False, server_default="false"),
+        sa.Column("vacancy_hash", sa.String(64), nullable=True),
+        sa.Column("total", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("skipped", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("processed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("written", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_rescore_jobs_id", "rescore_jobs", ["id"])
+    op.create_index("ix_rescore_jobs_vacancy_id", "rescore_jobs", ["vacancy_id"])
+    op.create_index("ix_rescore_jobs_status", "rescore_jobs", ["status"])
+
+
+def downgrade():
+    op.drop_table("rescore_jobs")
+    op.drop_column("ai_results", "vacancy_hash")
+    op.drop_column("ai_results", "cv_hash")
@@ -0,0 +1,25 @@
+"""interview_opening van application_tasks verwijderen (intro komt uit de Realtime-sessie)
+
+Revision ID: 20261019_033
+Revises: 20261019_032
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+revision = "20261019_033"
+down_revision = "20261019_032"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = inspect(op.get_bind())
+    cols = [c["name"] for c in inspector.get_columns("application_tasks")]
+    if "interview_opening" in cols:
+        op.drop_column("application_tasks", "interview_opening")
+
+
+def downgrade():
+    op.add_column("application_tasks", sa.Column("interview_opening", sa.Text(), nullable=True))
@@ -0,0 +1,36 @@
+"""interview_turns opnieuw backfillen
+
+Migratie 029 sloeg de backfill over als de tabel al bestond — en create_all
+bij het opstarten maakt hem vóór de migratie aan. Deze revisie zet de
+JSON-transcripts van sessies zonder beurten alsnog over (idempotent).
+
+Revision ID: 20261019_034
+Revises: 20261019_033
+Create Date: 2026-10-19
+"""
+import importlib.util
+import os
+
+from alembic import op
+
+revision = "20261019_034"
+down_revision = "20261019_033"
+branch_labels = None
+depends_on = None
+
+
+def _migration_029():
+    path = os.path.join(os.path.dirname(__file__), "20261019_029_interview_turns.py")
+    spec = importlib.util.spec_from_file_location("_migration_20261019_029", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def upgrade():
+    _migration_029().backfill(op.get_bind())
+
+
+def downgrade():
+    # Beurten blijven staan; het JSON-transcript is niet gewijzigd
+    pass
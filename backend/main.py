@@ -39,6 +39,7 @@ from backend.routers import billing as billing_router
 from backend.routers import scraper_admin as scraper_admin_router
 from backend.routers import promotions as promotions_router
 from backend.routers import analytics as analytics_router
+from backend.services import apply_pipeline, embeddings, interview_completion, lexical_match, llm_usage
 from backend.services.email import send_employer_review_reminder
 
 logger = logging.getLogger(__name__)
@@ -116,6 +117,19 @@ async def _daily_reminder_loop() -> None:
 async def lifespan(app_instance: FastAPI):
     # Startup: plan dagelijkse herinneringen
     task = asyncio.create_task(_daily_reminder_loop())
+    # Apply-pipeline: openstaande/uitgestelde sollicitatietaken verwerken
+    apply_worker = asyncio.create_task(apply_pipeline.worker_loop())
+    # Afronden van virtuele interviews (scoren, vervolgafspraak, mails)
+    completion_worker = asyncio.create_task(interview_completion.worker_loop())
+    # LLM-telemetrie periodiek naar de rollup-tabel
+    usage_flusher = asyncio.create_task(llm_usage.flush_loop())
+    # Embedding-index op de achtergrond vullen (aanbevelingen)
+    embeddings.refresh_index_background()
+    # IDF voor de lexicale pre-screen alvast laden (anders bij de eerste sollicitatie)
+    lexical_match.refresh_idf_background()
+    # Vaste zinnen van Lisa alvast in de TTS-cache (alleen wat nog ontbreekt)
+    if os.getenv("TTS_PREGENERATE_ON_START", "true").lower() not in ("0", "false", "no"):
+        asyncio.create_task(asyncio.to_thread(virtual_interview.warm_tts_cache))
     # Stuur ook meteen bij opstarten (voor gemiste reminders)
     try:
         sent = _send_pending_review_reminders()
@@ -126,6 +140,10 @@ async def lifespan(app_instance: FastAPI):
     yield
     # Shutdown
     task.cancel()
+    apply_worker.cancel()
+    completion_worker.cancel()
+    usage_flusher.cancel()
+    await asyncio.to_thread(llm_usage.flush)  # laatste events niet kwijtraken
 
 
 # ── Rate limiter ──────────────────────────────────────────────────────────────
@@ -159,6 +177,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # keyset-paginering van /employer/applications
 )
 
 app.include_router(auth.router)
@@ -10,10 +10,21 @@ from backend.models.recruiter_chat import RecruiterChatMessage
 from backend.models.interview_session import InterviewSession
 from backend.models.crm_sync import CRMSync
 from backend.models.virtual_interview import VirtualInterviewSession
+from backend.models.interview_turn import InterviewTurn
 from backend.models.scraped_vacancy import ScrapedVacancy
 from backend.models.promotion import PromotionRequest
 from backend.models.payment_log import PaymentLog
 from backend.models.visitor_log import VisitorLog
+from backend.models.serpapi_cache import SerpApiCache, SerpApiQueryStat
+from backend.models.sitemap_url import SitemapUrl
+from backend.models.llm_cache import LLMCacheEntry
+from backend.models.embedding import Embedding
+from backend.models.application_task import ApplicationTask
+from backend.models.llm_usage import LLMUsageDaily
+from backend.models.tts_cache import TTSCacheEntry
+from backend.models.conversation_summary import ConversationSummary
+from backend.models.interview_completion_task import InterviewCompletionTask
+from backend.models.rescore_job import RescoreJob
 
 __all__ = [
     "Base",
@@ -29,10 +40,22 @@ __all__ = [
     "InterviewSession",
     "CRMSync",
     "VirtualInterviewSession",
+    "InterviewTurn",
     "ScrapedVacancy",
     "PromotionRequest",
     "PaymentLog",
     "VisitorLog",
+    "SerpApiCache",
+    "SerpApiQueryStat",
+    "SitemapUrl",
+    "LLMCacheEntry",
+    "Embedding",
+    "ApplicationTask",
+    "LLMUsageDaily",
+    "TTSCacheEntry",
+    "ConversationSummary",
+    "InterviewCompletionTask",
+    "RescoreJob",
 ]
 
 
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, Integer, Text, DateTime, func, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, func, ForeignKey
 from sqlalchemy.orm import relationship
 
 from backend.models.base import Base
@@ -18,6 +18,11 @@ class AIResult(Base):
     gaps = Column(Text, nullable=True)
     suggested_questions = Column(Text, nullable=True)
 
+    # sha256 van de CV-tekst en vacaturetekst waarop de score gebaseerd is;
+    # een batch-herberekening (services/rescore.py) slaat ongewijzigde over
+    cv_hash = Column(String(64), nullable=True)
+    vacancy_hash = Column(String(64), nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     application = relationship("Application", back_populates="ai_results", lazy="joined")
@@ -0,0 +1,52 @@
+"""
+Achtergrondverwerking van een sollicitatie (apply-pipeline).
+
+Eén rij per sollicitatie. Het HTTP-request slaat alleen de sollicitatie, het
+CV en deze taak op; de worker in backend/services/apply_pipeline.py voert de
+stappen uit. Elke stap heeft een eigen *_at-kolom: een afgeronde stap wordt
+bij een retry overgeslagen (idempotent per stap).
+"""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary, String, Text
+from sqlalchemy.sql import func
+
+from backend.models.base import Base
+
+
+class ApplicationTask(Base):
+    __tablename__ = "application_tasks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    application_id = Column(
+        Integer, ForeignKey("applications.id", ondelete="CASCADE"), nullable=False, unique=True, index=True
+    )
+
+    kind = Column(String(20), nullable=False, default="apply")      # apply | analyze
+    # queued | running | done | failed
+    status = Column(String(20), nullable=False, default="queued", index=True)
+
+    cv_id = Column(Integer, ForeignKey("candidate_cvs.id", ondelete="SET NULL"), nullable=True)
+    # Ruwe upload tot de tekstextractie klaar is (daarna leeggemaakt)
+    cv_data = Column(LargeBinary, nullable=True)
+    motivation_letter = Column(Text, nullable=True)
+
+    # Afgeronde stappen
+    extracted_at = Column(DateTime(timezone=True), nullable=True)
+    scored_at = Column(DateTime(timezone=True), nullable=True)
+    candidate_notified_at = Column(DateTime(timezone=True), nullable=True)
+    employer_notified_at = Column(DateTime(timezone=True), nullable=True)
+    claim_checked_at = Column(DateTime(timezone=True), nullable=True)
+    opening_prepared_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Vooraf gegenereerde chat-opening van Lisa (zie services/lisa_opening.py);
+    # wordt leeggemaakt zodra hij als eerste bericht is opgeslagen
+    opening_language = Column(String(5), nullable=True)
+    chat_opening = Column(Text, nullable=True)
+
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -17,6 +17,12 @@ class CandidateCV(Base):
 
     extracted_text = Column(Text, nullable=True)
 
+    # Gestructureerde samenvatting voor AI-prompts (zie backend/services/cv_digest.py);
+    # digest_hash = sha256 van de extracted_text waarop de digest is gebaseerd
+    digest = Column(Text, nullable=True)
+    digest_hash = Column(String(64), nullable=True)
+    digested_at = Column(DateTime(timezone=True), nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     candidate = relationship("User", lazy="joined")
@@ -0,0 +1,25 @@
+"""
+Doorlopende samenvatting van een lang gesprek (Lisa-chat of virtueel interview).
+
+De prompt bevat alleen de laatste beurten letterlijk; alles daarvóór staat
+samengevat in `summary`. `covered` is het aantal berichten (vanaf het begin
+van het gesprek) dat in de samenvatting is verwerkt. kind + ref_id wijzen
+naar het gesprek: "chat" → application_id, "interview" → virtual_interview_sessions.id.
+"""
+
+from sqlalchemy import Column, DateTime, Integer, String, Text, UniqueConstraint
+from sqlalchemy.sql import func
+
+from backend.models.base import Base
+
+
+class ConversationSummary(Base):
+    __tablename__ = "conversation_summaries"
+    __table_args__ = (UniqueConstraint("kind", "ref_id", name="uq_conversation_summaries_kind_ref"),)
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(20), nullable=False)
+    ref_id = Column(Integer, nullable=False)
+    summary = Column(Text, nullable=False)
+    covered = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -0,0 +1,31 @@
+"""
+Opgeslagen embeddings voor vacatures en CV's.
+
+Eén rij per (owner_type, owner_id, model). De vector staat als float32-bytes
+in `vector`; content_hash is de sha1 van de ingebedde tekst, zodat een
+ongewijzigde tekst niet opnieuw wordt ingebed. Zie backend/services/embeddings.py.
+"""
+
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, UniqueConstraint
+from sqlalchemy.sql import func
+
+from backend.models.base import Base
+
+
+class Embedding(Base):
+    __tablename__ = "embeddings"
+    __table_args__ = (
+        UniqueConstraint("owner_type", "owner_id", "model", name="uq_embedding_owner_model"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    owner_type = Column(String(20), nullable=False)   # "vacancy" | "cv"
+    owner_id = Column(Integer, nullable=False)
+    model = Column(String(100), nullable=False)       # bv. "text-embedding-3-small" of "local-hash-512"
+
+    content_hash = Column(String(40), nullable=False)
+    dim = Column(Integer, nullable=False)
+    vector = Column(LargeBinary, nullable=False)      # float32, L2-genormaliseerd
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -0,0 +1,47 @@
+"""
+Achtergrondverwerking van een afgerond virtueel interview.
+
+Eén rij per interviewsessie. Het "afronden"-request slaat alleen het
+transcript op, markeert de sessie als voltooid en maakt deze taak aan; de
+worker in backend/services/interview_completion.py voert de stappen uit
+(scoren, beslissen, vervolgafspraak plannen, werkgever/kandidaat
+informeren). Elke stap heeft een eigen *_at-kolom en wordt bij een retry
+overgeslagen zodra hij klaar is.
+"""
+
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.sql import func
+
+from backend.models.base import Base
+
+
+class InterviewCompletionTask(Base):
+    __tablename__ = "interview_completion_tasks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(
+        Integer, ForeignKey("virtual_interview_sessions.id", ondelete="CASCADE"),
+        nullable=False, unique=True, index=True,
+    )
+    application_id = Column(Integer, ForeignKey("applications.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # queued | running | done | failed
+    status = Column(String(20), nullable=False, default="queued", index=True)
+    language = Column(String(5), nullable=False, default="nl")
+    # Uitkomst van de stap "decide": vervolgafspraak inplannen?
+    followup_wanted = Column(Boolean, nullable=True)
+
+    # Afgeronde stappen
+    scored_at = Column(DateTime(timezone=True), nullable=True)
+    decided_at = Column(DateTime(timezone=True), nullable=True)
+    followup_checked_at = Column(DateTime(timezone=True), nullable=True)
+    employer_notified_at = Column(DateTime(timezone=True), nullable=True)
+    invite_sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,29 @@
+"""
+Beurten van een virtueel interview (append-only).
+
+Vervangt het JSON-blob VirtualInterviewSession.transcript: elke beurt is
+één rij, zodat een nieuw antwoord een INSERT is in plaats van het hele
+transcript opnieuw te parsen, serialiseren en weg te schrijven. De volgorde
+is seq (0, 1, 2, ...) per sessie; rol als kleine integer (zie ROLES).
+"""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, SmallInteger, Text, UniqueConstraint
+from sqlalchemy.sql import func
+
+from backend.models.base import Base
+
+
+class InterviewTurn(Base):
+    __tablename__ = "interview_turns"
+    __table_args__ = (UniqueConstraint("session_id", "seq", name="uq_interview_turns_session_seq"),)
+
+    ROLES = ("recruiter", "candidate")  # role-kolom = index in deze tuple
+
+    id = Column(Integer, primary_key=True)
+    session_id = Column(
+        Integer, ForeignKey("virtual_interview_sessions.id", ondelete="CASCADE"), nullable=False
+    )
+    seq = Column(Integer, nullable=False)
+    role = Column(SmallInteger, nullable=False)
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,26 @@
+"""
+LLM response cache.
+
+Eén rij per unieke OpenAI-aanvraag, gesleuteld op een sha256-hash van
+(model, messages, temperature, max_tokens, response_format). Zie
+backend/services/llm_cache.py voor TTL en LRU-opruiming.
+"""
+
+from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy.sql import func
+
+from backend.models.base import Base
+
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    key = Column(String(64), nullable=False, unique=True, index=True)  # sha256 hex
+    model = Column(String(100), nullable=False)
+    response = Column(Text, nullable=False)
+
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_hit_at = Column(DateTime(timezone=True), nullable=True, index=True)  # LRU
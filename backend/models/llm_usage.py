@@ -0,0 +1,41 @@
+"""
+LLM-gebruik per dag, feature en model (rollup).
+
+Eén rij per (dag, feature, model) met tellers voor calls, cache-hits, fouten,
+tokens en kosten, plus een latency-histogram (vaste buckets, zie
+backend/services/llm_usage.py) zodat p50/p95 over dagen en workers heen
+samen te voegen zijn zonder ruwe events op te slaan.
+"""
+
+from sqlalchemy import BigInteger, Column, Date, DateTime, Float, Integer, String, Text, UniqueConstraint
+from sqlalchemy.sql import func
+
+from backend.models.base import Base
+
+
+class LLMUsageDaily(Base):
+    __tablename__ = "llm_usage_daily"
+    __table_args__ = (
+        UniqueConstraint("day", "feature", "model", name="uq_llm_usage_daily"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    day = Column(Date, nullable=False, index=True)  # UTC
+    feature = Column(String(64), nullable=False)    # "lisa_chat", "apply_prescreen", ...
+    model = Column(String(100), nullable=False)
+
+    calls = Column(Integer, nullable=False, default=0)       # incl. cache-hits en fouten
+    cache_hits = Column(Integer, nullable=False, default=0)
+    errors = Column(Integer, nullable=False, default=0)
+    error_classes = Column(Text, nullable=True)              # JSON {"APITimeoutError": 3, ...}
+
+    prompt_tokens = Column(BigInteger, nullable=False, default=0)
+    completion_tokens = Column(BigInteger, nullable=False, default=0)
+    characters = Column(BigInteger, nullable=False, default=0)  # TTS-input
+    cost_usd = Column(Float, nullable=False, default=0.0)
+
+    latency_ms_total = Column(Float, nullable=False, default=0.0)
+    latency_hist = Column(Text, nullable=True)               # JSON lijst met tellingen per bucket
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,42 @@
+"""
+Batch-herberekening van matchscores voor één vacature.
+
+Na een wijziging van de vacaturetekst zijn de bestaande AIResults verouderd.
+Een RescoreJob scoort de betrokken sollicitaties opnieuw in de achtergrond
+(backend/services/rescore.py); sollicitaties waarvan CV en vacaturetekst niet
+veranderd zijn sinds het laatste AIResult worden overgeslagen. De tellers
+dienen als voortgang voor het poll-endpoint.
+"""
+
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.sql import func
+
+from backend.models.base import Base
+
+
+class RescoreJob(Base):
+    __tablename__ = "rescore_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    vacancy_id = Column(Integer, ForeignKey("vacancies.id", ondelete="CASCADE"), nullable=False, index=True)
+    requested_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    # queued | running | done | failed
+    status = Column(String(20), nullable=False, default="queued", index=True)
+    # Ook ongewijzigde sollicitaties opnieuw scoren
+    force = Column(Boolean, nullable=False, default=False)
+    # sha256 van de vacaturetekst waartegen (het laatst) gescoord is
+    vacancy_hash = Column(String(64), nullable=True)
+
+    # Voortgang
+    total = Column(Integer, nullable=False, default=0)       # sollicitaties op de vacature
+    skipped = Column(Integer, nullable=False, default=0)     # CV en vacature ongewijzigd
+    processed = Column(Integer, nullable=False, default=0)   # al door de LLM gescoord
+    written = Column(Integer, nullable=False, default=0)     # nieuwe AIResults
+
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -11,7 +11,7 @@ Flow:
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from backend.models.base import Base
@@ -46,6 +46,10 @@ class ScrapedVacancy(Base):
     # "pending" → nog niet goedgekeurd door admin
     # "published" → live als Vacancy, wacht op claim
     # "claimed" → werkgever heeft account aangemaakt
+    # "flagged" → lage kwaliteitsscore bij scrapen, eerst handmatig beoordelen
+
+    # Kwaliteitsscore (0–1) uit services/scrape_quality.py
+    quality_score = Column(Float, nullable=True)
 
     claim_notified = Column(Boolean, default=False, nullable=False)
     # True zodra claim-mail verstuurd is (wordt maar 1x verstuurd)
@@ -0,0 +1,51 @@
+"""
+SerpAPI cache + query-statistieken.
+
+- SerpApiCache: één rij per betaalde SerpAPI-call (engine, query, start, dag).
+  Dezelfde zoekopdracht op dezelfde dag wordt uit de cache geserveerd.
+  Het aantal rijen per maand = verbruikte SerpAPI credits (budget-telling).
+- SerpApiQueryStat: historische opbrengst per query (vacatures mét e-mail),
+  gebruikt om queries te prioriteren wanneer het budget krap is.
+"""
+
+from sqlalchemy import Column, Date, DateTime, Integer, String, Text, UniqueConstraint
+from sqlalchemy.sql import func
+
+from backend.models.base import Base
+
+
+class SerpApiCache(Base):
+    __tablename__ = "serpapi_cache"
+    __table_args__ = (
+        UniqueConstraint("engine", "query", "start", "day", name="uq_serpapi_cache_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    engine = Column(String(50), nullable=False)   # "google" | "google_jobs"
+    query = Column(String(500), nullable=False)
+    start = Column(Integer, nullable=False, default=0)
+    day = Column(Date, nullable=False, index=True)  # UTC dag van de call
+
+    # Ruwe JSON-response van SerpAPI
+    response = Column(Text, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class SerpApiQueryStat(Base):
+    __tablename__ = "serpapi_query_stats"
+    __table_args__ = (
+        UniqueConstraint("engine", "query", name="uq_serpapi_query_stat"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    engine = Column(String(50), nullable=False)
+    query = Column(String(500), nullable=False)
+
+    runs = Column(Integer, nullable=False, default=0)           # aantal keer uitgevoerd
+    results = Column(Integer, nullable=False, default=0)        # totaal gevonden vacatures
+    emailed_results = Column(Integer, nullable=False, default=0)  # waarvan mét e-mail
+
+    last_run_at = Column(DateTime(timezone=True), nullable=True)
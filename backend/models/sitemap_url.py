@@ -0,0 +1,25 @@
+"""
+SitemapUrl — onthoudt welke vacature-URLs uit een sitemap al bezocht zijn.
+
+De scraper vergelijkt <lastmod> uit de sitemap met de opgeslagen waarde en
+haalt alleen nieuwe of gewijzigde detailpagina's opnieuw op.
+"""
+
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from backend.models.base import Base
+
+
+class SitemapUrl(Base):
+    __tablename__ = "sitemap_urls"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    url = Column(String(1000), nullable=False, unique=True, index=True)
+    site = Column(String(100), nullable=True)   # bureau-naam, bijv. "yer.nl"
+
+    # Ruwe <lastmod> waarde uit de sitemap (None als de sitemap die niet geeft)
+    lastmod = Column(String(40), nullable=True)
+
+    checked_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,34 @@
+"""
+TTS audio-cache.
+
+Eén rij per unieke uitspraak, gesleuteld op een sha256-hash van
+(model, voice, speed, format, tekst). De audio zelf staat in de
+storage-backend (lokaal of S3, zie backend/services/storage.py);
+deze tabel houdt de metadata bij voor ETags en LRU-opruiming
+(zie backend/services/tts_cache.py).
+"""
+
+from sqlalchemy import Column, DateTime, Float, Integer, String, Text
+from sqlalchemy.sql import func
+
+from backend.models.base import Base
+
+
+class TTSCacheEntry(Base):
+    __tablename__ = "tts_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    key = Column(String(64), nullable=False, unique=True, index=True)  # sha256 hex van de invoer
+    storage_key = Column(String(255), nullable=False)
+    etag = Column(String(64), nullable=False)                          # sha256 hex van de audio
+
+    model = Column(String(50), nullable=False)
+    voice = Column(String(50), nullable=False)
+    speed = Column(Float, nullable=False)
+    text = Column(Text, nullable=False)
+    size_bytes = Column(Integer, nullable=False, default=0)
+
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_hit_at = Column(DateTime(timezone=True), nullable=True, index=True)  # LRU
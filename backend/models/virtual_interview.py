@@ -23,7 +23,8 @@ class VirtualInterviewSession(Base):
     # Status: "pending" | "in_progress" | "completed" | "abandoned"
     status = Column(String(20), default="pending", nullable=False)
 
-    # Volledig gesprekstranscript als JSON: [{role, content, timestamp}]
+    # Verouderd: transcript als JSON [{role, content, timestamp}]. Beurten staan
+    # sinds migratie 029 in interview_turns; de kolom wordt niet meer geschreven
     transcript = Column(Text, nullable=True)
 
     # AI score na afloop (0-100)
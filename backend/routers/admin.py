@@ -9,7 +9,7 @@ import os
 from datetime import date, datetime, timedelta, timezone
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from sqlalchemy import func, cast, Date
@@ -18,6 +18,7 @@ from backend.db import get_db
 from backend import models
 from backend.routers.auth import get_current_user, require_role
 from backend.security import hash_password
+from backend.services import embeddings, llm_cache, llm_scheduler, llm_usage
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -145,6 +146,45 @@ def get_stats(
     )
 
 
+@router.get("/llm-cache/stats")
+def get_llm_cache_stats(current_user: models.User = Depends(get_current_user)):
+    """Hit/miss-tellers van de LLM response-cache (sinds start van dit proces)."""
+    require_role(current_user, "admin")
+    return llm_cache.stats()
+
+
+@router.get("/llm-scheduler")
+def get_llm_scheduler(current_user: models.User = Depends(get_current_user)):
+    """Lopende en wachtende OpenAI-calls per prioriteitsklasse en het token-budget (dit proces)."""
+    require_role(current_user, "admin")
+    return llm_scheduler.stats()
+
+
+@router.get("/llm-usage")
+def get_llm_usage(
+    days: int = 7,
+    feature: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    LLM-gebruik per dag en feature: calls, cache hit-rate, fouten, tokens,
+    kosten (USD) en p50/p95 latency. Events van dit proces worden eerst
+    weggeschreven, zodat de cijfers actueel zijn.
+    """
+    require_role(current_user, "admin")
+    llm_usage.flush()
+    rows = llm_usage.summary(db, days=min(max(days, 1), 90), feature=feature)
+    totals: dict = {}
+    for row in rows:
+        t = totals.setdefault(row["feature"], {"calls": 0, "cost_usd": 0.0, "prompt_tokens": 0, "completion_tokens": 0})
+        t["calls"] += row["calls"]
+        t["cost_usd"] = round(t["cost_usd"] + row["cost_usd"], 4)
+        t["prompt_tokens"] += row["prompt_tokens"]
+        t["completion_tokens"] += row["completion_tokens"]
+    return {"days": rows, "totals_per_feature": totals}
+
+
 @router.get("/users", response_model=List[UserAdminOut])
 def list_users(
     db: Session = Depends(get_db),
@@ -215,6 +255,7 @@ def revoke_free_trial(
 @router.delete("/users/{user_id}", status_code=204)
 def delete_user(
     user_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -249,6 +290,15 @@ def delete_user(
         db.query(models.AIResult).filter(models.AIResult.application_id.in_(id_list)).delete(synchronize_session=False)
         db.query(models.IntakeAnswer).filter(models.IntakeAnswer.application_id.in_(id_list)).delete(synchronize_session=False)
         db.query(models.RecruiterChatMessage).filter(models.RecruiterChatMessage.application_id.in_(id_list)).delete(synchronize_session=False)
+        vi_ids = db.query(models.VirtualInterviewSession.id).filter(models.VirtualInterviewSession.application_id.in_(id_list))
+        db.query(models.InterviewTurn).filter(models.InterviewTurn.session_id.in_(vi_ids)).delete(synchronize_session=False)
+        db.query(models.InterviewCompletionTask).filter(
+            models.InterviewCompletionTask.application_id.in_(id_list)
+        ).delete(synchronize_session=False)
+        db.query(models.ConversationSummary).filter(
+            ((models.ConversationSummary.kind == "chat") & models.ConversationSummary.ref_id.in_(id_list))
+            | ((models.ConversationSummary.kind == "interview") & models.ConversationSummary.ref_id.in_(vi_ids))
+        ).delete(synchronize_session=False)
         db.query(models.VirtualInterviewSession).filter(models.VirtualInterviewSession.application_id.in_(id_list)).delete(synchronize_session=False)
         db.query(models.InterviewSession).filter(models.InterviewSession.application_id.in_(id_list)).delete(synchronize_session=False)
         db.query(models.Application).filter(models.Application.id.in_(id_list)).delete(synchronize_session=False)
@@ -256,6 +306,7 @@ def delete_user(
     # Verwijder vacancy-gerelateerde records
     if vacancy_ids:
         db.query(models.PromotionRequest).filter(models.PromotionRequest.vacancy_id.in_(vacancy_ids)).delete(synchronize_session=False)
+        db.query(models.RescoreJob).filter(models.RescoreJob.vacancy_id.in_(vacancy_ids)).delete(synchronize_session=False)
         db.query(models.Vacancy).filter(models.Vacancy.employer_id == user_id).delete(synchronize_session=False)
 
     # Verwijder kandidaat-CV's
@@ -263,6 +314,7 @@ def delete_user(
 
     db.delete(user)
     db.commit()
+    background_tasks.add_task(embeddings.sync_vacancies, vacancy_ids)  # uit de aanbevelingen-index
 
 
 @router.patch("/users/{user_id}/password", status_code=200)
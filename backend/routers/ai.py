@@ -1,11 +1,13 @@
-from typing import Optional
+import asyncio
+import re
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
-from openai import OpenAI
 from sqlalchemy.orm import Session
 from jose import jwt, JWTError
-import os
 import json
 import requests as _requests
 from bs4 import BeautifulSoup
@@ -13,6 +15,7 @@ from bs4 import BeautifulSoup
 from backend.db import get_db
 from backend import models
 from backend.security import SECRET_KEY, ALGORITHM
+from backend.services import cv_digest, lexical_match, llm
 
 _oauth2 = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
@@ -29,15 +32,12 @@ def _optional_user(token: str | None = Depends(_oauth2), db: Session = Depends(g
 router = APIRouter()
 
 # =========================
-# OpenAI client
+# OpenAI (via backend.services.llm)
 # =========================
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
+if not llm.is_enabled():
     print("WAARSCHUWING: OPENAI_API_KEY is niet ingesteld.")
 
-client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
-
 
 # =========================
 # Pydantic modellen
@@ -88,25 +88,98 @@ def _get_language(request: Request) -> str:
 
 
 def ensure_client():
-    if client is None:
+    if not llm.is_enabled():
         raise HTTPException(
             status_code=500,
             detail="OPENAI_API_KEY is niet ingesteld in de omgeving."
         )
-    return client
 
 
-# =========================
-# Endpoint: CV herschrijven
-# =========================
+# ── Server-Sent Events ───────────────────────────────────────────────────────
+# De /stream-varianten draaien async (geen threadpool-slot per request) en
+# sturen tokens door zodra ze binnenkomen. Verbreekt de client, dan stopt de
+# generator en sluit llm.astream() de upstream-stream naar OpenAI.
 
-@router.post("/rewrite-cv", response_model=RewriteCVResponse)
-def rewrite_cv(payload: RewriteCVRequest) -> RewriteCVResponse:
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},  # nginx niet laten bufferen
+    )
+
+
+async def _stream_text(request: Request, messages: list, result_key: str, feature: str) -> AsyncIterator[str]:
+    """'delta'-events per token, daarna één 'done'-event met {result_key: volledige tekst}."""
+    parts = []
+    try:
+        async with aclosing(llm.astream(messages, feature=feature)) as stream:
+            async for delta in stream:
+                if await request.is_disconnected():
+                    return
+                parts.append(delta)
+                yield _sse("delta", {"text": delta})
+        yield _sse("done", {result_key: "".join(parts).strip()})
+    except Exception as exc:
+        yield _sse("error", {"detail": f"AI fout: {exc}"})
+
+
+_JSON_KEY_RE = re.compile(r'"(\w+)"\s*:\s*"')
+_JSON_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+
+
+def _partial_json_strings(buffer: str) -> Dict[str, Tuple[str, bool]]:
     """
-    Herschrijf een CV netjes voor recruiters.
+    Stringvelden uit een (nog onvolledig) JSON-object.
+    Geeft {key: (waarde tot nu toe, compleet)} terug; stopt bij het eerste
+    onafgemaakte veld.
     """
-    c = ensure_client()
+    out: Dict[str, Tuple[str, bool]] = {}
+    pos = 0
+    while True:
+        m = _JSON_KEY_RE.search(buffer, pos)
+        if not m:
+            break
+        i, chars, complete = m.end(), [], False
+        while i < len(buffer):
+            ch = buffer[i]
+            if ch == '"':
+                complete = True
+                i += 1
+                break
+            if ch == "\\":
+                if i + 1 >= len(buffer):
+                    break
+                esc = buffer[i + 1]
+                if esc == "u":
+                    if i + 6 > len(buffer):
+                        break
+                    try:
+                        chars.append(chr(int(buffer[i + 2:i + 6], 16)))
+                    except ValueError:
+                        pass
+                    i += 6
+                    continue
+                chars.append(_JSON_ESCAPES.get(esc, esc))
+                i += 2
+                continue
+            chars.append(ch)
+            i += 1
+        out[m.group(1)] = ("".join(chars), complete)
+        if not complete:
+            break
+        pos = i
+    return out
 
+
+# =========================
+# Endpoint: CV herschrijven
+# =========================
+
+def _rewrite_cv_messages(payload: RewriteCVRequest) -> list:
     lang_map = {"nl": "Dutch", "en": "English", "de": "German", "fr": "French", "es": "Spanish"}
     lang_name = lang_map.get(payload.language, "Dutch")
     system_prompt = (
@@ -129,16 +202,21 @@ def rewrite_cv(payload: RewriteCVRequest) -> RewriteCVResponse:
         f"{user_extra}\n\n"
         f"CV-tekst:\n{payload.cv_text}"
     )
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content},
+    ]
+
+
+@router.post("/rewrite-cv", response_model=RewriteCVResponse)
+def rewrite_cv(payload: RewriteCVRequest) -> RewriteCVResponse:
+    """
+    Herschrijf een CV netjes voor recruiters.
+    """
+    ensure_client()
 
     try:
-        resp = c.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_content},
-            ]
-        )
-        rewritten = resp.choices[0].message.content.strip()
+        rewritten = llm.chat(_rewrite_cv_messages(payload), feature="cv_rewrite")
         return RewriteCVResponse(rewritten_cv=rewritten)
     except Exception as e:
         # Fout netjes teruggeven i.p.v. 500 naar frontend
@@ -149,17 +227,18 @@ def rewrite_cv(payload: RewriteCVRequest) -> RewriteCVResponse:
         return RewriteCVResponse(rewritten_cv=msg)
 
 
+@router.post("/rewrite-cv/stream")
+async def rewrite_cv_stream(payload: RewriteCVRequest, request: Request) -> StreamingResponse:
+    """SSE-variant van /rewrite-cv: 'delta'-events per token, daarna 'done' met rewritten_cv."""
+    ensure_client()
+    return _sse_response(_stream_text(request, _rewrite_cv_messages(payload), "rewritten_cv", "cv_rewrite"))
+
+
 # =========================
 # Endpoint: Motivatiebrief
 # =========================
 
-@router.post("/motivation-letter", response_model=MotivationLetterResponse)
-def motivation_letter(payload: MotivationLetterRequest) -> MotivationLetterResponse:
-    """
-    Schrijf een motivatiebrief op basis van CV + vacaturetekst.
-    """
-    c = ensure_client()
-
+def _motivation_letter_messages(payload: MotivationLetterRequest) -> list:
     company_line = (
         f"De brief is gericht aan: {payload.company_name}.\n"
         if payload.company_name
@@ -182,16 +261,21 @@ def motivation_letter(payload: MotivationLetterRequest) -> MotivationLetterRespo
         f"CV-tekst:\n{payload.cv_text}\n\n"
         f"Vacaturetekst:\n{payload.job_description}"
     )
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content},
+    ]
+
+
+@router.post("/motivation-letter", response_model=MotivationLetterResponse)
+def motivation_letter(payload: MotivationLetterRequest) -> MotivationLetterResponse:
+    """
+    Schrijf een motivatiebrief op basis van CV + vacaturetekst.
+    """
+    ensure_client()
 
     try:
-        resp = c.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_content},
-            ]
-        )
-        letter = resp.choices[0].message.content.strip()
+        letter = llm.chat(_motivation_letter_messages(payload), feature="motivation_letter")
         return MotivationLetterResponse(letter=letter)
     except Exception as e:
         msg = (
@@ -201,6 +285,13 @@ def motivation_letter(payload: MotivationLetterRequest) -> MotivationLetterRespo
         return MotivationLetterResponse(letter=msg)
 
 
+@router.post("/motivation-letter/stream")
+async def motivation_letter_stream(payload: MotivationLetterRequest, request: Request) -> StreamingResponse:
+    """SSE-variant van /motivation-letter: 'delta'-events per token, daarna 'done' met letter."""
+    ensure_client()
+    return _sse_response(_stream_text(request, _motivation_letter_messages(payload), "letter", "motivation_letter"))
+
+
 # =========================
 # Endpoint: Matchscore kandidaat <-> vacature
 # =========================
@@ -209,8 +300,11 @@ def motivation_letter(payload: MotivationLetterRequest) -> MotivationLetterRespo
 def match_job(payload: MatchJobRequest) -> MatchJobResponse:
     """
     Laat AI een matchscore (0-100) geven tussen kandidaatprofiel en vacature.
+    Duidelijk irrelevante profielen krijgen direct de lexicale score (geen AI-call).
     """
-    c = ensure_client()
+    lex = lexical_match.score(payload.candidate_profile_text, payload.job_description)
+    if lex.clearly_irrelevant or not llm.is_enabled():
+        return MatchJobResponse(match_score=lex.score, explanation=lex.explanation())
 
     system_prompt = (
         "Je bent een STRENGE, kritische recruitment consultant. "
@@ -239,17 +333,16 @@ def match_job(payload: MatchJobRequest) -> MatchJobResponse:
     )
 
     try:
-        resp = c.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
+        content = llm.chat(
+            [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_content},
             ],
-            response_format={"type": "json_object"}
+            response_format={"type": "json_object"},
+            feature="job_match",
         )
 
-        raw = resp.choices[0].message.content
-        data = json.loads(raw)
+        data = json.loads(content)
 
         score = int(data.get("match_score", 0))
         explanation = data.get("explanation", "").strip() or "Geen uitleg ontvangen."
@@ -262,12 +355,9 @@ def match_job(payload: MatchJobRequest) -> MatchJobResponse:
 
         return MatchJobResponse(match_score=score, explanation=explanation)
     except Exception as e:
-        # Geen harde 500 naar de voorkant, maar een nette fallback
-        fallback_explanation = (
-            "Er ging iets mis bij het berekenen van de matchscore met OpenAI. "
-            f"Technische fout: {str(e)}"
-        )
-        return MatchJobResponse(match_score=0, explanation=fallback_explanation)
+        # Geen harde 500 naar de voorkant, maar de lexicale score als fallback
+        fallback_explanation = f"{lex.explanation()} (AI analyse mislukt: {str(e)})"
+        return MatchJobResponse(match_score=lex.score, explanation=fallback_explanation)
 
 
 # =========================
@@ -291,14 +381,8 @@ class GenerateVacancyResponse(BaseModel):
     description: str
 
 
-@router.post("/motivation-letter-for-vacancy/{vacancy_id}", response_model=MotivationForVacancyResponse)
-def motivation_letter_for_vacancy(
-    vacancy_id: int,
-    request: Request,
-    current_user: models.User = Depends(_optional_user),
-    db: Session = Depends(get_db),
-) -> MotivationForVacancyResponse:
-    """Genereer een motivatiebrief op basis van het CV en de vacature van de ingelogde kandidaat."""
+def _vacancy_letter_messages(vacancy_id: int, request: Request, current_user, db: Session) -> list:
+    """Berichten voor een motivatiebrief op basis van het nieuwste CV en de vacature (valideert ook)."""
     if not current_user:
         raise HTTPException(status_code=401, detail="Niet ingelogd")
 
@@ -312,7 +396,8 @@ def motivation_letter_for_vacancy(
         .order_by(models.CandidateCV.id.desc())
         .first()
     )
-    cv_text = cv.extracted_text if cv else ""
+    # Digest (gemaakt bij upload); geen db meegeven — dit draait ook in de async stream-route
+    cv_text = cv_digest.for_prompt(cv, max_chars=3000)
     job_text = vacancy.description or vacancy.extracted_text or ""
 
     if not cv_text:
@@ -320,33 +405,55 @@ def motivation_letter_for_vacancy(
 
     language = _get_language(request)
     lang_name = _LANG_NAMES.get(language, "Dutch")
-    c = ensure_client()
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You are an experienced recruitment copywriter. "
+                "Write a strong, personal motivation letter in first person. "
+                "Professional, concrete, max 3/4 A4. "
+                "Structure: intro, why this role/organisation, what I bring, call-to-action. "
+                f"Always respond in {lang_name}."
+            ),
+        },
+        {
+            "role": "user",
+            "content": f"CV:\n{cv_text}\n\nVACATURE:\n{job_text[:2000]}",
+        },
+    ]
+
+
+@router.post("/motivation-letter-for-vacancy/{vacancy_id}", response_model=MotivationForVacancyResponse)
+def motivation_letter_for_vacancy(
+    vacancy_id: int,
+    request: Request,
+    current_user: models.User = Depends(_optional_user),
+    db: Session = Depends(get_db),
+) -> MotivationForVacancyResponse:
+    """Genereer een motivatiebrief op basis van het CV en de vacature van de ingelogde kandidaat."""
+    messages = _vacancy_letter_messages(vacancy_id, request, current_user, db)
+    ensure_client()
     try:
-        resp = c.chat.completions.create(
-            model="gpt-4.1-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an experienced recruitment copywriter. "
-                        "Write a strong, personal motivation letter in first person. "
-                        "Professional, concrete, max 3/4 A4. "
-                        "Structure: intro, why this role/organisation, what I bring, call-to-action. "
-                        f"Always respond in {lang_name}."
-                    ),
-                },
-                {
-                    "role": "user",
-                    "content": f"CV:\n{cv_text[:3000]}\n\nVACATURE:\n{job_text[:2000]}",
-                },
-            ],
-        )
-        letter = resp.choices[0].message.content.strip()
+        letter = llm.chat(messages, feature="motivation_letter")
         return MotivationForVacancyResponse(letter=letter)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"AI fout: {exc}")
 
 
+@router.post("/motivation-letter-for-vacancy/{vacancy_id}/stream")
+async def motivation_letter_for_vacancy_stream(
+    vacancy_id: int,
+    request: Request,
+    current_user: models.User = Depends(_optional_user),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """SSE-variant: 'delta'-events per token, daarna 'done' met letter."""
+    # DB-queries (vacature, CV) niet op de event loop
+    messages = await asyncio.to_thread(_vacancy_letter_messages, vacancy_id, request, current_user, db)
+    ensure_client()
+    return _sse_response(_stream_text(request, messages, "letter", "motivation_letter"))
+
+
 # =========================
 # Endpoint: Vacature genereren
 # =========================
@@ -372,19 +479,16 @@ def _scrape_website(url: str, max_chars: int = 3000) -> str:
         return ""
 
 
-@router.post("/generate-vacancy", response_model=GenerateVacancyResponse)
-def generate_vacancy(
-    payload: GenerateVacancyRequest,
-    request: Request,
-    current_user: models.User = Depends(_optional_user),
-) -> GenerateVacancyResponse:
-    """Genereer een complete vacaturetekst op basis van een korte omschrijving."""
+_VACANCY_FIELDS = ("title", "location", "hours_per_week", "salary_range", "description")
+
+
+def _generate_vacancy_messages(payload: GenerateVacancyRequest, request: Request, current_user) -> list:
     if not current_user or current_user.role not in ("employer", "admin"):
         raise HTTPException(status_code=403, detail="Alleen werkgevers kunnen vacatures genereren")
 
     language = _get_language(request)
     lang_name = _LANG_NAMES.get(language, "Dutch")
-    c = ensure_client()
+    ensure_client()
 
     # Bedrijfscontext ophalen van de website (optioneel)
     company_context = ""
@@ -396,44 +500,90 @@ def generate_vacancy(
         if company_context
         else ""
     )
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You are an experienced recruitment copywriter. "
+                "You receive a short description from an employer and create a complete job vacancy from it. "
+                "If company information is available, use the tone, culture and values of that company. "
+                "Return ONLY a JSON object with these keys:\n"
+                "- title (string): the job title\n"
+                "- location (string): location, empty if unknown\n"
+                "- hours_per_week (string): e.g. '40 hours' or '32-40 hours'\n"
+                "- salary_range (string): e.g. '€3,500 - €5,000 per month', empty if unknown\n"
+                "- description (string): full job vacancy text with headings: "
+                "What will you do?, What do you bring?, What do we offer? "
+                f"Use markdown (**, bullet points). Max 400 words. Always respond in {lang_name}."
+            ),
+        },
+        {
+            "role": "user",
+            "content": (
+                f"Maak een vacature op basis van deze omschrijving:\n{payload.prompt}"
+                f"{company_block}"
+            ),
+        },
+    ]
+
+
+def _vacancy_from_json(data: dict) -> GenerateVacancyResponse:
+    return GenerateVacancyResponse(**{key: str(data.get(key) or "").strip() for key in _VACANCY_FIELDS})
+
 
+@router.post("/generate-vacancy", response_model=GenerateVacancyResponse)
+def generate_vacancy(
+    payload: GenerateVacancyRequest,
+    request: Request,
+    current_user: models.User = Depends(_optional_user),
+) -> GenerateVacancyResponse:
+    """Genereer een complete vacaturetekst op basis van een korte omschrijving."""
+    messages = _generate_vacancy_messages(payload, request, current_user)
     try:
-        resp = c.chat.completions.create(
-            model="gpt-4.1-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an experienced recruitment copywriter. "
-                        "You receive a short description from an employer and create a complete job vacancy from it. "
-                        "If company information is available, use the tone, culture and values of that company. "
-                        "Return ONLY a JSON object with these keys:\n"
-                        "- title (string): the job title\n"
-                        "- location (string): location, empty if unknown\n"
-                        "- hours_per_week (string): e.g. '40 hours' or '32-40 hours'\n"
-                        "- salary_range (string): e.g. '€3,500 - €5,000 per month', empty if unknown\n"
-                        "- description (string): full job vacancy text with headings: "
-                        "What will you do?, What do you bring?, What do we offer? "
-                        f"Use markdown (**, bullet points). Max 400 words. Always respond in {lang_name}."
-                    ),
-                },
-                {
-                    "role": "user",
-                    "content": (
-                        f"Maak een vacature op basis van deze omschrijving:\n{payload.prompt}"
-                        f"{company_block}"
-                    ),
-                },
-            ],
+        content = llm.chat(
+            messages,
             response_format={"type": "json_object"},
+            cache=False,  # werkgever verwacht bij opnieuw genereren een nieuwe tekst
+            feature="vacancy_generation",
         )
-        data = json.loads(resp.choices[0].message.content)
-        return GenerateVacancyResponse(
-            title=data.get("title", "").strip(),
-            location=data.get("location", "").strip(),
-            hours_per_week=data.get("hours_per_week", "").strip(),
-            salary_range=data.get("salary_range", "").strip(),
-            description=data.get("description", "").strip(),
-        )
+        return _vacancy_from_json(json.loads(content))
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"AI fout: {exc}")
+
+
+@router.post("/generate-vacancy/stream")
+async def generate_vacancy_stream(
+    payload: GenerateVacancyRequest,
+    request: Request,
+    current_user: models.User = Depends(_optional_user),
+) -> StreamingResponse:
+    """
+    SSE-variant van /generate-vacancy. Terwijl de JSON binnenkomt volgen
+    'field'-events ({"name", "delta", "complete"}) met de nieuw ontvangen
+    tekst per veld, zodat het formulier zich veld voor veld vult; daarna
+    'done' met de volledige vacature.
+    """
+    # Website scrapen is blokkerend — niet op de event loop
+    messages = await asyncio.to_thread(_generate_vacancy_messages, payload, request, current_user)
+
+    async def events() -> AsyncIterator[str]:
+        buffer = ""
+        sent: Dict[str, Tuple[int, bool]] = {}   # veld → (verstuurde lengte, compleet)
+        try:
+            async with aclosing(llm.astream(
+                messages, response_format={"type": "json_object"}, feature="vacancy_generation"
+            )) as stream:
+                async for delta in stream:
+                    if await request.is_disconnected():
+                        return
+                    buffer += delta
+                    for name, (value, complete) in _partial_json_strings(buffer).items():
+                        done_len, done_complete = sent.get(name, (0, False))
+                        if name in _VACANCY_FIELDS and (len(value) > done_len or complete != done_complete):
+                            sent[name] = (len(value), complete)
+                            yield _sse("field", {"name": name, "delta": value[done_len:], "complete": complete})
+            yield _sse("done", _vacancy_from_json(json.loads(buffer)).model_dump())
+        except Exception as exc:
+            yield _sse("error", {"detail": f"AI fout: {exc}"})
+
+    return _sse_response(events())
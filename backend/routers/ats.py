@@ -297,7 +297,7 @@ def ai_rank_internal(job_id: int, db: Session = Depends(get_db)):
     if not candidates:
         return []
 
-    ranked = rank_candidates_for_job(job, candidates)
+    ranked = rank_candidates_for_job(db, job, candidates)
 
     out: List[CandidateListItem] = []
     for item in ranked:
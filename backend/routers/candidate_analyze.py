@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-import json
-import os
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -10,14 +8,13 @@ from sqlalchemy.orm import Session
 from backend.db import get_db
 from backend import models, schemas
 from backend.routers.auth import get_current_user, require_role
-
-from openai import OpenAI
+from backend.services import apply_pipeline, cv_digest, embeddings, llm
 
 router = APIRouter(prefix="/candidate", tags=["candidate-analyze"])
 
 
 def _openai_enabled() -> bool:
-    return bool(os.getenv("OPENAI_API_KEY", "").strip())
+    return llm.is_enabled()
 
 
 @router.post("/analyze/{vacancy_id}", response_model=schemas.AIResultOut)
@@ -26,11 +23,13 @@ def analyze(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
+    """
+    AI-analyse van CV tegen vacature. Loopt via de apply-pipeline (zelfde
+    prompt, retries en lexicale fallback), maar wacht op het resultaat zodat
+    de response een AIResult blijft.
+    """
     require_role(current_user, "candidate")
 
-    if not _openai_enabled():
-        raise HTTPException(status_code=501, detail="AI not configured: set OPENAI_API_KEY on Render")
-
     vacancy = db.query(models.Vacancy).filter(models.Vacancy.id == vacancy_id).first()
     if not vacancy:
         raise HTTPException(status_code=404, detail="Vacancy not found")
@@ -54,84 +53,70 @@ def analyze(
     if not app:
         app = models.Application(candidate_id=current_user.id, vacancy_id=vacancy_id, status="applied")
         db.add(app)
-        db.commit()
-        db.refresh(app)
+        db.flush()
+
+    task = apply_pipeline.enqueue(db, app.id, kind="analyze", cv_id=cv.id)
+    if task.kind != "analyze":
+        # De sollicitatie zelf wordt nog verwerkt; die levert ook een AIResult
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Application is still being processed, try again shortly")
+    db.commit()
+
+    apply_pipeline.run_task(task.id)
+
+    db.refresh(task)
+    if task.scored_at is None:
+        if task.status in ("queued", "running") and not task.last_error:
+            # Een andere worker heeft de taak al opgepakt
+            raise HTTPException(status_code=409, detail="Analysis already running, try again shortly")
+        raise HTTPException(status_code=502, detail=f"AI analysis failed: {task.last_error}")
+
+    return (
+        db.query(models.AIResult)
+        .filter(models.AIResult.application_id == app.id)
+        .order_by(models.AIResult.id.desc())
+        .first()
+    )
 
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 
+RECOMMEND_K = 3
+
+
+def _explain_matches(cv_text: str, vacancies: list) -> dict:
+    """Laat de LLM alleen de gevonden top-k beoordelen en uitleggen. {vacancy_id: {...}}"""
+    vac_lines = "\n".join(
+        f"- ID {v.id}: {v.title} | {v.location or 'locatie onbekend'} | {(v.description or '')[:400]}"
+        for v in vacancies
+    )
     prompt = f"""
-Je bent een STRENGE, kritische recruitment consultant.
-Analyseer de match tussen CV en vacature en geef strikt JSON terug.
-
-SCORINGSRICHTLIJNEN (wees STRENG):
-- 0-20: Totaal geen relevante ervaring of opleiding voor deze functie
-- 21-40: Minimale overlap — enkele overdraagbare vaardigheden maar geen directe ervaring
-- 41-55: Gedeeltelijke match — enige relevante ervaring maar mist belangrijke vereisten
-- 56-70: Redelijke match — heeft relevante ervaring maar niet alles wat gevraagd wordt
-- 71-85: Goede match — voldoet aan de meeste vereisten met relevante werkervaring
-- 86-100: Uitstekende match — voldoet aan vrijwel alle vereisten, sterke directe ervaring
-
-BELANGRIJK:
-- Beoordeel op HARDE vaardigheden en RELEVANTE werkervaring, niet op soft skills
-- Een CV uit een totaal andere branche zonder relevante skills = MAX 35
-- Generieke CV-tekst zonder specifieke ervaring voor de functie = MAX 45
-- Geef alleen 70+ als de kandidaat aantoonbaar relevante werkervaring heeft
-- Wees eerlijk en realistisch — een te hoge score is misleidend voor de werkgever
-
-CV (extracted):
-{cv.extracted_text}
-
-Vacature:
-Titel: {vacancy.title}
-Locatie: {vacancy.location or ""}
-Uren: {vacancy.hours_per_week or ""}
-Salaris: {vacancy.salary_range or ""}
-Omschrijving:
-{vacancy.description or ""}
-
-JSON schema (strikt aanhouden):
-{{
-  "match_score": 0-100,
-  "summary": "korte samenvatting",
-  "strengths": "bulletpoints als tekst",
-  "gaps": "bulletpoints als tekst",
-  "suggested_questions": "3-7 intake vragen als tekst"
-}}
-""".strip()
+Je bent een STRENGE recruiter-AI. Onderstaande vacatures zijn via semantisch zoeken
+geselecteerd voor dit CV. Beoordeel elke vacature en leg kort uit waarom hij past.
+Wees realistisch: een CV uit een andere branche = MAX 35. Alleen 70+ bij directe relevante ervaring.
+
+CV:
+{cv_text}
+
+Vacatures:
+{vac_lines}
 
-    try:
-        resp = client.chat.completions.create(
-            model=model,
-            temperature=0.2,
-            messages=[
-                {"role": "system", "content": "Return ONLY valid JSON. No markdown."},
-                {"role": "user", "content": prompt},
-            ],
-        )
-        content = (resp.choices[0].message.content or "").strip()
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"OpenAI error: {e}")
-
-    # Parse JSON safely
-    import json
-    try:
-        data = json.loads(content)
-    except Exception:
-        raise HTTPException(status_code=502, detail=f"AI returned invalid JSON: {content[:300]}")
-
-    result = models.AIResult(
-        application_id=app.id,
-        match_score=int(data.get("match_score")) if data.get("match_score") is not None else None,
-        summary=data.get("summary"),
-        strengths=data.get("strengths"),
-        gaps=data.get("gaps"),
-        suggested_questions=data.get("suggested_questions"),
+Geef een JSON-object terug:
+{{"matches": [{{"vacancy_id": <id>, "match_score": <0-100>, "reason": "<max 12 woorden NL waarom goede match>"}}]}}
+""".strip()
+    data = llm.chat_json(
+        [
+            {"role": "system", "content": "Return ONLY valid JSON. No markdown."},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.2,
+        feature="vacancy_suggestions",
     )
-    db.add(result)
-    db.commit()
-    db.refresh(result)
-    return result
+    out = {}
+    for item in data.get("matches", []):
+        try:
+            out[int(item.get("vacancy_id"))] = item
+        except (TypeError, ValueError):
+            continue
+    return out
 
 
 @router.get("/recommendations", response_model=List[schemas.RecommendationOut])
@@ -140,12 +125,10 @@ def get_recommendations(
     current_user: models.User = Depends(get_current_user),
 ):
     """Geeft top-3 aanbevolen vacatures op basis van het CV van de kandidaat.
-    Maakt GEEN Application of AIResult aan — puur informatief."""
+    Zoekt via de embedding-index over alle actieve vacatures; de LLM legt
+    alleen de gevonden top-3 uit. Maakt GEEN Application of AIResult aan."""
     require_role(current_user, "candidate")
 
-    if not _openai_enabled():
-        raise HTTPException(status_code=501, detail="AI not configured: set OPENAI_API_KEY on Render")
-
     # Nieuwste CV ophalen
     cv = (
         db.query(models.CandidateCV)
@@ -164,77 +147,36 @@ def get_recommendations(
         .all()
     }
 
-    # Actieve vacatures ophalen (max 8, nieuwste eerst)
-    vac_query = (
-        db.query(models.Vacancy)
-        .filter(models.Vacancy.status == "actief")
-    )
-    if applied_ids:
-        vac_query = vac_query.filter(models.Vacancy.id.notin_(applied_ids))
-    vacancies = vac_query.order_by(models.Vacancy.id.desc()).limit(8).all()
-    if not vacancies:
+    hits = embeddings.recommend(db, cv, k=RECOMMEND_K, exclude=applied_ids)
+    if not hits:
         return []
 
-    # Bouw vacatureoverzicht voor de prompt
-    vac_lines = "\n".join(
-        f"- ID {v.id}: {v.title} | {v.location or 'locatie onbekend'} | {(v.description or '')[:200]}"
-        for v in vacancies
-    )
-
-    prompt = f"""
-Je bent een STRENGE recruiter-AI. Analyseer welke vacatures het beste passen bij het CV.
-Wees realistisch: een CV uit een andere branche = MAX 35. Alleen 70+ bij directe relevante ervaring.
-
-CV (samenvatting, eerste 1000 tekens):
-{cv.extracted_text[:1000]}
-
-Beschikbare vacatures:
-{vac_lines}
-
-Geef een JSON-array terug van de TOP 3 beste matches, gesorteerd van hoog naar laag:
-[
-  {{"vacancy_id": <id>, "match_score": <0-100>, "reason": "<max 12 woorden NL waarom goede match>"}},
-  ...
-]
-Geef ALLEEN de JSON-array terug. Geen markdown, geen tekst buiten de array.
-""".strip()
+    vac_map = {
+        v.id: v
+        for v in db.query(models.Vacancy).filter(models.Vacancy.id.in_([vid for vid, _ in hits])).all()
+    }
+    ranked = [(vac_map[vid], sim) for vid, sim in hits if vid in vac_map]
 
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    model_name = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-
-    try:
-        resp = client.chat.completions.create(
-            model=model_name,
-            temperature=0.2,
-            messages=[
-                {"role": "system", "content": "Return ONLY a valid JSON array. No markdown."},
-                {"role": "user", "content": prompt},
-            ],
-        )
-        content = (resp.choices[0].message.content or "").strip()
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"OpenAI error: {e}")
-
-    try:
-        parsed = json.loads(content)
-        if not isinstance(parsed, list):
-            return []
-        raw: list[dict] = parsed
-    except Exception:
-        return []
+    explained = {}
+    if _openai_enabled():
+        try:
+            explained = _explain_matches(cv_digest.for_prompt(cv, db, max_chars=1500), [v for v, _ in ranked])
+        except Exception:
+            explained = {}  # Val terug op de cosine-score
 
-    # Koppel vacature-info terug aan resultaten
-    vac_map = {v.id: v for v in vacancies}
     results: List[schemas.RecommendationOut] = []
-    for item in raw[:3]:
-        vid = item.get("vacancy_id")
-        v = vac_map.get(vid)
-        if v:
-            results.append(schemas.RecommendationOut(
-                vacancy_id=v.id,
-                title=v.title,
-                location=v.location,
-                match_score=max(0, min(100, int(item.get("match_score", 0)))),
-                reason=str(item.get("reason", "")),
-            ))
+    for v, sim in ranked:
+        item = explained.get(v.id, {})
+        try:
+            score = int(item.get("match_score"))
+        except (TypeError, ValueError):
+            score = round(max(0.0, sim) * 100)
+        results.append(schemas.RecommendationOut(
+            vacancy_id=v.id,
+            title=v.title,
+            location=v.location,
+            match_score=max(0, min(100, score)),
+            reason=str(item.get("reason") or "Sluit inhoudelijk aan op je CV"),
+        ))
+    results.sort(key=lambda r: r.match_score, reverse=True)
     return results
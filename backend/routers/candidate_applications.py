@@ -1,6 +1,6 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import func as sqlfunc
 
@@ -8,6 +8,7 @@ from backend.db import get_db
 from backend import models, schemas
 from backend.routers.auth import get_current_user, require_role
 from backend.routers.recruiter_chat import BASE_QUESTIONS
+from backend.services import apply_pipeline
 
 router = APIRouter(prefix="/candidate", tags=["candidate-applications"])
 
@@ -15,9 +16,11 @@ router = APIRouter(prefix="/candidate", tags=["candidate-applications"])
 @router.post("/apply/{vacancy_id}", response_model=schemas.ApplicationOut)
 def apply(
     vacancy_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
+    """Sollicitatie aanmaken; screening en mails lopen via de apply-pipeline."""
     require_role(current_user, "candidate")
 
     vacancy = db.query(models.Vacancy).filter(models.Vacancy.id == vacancy_id).first()
@@ -35,14 +38,25 @@ def apply(
     if existing:
         return existing
 
+    latest_cv = (
+        db.query(models.CandidateCV.id)
+        .filter(models.CandidateCV.candidate_id == current_user.id)
+        .order_by(models.CandidateCV.id.desc())
+        .first()
+    )
+
     app = models.Application(
         candidate_id=current_user.id,
         vacancy_id=vacancy_id,
         status="applied",
     )
     db.add(app)
+    db.flush()
+    task = apply_pipeline.enqueue(db, app.id, cv_id=latest_cv.id if latest_cv else None)
     db.commit()
     db.refresh(app)
+
+    background_tasks.add_task(apply_pipeline.run_task, task.id)
     return app
 
 
@@ -184,3 +198,38 @@ def application_ai_result(
         raise HTTPException(status_code=404, detail="Geen AI-analyse beschikbaar")
 
     return ai_result
+
+
+@router.get("/applications/{app_id}/processing", response_model=schemas.ApplicationProcessingOut)
+def application_processing(
+    app_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Voortgang van de achtergrondverwerking (apply-pipeline) — om te pollen na solliciteren."""
+    if current_user.role not in ("candidate", "admin"):
+        raise HTTPException(status_code=403, detail="Alleen kandidaten en admins")
+
+    q = db.query(models.Application).filter(models.Application.id == app_id)
+    if current_user.role != "admin":
+        q = q.filter(models.Application.candidate_id == current_user.id)
+    if not q.first():
+        raise HTTPException(status_code=404, detail="Sollicitatie niet gevonden")
+
+    task = (
+        db.query(models.ApplicationTask)
+        .filter(models.ApplicationTask.application_id == app_id)
+        .first()
+    )
+    latest_ai = (
+        db.query(models.AIResult)
+        .filter(models.AIResult.application_id == app_id)
+        .order_by(models.AIResult.id.desc())
+        .first()
+    )
+    return schemas.ApplicationProcessingOut(
+        application_id=app_id,
+        match_score=latest_ai.match_score if latest_ai else None,
+        explanation=latest_ai.summary if latest_ai else None,
+        **apply_pipeline.status_of(task),
+    )
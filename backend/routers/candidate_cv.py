@@ -2,12 +2,13 @@ from __future__ import annotations
 
 import io
 from typing import List
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, UploadFile, File, HTTPException
 from sqlalchemy.orm import Session
 
 from backend.db import get_db
 from backend import models, schemas
 from backend.routers.auth import get_current_user, require_role
+from backend.services import cv_digest, embeddings
 
 import PyPDF2
 import docx
@@ -31,6 +32,7 @@ def _extract_text_from_docx(data: bytes) -> str:
 
 @router.post("/cv", response_model=str)
 async def upload_cv(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
@@ -64,6 +66,8 @@ async def upload_cv(
     db.add(cv)
     db.commit()
     db.refresh(cv)
+    background_tasks.add_task(embeddings.sync_cv, cv.id)
+    background_tasks.add_task(cv_digest.sync_cv, cv.id)
 
     return extracted
 
@@ -89,6 +93,7 @@ def get_cv_full_text(
 def update_cv_text(
     cv_id: int,
     payload: schemas.CandidateCVUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -103,6 +108,8 @@ def update_cv_text(
     cv.extracted_text = payload.extracted_text
     db.commit()
     db.refresh(cv)
+    background_tasks.add_task(embeddings.sync_cv, cv.id)
+    background_tasks.add_task(cv_digest.sync_cv, cv.id)
     text = cv.extracted_text or ""
     return schemas.CandidateCVOut(
         id=cv.id,
@@ -1,6 +1,7 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import and_, func, or_
 from sqlalchemy.orm import Session
 
 from backend.db import get_db
@@ -20,47 +21,148 @@ def _employer_ids(db: Session, current_user: models.User) -> list:
     return [current_user.id]
 
 
+SORTS = ("newest", "match_score")
+PAGE_MAX = 500
+
+
+def _employer_ids_query(db: Session, current_user: models.User):
+    """Zelfde als _employer_ids, maar als subquery (geen extra roundtrip)."""
+    if current_user.org_id:
+        return db.query(models.User.id).filter(models.User.org_id == current_user.org_id)
+    return [current_user.id]
+
+
+def _parse_cursor(cursor: str, sort: str) -> tuple:
+    """Cursor = sleutel van de laatste rij van de vorige pagina: "<id>" of "<score>:<id>" (score -1 = geen)."""
+    try:
+        parts = [int(p) for p in cursor.split(":")]
+    except ValueError:
+        parts = []
+    if len(parts) != (2 if sort == "match_score" else 1):
+        raise HTTPException(status_code=400, detail="Ongeldige cursor")
+    return tuple(parts)
+
+
 @router.get("/applications", response_model=List[schemas.ApplicationWithCandidateOut])
 def list_applications(
+    response: Response,
     vacancy_id: Optional[int] = Query(default=None),
+    status: Optional[List[str]] = Query(default=None),
+    sort: str = Query(default="newest"),
+    limit: Optional[int] = Query(default=None, ge=1, le=PAGE_MAX),
+    cursor: Optional[str] = Query(default=None),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
+    """
+    Sollicitaties op de vacatures van de werkgever (of organisatie), met
+    kandidaat en het laatste AIResult — in één query.
+
+    - status: filter, herhaalbaar (?status=applied&status=shortlisted)
+    - sort: newest (standaard) of match_score (hoogste eerst, zonder score achteraan)
+    - limit + cursor: keyset-paginering; is er een volgende pagina, dan staat
+      de cursor in de X-Next-Cursor header. Zonder limit komt alles terug.
+    """
     require_role(current_user, "employer")
+    if sort not in SORTS:
+        raise HTTPException(status_code=400, detail=f"Ongeldige sortering (kies: {', '.join(SORTS)})")
+
+    employer_ids = _employer_ids_query(db, current_user)
+    scope = (
+        db.query(models.Application.id)
+        .join(models.Vacancy, models.Application.vacancy_id == models.Vacancy.id)
+        .filter(models.Vacancy.employer_id.in_(employer_ids))
+    )
+    if vacancy_id is not None:
+        scope = scope.filter(models.Application.vacancy_id == vacancy_id)
+
+    # Laatste AIResult per sollicitatie (window function; werkt op PostgreSQL en SQLite),
+    # alleen over de AIResults van deze werkgever
+    ranked = (
+        db.query(
+            models.AIResult.application_id.label("application_id"),
+            models.AIResult.match_score.label("match_score"),
+            models.AIResult.summary.label("summary"),
+            models.AIResult.strengths.label("strengths"),
+            models.AIResult.gaps.label("gaps"),
+            models.AIResult.suggested_questions.label("suggested_questions"),
+            func.row_number().over(
+                partition_by=models.AIResult.application_id, order_by=models.AIResult.id.desc()
+            ).label("rn"),
+        )
+        .filter(models.AIResult.application_id.in_(scope))
+        .subquery()
+    )
+    score = func.coalesce(ranked.c.match_score, -1)
 
     q = (
-        db.query(models.Application)
+        db.query(
+            models.Application.id,
+            models.Application.vacancy_id,
+            models.Application.status,
+            models.Application.created_at,
+            models.Application.candidate_id,
+            models.User.full_name.label("candidate_name"),
+            models.User.email.label("candidate_email"),
+            ranked.c.match_score,
+            ranked.c.summary,
+            ranked.c.strengths,
+            ranked.c.gaps,
+            ranked.c.suggested_questions,
+        )
         .join(models.Vacancy, models.Application.vacancy_id == models.Vacancy.id)
-        .filter(models.Vacancy.employer_id.in_(_employer_ids(db, current_user)))
+        .outerjoin(models.User, models.User.id == models.Application.candidate_id)
+        .outerjoin(ranked, (ranked.c.application_id == models.Application.id) & (ranked.c.rn == 1))
+        .filter(models.Vacancy.employer_id.in_(employer_ids))
         .filter(models.Application.status != "auto_rejected")
     )
 
     if vacancy_id is not None:
         q = q.filter(models.Application.vacancy_id == vacancy_id)
-
-    rows = q.order_by(models.Application.id.desc()).all()
-
-    result = []
-    for app in rows:
-        candidate = db.query(models.User).filter(models.User.id == app.candidate_id).first()
-        ai = db.query(models.AIResult).filter(models.AIResult.application_id == app.id).first()
-
-        result.append(schemas.ApplicationWithCandidateOut(
-            id=app.id,
-            vacancy_id=app.vacancy_id,
-            status=app.status,
-            created_at=app.created_at,
-            candidate_id=app.candidate_id,
-            candidate_name=candidate.full_name if candidate else "Onbekend",
-            candidate_email=candidate.email if candidate else "",
-            match_score=ai.match_score if ai else None,
-            ai_summary=ai.summary if ai else None,
-            ai_strengths=ai.strengths if ai else None,
-            ai_gaps=ai.gaps if ai else None,
-            ai_suggested_questions=ai.suggested_questions if ai else None,
-        ))
-
-    return result
+    if status:
+        q = q.filter(models.Application.status.in_(status))
+
+    if sort == "match_score":
+        if cursor:
+            last_score, last_id = _parse_cursor(cursor, sort)
+            q = q.filter(or_(score < last_score, and_(score == last_score, models.Application.id < last_id)))
+        q = q.order_by(score.desc(), models.Application.id.desc())
+    else:
+        if cursor:
+            (last_id,) = _parse_cursor(cursor, sort)
+            q = q.filter(models.Application.id < last_id)
+        q = q.order_by(models.Application.id.desc())
+
+    if limit is not None:
+        # Eén rij extra om te weten of er een volgende pagina is
+        rows = q.limit(limit + 1).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            response.headers["X-Next-Cursor"] = (
+                f"{last.match_score if last.match_score is not None else -1}:{last.id}"
+                if sort == "match_score" else str(last.id)
+            )
+    else:
+        rows = q.all()
+
+    return [
+        schemas.ApplicationWithCandidateOut(
+            id=row.id,
+            vacancy_id=row.vacancy_id,
+            status=row.status,
+            created_at=row.created_at,
+            candidate_id=row.candidate_id,
+            candidate_name=row.candidate_name or "Onbekend",
+            candidate_email=row.candidate_email or "",
+            match_score=row.match_score,
+            ai_summary=row.summary,
+            ai_strengths=row.strengths,
+            ai_gaps=row.gaps,
+            ai_suggested_questions=row.suggested_questions,
+        )
+        for row in rows
+    ]
 
 
 @router.get("/applications/{application_id}/cv")
@@ -1,13 +1,14 @@
 from typing import List
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from backend.db import get_db
 from backend import models, schemas
 from backend.routers.auth import get_current_user, require_role
+from backend.services import embeddings, rescore
 
 router = APIRouter(prefix="/employer/vacancies", tags=["employer-vacancies"])
 
@@ -45,6 +46,7 @@ PLAN_VACANCY_LIMITS = {"gratis": 1, "normaal": 5}  # None = onbeperkt (premium)
 @router.post("", response_model=schemas.VacancyOut)
 def create_vacancy(
     payload: schemas.VacancyCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -107,6 +109,7 @@ def create_vacancy(
     db.add(vacancy)
     db.commit()
     db.refresh(vacancy)
+    background_tasks.add_task(embeddings.sync_vacancy, vacancy.id)
     return vacancy
 
 
@@ -126,6 +129,7 @@ class VacancyUpdate(BaseModel):
 def update_vacancy(
     vacancy_id: int,
     payload: VacancyUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -138,23 +142,77 @@ def update_vacancy(
     if vacancy.employer_id not in _employer_ids(db, current_user):
         raise HTTPException(status_code=403, detail="Geen toegang tot deze vacature")
 
+    old_hash = rescore.vacancy_hash(vacancy)
     vacancy.title = payload.title
     vacancy.location = payload.location or None
     vacancy.hours_per_week = payload.hours_per_week or None
     vacancy.salary_range = payload.salary_range or None
-    vacancy.description = payload.description or None
+    if (payload.description or None) != vacancy.description:
+        vacancy.description = payload.description or None
+        # Scoring leest extracted_text; een bewerkte omschrijving vervangt de geüploade tekst
+        vacancy.extracted_text = (payload.description or "").strip() or None
+        vacancy.source_type = "manual"
     vacancy.employment_type = payload.employment_type or None
     vacancy.work_location = payload.work_location or None
     vacancy.interview_type = payload.interview_type or "both"
     vacancy.language = payload.language or None
+    job = None
+    if rescore.RESCORE_ON_EDIT and rescore.vacancy_hash(vacancy) != old_hash:
+        # Bestaande matchscores zijn verouderd: batch-herberekening op de achtergrond
+        job = rescore.start(db, vacancy.id, requested_by=current_user.id)
     db.commit()
     db.refresh(vacancy)
+    background_tasks.add_task(embeddings.sync_vacancy, vacancy.id)
+    if job is not None:
+        background_tasks.add_task(rescore.run_job, job.id)
     return vacancy
 
 
+def _own_vacancy(db: Session, vacancy_id: int, current_user: models.User) -> models.Vacancy:
+    require_role(current_user, "employer")
+    vacancy = db.query(models.Vacancy).filter(models.Vacancy.id == vacancy_id).first()
+    if not vacancy:
+        raise HTTPException(status_code=404, detail="Vacature niet gevonden")
+    if vacancy.employer_id not in _employer_ids(db, current_user):
+        raise HTTPException(status_code=403, detail="Geen toegang tot deze vacature")
+    return vacancy
+
+
+@router.post("/{vacancy_id}/rescore")
+def rescore_vacancy(
+    vacancy_id: int,
+    background_tasks: BackgroundTasks,
+    force: bool = False,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Herbereken de matchscores van alle sollicitaties op deze vacature
+    (services/rescore.py). Ongewijzigde CV's worden overgeslagen, tenzij
+    force=true. Antwoordt direct; voortgang via GET /{vacancy_id}/rescore.
+    """
+    vacancy = _own_vacancy(db, vacancy_id, current_user)
+    job = rescore.start(db, vacancy.id, requested_by=current_user.id, force=force)
+    db.commit()
+    background_tasks.add_task(rescore.run_job, job.id)
+    return rescore.status_of(job)
+
+
+@router.get("/{vacancy_id}/rescore")
+def rescore_status(
+    vacancy_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Voortgang van de laatste herberekening voor deze vacature."""
+    vacancy = _own_vacancy(db, vacancy_id, current_user)
+    return rescore.latest_status(db, vacancy.id)
+
+
 @router.delete("/{vacancy_id}", status_code=204)
 def delete_vacancy(
     vacancy_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -169,6 +227,7 @@ def delete_vacancy(
 
     db.delete(vacancy)
     db.commit()
+    background_tasks.add_task(embeddings.sync_vacancy, vacancy_id)
 
 
 VALID_STATUSES = {"concept", "actief", "offline"}
@@ -182,6 +241,7 @@ class StatusUpdate(BaseModel):
 def update_vacancy_status(
     vacancy_id: int,
     payload: StatusUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -200,4 +260,5 @@ def update_vacancy_status(
     vacancy.status = payload.status
     db.commit()
     db.refresh(vacancy)
+    background_tasks.add_task(embeddings.sync_vacancy, vacancy.id)  # index bijwerken
     return vacancy
@@ -20,6 +20,7 @@ from sqlalchemy.orm import Session
 from backend.db import get_db
 from backend import models
 from backend.routers.auth import get_current_user, require_role
+from backend.services import llm
 
 router = APIRouter(prefix="/integrations", tags=["integrations"])
 
@@ -55,7 +56,7 @@ def _check_openai() -> IntegrationStatus:
     try:
         # Goedkope test: haal model lijst op
         resp = http.get(
-            "https://api.openai.com/v1/models",
+            llm.api_url("models"),
             headers={"Authorization": f"Bearer {api_key}"},
             timeout=8,
         )
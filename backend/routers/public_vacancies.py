@@ -1,21 +1,20 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 from datetime import datetime, timezone
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile
 from fastapi.security import OAuth2PasswordBearer
-from openai import OpenAI
 from sqlalchemy.orm import Session
 from jose import jwt, JWTError
 
 from backend import models, schemas
 from backend.db import get_db
 from backend.security import create_access_token, hash_password, SECRET_KEY, ALGORITHM
-from backend.services.text_extract import extract_text
-from backend.services.email import send_application_confirmation, send_new_applicant_notification, send_claim_notification
+from backend.services import apply_pipeline, lexical_match
 
 oauth2_optional = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
@@ -34,28 +33,6 @@ def _get_optional_user(token: str | None = Depends(oauth2_optional), db: Session
 router = APIRouter(prefix="/vacancies", tags=["public-vacancies"])
 
 
-def _maybe_send_claim_mail(vacancy_id: int, vacancy_title: str, db: Session) -> None:
-    """Stuur eenmalig een claim-mail als deze vacature gescraped is en nog niet geclaimd."""
-    from backend.models.scraped_vacancy import ScrapedVacancy as SV
-    import os
-    sv = db.query(SV).filter(SV.vacancy_id == vacancy_id, SV.claim_notified == False).first()
-    if not sv:
-        return
-    frontend_url = os.getenv("FRONTEND_URL", "https://www.vorzaiq.com")
-    claim_url = f"{frontend_url}/claim/{sv.claim_token}"
-    send_claim_notification(
-        employer_email=sv.contact_email,
-        vacancy_title=vacancy_title,
-        company_name=sv.company_name or "",
-        claim_url=claim_url,
-    )
-    sv.claim_notified = True
-    db.commit()
-
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
-
-
 @router.get("", response_model=List[schemas.PublicVacancyOut])
 def list_vacancies(
     q: Optional[str] = None,
@@ -171,9 +148,31 @@ def get_vacancy(vacancy_id: int, db: Session = Depends(get_db)):
 CURRENT_TERMS_VERSION = "2026-07b"
 
 
+def _intake_answers(db: Session, vacancy_id: int, application_id: int, intake_answers_json: str) -> list:
+    """Geldige intake-antwoorden als IntakeAnswer-objecten (onbekende vragen en rommel overgeslagen)."""
+    try:
+        answers_data = json.loads(intake_answers_json or "[]")
+    except ValueError:
+        return []
+    question_ids = {
+        row.id
+        for row in db.query(models.IntakeQuestion.id).filter(models.IntakeQuestion.vacancy_id == vacancy_id).all()
+    }
+    out = []
+    for item in answers_data if isinstance(answers_data, list) else []:
+        try:
+            qid = int(item["question_id"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if item.get("answer") and qid in question_ids:
+            out.append(models.IntakeAnswer(application_id=application_id, question_id=qid, answer=str(item["answer"])))
+    return out
+
+
 @router.post("/{vacancy_id}/apply", response_model=schemas.ApplyResponse)
 async def apply_to_vacancy(
     vacancy_id: int,
+    background_tasks: BackgroundTasks,
     full_name: str = Form(...),
     email: str = Form(...),
     password: str = Form(...),
@@ -182,6 +181,11 @@ async def apply_to_vacancy(
     terms_accepted: str = Form(default="false"),
     db: Session = Depends(get_db),
 ):
+    """
+    Solliciteren zonder account. Slaat account, CV en sollicitatie in één
+    transactie op en antwoordt direct; tekstextractie, AI-screening en mails
+    lopen via de apply-pipeline (poll /candidate/applications/{id}/processing).
+    """
     if terms_accepted.lower() not in ("true", "1", "yes"):
         raise HTTPException(
             status_code=422,
@@ -207,163 +211,63 @@ async def apply_to_vacancy(
             status_code=422, detail="Wachtwoord moet minimaal 8 tekens bevatten."
         )
 
-    # Maak kandidaat account aan
+    # bcrypt is CPU-werk — niet op de event loop
+    hashed = await asyncio.to_thread(hash_password, password)
+    cv_data = await cv_file.read()
+
+    # Kandidaat, CV, sollicitatie, intake-antwoorden en taak: één commit
     candidate = models.User(
         email=email,
         full_name=full_name.strip(),
-        hashed_password=hash_password(password),
+        hashed_password=hashed,
         role="candidate",
         terms_accepted_at=datetime.now(timezone.utc),
         terms_version=CURRENT_TERMS_VERSION,
     )
     db.add(candidate)
-    db.commit()
-    db.refresh(candidate)
+    db.flush()
 
-    # Extraheer tekst uit CV
-    cv_data = await cv_file.read()
-    cv_text = ""
-    if cv_data:
-        try:
-            _, cv_text = extract_text(
-                cv_data, cv_file.filename or "cv", cv_file.content_type or ""
-            )
-        except Exception:
-            cv_text = ""
-
-    # Sla CV op
     cv_record = models.CandidateCV(
         candidate_id=candidate.id,
         source_filename=cv_file.filename,
         source_content_type=cv_file.content_type,
-        extracted_text=cv_text or None,
     )
-    db.add(cv_record)
-    db.commit()
-
-    # Maak sollicitatie aan
     application = models.Application(
         candidate_id=candidate.id,
         vacancy_id=vacancy_id,
         status="applied",
     )
-    db.add(application)
-    db.commit()
-    db.refresh(application)
+    db.add_all([cv_record, application])
+    db.flush()
 
-    # Sla intake-antwoorden op (optioneel)
-    try:
-        answers_data = json.loads(intake_answers_json)
-        for item in answers_data:
-            if item.get("answer"):
-                db.add(
-                    models.IntakeAnswer(
-                        application_id=application.id,
-                        question_id=int(item["question_id"]),
-                        answer=str(item["answer"]),
-                    )
-                )
-        db.commit()
-    except Exception:
-        pass
-
-    # AI pre-screening
-    match_score = 0
-    explanation = "AI analyse niet beschikbaar — geen OpenAI key of vacaturetekst."
-
-    job_text = (vacancy.extracted_text or vacancy.description or "").strip()
-    if _client and cv_text and job_text:
-        try:
-            resp = _client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "Je bent een STRENGE, kritische recruitment consultant. "
-                            "Je beoordeelt hoe goed een kandidaat ECHT past bij een vacature.\n\n"
-                            "SCORINGSRICHTLIJNEN (wees STRENG):\n"
-                            "- 0-20: Totaal geen relevante ervaring of opleiding voor deze functie\n"
-                            "- 21-40: Minimale overlap — enkele overdraagbare vaardigheden maar geen directe ervaring\n"
-                            "- 41-55: Gedeeltelijke match — enige relevante ervaring maar mist belangrijke vereisten\n"
-                            "- 56-70: Redelijke match — heeft relevante ervaring maar niet alles wat gevraagd wordt\n"
-                            "- 71-85: Goede match — voldoet aan de meeste vereisten met relevante werkervaring\n"
-                            "- 86-100: Uitstekende match — voldoet aan vrijwel alle vereisten, sterke directe ervaring\n\n"
-                            "BELANGRIJK:\n"
-                            "- Beoordeel op HARDE vaardigheden en RELEVANTE werkervaring, niet op soft skills\n"
-                            "- Een CV uit een totaal andere branche zonder relevante skills = MAX 35\n"
-                            "- Generieke CV-tekst zonder specifieke ervaring voor de functie = MAX 45\n"
-                            "- Geef alleen 70+ als de kandidaat aantoonbaar relevante werkervaring heeft\n"
-                            "- Wees eerlijk en realistisch — een te hoge score is misleidend voor de werkgever\n\n"
-                            "Geef ALLEEN een JSON-object terug met keys "
-                            "'match_score' (int) en 'explanation' (string)."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": (
-                            f"KANDIDAAT CV:\n{cv_text[:3000]}\n\n"
-                            f"VACATURE:\n{job_text[:2000]}"
-                        ),
-                    },
-                ],
-                response_format={"type": "json_object"},
-            )
-            data = json.loads(resp.choices[0].message.content)
-            match_score = max(0, min(100, int(data.get("match_score", 0))))
-            explanation = data.get("explanation", "").strip() or explanation
-        except Exception as exc:
-            explanation = f"AI analyse mislukt: {exc}"
-
-    # Sla AI-resultaat op
-    db.add(
-        models.AIResult(
-            application_id=application.id,
-            match_score=match_score,
-            summary=explanation,
-        )
-    )
+    db.add_all(_intake_answers(db, vacancy_id, application.id, intake_answers_json))
+    task = apply_pipeline.enqueue(db, application.id, cv_id=cv_record.id, cv_data=cv_data or None)
     db.commit()
 
-    # E-mail notificaties (fouten worden gelogd, niet doorgegooid)
-    employer = db.query(models.User).filter(models.User.id == vacancy.employer_id).first()
-    send_application_confirmation(
-        candidate_email=candidate.email,
-        candidate_name=candidate.full_name or candidate.email,
-        vacancy_title=vacancy.title,
-        match_score=match_score,
-    )
-    if employer:
-        send_new_applicant_notification(
-            employer_email=employer.email,
-            candidate_name=candidate.full_name or candidate.email,
-            candidate_email=candidate.email,
-            vacancy_title=vacancy.title,
-            match_score=match_score,
-        )
-
-    # Claim-mail: stuur eenmalig als dit een gescrapede vacature is
-    _maybe_send_claim_mail(vacancy_id, vacancy.title, db)
-
-    access_token = create_access_token(subject=str(candidate.id))
+    background_tasks.add_task(apply_pipeline.run_task, task.id)
 
     return schemas.ApplyResponse(
         application_id=application.id,
-        match_score=match_score,
-        explanation=explanation,
-        access_token=access_token,
+        match_score=None,
+        explanation="Je sollicitatie is ontvangen. We analyseren je CV — de matchscore volgt zo.",
+        access_token=create_access_token(subject=str(candidate.id)),
+        processing_status=task.status,
     )
 
 
 @router.post("/{vacancy_id}/apply-authenticated", response_model=schemas.ApplyResponse)
 async def apply_authenticated(
     vacancy_id: int,
+    background_tasks: BackgroundTasks,
     motivation_letter: str = Form(default=""),
     intake_answers_json: str = Form(default="[]"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(_get_optional_user),
 ):
-    """Solliciteren als ingelogde kandidaat — gebruikt bestaand account + meest recente CV."""
+    """
+    Solliciteren als ingelogde kandidaat — gebruikt bestaand account + meest recente CV.
+    Geeft direct de lexicale pre-screen score terug; de AI-score en mails volgen via de apply-pipeline.
+    """
     if not current_user:
         raise HTTPException(status_code=401, detail="Niet ingelogd")
     if current_user.role not in ("candidate", "admin"):
@@ -395,111 +299,35 @@ async def apply_authenticated(
     )
     cv_text = cv_record.extracted_text if cv_record else ""
 
-    # Sollicitatie aanmaken
+    # Sollicitatie, intake-antwoorden en taak: één commit
     application = models.Application(
         candidate_id=current_user.id,
         vacancy_id=vacancy_id,
         status="applied",
     )
     db.add(application)
+    db.flush()
+
+    db.add_all(_intake_answers(db, vacancy_id, application.id, intake_answers_json))
+    task = apply_pipeline.enqueue(
+        db,
+        application.id,
+        cv_id=cv_record.id if cv_record else None,
+        motivation_letter=motivation_letter,
+    )
     db.commit()
-    db.refresh(application)
 
-    # Intake-antwoorden opslaan
-    try:
-        answers_data = json.loads(intake_answers_json)
-        for item in answers_data:
-            if item.get("answer"):
-                db.add(models.IntakeAnswer(
-                    application_id=application.id,
-                    question_id=int(item["question_id"]),
-                    answer=str(item["answer"]),
-                ))
-        db.commit()
-    except Exception:
-        pass
-
-    # AI pre-screening
-    match_score = 0
-    explanation = "AI analyse niet beschikbaar."
+    background_tasks.add_task(apply_pipeline.run_task, task.id)
+
+    # Directe pre-screen (microseconden); de pipeline vervangt hem door de AI-score
     job_text = (vacancy.extracted_text or vacancy.description or "").strip()
     combined_cv = (cv_text or "") + ("\n\nMOTIVATIE:\n" + motivation_letter if motivation_letter else "")
-
-    if _client and combined_cv.strip() and job_text:
-        try:
-            resp = _client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "Je bent een STRENGE, kritische recruitment consultant. "
-                            "Je beoordeelt hoe goed een kandidaat ECHT past bij een vacature.\n\n"
-                            "SCORINGSRICHTLIJNEN (wees STRENG):\n"
-                            "- 0-20: Totaal geen relevante ervaring of opleiding voor deze functie\n"
-                            "- 21-40: Minimale overlap — enkele overdraagbare vaardigheden maar geen directe ervaring\n"
-                            "- 41-55: Gedeeltelijke match — enige relevante ervaring maar mist belangrijke vereisten\n"
-                            "- 56-70: Redelijke match — heeft relevante ervaring maar niet alles wat gevraagd wordt\n"
-                            "- 71-85: Goede match — voldoet aan de meeste vereisten met relevante werkervaring\n"
-                            "- 86-100: Uitstekende match — voldoet aan vrijwel alle vereisten, sterke directe ervaring\n\n"
-                            "BELANGRIJK:\n"
-                            "- Beoordeel op HARDE vaardigheden en RELEVANTE werkervaring, niet op soft skills\n"
-                            "- Een CV uit een totaal andere branche zonder relevante skills = MAX 35\n"
-                            "- Generieke CV-tekst zonder specifieke ervaring voor de functie = MAX 45\n"
-                            "- Geef alleen 70+ als de kandidaat aantoonbaar relevante werkervaring heeft\n"
-                            "- Wees eerlijk en realistisch — een te hoge score is misleidend voor de werkgever\n\n"
-                            "Geef ALLEEN een JSON-object terug met keys "
-                            "'match_score' (int) en 'explanation' (string)."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": (
-                            f"KANDIDAAT CV + MOTIVATIE:\n{combined_cv[:3500]}\n\n"
-                            f"VACATURE:\n{job_text[:2000]}"
-                        ),
-                    },
-                ],
-                response_format={"type": "json_object"},
-            )
-            data = json.loads(resp.choices[0].message.content)
-            match_score = max(0, min(100, int(data.get("match_score", 0))))
-            explanation = data.get("explanation", "").strip() or explanation
-        except Exception as exc:
-            explanation = f"AI analyse mislukt: {exc}"
-
-    db.add(models.AIResult(
-        application_id=application.id,
-        match_score=match_score,
-        summary=explanation,
-    ))
-    db.commit()
-
-    # E-mail notificaties
-    employer = db.query(models.User).filter(models.User.id == vacancy.employer_id).first()
-    send_application_confirmation(
-        candidate_email=current_user.email,
-        candidate_name=current_user.full_name or current_user.email,
-        vacancy_title=vacancy.title,
-        match_score=match_score,
-    )
-    if employer:
-        send_new_applicant_notification(
-            employer_email=employer.email,
-            candidate_name=current_user.full_name or current_user.email,
-            candidate_email=current_user.email,
-            vacancy_title=vacancy.title,
-            match_score=match_score,
-        )
-
-    # Claim-mail: stuur eenmalig als dit een gescrapede vacature is
-    _maybe_send_claim_mail(vacancy_id, vacancy.title, db)
-
-    access_token = create_access_token(subject=str(current_user.id))
+    lex = lexical_match.score(combined_cv, job_text)
 
     return schemas.ApplyResponse(
         application_id=application.id,
-        match_score=match_score,
-        explanation=explanation,
-        access_token=access_token,
+        match_score=lex.score,
+        explanation=lex.explanation(),
+        access_token=create_access_token(subject=str(current_user.id)),
+        processing_status=task.status,
     )
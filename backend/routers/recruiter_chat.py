@@ -5,12 +5,14 @@ Flow:
 1. POST /ai/recruiter/{app_id}/start
    → Laadt CV + vacature + gaps uit AIResult
    → AI stelt zich voor en stelt de eerste vraag over een gap
+     (meestal al vooraf gegenereerd door de apply-pipeline, zie lisa_opening)
    → Sla recruiter bericht op in DB
 
 2. POST /ai/recruiter/{app_id}/message
    → Kandidaat stuurt antwoord
    → Sla kandidaat bericht op
-   → AI leest volledige conversatiegeschiedenis + context
+   → AI leest de laatste berichten + samenvatting van het eerdere gesprek
+     (zie conversation_memory) + context
    → Genereert vervolgvraag of sluitingsbericht
    → Sla recruiter antwoord op
 
@@ -18,22 +20,21 @@ Flow:
    → Geeft volledige chatgeschiedenis terug
 """
 
-import os
-from typing import List
+import logging
+from typing import AsyncIterator, List
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from openai import OpenAI
 
 from backend.db import get_db
 from backend import models
 from backend.routers.auth import get_current_user
+from backend.services import chat_context, conversation_memory, lisa_opening, llm
 
-router = APIRouter(prefix="/ai/recruiter", tags=["recruiter-chat"])
+logger = logging.getLogger(__name__)
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+router = APIRouter(prefix="/ai/recruiter", tags=["recruiter-chat"])
 
 BASE_QUESTIONS = 3  # Lisa stelt minimaal 3 vragen, meer als er intake vragen zijn
 
@@ -65,53 +66,11 @@ class SendMessageIn(BaseModel):
 # ── Helpers ─────────────────────────────────────────────────────────────
 
 def _get_application_context(app_id: int, db: Session) -> dict:
-    """Haal alle relevante context op voor de AI recruiter."""
-    app = db.query(models.Application).filter(models.Application.id == app_id).first()
-    if not app:
+    """Haal alle relevante context op voor de AI recruiter (gecachet, zie chat_context)."""
+    ctx = chat_context.get(app_id, db)
+    if ctx is None:
         raise HTTPException(status_code=404, detail="Sollicitatie niet gevonden")
-
-    candidate = db.query(models.User).filter(models.User.id == app.candidate_id).first()
-    vacancy = db.query(models.Vacancy).filter(models.Vacancy.id == app.vacancy_id).first()
-    ai_result = (
-        db.query(models.AIResult)
-        .filter(models.AIResult.application_id == app_id)
-        .first()
-    )
-    cv = (
-        db.query(models.CandidateCV)
-        .filter(models.CandidateCV.candidate_id == app.candidate_id)
-        .order_by(models.CandidateCV.id.desc())
-        .first()
-    )
-
-    employer = (
-        db.query(models.User).filter(models.User.id == vacancy.employer_id).first()
-        if vacancy else None
-    )
-
-    # Haal intake vragen op die de werkgever heeft ingesteld
-    intake_questions = []
-    if vacancy:
-        iq_rows = (
-            db.query(models.IntakeQuestion)
-            .filter(models.IntakeQuestion.vacancy_id == vacancy.id)
-            .all()
-        )
-        intake_questions = [q.question for q in iq_rows]
-
-    return {
-        "app": app,
-        "candidate_name": candidate.full_name if candidate else "Kandidaat",
-        "vacancy_title": vacancy.title if vacancy else "Vacature",
-        "vacancy_description": vacancy.description or "" if vacancy else "",
-        "employer_name": employer.full_name if employer else "VorzaIQ",
-        "match_score": ai_result.match_score if ai_result else None,
-        "gaps": ai_result.gaps if ai_result else "",
-        "strengths": ai_result.strengths if ai_result else "",
-        "suggested_questions": ai_result.suggested_questions if ai_result else "",
-        "cv_text": cv.extracted_text or "" if cv else "",
-        "intake_questions": intake_questions,
-    }
+    return ctx
 
 
 def _build_system_prompt(ctx: dict, language: str = "nl") -> str:
@@ -139,7 +98,7 @@ BACKGROUND (internal — do not mention directly):
 - Job description: {ctx['vacancy_description'][:600] if ctx['vacancy_description'] else 'not available'}
 - Candidate strengths: {ctx['strengths'] or 'not yet known'}
 - Areas of attention: {ctx['gaps'] or 'no specific gaps'}
-- CV highlights: {ctx['cv_text'][:800] if ctx['cv_text'] else 'CV not available'}
+- CV highlights: {ctx['cv_text'] or 'CV not available'}
 - Interview questions to ask: {ctx['suggested_questions'] or 'use your own judgement'}
 {intake_instruction}
 
@@ -170,7 +129,7 @@ ACHTERGROND (intern — niet letterlijk noemen):
 - Functiebeschrijving: {ctx['vacancy_description'][:600] if ctx['vacancy_description'] else 'niet beschikbaar'}
 - Sterke punten kandidaat: {ctx['strengths'] or 'nog niet bekend'}
 - Aandachtspunten: {ctx['gaps'] or 'geen specifieke gaps'}
-- CV highlights: {ctx['cv_text'][:800] if ctx['cv_text'] else 'CV niet beschikbaar'}
+- CV highlights: {ctx['cv_text'] or 'CV niet beschikbaar'}
 - Interviewvragen om te stellen: {ctx['suggested_questions'] or 'gebruik je eigen oordeel'}
 {intake_instruction}
 
@@ -216,6 +175,15 @@ def _get_conversation_history(app_id: int, db: Session) -> list:
     ]
 
 
+def _first_message(app_id: int, db: Session) -> models.RecruiterChatMessage | None:
+    return (
+        db.query(models.RecruiterChatMessage)
+        .filter(models.RecruiterChatMessage.application_id == app_id)
+        .order_by(models.RecruiterChatMessage.created_at.asc())
+        .first()
+    )
+
+
 def _save_message(app_id: int, role: str, content: str, db: Session) -> models.RecruiterChatMessage:
     msg = models.RecruiterChatMessage(
         application_id=app_id,
@@ -228,21 +196,55 @@ def _save_message(app_id: int, role: str, content: str, db: Session) -> models.R
     return msg
 
 
+def _opening_instruction(ctx: dict) -> str:
+    return (
+        f"Stel jezelf voor als Lisa en bedank {ctx['candidate_name']} kort voor de sollicitatie "
+        f"op {ctx['vacancy_title']}. Vertel dat je een paar vragen hebt. "
+        f"Stel dan meteen je eerste vraag over de gevonden aandachtspunten."
+    )
+
+
+_AI_UNAVAILABLE = "De AI recruiter is momenteel niet beschikbaar. Zorg dat OPENAI_API_KEY is ingesteld."
+
+
 def _call_ai(system_prompt: str, history: list) -> str:
-    if not client:
-        return "De AI recruiter is momenteel niet beschikbaar. Zorg dat OPENAI_API_KEY is ingesteld."
+    if not llm.is_enabled():
+        return _AI_UNAVAILABLE
     try:
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "system", "content": system_prompt}] + history,
+        return llm.chat(
+            [{"role": "system", "content": system_prompt}] + history,
             max_tokens=300,
             temperature=0.7,
+            cache=False,
+            feature="lisa_chat",
         )
-        return resp.choices[0].message.content.strip()
     except Exception as e:
         return f"Er ging iets mis: {str(e)}"
 
 
+async def _astream_ai(system_prompt: str, history: list) -> AsyncIterator[str]:
+    """Streaming variant van _call_ai voor de WebSocket chat: yieldt Lisa's antwoord in delta's."""
+    if not llm.is_enabled():
+        yield _AI_UNAVAILABLE
+        return
+    started = False
+    try:
+        async for delta in llm.astream(
+            [{"role": "system", "content": system_prompt}] + history,
+            max_tokens=300,
+            temperature=0.7,
+            feature="lisa_chat",
+        ):
+            started = True
+            yield delta
+    except Exception as e:
+        if not started:
+            yield f"Er ging iets mis: {str(e)}"
+        else:
+            # Stream brak halverwege af: wat er al is blijft staan
+            logger.warning("[chat] Stream afgebroken: %s", e)
+
+
 # ── Endpoints ────────────────────────────────────────────────────────────
 
 @router.post("/{app_id}/start", response_model=ChatMessageOut)
@@ -291,40 +293,24 @@ def start_conversation(
                     ),
                 )
 
-    # Controleer of de chat al gestart is
-    existing = (
-        db.query(models.RecruiterChatMessage)
-        .filter(models.RecruiterChatMessage.application_id == app_id)
-        .first()
-    )
-    if existing:
-        # Geef het eerste bericht terug als de chat al gestart is
-        first_msg = (
-            db.query(models.RecruiterChatMessage)
-            .filter(models.RecruiterChatMessage.application_id == app_id)
-            .order_by(models.RecruiterChatMessage.created_at.asc())
-            .first()
-        )
-        return ChatMessageOut(
-            id=first_msg.id,
-            role=first_msg.role,
-            content=first_msg.content,
-            created_at=str(first_msg.created_at),
-        )
-
-    # Bouw context en genereer openingsbericht
+    # Opening ligt meestal al klaar (apply-pipeline); een lopende generatie wordt afgewacht
     language = _get_language(request)
-    ctx = _get_application_context(app_id, db)
-    system_prompt = _build_system_prompt(ctx, language)
-
-    opening_instruction = (
-        f"Stel jezelf voor als Lisa en bedank {ctx['candidate_name']} kort voor de sollicitatie "
-        f"op {ctx['vacancy_title']}. Vertel dat je een paar vragen hebt. "
-        f"Stel dan meteen je eerste vraag over de gevonden aandachtspunten."
-    )
-
-    response = _call_ai(system_prompt, [{"role": "user", "content": opening_instruction}])
-    msg = _save_message(app_id, "recruiter", response, db)
+    lisa_opening.wait(lisa_opening.CHAT, app_id)
+    msg = _first_message(app_id, db) or lisa_opening.take_chat_opening(db, app_id, language)
+    if msg is None:
+        fut, owner = lisa_opening.begin(lisa_opening.CHAT, app_id)
+        if not owner:
+            lisa_opening.wait(lisa_opening.CHAT, app_id)
+            msg = _first_message(app_id, db) or lisa_opening.take_chat_opening(db, app_id, language)
+        if msg is None:
+            try:
+                ctx = _get_application_context(app_id, db)
+                system_prompt = _build_system_prompt(ctx, language)
+                response = _call_ai(system_prompt, [{"role": "user", "content": _opening_instruction(ctx)}])
+                msg = _save_message(app_id, "recruiter", response, db)
+            finally:
+                if owner:
+                    lisa_opening.finish(lisa_opening.CHAT, app_id, fut)
 
     return ChatMessageOut(
         id=msg.id,
@@ -339,6 +325,7 @@ def send_message(
     app_id: int,
     payload: SendMessageIn,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -362,7 +349,9 @@ def send_message(
     language = _get_language(request)
     ctx = _get_application_context(app_id, db)
     system_prompt = _build_system_prompt(ctx, language)
-    history = _get_conversation_history(app_id, db)
+    history = conversation_memory.prompt_history(
+        db, conversation_memory.CHAT, app_id, _get_conversation_history(app_id, db)
+    )
 
     # Dynamisch max vragen: basis + intake vragen van werkgever
     intake_qs = ctx.get("intake_questions", [])
@@ -379,6 +368,7 @@ def send_message(
 
     response = _call_ai(system_prompt, history)
     msg = _save_message(app_id, "recruiter", response, db)
+    background_tasks.add_task(conversation_memory.fold, conversation_memory.CHAT, app_id)
 
     return ChatMessageOut(
         id=msg.id,
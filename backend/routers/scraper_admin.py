@@ -5,6 +5,8 @@ Endpoints (admin):
   POST /admin/scrape                      → start scraping
   GET  /admin/scraped-vacancies           → lijst per status
   POST /admin/scraped-vacancies/{id}/publish → publiceer als Vacancy
+  POST /admin/scraped-vacancies/bulk-publish → bulk publish met AI (achtergrond-job)
+  GET  /admin/scraped-vacancies/bulk-publish/{job_id} → voortgang bulk publish
   DELETE /admin/scraped-vacancies/{id}    → verwijder record
 
 Endpoints (publiek — claim flow):
@@ -24,6 +26,8 @@ from backend.db import get_db, SessionLocal
 from backend import models
 from backend.routers.auth import get_current_user, require_role
 from backend.security import hash_password, create_access_token
+from backend.services import bulk_publish, embeddings
+from backend.services.scrape_quality import filter_batch
 from backend.services.scraper import run_scraper
 from backend.services.vacancy_enricher import enrich_for_publish, extract_phone
 
@@ -56,6 +60,7 @@ class ScrapedVacancyOut(BaseModel):
     published_at: Optional[str]
     claimed_at: Optional[str]
     vacancy_id: Optional[int]
+    quality_score: Optional[float] = None
 
     class Config:
         from_attributes = True
@@ -72,6 +77,25 @@ class ScrapeStarted(BaseModel):
     message: str
 
 
+class BulkPublishRequest(BaseModel):
+    ids: Optional[List[int]] = None          # expliciete selectie; leeg = filter
+    source_name: Optional[str] = None        # bijv. "jobbird" of "bureau:yer.nl"
+    limit: int = 200
+    use_ai: bool = True
+
+
+class BulkPublishProgress(BaseModel):
+    job_id: str
+    status: str
+    total: int
+    enriched: int
+    published: int
+    failed: int
+    started_at: Optional[str]
+    finished_at: Optional[str]
+    error: Optional[str]
+
+
 class ClaimInfoOut(BaseModel):
     vacancy_title: str
     company_name: Optional[str]
@@ -136,6 +160,8 @@ def _save_batch(db: Session, raw: list) -> tuple:
             location=item.get("location"),
             source_url=src_url or None,
             source_name=item.get("source_name"),
+            quality_score=item.get("quality_score"),
+            status="flagged" if item.get("quality_flagged") else "pending",
         )
         db.add(sv)
         saved += 1
@@ -167,14 +193,17 @@ def _run_scrape_and_save(source: str, custom_urls: Optional[List[str]]) -> None:
         for src in sources:
             try:
                 raw = run_scraper(source=src, custom_urls=custom_urls)
+                found = len(raw)
+                # Goedkope kwaliteitsfilter: rommel komt niet in de DB
+                raw, dropped = filter_batch(raw)
                 saved, skipped = _save_batch(db, raw)
                 db.commit()
-                total_found += len(raw)
+                total_found += found
                 total_saved += saved
-                total_skipped += skipped
+                total_skipped += skipped + dropped
                 logger.info(
-                    "[scraper-admin] %s: %d gevonden, %d opgeslagen, %d skip",
-                    src, len(raw), saved, skipped,
+                    "[scraper-admin] %s: %d gevonden, %d laag-kwaliteit gedropt, %d opgeslagen, %d skip",
+                    src, found, dropped, saved, skipped,
                 )
             except Exception as exc:
                 logger.error("[scraper-admin] %s mislukt: %s", src, exc, exc_info=True)
@@ -240,6 +269,7 @@ def list_scraped_vacancies(
             published_at=str(sv.published_at) if sv.published_at else None,
             claimed_at=str(sv.claimed_at) if sv.claimed_at else None,
             vacancy_id=sv.vacancy_id,
+            quality_score=sv.quality_score,
         )
         for sv in items
     ]
@@ -248,6 +278,7 @@ def list_scraped_vacancies(
 @router.post("/admin/scraped-vacancies/{sv_id}/publish")
 def publish_scraped_vacancy(
     sv_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -260,7 +291,8 @@ def publish_scraped_vacancy(
     sv = db.query(models.ScrapedVacancy).filter(models.ScrapedVacancy.id == sv_id).first()
     if not sv:
         raise HTTPException(status_code=404, detail="ScrapedVacancy niet gevonden")
-    if sv.status != "pending":
+    # 'flagged' = lage kwaliteitsscore; admin mag na beoordeling alsnog publiceren
+    if sv.status not in ("pending", "flagged"):
         raise HTTPException(status_code=409, detail=f"Status is al '{sv.status}', niet pending")
     if not sv.contact_email:
         raise HTTPException(status_code=422, detail="Vacature heeft geen e-mailadres — niet publiceerbaar")
@@ -301,12 +333,14 @@ def publish_scraped_vacancy(
     sv.published_at = datetime.now(timezone.utc)
     db.commit()
 
+    background_tasks.add_task(embeddings.sync_vacancy, vacancy.id)  # aanbevelingen-index
     logger.info("[scraper-admin] ScrapedVacancy %d gepubliceerd als Vacancy %d", sv_id, vacancy.id)
     return {"vacancy_id": vacancy.id, "status": "published"}
 
 
 @router.post("/admin/scraped-vacancies/publish-all")
 def publish_all_pending(
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -329,7 +363,7 @@ def publish_all_pending(
         )
         .all()
     )
-    published = 0
+    published_ids = []
 
     for sv in pending:
         enriched = enrich_for_publish(
@@ -350,16 +384,54 @@ def publish_all_pending(
         sv.vacancy_id = vacancy.id
         sv.status = "published"
         sv.published_at = datetime.now(timezone.utc)
-        published += 1
+        published_ids.append(vacancy.id)
 
     db.commit()
-    logger.info("[scraper-admin] Bulk publish: %d vacatures gepubliceerd", published)
-    return {"published": published}
+    background_tasks.add_task(embeddings.sync_vacancies, published_ids)  # één batch voor de index
+    logger.info("[scraper-admin] Bulk publish: %d vacatures gepubliceerd", len(published_ids))
+    return {"published": len(published_ids)}
+
+
+@router.post("/admin/scraped-vacancies/bulk-publish", response_model=BulkPublishProgress)
+def start_bulk_publish(
+    payload: BulkPublishRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Publiceer een selectie pending vacatures op de achtergrond, mét AI-verrijking.
+    Retourneert meteen een job; voortgang via GET .../bulk-publish/{job_id}.
+    """
+    require_role(current_user, "admin")
+    limit = max(1, min(payload.limit, 1000))
+    sv_ids = bulk_publish.select_pending(db, ids=payload.ids, source_name=payload.source_name, limit=limit)
+    if not sv_ids:
+        raise HTTPException(status_code=404, detail="Geen publiceerbare pending vacatures gevonden")
+
+    job_id = bulk_publish.create_job(total=len(sv_ids))
+    background_tasks.add_task(bulk_publish.run_bulk_publish, job_id, sv_ids, payload.use_ai)
+    logger.info("[scraper-admin] Bulk publish %s gestart: %d vacatures", job_id, len(sv_ids))
+    return BulkPublishProgress(**bulk_publish.jobs[job_id])
+
+
+@router.get("/admin/scraped-vacancies/bulk-publish/{job_id}", response_model=BulkPublishProgress)
+def get_bulk_publish_progress(
+    job_id: str,
+    current_user: models.User = Depends(get_current_user),
+):
+    """Voortgang van een bulk-publish job."""
+    require_role(current_user, "admin")
+    job = bulk_publish.jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job niet gevonden")
+    return BulkPublishProgress(**job)
 
 
 @router.post("/admin/scraped-vacancies/{sv_id}/re-enrich")
 def re_enrich_scraped_vacancy(
     sv_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -395,6 +467,7 @@ def re_enrich_scraped_vacancy(
     if enriched["work_location"]:
         vacancy.work_location = enriched["work_location"]
     db.commit()
+    background_tasks.add_task(embeddings.sync_vacancy, vacancy.id)  # nieuwe tekst → nieuwe vector
 
     logger.info("[scraper-admin] Re-enrich Vacancy %d via AI", sv.vacancy_id)
     return {"status": "enriched", "vacancy_id": sv.vacancy_id}
@@ -403,6 +476,7 @@ def re_enrich_scraped_vacancy(
 @router.delete("/admin/scraped-vacancies/{sv_id}")
 def delete_scraped_vacancy(
     sv_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -413,13 +487,17 @@ def delete_scraped_vacancy(
         raise HTTPException(status_code=404, detail="ScrapedVacancy niet gevonden")
 
     # Verwijder gekoppelde Vacancy (optioneel — als die er is)
+    vacancy_id = None
     if sv.vacancy_id:
         vacancy = db.query(models.Vacancy).filter(models.Vacancy.id == sv.vacancy_id).first()
         if vacancy:
+            vacancy_id = vacancy.id
             db.delete(vacancy)
 
     db.delete(sv)
     db.commit()
+    if vacancy_id is not None:
+        background_tasks.add_task(embeddings.sync_vacancy, vacancy_id)  # uit de index halen
     return {"deleted": True}
 
 
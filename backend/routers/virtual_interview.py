@@ -23,40 +23,45 @@ Flow:
    → Geeft volgende tekst + ended-flag terug
 
 6. POST /virtual-interview/session/{app_id}/complete
-   → Sluit het interview af
-   → AI scoort volledig transcript
-   → Als score >= threshold én MS Graph geconfigureerd: plan Teams-vervolgafspraak
-   → Slaat AIResult op
+   → Sluit het interview af en antwoordt direct (status "processing")
+   → Op de achtergrond (services/interview_completion.py): AI scoort het
+     transcript, AIResult, Teams-vervolgafspraak als score >= threshold én
+     MS Graph geconfigureerd, mail aan de werkgever
 
-7. GET /virtual-interview/session/{app_id}
+7. GET /virtual-interview/session/{app_id}/completion
+   → Voortgang en resultaat van het afronden (poll tot status "done")
+
+8. GET /virtual-interview/session/{app_id}
    → Geeft status + transcript terug
 
 Premium feature: alleen beschikbaar als employer.plan == "premium"
 """
 
 import base64
-import io
 import json
 import os
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from typing import List, Optional
 
 import requests as http
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from openai import OpenAI
 
 from backend.db import get_db
 from backend import models
 from backend.routers.auth import get_current_user
-from backend.routers.interview_scheduler import (
-    _create_teams_online_meeting,
-    _send_calendar_invite,
-    MS_ORGANIZER_EMAIL,
+from backend.services import (
+    chat_context,
+    conversation_memory,
+    interview_completion,
+    llm,
+    realtime_prefetch,
+    tts_cache,
 )
-from backend.services.email import send_interview_completed_notification
 
 router = APIRouter(prefix="/virtual-interview", tags=["virtual-interview"])
 
@@ -77,9 +82,6 @@ DID_PRESENTER_URL = os.getenv("DID_PRESENTER_URL", "")
 SCORE_THRESHOLD = int(os.getenv("VIRTUAL_INTERVIEW_THRESHOLD", "60"))
 MAX_QUESTIONS = 4
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-_ai_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
-
 DID_BASE = "https://api.d-id.com"
 
 # ── Anam AI Avatar ───────────────────────────────────────────────────────────
@@ -87,6 +89,21 @@ ANAM_API_KEY = os.getenv("ANAM_API_KEY", "")
 ANAM_AVATAR_ID = os.getenv("ANAM_AVATAR_ID", "bdaaedfa-00f2-417a-8239-8bb89adec682")  # Astrid desk
 LISA_MONTHLY_LIMIT = int(os.getenv("LISA_MONTHLY_LIMIT", "75"))
 
+# ── OpenAI TTS (stem van Lisa 1.0 / fallback) ─────────────────────────────────
+LISA_TTS_MODEL = "tts-1"   # Sneller dan tts-1-hd, aanvaardbare kwaliteit voor gesprek
+LISA_TTS_VOICE = "nova"    # Natuurlijke vrouwenstem (klinkt goed in het Nederlands)
+LISA_TTS_SPEED = 1.05      # Iets sneller — gesprekstempo
+
+_AI_UNAVAILABLE = "De AI is momenteel niet beschikbaar."
+
+# Vaste zinnen die deze router zelf als antwoord teruggeeft — bij opstarten
+# voorgegenereerd in de TTS-cache. Alleen letterlijk uitgesproken tekst heeft
+# zin: de cache-sleutel is de exacte tekst, dus LLM-antwoorden raken hem nooit.
+# Aanvullen zonder deploy: TTS_PREGENERATE_PHRASES="zin 1|zin 2"
+LISA_TTS_COMMON_PHRASES = [
+    _AI_UNAVAILABLE,
+] + [p.strip() for p in os.getenv("TTS_PREGENERATE_PHRASES", "").split("|") if p.strip()]
+
 _LANG_NAMES = {"nl": "Dutch", "en": "English"}
 
 def _get_language(request: Request) -> str:
@@ -141,9 +158,11 @@ class AnswerOut(BaseModel):
 
 
 class CompleteOut(BaseModel):
-    score: int
-    summary: str
-    followup_scheduled: bool
+    status: str = "done"                 # processing | done | failed
+    stages: dict = {}
+    score: Optional[int] = None          # None zolang er nog gescoord wordt
+    summary: Optional[str] = None
+    followup_scheduled: bool = False
     teams_join_url: Optional[str] = None
     scheduled_at: Optional[str] = None
 
@@ -320,34 +339,11 @@ def _did_close_stream(stream_id: str, session_id: str) -> None:
 # ── AI helpers ────────────────────────────────────────────────────────────────
 
 def _get_context(app_id: int, db: Session) -> dict:
-    """Laad sollicitatie-context (kandidaat, vacature, CV, AIResult)."""
-    app = db.query(models.Application).filter(models.Application.id == app_id).first()
-    if not app:
+    """Laad sollicitatie-context (kandidaat, vacature, CV, AIResult) — gedeeld met Lisa's chat via chat_context."""
+    ctx = chat_context.get(app_id, db)
+    if ctx is None:
         raise HTTPException(status_code=404, detail="Sollicitatie niet gevonden")
-    candidate = db.query(models.User).filter(models.User.id == app.candidate_id).first()
-    vacancy = db.query(models.Vacancy).filter(models.Vacancy.id == app.vacancy_id).first()
-    ai_result = (
-        db.query(models.AIResult).filter(models.AIResult.application_id == app_id).first()
-    )
-    cv = (
-        db.query(models.CandidateCV)
-        .filter(models.CandidateCV.candidate_id == app.candidate_id)
-        .order_by(models.CandidateCV.id.desc())
-        .first()
-    )
-    return {
-        "app": app,
-        "candidate_name": candidate.full_name if candidate else "Kandidaat",
-        "candidate_email": candidate.email if candidate else "",
-        "vacancy_title": vacancy.title if vacancy else "Vacature",
-        "vacancy_description": vacancy.description or "" if vacancy else "",
-        "employer_id": vacancy.employer_id if vacancy else None,
-        "match_score": ai_result.match_score if ai_result else None,
-        "gaps": ai_result.gaps if ai_result else "",
-        "strengths": ai_result.strengths if ai_result else "",
-        "suggested_questions": ai_result.suggested_questions if ai_result else "",
-        "cv_text": cv.extracted_text or "" if cv else "",
-    }
+    return ctx
 
 
 def _build_avatar_system_prompt(ctx: dict, language: str = "nl") -> str:
@@ -370,7 +366,7 @@ CONTEXT (internal — do not mention directly):
 - Position: {ctx['vacancy_title']}
 - Candidate strengths: {ctx['strengths'] or 'not known'}
 - Areas of attention: {ctx['gaps'] or 'no specific gaps'}
-- CV summary: {ctx['cv_text'][:300] if ctx['cv_text'] else 'not available'}
+- CV summary: {ctx['cv_summary'] or 'not available'}
 - Suggested questions: {ctx['suggested_questions'] or 'use your own judgement'}
 
 GOAL: ask exactly {MAX_QUESTIONS} targeted questions, end warmly and briefly.
@@ -393,7 +389,7 @@ CONTEXT (intern — niet letterlijk noemen):
 - Functie: {ctx['vacancy_title']}
 - Sterke punten kandidaat: {ctx['strengths'] or 'niet bekend'}
 - Aandachtspunten: {ctx['gaps'] or 'geen specifieke gaps'}
-- CV samenvatting: {ctx['cv_text'][:300] if ctx['cv_text'] else 'niet beschikbaar'}
+- CV samenvatting: {ctx['cv_summary'] or 'niet beschikbaar'}
 - Suggesties voor vragen: {ctx['suggested_questions'] or 'gebruik je eigen oordeel'}
 
 DOEL: stel precies {MAX_QUESTIONS} gerichte vragen, eindig warm en kort.
@@ -401,23 +397,27 @@ Spreek altijd Nederlands."""
 
 
 def _call_ai(system_prompt: str, history: list) -> str:
-    if not _ai_client:
-        return "De AI is momenteel niet beschikbaar."
+    if not llm.is_enabled():
+        return _AI_UNAVAILABLE
     try:
-        resp = _ai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "system", "content": system_prompt}] + history,
+        return llm.chat(
+            [{"role": "system", "content": system_prompt}] + history,
             max_tokens=250,
             temperature=0.75,
+            cache=False,
+            feature="virtual_interview",
         )
-        return resp.choices[0].message.content.strip()
     except Exception as e:
         return f"Er ging iets mis: {str(e)}"
 
 
-def _score_transcript(ctx: dict, transcript: list, language: str = "nl") -> tuple[int, str]:
-    """Analyseer het volledige transcript en geef een score (0-100) + samenvatting."""
-    if not _ai_client:
+def _score_transcript(ctx: dict, transcript: list, language: str = "nl", strict: bool = False) -> tuple[int, str]:
+    """
+    Analyseer het volledige transcript en geef een score (0-100) + samenvatting.
+    strict=True: fouten doorgeven (de completion-pipeline probeert het dan opnieuw)
+    in plaats van terug te vallen op een neutrale score.
+    """
+    if not llm.is_enabled():
         return 50, "AI niet beschikbaar voor scoring." if language != "en" else "AI not available for scoring."
 
     convo = "\n".join(
@@ -457,13 +457,12 @@ Geef een JSON antwoord met:
 Reageer ALLEEN met geldige JSON, geen tekst ernaast."""
 
     try:
-        resp = _ai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
+        raw = llm.chat(
+            [{"role": "user", "content": prompt}],
             max_tokens=200,
             temperature=0.3,
+            feature="interview_scoring",
         )
-        raw = resp.choices[0].message.content.strip()
         # Verwijder eventuele markdown code fences
         if raw.startswith("```"):
             raw = raw.split("```")[1]
@@ -472,27 +471,73 @@ Reageer ALLEEN met geldige JSON, geen tekst ernaast."""
         data = json.loads(raw)
         return int(data.get("score", 50)), data.get("summary", "Interview afgerond.")
     except Exception as e:
+        if strict:
+            raise
         return 50, f"Score niet berekend ({str(e)})"
 
 
-def _get_transcript(vi_session: models.VirtualInterviewSession) -> list:
-    if not vi_session.transcript:
-        return []
-    try:
-        return json.loads(vi_session.transcript)
-    except Exception:
-        return []
+def _get_transcript(vi_session: models.VirtualInterviewSession, db: Session) -> list:
+    """Beurten van de sessie op volgorde: [{role, content, timestamp}]."""
+    rows = (
+        db.query(models.InterviewTurn.role, models.InterviewTurn.content, models.InterviewTurn.created_at)
+        .filter(models.InterviewTurn.session_id == vi_session.id)
+        .order_by(models.InterviewTurn.seq.asc())
+        .all()
+    )
+    return [
+        {
+            "role": models.InterviewTurn.ROLES[row.role],
+            "content": row.content,
+            "timestamp": row.created_at.isoformat() if row.created_at else None,
+        }
+        for row in rows
+    ]
 
 
-def _append_transcript(vi_session: models.VirtualInterviewSession, role: str, content: str, db: Session) -> None:
-    transcript = _get_transcript(vi_session)
-    transcript.append({
-        "role": role,
-        "content": content,
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-    })
-    vi_session.transcript = json.dumps(transcript, ensure_ascii=False)
-    db.commit()
+def _turn_rows(session_id: int, turns: list, seq: int) -> list:
+    return [
+        models.InterviewTurn(
+            session_id=session_id,
+            seq=seq + i,
+            role=models.InterviewTurn.ROLES.index(role) if role in models.InterviewTurn.ROLES else 1,
+            content=content,
+        )
+        for i, (role, content) in enumerate(turns)
+    ]
+
+
+def _append_turns(vi_session: models.VirtualInterviewSession, turns: list, db: Session, seq: Optional[int] = None) -> None:
+    """
+    Voeg beurten [(role, content)] toe als nieuwe rijen en commit — het bestaande
+    transcript wordt niet gelezen of herschreven. seq is het volgnummer van de
+    eerste beurt (bekend als de aanroeper het transcript al heeft); zonder seq,
+    of als een parallelle request hetzelfde nummer pakte, wordt het opgezocht.
+    """
+    for _ in range(3):
+        if seq is None:
+            seq = db.query(func.coalesce(func.max(models.InterviewTurn.seq) + 1, 0)).filter(
+                models.InterviewTurn.session_id == vi_session.id
+            ).scalar()
+        db.add_all(_turn_rows(vi_session.id, turns, seq))
+        try:
+            db.commit()
+            return
+        except IntegrityError:
+            db.rollback()
+            seq = None
+    raise HTTPException(status_code=409, detail="Transcript tegelijk gewijzigd, probeer opnieuw")
+
+
+def _replace_turns(vi_session: models.VirtualInterviewSession, transcript: list, db: Session) -> None:
+    """Vervang alle beurten door een aangeleverd transcript (bulk insert, geen commit)."""
+    db.query(models.InterviewTurn).filter(
+        models.InterviewTurn.session_id == vi_session.id
+    ).delete(synchronize_session=False)
+    db.add_all(_turn_rows(
+        vi_session.id,
+        [(t.get("role"), t.get("content")) for t in transcript if isinstance(t, dict) and t.get("content")],
+        0,
+    ))
 
 
 # ── Endpoints ─────────────────────────────────────────────────────────────────
@@ -644,7 +689,7 @@ def speak(
         raise HTTPException(status_code=404, detail="Geen actieve interview sessie")
     if vi_session.did_stream_id != TTS_FALLBACK_STREAM_ID:
         _did_speak(vi_session.did_stream_id, vi_session.did_session_id or "", payload.text, language)
-    _append_transcript(vi_session, "recruiter", payload.text, db)
+    _append_turns(vi_session, [("recruiter", payload.text)], db)
     return {"ok": True}
 
 
@@ -653,6 +698,7 @@ def submit_answer(
     app_id: int,
     payload: AnswerIn,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -676,19 +722,21 @@ def submit_answer(
     if not vi_session:
         raise HTTPException(status_code=404, detail="Geen actieve interview sessie")
 
-    # Sla kandidaat antwoord op
-    _append_transcript(vi_session, "candidate", payload.transcript.strip(), db)
+    # Sla kandidaat antwoord op (één INSERT; het transcript wordt één keer gelezen)
+    transcript = _get_transcript(vi_session, db)
+    answer = payload.transcript.strip()
+    _append_turns(vi_session, [("candidate", answer)], db, seq=len(transcript))
+    transcript.append({"role": "candidate", "content": answer})
 
     # Huidige status: hoeveel recruiter-beurten zijn er al?
-    transcript = _get_transcript(vi_session)
     recruiter_turns = sum(1 for t in transcript if t["role"] == "recruiter")
 
     ctx = _get_context(app_id, db)
     system_prompt = _build_avatar_system_prompt(ctx, language)
-    history = [
+    history = conversation_memory.prompt_history(db, conversation_memory.INTERVIEW, vi_session.id, [
         {"role": "assistant" if t["role"] == "recruiter" else "user", "content": t["content"]}
         for t in transcript
-    ]
+    ])
 
     if recruiter_turns >= MAX_QUESTIONS:
         # Sluitingsbericht — geen nieuwe vragen meer
@@ -699,12 +747,13 @@ def submit_answer(
         )
         history.append({"role": "user", "content": closing_instruction})
         next_text = _call_ai(system_prompt, history)
-        _append_transcript(vi_session, "recruiter", next_text, db)
+        _append_turns(vi_session, [("recruiter", next_text)], db, seq=len(transcript))
         return AnswerOut(next_text=next_text, ended=True, question_number=recruiter_turns)
 
     # Volgende vraag genereren
     next_text = _call_ai(system_prompt, history)
-    _append_transcript(vi_session, "recruiter", next_text, db)
+    _append_turns(vi_session, [("recruiter", next_text)], db, seq=len(transcript))
+    background_tasks.add_task(conversation_memory.fold, conversation_memory.INTERVIEW, vi_session.id)
     return AnswerOut(
         next_text=next_text,
         ended=False,
@@ -712,20 +761,58 @@ def submit_answer(
     )
 
 
+def _completion_out(vi_session: models.VirtualInterviewSession, db: Session) -> CompleteOut:
+    task = (
+        db.query(models.InterviewCompletionTask)
+        .filter(models.InterviewCompletionTask.session_id == vi_session.id)
+        .first()
+    )
+    progress = interview_completion.status_of(task)
+    status = "processing" if progress["status"] in ("queued", "running") else progress["status"]
+    followup = None
+    if vi_session.followup_interview_id:
+        followup = db.query(models.InterviewSession).filter(
+            models.InterviewSession.id == vi_session.followup_interview_id
+        ).first()
+    scored = task is None or task.scored_at is not None
+    return CompleteOut(
+        status=status,
+        stages=progress["stages"],
+        score=vi_session.score if scored else None,
+        summary=vi_session.score_summary if scored else None,
+        followup_scheduled=followup is not None,
+        teams_join_url=followup.teams_join_url if followup else None,
+        scheduled_at=followup.scheduled_at.isoformat() if followup and followup.scheduled_at else None,
+    )
+
+
+def _start_completion(
+    vi_session: models.VirtualInterviewSession,
+    language: str,
+    background_tasks: BackgroundTasks,
+    db: Session,
+) -> CompleteOut:
+    """Persist-stap: sessie voltooid + taak in de wachtrij (één commit); de rest draait op de achtergrond."""
+    vi_session.status = "completed"
+    task = interview_completion.enqueue(db, vi_session, language)
+    db.commit()
+    if task.status == "queued":
+        background_tasks.add_task(interview_completion.run_task, task.id)
+    return _completion_out(vi_session, db)
+
+
 @router.post("/session/{app_id}/complete", response_model=CompleteOut)
 def complete_interview(
     app_id: int,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """
-    Finaliseer het interview:
-    1. Markeer sessie als voltooid
-    2. AI scoort het transcript
-    3. Sla score op in AIResult
-    4. Als score >= threshold én MS Graph geconfigureerd: plan automatisch een Teams-vervolgafspraak
-    5. Sluit D-ID stream
+    Finaliseer het interview. Antwoordt direct (status "processing"); op de
+    achtergrond volgen scoren, AIResult, evt. Teams-vervolgafspraak en de mail
+    aan de werkgever (zie interview_completion). Poll /completion voor het resultaat.
     """
     app = db.query(models.Application).filter(models.Application.id == app_id).first()
     if not app:
@@ -741,149 +828,53 @@ def complete_interview(
     if not vi_session:
         raise HTTPException(status_code=404, detail="Geen interview sessie gevonden")
 
-    language = _get_language(request)
-    transcript = _get_transcript(vi_session)
-    ctx = _get_context(app_id, db)
-
-    # Score berekenen
-    score, summary = _score_transcript(ctx, transcript, language)
-
-    # Sla score op
-    vi_session.score = score
-    vi_session.score_summary = summary
-    vi_session.status = "completed"
-    db.commit()
-
-    # Verrijk of maak AIResult aan
-    ai_result = (
-        db.query(models.AIResult).filter(models.AIResult.application_id == app_id).first()
-    )
-    if ai_result:
-        # Update bestaand resultaat met interview-score
-        ai_result.match_score = max(ai_result.match_score or 0, score)
-        ai_result.summary = (ai_result.summary or "") + f"\n\n[Video interview score: {score}/100]\n{summary}"
-    else:
-        ai_result = models.AIResult(
-            application_id=app_id,
-            match_score=score,
-            summary=f"[Video interview score: {score}/100]\n{summary}",
-        )
-        db.add(ai_result)
-    db.commit()
-
-    # Markeer interview als afgerond + stuur werkgever notificatie
-    now = datetime.now(timezone.utc)
-    app.interview_completed_at = now
-    db.commit()
-
-    deadline = now + timedelta(days=7)
-    deadline_str = deadline.strftime("%d-%m-%Y")
-    employer = db.query(models.User).filter(models.User.id == ctx["employer_id"]).first()
-    if employer:
-        try:
-            send_interview_completed_notification(
-                employer_email=employer.email,
-                candidate_name=ctx["candidate_name"],
-                vacancy_title=ctx["vacancy_title"],
-                interview_score=score,
-                deadline_str=deadline_str,
-            )
-        except Exception:
-            pass  # E-mail niet-fataal
-
-    # D-ID stream sluiten
+    # D-ID stream sluiten hoeft de kandidaat niet af te wachten
     if vi_session.did_stream_id:
-        _did_close_stream(vi_session.did_stream_id, vi_session.did_session_id or "")
+        background_tasks.add_task(_did_close_stream, vi_session.did_stream_id, vi_session.did_session_id or "")
 
-    # Auto-plan vervolgafspraak als score hoog genoeg + MS Graph geconfigureerd
-    followup_scheduled = False
-    teams_join_url = None
-    scheduled_at_str = None
+    return _start_completion(vi_session, _get_language(request), background_tasks, db)
 
-    if score >= SCORE_THRESHOLD and MS_ORGANIZER_EMAIL:
-        try:
-            employer = db.query(models.User).filter(
-                models.User.id == ctx["employer_id"]
-            ).first() if ctx["employer_id"] else None
-
-            # Plan 3 werkdagen vanaf nu, om 10:00
-            now = datetime.now(timezone.utc)
-            followup_dt = now + timedelta(days=3)
-            followup_dt = followup_dt.replace(hour=9, minute=0, second=0, microsecond=0)
-            end_dt = followup_dt + timedelta(minutes=45)
-
-            subject = f"2e gesprek: {ctx['candidate_name']} — {ctx['vacancy_title']}"
-
-            meeting = _create_teams_online_meeting(
-                subject=subject,
-                start_dt=followup_dt,
-                end_dt=end_dt,
-                organizer_email=MS_ORGANIZER_EMAIL,
-            )
-            join_url = meeting.get("joinWebUrl") or meeting.get("joinUrl")
-
-            # Sla op als InterviewSession
-            interview_session = models.InterviewSession(
-                application_id=app_id,
-                scheduled_at=followup_dt,
-                duration_minutes=45,
-                interview_type="teams",
-                status="scheduled",
-                teams_meeting_id=meeting.get("id"),
-                teams_join_url=join_url,
-                teams_organizer_email=MS_ORGANIZER_EMAIL,
-                notes=f"Automatisch ingepland na video interview. Score: {score}/100",
-            )
-            db.add(interview_session)
-            db.commit()
-            db.refresh(interview_session)
 
-            vi_session.followup_interview_id = interview_session.id
-            db.commit()
-
-            # Kalender-uitnodigingen sturen
-            attendees = []
-            if employer:
-                attendees.append(employer.email)
-            if ctx["candidate_email"]:
-                attendees.append(ctx["candidate_email"])
-
-            body_html = (
-                f"<p>Beste {ctx['candidate_name']},</p>"
-                f"<p>Gefeliciteerd! Op basis van uw video interview nodigen we u uit "
-                f"voor een 2e gesprek over de functie <strong>{ctx['vacancy_title']}</strong>.</p>"
-                f"<p>Score video interview: <strong>{score}/100</strong></p>"
-            )
-            _send_calendar_invite(
-                organizer_email=MS_ORGANIZER_EMAIL,
-                attendee_emails=attendees,
-                subject=subject,
-                body_html=body_html,
-                start_dt=followup_dt,
-                end_dt=end_dt,
-                teams_join_url=join_url,
-            )
+@router.get("/session/{app_id}/completion", response_model=CompleteOut)
+def get_completion(
+    app_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Voortgang en resultaat van het afronden (score, vervolgafspraak)."""
+    app = db.query(models.Application).filter(models.Application.id == app_id).first()
+    if not app:
+        raise HTTPException(status_code=404, detail="Sollicitatie niet gevonden")
+    if app.candidate_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Geen toegang")
 
-            followup_scheduled = True
-            teams_join_url = join_url
-            scheduled_at_str = followup_dt.isoformat()
+    vi_session = (
+        db.query(models.VirtualInterviewSession)
+        .filter(models.VirtualInterviewSession.application_id == app_id)
+        .first()
+    )
+    if not vi_session or vi_session.status != "completed":
+        raise HTTPException(status_code=404, detail="Interview is nog niet afgerond")
+    return _completion_out(vi_session, db)
 
-        except Exception:
-            pass  # Vervolgafspraak mislukt — niet fataal
 
-    return CompleteOut(
-        score=score,
-        summary=summary,
-        followup_scheduled=followup_scheduled,
-        teams_join_url=teams_join_url,
-        scheduled_at=scheduled_at_str,
+def warm_tts_cache() -> int:
+    """Genereer de vaste zinnen vooraf (lifespan, in een thread)."""
+    return tts_cache.pregenerate(
+        LISA_TTS_COMMON_PHRASES, voice=LISA_TTS_VOICE, speed=LISA_TTS_SPEED, model=LISA_TTS_MODEL
     )
 
 
+def _prepend(first: bytes, rest):
+    yield first
+    yield from rest
+
+
 @router.post("/session/{app_id}/tts")
 def text_to_speech(
     app_id: int,
     payload: SpeakIn,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -891,8 +882,12 @@ def text_to_speech(
     OpenAI TTS: zet tekst om naar MP3 audio.
     Wordt gebruikt als vervanger voor browser Web Speech API — klinkt veel natuurlijker.
     Vereist OPENAI_API_KEY geconfigureerd op de server.
+
+    Audio komt uit de TTS-cache (sleutel: tekst + stem + snelheid + model) met
+    een sterke ETag; If-None-Match geeft 304. Niet-gecachete audio wordt chunk
+    voor chunk gestreamd en daarna in de cache gezet (X-TTS-Cache: hit|miss).
     """
-    if not _ai_client:
+    if not llm.is_enabled():
         raise HTTPException(status_code=503, detail="OpenAI niet geconfigureerd")
 
     # Autorisatie: alleen de kandidaat van deze sollicitatie (of admin)
@@ -902,22 +897,30 @@ def text_to_speech(
     if app.candidate_id != current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Geen toegang")
 
+    text = payload.text.strip()
+    key = tts_cache.make_key(text, LISA_TTS_VOICE, LISA_TTS_SPEED, LISA_TTS_MODEL)
+
+    cached = tts_cache.get(key)
+    if cached is not None:
+        audio_bytes, etag = cached
+        headers = {"ETag": f'"{etag}"', "Cache-Control": "private, max-age=86400", "X-TTS-Cache": "hit"}
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            return Response(status_code=304, headers=headers)
+        return Response(audio_bytes, media_type="audio/mpeg", headers=headers)
+
+    # Eerste chunk al hier ophalen: een OpenAI-fout wordt zo nog een nette 502
+    chunks = tts_cache.stream(key, text, voice=LISA_TTS_VOICE, speed=LISA_TTS_SPEED, model=LISA_TTS_MODEL)
     try:
-        response = _ai_client.audio.speech.create(
-            model="tts-1",         # Sneller dan tts-1-hd, aanvaardbare kwaliteit voor gesprek
-            voice="nova",          # Natuurlijke vrouwenstem (klinkt goed in het Nederlands)
-            input=payload.text,
-            speed=1.05,            # Iets sneller — gesprekstempo
-            response_format="mp3",
-        )
-        audio_bytes = response.content
-        return StreamingResponse(
-            io.BytesIO(audio_bytes),
-            media_type="audio/mpeg",
-            headers={"Cache-Control": "no-cache", "Content-Length": str(len(audio_bytes))},
-        )
+        first = next(chunks)
+    except StopIteration:
+        raise HTTPException(status_code=502, detail="TTS mislukt: lege audio")
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"TTS mislukt: {str(e)}")
+    return StreamingResponse(
+        _prepend(first, chunks),
+        media_type="audio/mpeg",
+        headers={"Cache-Control": "no-cache", "X-TTS-Cache": "miss"},
+    )
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -941,25 +944,8 @@ class V2CompleteIn(BaseModel):
     transcript: List[dict]   # [{role: "recruiter"|"candidate", content: str}]
 
 
-@router.post("/session/{app_id}/realtime-token")
-def create_realtime_token(
-    app_id: int,
-    request: Request,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
-):
-    """
-    Lisa 2.0 — Maak een ephemeral OpenAI Realtime API token aan.
-    De browser gebruikt dit token om DIRECT met OpenAI te verbinden via WebSocket.
-
-    Flow:
-      Browser → POST /realtime-token → krijgt client_secret
-      Browser → WebSocket wss://api.openai.com/v1/realtime?model=...
-      Browser ↔ OpenAI Realtime (full-duplex audio, geen backend meer nodig)
-      Browser → POST /v2-complete (met transcript) voor scoring
-
-    Vereist: OPENAI_API_KEY (al geconfigureerd)
-    """
+def _check_realtime_access(app_id: int, current_user: models.User, db: Session) -> None:
+    """Toegang, afgerond interview, Scale-plan en maandlimiet voor Lisa 2.0 — gedeeld door /realtime-prefetch en /realtime-token."""
     # Toegangscontrole
     app = db.query(models.Application).filter(models.Application.id == app_id).first()
     if not app:
@@ -967,6 +953,17 @@ def create_realtime_token(
     if app.candidate_id != current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Geen toegang")
 
+    # Afgerond blijft afgerond (zoals /start): een herstart zou de sessie terug
+    # op in_progress zetten terwijl de completion-taak al done is, en dan wordt
+    # het nieuwe transcript nooit gescoord
+    vi_session = (
+        db.query(models.VirtualInterviewSession.status)
+        .filter(models.VirtualInterviewSession.application_id == app_id)
+        .first()
+    )
+    if vi_session and vi_session.status == "completed":
+        raise HTTPException(status_code=409, detail="Dit interview is al afgerond.")
+
     # Scale plan check (admins mogen altijd testen)
     vacancy = db.query(models.Vacancy).filter(models.Vacancy.id == app.vacancy_id).first()
     employer = db.query(models.User).filter(models.User.id == vacancy.employer_id).first() if vacancy else None
@@ -998,15 +995,14 @@ def create_realtime_token(
             detail=f"Maandelijks interview limiet bereikt ({LISA_MONTHLY_LIMIT}). Neem contact op voor extra interviews.",
         )
 
-    if not OPENAI_API_KEY:
+    if not llm.is_enabled():
         raise HTTPException(status_code=503, detail="OPENAI_API_KEY niet geconfigureerd")
 
-    # Haal context op voor Lisa's systeem-prompt
-    language = _get_language(request)
-    ctx = _get_context(app_id, db)
 
+def _realtime_instructions(ctx: dict, language: str) -> str:
+    """Systeem-prompt van Lisa 2.0 voor de Realtime-sessie."""
     if language == "en":
-        system_prompt = f"""You are Lisa, an enthusiastic and empathetic HR recruiter at VorzaIQ.
+        return f"""You are Lisa, an enthusiastic and empathetic HR recruiter at VorzaIQ.
 
 You are conducting a spoken video interview with {ctx['candidate_name']} for the position of {ctx['vacancy_title']}.
 You are warm, curious and direct. Talk as if you're sitting across from someone — energetic but relaxed.
@@ -1022,7 +1018,7 @@ CONTEXT:
 - Position: {ctx['vacancy_title']}
 - Candidate strengths: {ctx['strengths'] or 'unknown'}
 - Areas of attention: {ctx['gaps'] or 'unknown'}
-- CV summary: {(ctx.get('cv_text') or '')[:300]}
+- CV summary: {ctx.get('cv_summary') or ''}
 
 STRUCTURE (4-6 questions, free conversation):
 1. Introduce yourself and warmly welcome {ctx['candidate_name']}
@@ -1032,7 +1028,7 @@ STRUCTURE (4-6 questions, free conversation):
 
 Always speak English."""
     else:
-        system_prompt = f"""Je bent Lisa, een enthousiaste en empathische HR-recruiter bij VorzaIQ.
+        return f"""Je bent Lisa, een enthousiaste en empathische HR-recruiter bij VorzaIQ.
 
 Je voert een gesproken video-interview met {ctx['candidate_name']} voor de positie van {ctx['vacancy_title']}.
 Je bent warm, nieuwsgierig en direct. Praat alsof je echt tegenover iemand zit — energiek maar ontspannen.
@@ -1049,7 +1045,7 @@ CONTEXT:
 - Functie: {ctx['vacancy_title']}
 - Sterke punten kandidaat: {ctx['strengths'] or 'onbekend'}
 - Aandachtspunten: {ctx['gaps'] or 'onbekend'}
-- CV samenvatting: {(ctx.get('cv_text') or '')[:300]}
+- CV samenvatting: {ctx.get('cv_summary') or ''}
 
 STRUCTUUR (4-6 vragen, volledig vrij gesprek):
 1. Stel jezelf voor en verwelkom {ctx['candidate_name']} warm
@@ -1059,27 +1055,15 @@ STRUCTUUR (4-6 vragen, volledig vrij gesprek):
 
 Spreek altijd Nederlands."""
 
-    # Maak of hergebruik VirtualInterviewSession
-    vi_session = (
-        db.query(models.VirtualInterviewSession)
-        .filter(models.VirtualInterviewSession.application_id == app_id)
-        .first()
-    )
-    if not vi_session:
-        vi_session = models.VirtualInterviewSession(
-            application_id=app_id,
-            status="pending",
-        )
-        db.add(vi_session)
-        db.commit()
-        db.refresh(vi_session)
 
+def _mint_realtime_secret(instructions: str) -> dict:
+    """Vraag een ephemeral token aan; geeft {client_secret, expires_at (epoch of None)}."""
     # Vraag ephemeral token op bij OpenAI Realtime GA API (client_secrets)
     try:
         resp = http.post(
-            "https://api.openai.com/v1/realtime/client_secrets",
+            llm.api_url("realtime/client_secrets"),
             headers={
-                "Authorization": f"Bearer {OPENAI_API_KEY}",
+                "Authorization": f"Bearer {llm.OPENAI_API_KEY}",
                 "Content-Type": "application/json",
             },
             json={
@@ -1087,7 +1071,7 @@ Spreek altijd Nederlands."""
                     "type": "realtime",
                     "model": "gpt-realtime-2",
                     "output_modalities": ["audio"],
-                    "instructions": system_prompt,
+                    "instructions": instructions,
                     "audio": {
                         "input": {
                             "turn_detection": {
@@ -1122,14 +1106,83 @@ Spreek altijd Nederlands."""
     if not client_secret:
         raise HTTPException(status_code=502, detail="Geen client_secret ontvangen van OpenAI")
 
-    vi_session.status = "in_progress"
+    return {"client_secret": client_secret, "expires_at": data.get("expires_at")}
+
+
+@router.post("/session/{app_id}/realtime-prefetch")
+def prefetch_realtime_session(
+    app_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Lisa 2.0 — Zet de Realtime-sessie alvast klaar terwijl de kandidaat het
+    startscherm leest (services/realtime_prefetch.py). Laadt de context,
+    bouwt de prompt en maakt het ephemeral token op de achtergrond aan;
+    antwoordt direct. Opnieuw aanroepen na refresh_in seconden houdt een
+    vers token klaar.
+    """
+    _check_realtime_access(app_id, current_user, db)
+    language = _get_language(request)
+    instructions = _realtime_instructions(_get_context(app_id, db), language)
+    return realtime_prefetch.prefetch(app_id, language, lambda: _mint_realtime_secret(instructions))
+
+
+@router.post("/session/{app_id}/realtime-token")
+def create_realtime_token(
+    app_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Lisa 2.0 — Maak een ephemeral OpenAI Realtime API token aan.
+    De browser gebruikt dit token om DIRECT met OpenAI te verbinden via WebSocket.
+
+    Flow:
+      Browser → POST /realtime-prefetch (bij laden pagina, optioneel)
+      Browser → POST /realtime-token → krijgt client_secret
+      Browser → WebSocket wss://api.openai.com/v1/realtime?model=...
+      Browser ↔ OpenAI Realtime (full-duplex audio, geen backend meer nodig)
+      Browser → POST /v2-complete (met transcript) voor scoring
+
+    Ligt er een vooraf aangemaakt token klaar (of is het nog onderweg), dan
+    wordt dat gebruikt; anders wordt het hier aangemaakt.
+
+    Vereist: OPENAI_API_KEY (al geconfigureerd)
+    """
+    _check_realtime_access(app_id, current_user, db)
+    language = _get_language(request)
+
+    minted = realtime_prefetch.take(app_id, language)
+    prefetched = minted is not None
+    if minted is None:
+        minted = _mint_realtime_secret(_realtime_instructions(_get_context(app_id, db), language))
+
+    # Maak of hergebruik VirtualInterviewSession
+    vi_session = (
+        db.query(models.VirtualInterviewSession)
+        .filter(models.VirtualInterviewSession.application_id == app_id)
+        .first()
+    )
+    if not vi_session:
+        vi_session = models.VirtualInterviewSession(
+            application_id=app_id,
+            status="in_progress",
+        )
+        db.add(vi_session)
+    else:
+        vi_session.status = "in_progress"
     db.commit()
+    db.refresh(vi_session)
 
     return {
-        "client_secret": client_secret,
+        "client_secret": minted["client_secret"],
         "session_id": vi_session.id,
         "model": "gpt-realtime-2",
         "voice": LISA_V2_VOICE,
+        "prefetched": prefetched,
     }
 
 
@@ -1182,16 +1235,17 @@ def complete_v2_interview(
     app_id: int,
     payload: V2CompleteIn,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """
-    Lisa 2.0 — Finaliseer interview: score het transcript en plan evt. vervolgafspraak.
-    Het transcript wordt aangeleverd vanuit de browser (OpenAI Realtime WebSocket).
+    Lisa 2.0 — Finaliseer interview. Het transcript wordt aangeleverd vanuit
+    de browser (OpenAI Realtime WebSocket) en direct opgeslagen; scoren en een
+    evt. vervolgafspraak gebeuren op de achtergrond (poll /completion).
 
     Transcript formaat: [{role: "recruiter"|"candidate", content: str}, ...]
     """
-    language = _get_language(request)
     app = db.query(models.Application).filter(models.Application.id == app_id).first()
     if not app:
         raise HTTPException(status_code=404, detail="Sollicitatie niet gevonden")
@@ -1206,121 +1260,15 @@ def complete_v2_interview(
     if not vi_session:
         raise HTTPException(status_code=404, detail="Geen interview sessie gevonden")
 
-    ctx = _get_context(app_id, db)
-    score, summary = _score_transcript(ctx, payload.transcript, language)
-
-    vi_session.score = score
-    vi_session.score_summary = summary
-    vi_session.status = "completed"
-    vi_session.transcript = json.dumps(payload.transcript, ensure_ascii=False)
-    db.commit()
-
-    # Verrijk of maak AIResult aan
-    ai_result = (
-        db.query(models.AIResult).filter(models.AIResult.application_id == app_id).first()
-    )
-    if ai_result:
-        ai_result.match_score = max(ai_result.match_score or 0, score)
-        ai_result.summary = (ai_result.summary or "") + f"\n\n[Video interview score: {score}/100]\n{summary}"
-    else:
-        ai_result = models.AIResult(
-            application_id=app_id,
-            match_score=score,
-            summary=f"[Video interview score: {score}/100]\n{summary}",
-        )
-        db.add(ai_result)
-    db.commit()
-
-    # Markeer interview als afgerond + stuur werkgever notificatie
-    now = datetime.now(timezone.utc)
-    app.interview_completed_at = now
-    db.commit()
-
-    deadline = now + timedelta(days=7)
-    deadline_str = deadline.strftime("%d-%m-%Y")
-    employer = db.query(models.User).filter(models.User.id == ctx["employer_id"]).first()
-    if employer:
-        try:
-            send_interview_completed_notification(
-                employer_email=employer.email,
-                candidate_name=ctx["candidate_name"],
-                vacancy_title=ctx["vacancy_title"],
-                interview_score=score,
-                deadline_str=deadline_str,
-            )
-        except Exception:
-            pass  # E-mail niet-fataal
-
-    # Auto-plan vervolgafspraak als score hoog genoeg + MS Graph geconfigureerd
-    followup_scheduled = False
-    teams_join_url = None
-    scheduled_at_str = None
-
-    if score >= SCORE_THRESHOLD and MS_ORGANIZER_EMAIL:
-        try:
-            if not employer:
-                employer = db.query(models.User).filter(models.User.id == ctx["employer_id"]).first()
-            now = datetime.now(timezone.utc)
-            followup_dt = (now + timedelta(days=3)).replace(hour=9, minute=0, second=0, microsecond=0)
-            end_dt = followup_dt + timedelta(minutes=45)
-            subject = f"2e gesprek: {ctx['candidate_name']} — {ctx['vacancy_title']}"
-
-            meeting = _create_teams_online_meeting(
-                subject=subject, start_dt=followup_dt, end_dt=end_dt, organizer_email=MS_ORGANIZER_EMAIL,
-            )
-            join_url = meeting.get("joinWebUrl") or meeting.get("joinUrl")
-
-            interview_session = models.InterviewSession(
-                application_id=app_id,
-                scheduled_at=followup_dt,
-                duration_minutes=45,
-                interview_type="teams",
-                status="scheduled",
-                teams_meeting_id=meeting.get("id"),
-                teams_join_url=join_url,
-                teams_organizer_email=MS_ORGANIZER_EMAIL,
-                notes=f"Automatisch ingepland na Lisa 2.0 video interview. Score: {score}/100",
-            )
-            db.add(interview_session)
-            db.commit()
-            db.refresh(interview_session)
-
-            vi_session.followup_interview_id = interview_session.id
-            db.commit()
-
-            attendees = []
-            if employer:
-                attendees.append(employer.email)
-            if ctx["candidate_email"]:
-                attendees.append(ctx["candidate_email"])
-
-            _send_calendar_invite(
-                organizer_email=MS_ORGANIZER_EMAIL,
-                attendee_emails=attendees,
-                subject=subject,
-                body_html=(
-                    f"<p>Beste {ctx['candidate_name']},</p>"
-                    f"<p>Op basis van uw video interview nodigen we u uit voor een 2e gesprek "
-                    f"over de functie <strong>{ctx['vacancy_title']}</strong>.</p>"
-                    f"<p>Score video interview: <strong>{score}/100</strong></p>"
-                ),
-                start_dt=followup_dt,
-                end_dt=end_dt,
-                teams_join_url=join_url,
-            )
-            followup_scheduled = True
-            teams_join_url = join_url
-            scheduled_at_str = followup_dt.isoformat()
-        except Exception:
-            pass
-
-    return CompleteOut(
-        score=score,
-        summary=summary,
-        followup_scheduled=followup_scheduled,
-        teams_join_url=teams_join_url,
-        scheduled_at=scheduled_at_str,
+    # Al afgerond (dubbele klik, retry van de browser): transcript niet opnieuw vervangen
+    task = (
+        db.query(models.InterviewCompletionTask.status)
+        .filter(models.InterviewCompletionTask.session_id == vi_session.id)
+        .first()
     )
+    if task is None or task.status == "failed":
+        _replace_turns(vi_session, payload.transcript, db)
+    return _start_completion(vi_session, _get_language(request), background_tasks, db)
 
 
 @router.get("/session/{app_id}", response_model=SessionStatusOut)
@@ -1353,6 +1301,6 @@ def get_session(
         id=vi_session.id,
         status=vi_session.status,
         score=vi_session.score,
-        transcript=_get_transcript(vi_session),
+        transcript=_get_transcript(vi_session, db),
         followup_interview_id=vi_session.followup_interview_id,
     )
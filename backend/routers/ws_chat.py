@@ -2,20 +2,20 @@
 WebSocket router voor Lisa AI recruiter chat.
 
 Vervangt het HTTP polling model met een echte WebSocket verbinding.
-De kandidaat stuurt berichten en ontvangt Lisa's antwoord streaming.
+De kandidaat stuurt berichten en ontvangt Lisa's antwoord streaming:
+eerst {"delta": ...}-frames per token, daarna één slotbericht met het
+opgeslagen id en de ended-vlag.
 
 Endpoint: WS /ws/chat/{app_id}?token=<jwt>
 """
 
 import asyncio
 import json
-import os
-from typing import Dict
+from typing import Dict, Tuple
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
 from jose import jwt, JWTError
-from openai import OpenAI
 
 from backend.db import SessionLocal
 from backend import models
@@ -23,14 +23,12 @@ from backend.security import SECRET_KEY, ALGORITHM
 from backend.routers.recruiter_chat import (
     _get_application_context,
     _build_system_prompt,
-    _count_recruiter_messages,
-    _get_conversation_history,
+    _opening_instruction,
     _save_message,
-    _call_ai,
+    _astream_ai,
     BASE_QUESTIONS,
 )
-
-_openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY")) if os.getenv("OPENAI_API_KEY") else None
+from backend.services import conversation_memory, lisa_opening, llm
 
 
 def _evaluate_and_filter(app_id: int, db: Session) -> None:
@@ -39,11 +37,16 @@ def _evaluate_and_filter(app_id: int, db: Session) -> None:
     Kandidaten met slechte antwoorden én CV-match < 90% krijgen status 'auto_rejected'.
     Kandidaten met CV-match >= 90% worden ALTIJD doorgelaten.
     """
-    if not _openai_client:
+    if not llm.is_enabled():
         return
 
     # Haal match_score op — 90%+ altijd doorlaten
-    ai_result = db.query(models.AIResult).filter(models.AIResult.application_id == app_id).first()
+    ai_result = (
+        db.query(models.AIResult)
+        .filter(models.AIResult.application_id == app_id)
+        .order_by(models.AIResult.id.desc())
+        .first()
+    )
     match_score = ai_result.match_score if ai_result else 0
     if match_score and match_score >= 90:
         return
@@ -77,14 +80,12 @@ Beoordelingsregels:
 - Twijfel? Kies dan NIET voor reject"""
 
     try:
-        resp = _openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": eval_prompt}],
+        result = llm.chat_json(
+            [{"role": "user", "content": eval_prompt}],
             max_tokens=150,
             temperature=0.1,
-            response_format={"type": "json_object"},
+            feature="lisa_evaluation",
         )
-        result = json.loads(resp.choices[0].message.content)
 
         if result.get("reject") and (match_score or 0) < 90:
             app = db.query(models.Application).filter(models.Application.id == app_id).first()
@@ -119,6 +120,52 @@ class ConnectionManager:
 manager = ConnectionManager()
 
 
+async def _stream_reply(ws: WebSocket, system_prompt: str, history: list) -> Tuple[str, bool]:
+    """
+    Stream Lisa's antwoord als {"delta": ...}-frames.
+    Geeft (volledige tekst, client nog verbonden) terug. Verbreekt de client
+    halverwege, dan lopen we de stream wel af: het antwoord wordt opgeslagen
+    en staat er bij opnieuw verbinden gewoon in de geschiedenis.
+    """
+    parts = []
+    connected = True
+    async for delta in _astream_ai(system_prompt, history):
+        parts.append(delta)
+        if connected:
+            try:
+                await manager.send(ws, {"role": "recruiter", "delta": delta})
+            except (WebSocketDisconnect, RuntimeError):
+                connected = False
+    return "".join(parts).strip(), connected
+
+
+async def _generate_opening(ws: WebSocket, app_id: int, lang: str, system_prompt: str, ctx: dict, db: Session) -> dict | None:
+    """
+    Fallback zonder klaargezette opening: stream hem live. Een tweede verbinding
+    die tegelijk binnenkomt wacht op deze generatie en krijgt het opgeslagen bericht.
+    Geeft None als de client tijdens het streamen verdween.
+    """
+    fut, owner = lisa_opening.begin(lisa_opening.CHAT, app_id)
+    if not owner:
+        await lisa_opening.await_inflight(lisa_opening.CHAT, app_id)
+        first = await asyncio.to_thread(lisa_opening.load_chat_opening, app_id, lang)
+        if first is not None:
+            return first
+        db.expire_all()
+        msg = db.query(models.RecruiterChatMessage).filter(
+            models.RecruiterChatMessage.application_id == app_id
+        ).order_by(models.RecruiterChatMessage.created_at.asc()).first()
+        return {"id": msg.id, "content": msg.content} if msg else None
+    try:
+        response_text, connected = await _stream_reply(
+            ws, system_prompt, [{"role": "user", "content": _opening_instruction(ctx)}]
+        )
+        msg = _save_message(app_id, "recruiter", response_text, db)
+    finally:
+        lisa_opening.finish(lisa_opening.CHAT, app_id, fut)
+    return {"id": msg.id, "content": msg.content} if connected else None
+
+
 def _auth_user(token: str, db: Session) -> models.User | None:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -134,7 +181,8 @@ async def ws_chat(ws: WebSocket, app_id: int, token: str = "", lang: str = "nl")
     WebSocket Lisa chat.
 
     Client stuurt: { "content": "antwoord van kandidaat" }
-    Server stuurt: { "role": "recruiter"|"candidate", "content": "...", "ended": bool }
+    Server stuurt: { "role": "recruiter", "delta": "..." }  (tijdens het genereren)
+                   { "id": int, "role": "recruiter"|"candidate", "content": "...", "ended": bool }
     """
     db: Session = SessionLocal()
 
@@ -165,8 +213,15 @@ async def ws_chat(ws: WebSocket, app_id: int, token: str = "", lang: str = "nl")
             models.RecruiterChatMessage.application_id == app_id
         ).order_by(models.RecruiterChatMessage.created_at.asc()).all()
 
+        # Gespreksstand per verbinding in het geheugen: geschiedenis en teller
+        # worden één keer geladen en daarna bij elk opgeslagen bericht bijgewerkt
+        conv_history = [
+            {"role": "assistant" if m.role == "recruiter" else "user", "content": m.content}
+            for m in history_msgs
+        ]
         recruiter_count = sum(1 for m in history_msgs if m.role == "recruiter")
         ctx = _get_application_context(app_id, db)
+        system_prompt = _build_system_prompt(ctx, lang)
         intake_qs = ctx.get("intake_questions", [])
         max_questions = BASE_QUESTIONS + len(intake_qs)
         ended = recruiter_count > max_questions
@@ -179,27 +234,26 @@ async def ws_chat(ws: WebSocket, app_id: int, token: str = "", lang: str = "nl")
                 "ended": ended,
             })
 
-        # Geen geschiedenis → genereer Lisa's openingsbericht automatisch
+        # Geen geschiedenis → Lisa's openingsbericht. Meestal heeft de apply-pipeline
+        # het al klaargezet; een lopende generatie wordt afgewacht, niet herhaald
         if not history_msgs:
             try:
-                ctx = _get_application_context(app_id, db)
-                system_prompt = _build_system_prompt(ctx, lang)
-                opening_instruction = (
-                    f"Stel jezelf voor als Lisa en bedank {ctx['candidate_name']} kort voor de sollicitatie "
-                    f"op {ctx['vacancy_title']}. Vertel dat je een paar vragen hebt. "
-                    f"Stel dan meteen je eerste vraag over de gevonden aandachtspunten."
-                )
-                response_text = await asyncio.to_thread(
-                    _call_ai, system_prompt, [{"role": "user", "content": opening_instruction}]
-                )
-                opening_msg = _save_message(app_id, "recruiter", response_text, db)
+                await lisa_opening.await_inflight(lisa_opening.CHAT, app_id)
+                opening = await asyncio.to_thread(lisa_opening.load_chat_opening, app_id, lang)
+                if opening is None:
+                    opening = await _generate_opening(ws, app_id, lang, system_prompt, ctx, db)
+                if opening is None:
+                    return
+                conv_history.append({"role": "assistant", "content": opening["content"]})
                 recruiter_count = 1
                 await manager.send(ws, {
-                    "id": opening_msg.id,
+                    "id": opening["id"],
                     "role": "recruiter",
-                    "content": response_text,
+                    "content": opening["content"],
                     "ended": False,
                 })
+            except WebSocketDisconnect:
+                return
             except Exception:
                 pass
 
@@ -218,6 +272,7 @@ async def ws_chat(ws: WebSocket, app_id: int, token: str = "", lang: str = "nl")
 
                 # Sla kandidaat bericht op
                 candidate_msg = _save_message(app_id, "candidate", content, db)
+                conv_history.append({"role": "user", "content": content})
                 await manager.send(ws, {
                     "id": candidate_msg.id,
                     "role": "candidate",
@@ -225,36 +280,48 @@ async def ws_chat(ws: WebSocket, app_id: int, token: str = "", lang: str = "nl")
                     "ended": False,
                 })
 
-                # Genereer Lisa's antwoord
-                recruiter_count = _count_recruiter_messages(app_id, db)
-                ctx = _get_application_context(app_id, db)
-                system_prompt = _build_system_prompt(ctx, lang)
-                conv_history = _get_conversation_history(app_id, db)
-
-                intake_qs_ws = ctx.get("intake_questions", [])
-                max_questions_ws = BASE_QUESTIONS + len(intake_qs_ws)
-                if recruiter_count >= max_questions_ws:
+                # Genereer Lisa's antwoord — context komt uit de cache; alleen
+                # bij een gewijzigde sollicitatie/CV/vacature is het een nieuw
+                # object en bouwen we de system prompt opnieuw
+                fresh = _get_application_context(app_id, db)
+                if fresh is not ctx:
+                    ctx = fresh
+                    system_prompt = _build_system_prompt(ctx, lang)
+                    max_questions = BASE_QUESTIONS + len(ctx.get("intake_questions", []))
+
+                prompt_history = conversation_memory.prompt_history(
+                    db, conversation_memory.CHAT, app_id, conv_history
+                )
+                if recruiter_count >= max_questions:
                     closing = (
                         f"Dit is je LAATSTE bericht. Bedank {ctx['candidate_name']} hartelijk voor de antwoorden. "
                         f"Zeg dat de werkgever zo snel mogelijk contact opneemt. Sluit vriendelijk af. "
                         f"BELANGRIJK: Stel ABSOLUUT GEEN nieuwe vragen meer. Eindig het gesprek definitief."
                     )
-                    conv_history.append({"role": "user", "content": closing})
+                    prompt_history.append({"role": "user", "content": closing})
                     ended = True
 
-                response_text = await asyncio.to_thread(_call_ai, system_prompt, conv_history)
-                recruiter_msg = _save_message(app_id, "recruiter", response_text, db)
+                response_text, connected = await _stream_reply(ws, system_prompt, prompt_history)
 
-                await manager.send(ws, {
-                    "id": recruiter_msg.id,
-                    "role": "recruiter",
-                    "content": response_text,
-                    "ended": ended,
-                })
+                # Pas na de stream: opslaan, slotbericht, evaluatie
+                recruiter_msg = _save_message(app_id, "recruiter", response_text, db)
+                conv_history.append({"role": "assistant", "content": response_text})
+                recruiter_count += 1
+                # Oudere berichten samenvatten gebeurt na het antwoord, buiten de beurt om
+                asyncio.create_task(asyncio.to_thread(conversation_memory.fold, conversation_memory.CHAT, app_id))
+                if connected:
+                    await manager.send(ws, {
+                        "id": recruiter_msg.id,
+                        "role": "recruiter",
+                        "content": response_text,
+                        "ended": ended,
+                    })
 
                 # Chat afgerond → evalueer kwaliteit en filter slechte kandidaten
                 if ended:
                     await asyncio.to_thread(_evaluate_and_filter, app_id, db)
+                if not connected:
+                    break
 
             except WebSocketDisconnect:
                 break
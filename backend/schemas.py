@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
 
 
@@ -237,10 +237,22 @@ class PublicVacancyDetail(PublicVacancyOut):
 
 class ApplyResponse(BaseModel):
     application_id: int
-    match_score: int
+    match_score: Optional[int] = None   # None = nog niet gescoord (volgt via de pipeline)
     explanation: str
     access_token: str
     token_type: str = "bearer"
+    # Verwerking loopt op de achtergrond — poll GET /candidate/applications/{id}/processing
+    processing_status: str = "queued"
+
+
+class ApplicationProcessingOut(BaseModel):
+    application_id: int
+    status: str                      # queued | running | done | failed
+    stages: Dict[str, bool] = {}
+    attempts: int = 0
+    last_error: Optional[str] = None
+    match_score: Optional[int] = None
+    explanation: Optional[str] = None
 
 
 # ----------------------------
@@ -1,8 +1,4 @@
-from openai import OpenAI
-from backend.config import OPENAI_API_KEY
-
-# Maak één OpenAI client aan
-client = OpenAI(api_key=OPENAI_API_KEY)
+from backend.services import llm
 
 
 def rewrite_cv(cv_text: str, target_role: str | None = None, language: str = "nl") -> str:
@@ -31,17 +27,15 @@ Gestructureerd CV:
 """
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4.1-mini",
-            messages=[
+        return llm.chat(
+            [
                 {"role": "system", "content": "Je bent een expert CV-schrijver en recruitment specialist."},
                 {"role": "user", "content": prompt},
             ],
             temperature=0.4,
+            feature="cv_rewrite",
         )
 
-        return response.choices[0].message.content.strip()
-
     except Exception as e:
         # Dit logt de fout in de Render-logs
         print("OpenAI fout in rewrite_cv:", repr(e))
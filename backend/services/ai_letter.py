@@ -1,9 +1,4 @@
-from openai import OpenAI
-from backend.config import OPENAI_API_KEY
-
-
-
-client = OpenAI(api_key=OPENAI_API_KEY)
+from backend.services import llm
 
 
 def generate_motivation_letter(
@@ -42,13 +37,11 @@ VACATURETEKST:
 Schrijf nu de volledige motivatiebrief:
 """
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
+    return llm.chat(
+        [
             {"role": "system", "content": "Je bent een expert in sollicitatiebrieven en recruitment."},
             {"role": "user", "content": prompt},
         ],
         temperature=0.5,
+        feature="motivation_letter",
     )
-
-    return response.choices[0].message.content.strip()
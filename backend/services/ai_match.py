@@ -1,13 +1,11 @@
-import json
+from __future__ import annotations
+
 from typing import List, Dict
 
 from sqlalchemy.orm import Session
-from openai import OpenAI
 
-from backend.config import OPENAI_API_KEY
 from backend import models
-
-client = OpenAI(api_key=OPENAI_API_KEY)
+from backend.services import ranking
 
 
 def rank_candidates_for_job(
@@ -20,8 +18,11 @@ def rank_candidates_for_job(
     - Leest vacaturetekst
     - Leest CV-teksten
     - Geeft per kandidaat een score (0–100) + korte uitleg terug
-    - Slaat match_score op in de database
+    - Slaat match_score op in de database (één commit)
     - Retourneert een gesorteerde lijst (beste eerst)
+
+    Het scoren zelf (lexicale pre-filter, chunks, parallelle LLM-calls,
+    retries en fallback) zit in backend/services/ranking.py.
     """
 
     if not candidates:
@@ -29,100 +30,28 @@ def rank_candidates_for_job(
 
     job_text = f"Titel: {job.title}\nLocatie: {job.location or 'Onbekend'}\n\nOmschrijving:\n{job.description}"
 
-    candidates_payload = []
-    for c in candidates:
-        name_or_email = c.full_name or c.email or f"Kandidaat {c.id}"
-        candidates_payload.append(
-            {
-                "id": c.id,
-                "name": name_or_email,
-                "cv_text": (c.cv_text or "")[:8000],  # safeguard
-            }
-        )
-
-    system_prompt = (
-        "Je bent een STRENGE, kritische recruitment consultant. "
-        "Je beoordeelt kandidaten objectief op basis van hun CV en de vacaturetekst.\n\n"
-        "SCORINGSRICHTLIJNEN (wees STRENG):\n"
-        "- 0-20: Totaal geen relevante ervaring of opleiding\n"
-        "- 21-40: Minimale overlap — enkele overdraagbare vaardigheden maar geen directe ervaring\n"
-        "- 41-55: Gedeeltelijke match — enige relevante ervaring maar mist belangrijke vereisten\n"
-        "- 56-70: Redelijke match — heeft relevante ervaring maar niet alles\n"
-        "- 71-85: Goede match — voldoet aan de meeste vereisten\n"
-        "- 86-100: Uitstekende match — sterke directe ervaring\n\n"
-        "BELANGRIJK: Beoordeel op HARDE vaardigheden en RELEVANTE werkervaring, niet op soft skills. "
-        "Een CV uit een andere branche zonder relevante skills = MAX 35. "
-        "Geef alleen 70+ bij aantoonbaar relevante werkervaring. "
-        "Geef een matchscore en korte Nederlandse uitleg per kandidaat."
-    )
-
-    user_prompt = {
-        "job": job_text,
-        "candidates": candidates_payload,
-        "instructions": (
-            "Geef je antwoord als geldig JSON-object met één key 'rankings', "
-            "die een array bevat van objecten met exact deze velden: "
-            "{'candidate_id': int, 'match_score': int, 'explanation': str}. "
-            "Gebruik Nederlandse uitleg. Sorteer in je JSON van beste naar minst goede kandidaat."
-        ),
-    }
-
-    response = client.chat.completions.create(
-        model="gpt-4.1-mini",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {
-                "role": "user",
-                "content": json.dumps(user_prompt, ensure_ascii=False),
-            },
+    ranked = ranking.rank(
+        job_text,
+        [
+            {"id": c.id, "name": c.full_name or c.email or f"Kandidaat {c.id}", "cv_text": c.cv_text or ""}
+            for c in candidates
         ],
-        temperature=0.3,
     )
 
-    content = response.choices[0].message.content
-
-    try:
-        data = json.loads(content)
-        rankings = data.get("rankings", [])
-    except json.JSONDecodeError:
-        # Als AI geen geldig JSON terugstuurt, doen we geen update
-        # maar geven we een lege lijst terug
-        return []
-
-    ranking_by_id = {}
-    for item in rankings:
-        cid = item.get("candidate_id")
-        score = item.get("match_score")
-        explanation = item.get("explanation", "")
-        if cid is None or score is None:
-            continue
-        ranking_by_id[int(cid)] = {
-            "match_score": int(score),
-            "explanation": explanation,
-        }
-
+    by_id = {c.id: c for c in candidates}
     result: List[Dict] = []
-
-    for c in candidates:
-        info = ranking_by_id.get(c.id)
-        if not info:
-            # AI heeft deze kandidaat niet gerankt, sla over
-            continue
-
-        c.match_score = info["match_score"]
-
+    for item in ranked:
+        c = by_id[item["id"]]
+        c.match_score = item["match_score"]
         result.append(
             {
                 "candidate_id": c.id,
                 "full_name": c.full_name,
                 "email": c.email,
-                "match_score": info["match_score"],
-                "explanation": info["explanation"],
+                "match_score": item["match_score"],
+                "explanation": item["explanation"],
             }
         )
 
     db.commit()
-
-    # Extra sortering, just in case
-    result.sort(key=lambda x: x["match_score"], reverse=True)
     return result
@@ -1,10 +1,7 @@
 import json
 from typing import Literal
 
-from openai import OpenAI
-from backend.config import OPENAI_API_KEY
-
-client = OpenAI(api_key=OPENAI_API_KEY)
+from backend.services import lexical_match, llm
 
 
 def score_job_match(
@@ -16,7 +13,13 @@ def score_job_match(
     Berekent met AI hoe goed een kandidaat past op een vacature.
     Gebruikt een score van 0–100 en geeft een korte uitleg terug.
     Dit wordt gebruikt door het endpoint /ai/match-job.
+
+    Eerst wordt lokaal een lexicale score berekend: bij een duidelijk
+    irrelevant profiel (of als de AI-call faalt) is dat het antwoord.
     """
+    lex = lexical_match.score(candidate_profile_text, job_description)
+    if lex.clearly_irrelevant or not llm.is_enabled():
+        return {"match_score": lex.score, "explanation": lex.explanation()}
 
     if language == "nl":
         system_prompt = (
@@ -58,30 +61,26 @@ def score_job_match(
         ),
     }
 
-    response = client.chat.completions.create(
-        model="gpt-4.1-mini",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {
-                "role": "user",
-                "content": json.dumps(user_payload, ensure_ascii=False),
-            },
-        ],
-        temperature=0.3,
-    )
-
-    content = response.choices[0].message.content
-
     try:
+        content = llm.chat(
+            [
+                {"role": "system", "content": system_prompt},
+                {
+                    "role": "user",
+                    "content": json.dumps(user_payload, ensure_ascii=False),
+                },
+            ],
+            temperature=0.3,
+            response_format={"type": "json_object"},
+            feature="apply_prescreen",
+        )
         data = json.loads(content)
         score = int(data.get("match_score", 0))
         explanation = data.get("explanation", "")
     except Exception:
-        # Fallback als AI geen netjes JSON terugstuurt
-        score = 0
-        explanation = (
-            "De AI kon geen geldige matchscore genereren op basis van de aangeleverde gegevens."
-        )
+        # Fallback als AI faalt of geen netjes JSON terugstuurt
+        score = lex.score
+        explanation = lex.explanation()
 
     # Zorg dat score tussen 0 en 100 zit
     score = max(0, min(100, score))
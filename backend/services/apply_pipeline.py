@@ -0,0 +1,539 @@
+"""
+Apply-pipeline — sollicitaties verwerken buiten het HTTP-request.
+
+Het request slaat alleen de sollicitatie, het CV (ruwe upload) en een
+ApplicationTask op en antwoordt direct. Deze module voert daarna de stappen uit:
+
+    apply:   extract → score → opening → notify_candidate → notify_employer → claim_mail
+    analyze: extract → analyze   (draait inline in /candidate/analyze: geen opening,
+                                  de chat genereert die zo nodig live)
+
+- Elke stap markeert zichzelf in een eigen *_at-kolom en wordt bij een retry
+  overgeslagen zodra hij klaar is (idempotent per stap; het AIResult wordt in
+  dezelfde commit als scored_at geschreven)
+- Een mislukte stap zet de taak terug in de wachtrij met exponentiële backoff
+  + jitter; na APPLY_MAX_ATTEMPTS pogingen → status 'failed'. Faalt de LLM bij
+  de laatste poging, dan wordt de lexicale score opgeslagen
+- Taken staan in de database (overleven een herstart). Een worker claimt een
+  taak met een lease (locked_until), zodat twee workers/processen nooit
+  dezelfde taak tegelijk uitvoeren; een verlopen lease wordt opnieuw opgepakt
+
+Starten gebeurt op twee manieren: direct na het request via BackgroundTasks
+(run_task) en via worker_loop() in de lifespan, die achtergebleven en
+uitgestelde taken oppakt.
+"""
+
+import asyncio
+import logging
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.services import cv_digest, embeddings, lexical_match, lisa_opening, llm, rescore
+from backend.services.email import (
+    send_application_confirmation,
+    send_claim_notification,
+    send_new_applicant_notification,
+)
+from backend.services.text_extract import extract_text
+
+logger = logging.getLogger(__name__)
+
+APPLY_MAX_ATTEMPTS = int(os.getenv("APPLY_MAX_ATTEMPTS", "5"))
+APPLY_POLL_SECONDS = float(os.getenv("APPLY_POLL_SECONDS", "5"))
+APPLY_LEASE_SECONDS = int(os.getenv("APPLY_LEASE_SECONDS", "300"))
+
+BATCH_SIZE = 10               # taken per worker-ronde
+RETRY_BASE_SECONDS = 15       # verdubbelt per poging
+RETRY_MAX_SECONDS = 3600
+MOTIVATION_PROMPT_CHARS = 1500  # motivatiebrief naast de CV-digest in de scoring-prompt
+
+# Stappen per soort taak: (naam, kolom die de stap als afgerond markeert)
+STAGES = {
+    "apply": (
+        ("extract", "extracted_at"),
+        ("score", "scored_at"),
+        ("opening", "opening_prepared_at"),
+        ("notify_candidate", "candidate_notified_at"),
+        ("notify_employer", "employer_notified_at"),
+        ("claim_mail", "claim_checked_at"),
+    ),
+    "analyze": (
+        ("extract", "extracted_at"),
+        ("analyze", "scored_at"),
+    ),
+}
+
+SCORING_PROMPT = (
+    "Je bent een STRENGE, kritische recruitment consultant. "
+    "Je beoordeelt hoe goed een kandidaat ECHT past bij een vacature.\n\n"
+    "SCORINGSRICHTLIJNEN (wees STRENG):\n"
+    "- 0-20: Totaal geen relevante ervaring of opleiding voor deze functie\n"
+    "- 21-40: Minimale overlap — enkele overdraagbare vaardigheden maar geen directe ervaring\n"
+    "- 41-55: Gedeeltelijke match — enige relevante ervaring maar mist belangrijke vereisten\n"
+    "- 56-70: Redelijke match — heeft relevante ervaring maar niet alles wat gevraagd wordt\n"
+    "- 71-85: Goede match — voldoet aan de meeste vereisten met relevante werkervaring\n"
+    "- 86-100: Uitstekende match — voldoet aan vrijwel alle vereisten, sterke directe ervaring\n\n"
+    "BELANGRIJK:\n"
+    "- Beoordeel op HARDE vaardigheden en RELEVANTE werkervaring, niet op soft skills\n"
+    "- Een CV uit een totaal andere branche zonder relevante skills = MAX 35\n"
+    "- Generieke CV-tekst zonder specifieke ervaring voor de functie = MAX 45\n"
+    "- Geef alleen 70+ als de kandidaat aantoonbaar relevante werkervaring heeft\n"
+    "- Wees eerlijk en realistisch — een te hoge score is misleidend voor de werkgever\n\n"
+    "Geef ALLEEN een JSON-object terug met keys "
+    "'match_score' (int) en 'explanation' (string)."
+)
+
+ANALYZE_PROMPT = """
+Je bent een STRENGE, kritische recruitment consultant.
+Analyseer de match tussen CV en vacature en geef strikt JSON terug.
+
+SCORINGSRICHTLIJNEN (wees STRENG):
+- 0-20: Totaal geen relevante ervaring of opleiding voor deze functie
+- 21-40: Minimale overlap — enkele overdraagbare vaardigheden maar geen directe ervaring
+- 41-55: Gedeeltelijke match — enige relevante ervaring maar mist belangrijke vereisten
+- 56-70: Redelijke match — heeft relevante ervaring maar niet alles wat gevraagd wordt
+- 71-85: Goede match — voldoet aan de meeste vereisten met relevante werkervaring
+- 86-100: Uitstekende match — voldoet aan vrijwel alle vereisten, sterke directe ervaring
+
+BELANGRIJK:
+- Beoordeel op HARDE vaardigheden en RELEVANTE werkervaring, niet op soft skills
+- Een CV uit een totaal andere branche zonder relevante skills = MAX 35
+- Generieke CV-tekst zonder specifieke ervaring voor de functie = MAX 45
+- Geef alleen 70+ als de kandidaat aantoonbaar relevante werkervaring heeft
+- Wees eerlijk en realistisch — een te hoge score is misleidend voor de werkgever
+
+CV (extracted):
+{cv_text}
+
+Vacature:
+Titel: {title}
+Locatie: {location}
+Uren: {hours}
+Salaris: {salary}
+Omschrijving:
+{description}
+
+JSON schema (strikt aanhouden):
+{{
+  "match_score": 0-100,
+  "summary": "korte samenvatting",
+  "strengths": "bulletpoints als tekst",
+  "gaps": "bulletpoints als tekst",
+  "suggested_questions": "3-7 intake vragen als tekst"
+}}
+""".strip()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# ── Wachtrij ──────────────────────────────────────────────────────────────────
+
+def enqueue(
+    db: Session,
+    application_id: int,
+    *,
+    kind: str = "apply",
+    cv_id: Optional[int] = None,
+    cv_data: Optional[bytes] = None,
+    motivation_letter: Optional[str] = None,
+) -> models.ApplicationTask:
+    """
+    Zet een sollicitatie in de wachtrij. De aanroeper commit (samen met de
+    sollicitatie zelf). Een afgeronde taak wordt voor 'analyze' opnieuw
+    klaargezet. Een lopende taak blijft ongewijzigd en wordt teruggegeven;
+    is die van een andere soort (task.kind), dan is de aanvraag níet
+    ingepland en moet de aanroeper dat melden (bijv. 409).
+    """
+    task = (
+        db.query(models.ApplicationTask)
+        .filter(models.ApplicationTask.application_id == application_id)
+        .first()
+    )
+    if task is None:
+        task = models.ApplicationTask(
+            application_id=application_id,
+            kind=kind,
+            status="queued",
+            cv_id=cv_id,
+            cv_data=cv_data,
+            motivation_letter=motivation_letter or None,
+            attempts=0,
+            next_attempt_at=_now(),
+        )
+        db.add(task)
+    elif task.status in ("done", "failed") and kind == "analyze":
+        task.kind = "analyze"
+        task.status = "queued"
+        task.cv_id = cv_id or task.cv_id
+        task.scored_at = None
+        task.attempts = 0
+        task.last_error = None
+        task.finished_at = None
+        task.next_attempt_at = _now()
+    return task
+
+
+def _claim(db: Session, task_id: Optional[int] = None, limit: int = 1) -> list:
+    """Claim openstaande taken met een lease. Geeft de geclaimde ids terug."""
+    T = models.ApplicationTask
+    now = _now()
+    free = or_(T.locked_until.is_(None), T.locked_until < now)
+    q = db.query(T.id).filter(T.status.in_(("queued", "running")), T.next_attempt_at <= now, free)
+    if task_id is not None:
+        q = q.filter(T.id == task_id)
+    candidates = [row.id for row in q.order_by(T.next_attempt_at.asc()).limit(limit).all()]
+
+    claimed = []
+    for tid in candidates:
+        # Voorwaardelijke update: bij twee gelijktijdige workers wint er één
+        updated = (
+            db.query(T)
+            .filter(T.id == tid, free)
+            .update(
+                {"status": "running", "locked_until": now + timedelta(seconds=APPLY_LEASE_SECONDS)},
+                synchronize_session=False,
+            )
+        )
+        if updated:
+            claimed.append(tid)
+    db.commit()
+    return claimed
+
+
+def _retry_delay(attempts: int) -> float:
+    return random.uniform(0.5, 1.0) * min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * (2 ** (attempts - 1)))
+
+
+# ── Stappen ───────────────────────────────────────────────────────────────────
+
+def _cv(db: Session, task: models.ApplicationTask, application: models.Application) -> Optional[models.CandidateCV]:
+    cv = None
+    if task.cv_id:
+        cv = db.query(models.CandidateCV).filter(models.CandidateCV.id == task.cv_id).first()
+    if cv is None:
+        cv = (
+            db.query(models.CandidateCV)
+            .filter(models.CandidateCV.candidate_id == application.candidate_id)
+            .order_by(models.CandidateCV.id.desc())
+            .first()
+        )
+    return cv
+
+
+def _latest_score(db: Session, application_id: int) -> int:
+    row = (
+        db.query(models.AIResult.match_score)
+        .filter(models.AIResult.application_id == application_id)
+        .order_by(models.AIResult.id.desc())
+        .first()
+    )
+    return (row.match_score or 0) if row else 0
+
+
+def _stage_extract(db: Session, task: models.ApplicationTask, application: models.Application, final: bool) -> None:
+    if not task.cv_data or not task.cv_id:
+        return
+    cv = db.query(models.CandidateCV).filter(models.CandidateCV.id == task.cv_id).first()
+    if cv is None:
+        task.cv_data = None
+        return
+    text = ""
+    try:
+        _, text = extract_text(task.cv_data, cv.source_filename or "cv", cv.source_content_type or "")
+    except Exception as exc:
+        # Onleesbaar bestand: opnieuw proberen helpt niet
+        logger.warning("[apply] Tekstextractie CV %d mislukt: %s", cv.id, exc)
+    cv.extracted_text = text or None
+    task.cv_data = None
+    task.extracted_at = _now()
+    db.commit()
+    if text:
+        embeddings.sync_cv(cv.id)
+        # Eenmalige CV-digest voor alle prompts; mislukt hij, dan maakt de volgende prompt hem alsnog
+        try:
+            cv_digest.ensure(db, cv)
+        except Exception as exc:
+            logger.warning("[apply] CV-digest %d mislukt: %s", cv.id, exc)
+            db.rollback()
+
+
+def score_with_llm(cv_text: str, job_text: str, with_motivation: bool = False, tenant=None) -> Tuple[int, str]:
+    """Strenge GPT-beoordeling van CV (+ motivatie) tegen de vacaturetekst. cv_text is bij voorkeur de CV-digest."""
+    label = "KANDIDAAT CV + MOTIVATIE" if with_motivation else "KANDIDAAT CV"
+    data = llm.chat_json(
+        [
+            {"role": "system", "content": SCORING_PROMPT},
+            {
+                "role": "user",
+                "content": f"{label}:\n{cv_text[:3500 if with_motivation else 3000]}\n\nVACATURE:\n{job_text[:2000]}",
+            },
+        ],
+        feature="apply_prescreen",
+        tenant=tenant,
+    )
+    return max(0, min(100, int(data.get("match_score", 0)))), (data.get("explanation") or "").strip()
+
+
+def _stage_score(db: Session, task: models.ApplicationTask, application: models.Application, final: bool) -> None:
+    vacancy = application.vacancy
+    job_text = (vacancy.extracted_text or vacancy.description or "").strip()
+    motivation = task.motivation_letter or ""
+    cv = _cv(db, task, application)
+    motivation_block = "\n\nMOTIVATIE:\n" + motivation if motivation else ""
+
+    # Lexicaal op de volledige tekst (lokaal), de LLM krijgt de compacte digest
+    combined = ((cv.extracted_text or "") if cv else "") + motivation_block
+    lex = lexical_match.score(combined, job_text)
+    match_score, explanation = lex.score, lex.explanation()
+    if llm.is_enabled() and combined.strip() and job_text and not lex.clearly_irrelevant:
+        try:
+            prompt_cv = cv_digest.for_prompt(cv, db) + motivation_block[:MOTIVATION_PROMPT_CHARS]
+            match_score, ai_explanation = score_with_llm(prompt_cv, job_text, bool(motivation), tenant=vacancy.employer_id)
+            explanation = ai_explanation or explanation
+        except Exception as exc:
+            if not final:
+                raise
+            # Laatste poging: lexicale score blijft staan
+            explanation = f"{lex.explanation()} (AI analyse mislukt: {exc})"
+
+    db.add(models.AIResult(
+        application_id=application.id,
+        match_score=match_score,
+        summary=explanation,
+        cv_hash=rescore.cv_hash(cv),
+        vacancy_hash=rescore.vacancy_hash(vacancy),
+    ))
+
+
+def _stage_analyze(db: Session, task: models.ApplicationTask, application: models.Application, final: bool) -> None:
+    vacancy = application.vacancy
+    cv = _cv(db, task, application)
+    cv_text = (cv.extracted_text or "") if cv else ""
+
+    data = None
+    if llm.is_enabled():
+        prompt = ANALYZE_PROMPT.format(
+            cv_text=cv_digest.for_prompt(cv, db),
+            title=vacancy.title,
+            location=vacancy.location or "",
+            hours=vacancy.hours_per_week or "",
+            salary=vacancy.salary_range or "",
+            description=vacancy.description or "",
+        )
+        try:
+            data = llm.chat_json(
+                [
+                    {"role": "system", "content": "Return ONLY valid JSON. No markdown."},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=0.2,
+                feature="cv_analysis",
+                tenant=vacancy.employer_id,
+            )
+        except Exception:
+            if not final:
+                raise
+
+    if data is None:
+        # Geen AI (of laatste poging mislukt): lexicale analyse
+        lex = lexical_match.score(cv_text, (vacancy.extracted_text or vacancy.description or ""))
+        db.add(models.AIResult(
+            application_id=application.id,
+            match_score=lex.score,
+            summary=lex.explanation(),
+            cv_hash=rescore.cv_hash(cv),
+            vacancy_hash=rescore.vacancy_hash(vacancy),
+        ))
+        return
+
+    score = data.get("match_score")
+    db.add(models.AIResult(
+        application_id=application.id,
+        match_score=max(0, min(100, int(score))) if score is not None else None,
+        summary=data.get("summary"),
+        strengths=data.get("strengths"),
+        gaps=data.get("gaps"),
+        suggested_questions=data.get("suggested_questions"),
+        cv_hash=rescore.cv_hash(cv),
+        vacancy_hash=rescore.vacancy_hash(vacancy),
+    ))
+
+
+def _stage_opening(db: Session, task: models.ApplicationTask, application: models.Application, final: bool) -> None:
+    """Lisa's openingen vooraf genereren, vóór de bevestigingsmail (kandidaat gaat daarna vaak meteen chatten)."""
+    try:
+        lisa_opening.prepare(db, task, application)
+    except Exception as exc:
+        # Geen retry: zonder opening genereert de chat hem live bij de eerste verbinding
+        db.rollback()
+        logger.warning("[apply] Opening voor sollicitatie %d mislukt: %s", application.id, exc)
+
+
+def _stage_notify_candidate(db: Session, task: models.ApplicationTask, application: models.Application, final: bool) -> None:
+    candidate = application.candidate
+    send_application_confirmation(
+        candidate_email=candidate.email,
+        candidate_name=candidate.full_name or candidate.email,
+        vacancy_title=application.vacancy.title,
+        match_score=_latest_score(db, application.id),
+    )
+
+
+def _stage_notify_employer(db: Session, task: models.ApplicationTask, application: models.Application, final: bool) -> None:
+    employer = db.query(models.User).filter(models.User.id == application.vacancy.employer_id).first()
+    if not employer:
+        return
+    candidate = application.candidate
+    send_new_applicant_notification(
+        employer_email=employer.email,
+        candidate_name=candidate.full_name or candidate.email,
+        candidate_email=candidate.email,
+        vacancy_title=application.vacancy.title,
+        match_score=_latest_score(db, application.id),
+    )
+
+
+def _stage_claim_mail(db: Session, task: models.ApplicationTask, application: models.Application, final: bool) -> None:
+    """Stuur eenmalig een claim-mail als deze vacature gescraped is en nog niet geclaimd."""
+    sv = (
+        db.query(models.ScrapedVacancy)
+        .filter(
+            models.ScrapedVacancy.vacancy_id == application.vacancy_id,
+            models.ScrapedVacancy.claim_notified == False,  # noqa: E712
+        )
+        .first()
+    )
+    if not sv:
+        return
+    frontend_url = os.getenv("FRONTEND_URL", "https://www.vorzaiq.com")
+    send_claim_notification(
+        employer_email=sv.contact_email,
+        vacancy_title=application.vacancy.title,
+        company_name=sv.company_name or "",
+        claim_url=f"{frontend_url}/claim/{sv.claim_token}",
+    )
+    sv.claim_notified = True
+
+
+_STAGE_FUNCS = {
+    "extract": _stage_extract,
+    "score": _stage_score,
+    "analyze": _stage_analyze,
+    "opening": _stage_opening,
+    "notify_candidate": _stage_notify_candidate,
+    "notify_employer": _stage_notify_employer,
+    "claim_mail": _stage_claim_mail,
+}
+
+
+# ── Uitvoeren ─────────────────────────────────────────────────────────────────
+
+def _process(db: Session, task_id: int) -> None:
+    task = db.query(models.ApplicationTask).filter(models.ApplicationTask.id == task_id).first()
+    if task is None:
+        return  # sollicitatie (en taak) inmiddels verwijderd
+    application = db.query(models.Application).filter(models.Application.id == task.application_id).first()
+    if application is None:
+        task.status = "failed"
+        task.last_error = "application not found"
+        task.locked_until = None
+        task.finished_at = _now()
+        db.commit()
+        return
+    final = task.attempts + 1 >= APPLY_MAX_ATTEMPTS
+
+    for name, column in STAGES.get(task.kind, ()):
+        if getattr(task, column) is not None:
+            continue
+        try:
+            _STAGE_FUNCS[name](db, task, application, final)
+            setattr(task, column, _now())
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            task.attempts = (task.attempts or 0) + 1
+            task.last_error = f"{name}: {exc}"[:2000]
+            task.locked_until = None
+            if task.attempts >= APPLY_MAX_ATTEMPTS:
+                task.status = "failed"
+                task.finished_at = _now()
+                logger.error("[apply] Taak %d (sollicitatie %d) definitief mislukt in '%s': %s",
+                             task.id, task.application_id, name, exc)
+            else:
+                task.status = "queued"
+                task.next_attempt_at = _now() + timedelta(seconds=_retry_delay(task.attempts))
+                logger.warning("[apply] Taak %d stap '%s' mislukt (poging %d): %s",
+                               task.id, name, task.attempts, exc)
+            db.commit()
+            return
+
+    task.status = "done"
+    task.locked_until = None
+    task.finished_at = _now()
+    db.commit()
+
+
+def run_task(task_id: int) -> None:
+    """Verwerk één taak direct (BackgroundTask na het request). Eigen DB-sessie."""
+    from backend.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if _claim(db, task_id=task_id):
+            _process(db, task_id)
+    except Exception as exc:
+        logger.error("[apply] Taak %d mislukt: %s", task_id, exc, exc_info=True)
+        db.rollback()
+    finally:
+        db.close()
+
+
+def process_due(limit: int = BATCH_SIZE) -> int:
+    """Verwerk openstaande taken (nieuw, uitgesteld of met verlopen lease)."""
+    from backend.db import SessionLocal
+
+    db = SessionLocal()
+    done = 0
+    try:
+        for task_id in _claim(db, limit=limit):
+            try:
+                _process(db, task_id)
+            except Exception as exc:
+                logger.error("[apply] Taak %d mislukt: %s", task_id, exc, exc_info=True)
+                db.rollback()
+            done += 1
+    finally:
+        db.close()
+    return done
+
+
+async def worker_loop() -> None:
+    """Achtergrondtaak (lifespan) die de wachtrij leegt."""
+    while True:
+        try:
+            busy = await asyncio.to_thread(process_due)
+        except Exception as exc:
+            logger.error("[apply] Worker-ronde mislukt: %s", exc)
+            busy = 0
+        await asyncio.sleep(0.1 if busy else APPLY_POLL_SECONDS)
+
+
+def status_of(task: Optional[models.ApplicationTask]) -> dict:
+    """Voortgang voor het poll-endpoint."""
+    if task is None:
+        # Sollicitaties van vóór de pipeline
+        return {"status": "done", "stages": {}, "attempts": 0, "last_error": None}
+    return {
+        "status": task.status,
+        "stages": {name: getattr(task, column) is not None for name, column in STAGES.get(task.kind, ())},
+        "attempts": task.attempts or 0,
+        "last_error": task.last_error if task.status == "failed" else None,
+    }
@@ -0,0 +1,228 @@
+"""
+Bulk publish pipeline voor gescrapede vacatures.
+
+Flow (draait als BackgroundTask, eigen DB-sessie):
+1. Selecteer pending ScrapedVacancies (op ids of filter)
+2. Verrijk beschrijvingen met AI — parallel met begrensde concurrency;
+   korte vacatures worden per BATCH_MAX_ITEMS in één prompt gebundeld
+3. Schrijf Vacancy-rijen in blokken van CHUNK_SIZE (één flush + commit per blok)
+   en zet de bijbehorende ScrapedVacancy op 'published'
+4. Voeg alle gepubliceerde vacatures in één batch toe aan de embedding-index
+5. Voortgang staat in-memory in `jobs` (zie GET /admin/scraped-vacancies/bulk-publish/{job_id})
+"""
+
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.services import embeddings
+from backend.services.vacancy_enricher import (
+    BATCH_MAX_ITEMS,
+    BATCH_SHORT_CHARS,
+    ai_enrich_batch,
+    ai_enrich_description,
+    enrich_for_publish,
+)
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_EMAIL = "system@itspeanuts.ai"
+
+ENRICH_CONCURRENCY = int(os.getenv("BULK_ENRICH_CONCURRENCY", "4"))
+CHUNK_SIZE = 50
+PUBLISHABLE_STATUSES = ("pending", "flagged")
+
+# job_id → voortgang. Reset bij herstart (net als state.maintenance).
+jobs: Dict[str, dict] = {}
+_jobs_lock = threading.Lock()
+
+
+def _update(job_id: str, **fields) -> None:
+    with _jobs_lock:
+        jobs[job_id].update(fields)
+
+
+def _incr(job_id: str, key: str, n: int = 1) -> None:
+    with _jobs_lock:
+        jobs[job_id][key] += n
+
+
+def create_job(total: int) -> str:
+    job_id = uuid.uuid4().hex[:12]
+    with _jobs_lock:
+        jobs[job_id] = {
+            "job_id": job_id,
+            "status": "queued",   # queued | enriching | publishing | done | failed
+            "total": total,
+            "enriched": 0,
+            "published": 0,
+            "failed": 0,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "finished_at": None,
+            "error": None,
+        }
+    return job_id
+
+
+def select_pending(
+    db: Session,
+    ids: Optional[List[int]] = None,
+    source_name: Optional[str] = None,
+    limit: int = 200,
+) -> List[int]:
+    """
+    Ids van publiceerbare ScrapedVacancies (pending + e-mailadres).
+    Bij een expliciete id-lijst tellen ook 'flagged' items mee (admin heeft ze bekeken).
+    """
+    statuses = PUBLISHABLE_STATUSES if ids else ("pending",)
+    q = db.query(models.ScrapedVacancy.id).filter(
+        models.ScrapedVacancy.status.in_(statuses),
+        models.ScrapedVacancy.contact_email.isnot(None),
+        models.ScrapedVacancy.contact_email != "",
+    )
+    if ids:
+        q = q.filter(models.ScrapedVacancy.id.in_(ids))
+    if source_name:
+        q = q.filter(models.ScrapedVacancy.source_name == source_name)
+    return [row.id for row in q.order_by(models.ScrapedVacancy.scraped_at.desc()).limit(limit).all()]
+
+
+def _enrich_all(job_id: str, items: List[dict]) -> Dict[int, str]:
+    """AI-beschrijvingen voor alle items: korte in gebundelde prompts, lange los."""
+    short = [it for it in items if len((it["description"] or "").strip()) <= BATCH_SHORT_CHARS]
+    long_ = [it for it in items if len((it["description"] or "").strip()) > BATCH_SHORT_CHARS]
+    batches = [short[i:i + BATCH_MAX_ITEMS] for i in range(0, len(short), BATCH_MAX_ITEMS)]
+
+    descriptions: Dict[int, str] = {}
+
+    def _single(it: dict) -> Dict[int, str]:
+        return {it["id"]: ai_enrich_description(it["title"], it["description"], it["company_name"])}
+
+    def _batch(batch: List[dict]) -> Dict[int, str]:
+        out = ai_enrich_batch(batch)
+        # Items die in de gebundelde response ontbreken alsnog los verrijken
+        for it in batch:
+            if it["id"] not in out:
+                out.update(_single(it))
+        return out
+
+    with ThreadPoolExecutor(max_workers=ENRICH_CONCURRENCY) as executor:
+        futures = [executor.submit(_batch, b) for b in batches]
+        futures += [executor.submit(_single, it) for it in long_]
+        for fut in as_completed(futures):
+            try:
+                part = fut.result()
+            except Exception as exc:
+                logger.warning("[bulk-publish] Verrijking mislukt: %s", exc)
+                continue
+            descriptions.update(part)
+            _incr(job_id, "enriched", len(part))
+    return descriptions
+
+
+def run_bulk_publish(job_id: str, sv_ids: List[int], use_ai: bool = True) -> None:
+    """Voer een bulk-publish job uit. Wordt aangeroepen als BackgroundTask."""
+    from backend.db import SessionLocal
+
+    db: Session = SessionLocal()
+    try:
+        system_employer = db.query(models.User).filter(models.User.email == SYSTEM_EMAIL).first()
+        if not system_employer:
+            _update(job_id, status="failed", error="Systeem-werkgever niet gevonden",
+                    finished_at=datetime.now(timezone.utc).isoformat())
+            return
+
+        items = [
+            {
+                "id": sv.id,
+                "title": sv.title,
+                "description": sv.description or "",
+                "company_name": sv.company_name or "",
+                "location": sv.location or "",
+            }
+            for sv in db.query(models.ScrapedVacancy).filter(models.ScrapedVacancy.id.in_(sv_ids)).all()
+        ]
+
+        descriptions: Dict[int, str] = {}
+        if use_ai:
+            _update(job_id, status="enriching")
+            descriptions = _enrich_all(job_id, items)
+
+        _update(job_id, status="publishing")
+        vacancy_ids: List[int] = []
+        for i in range(0, len(items), CHUNK_SIZE):
+            chunk = items[i:i + CHUNK_SIZE]
+            try:
+                published = _publish_chunk(db, system_employer.id, chunk, descriptions)
+                db.commit()
+                vacancy_ids.extend(published)
+                _incr(job_id, "published", len(published))
+                _incr(job_id, "failed", len(chunk) - len(published))
+            except Exception as exc:
+                logger.error("[bulk-publish] Blok %d mislukt: %s", i // CHUNK_SIZE, exc, exc_info=True)
+                db.rollback()
+                _incr(job_id, "failed", len(chunk))
+
+        embeddings.sync_vacancies(vacancy_ids)
+        _update(job_id, status="done", finished_at=datetime.now(timezone.utc).isoformat())
+        logger.info("[bulk-publish] Job %s klaar: %s", job_id, jobs[job_id])
+    except Exception as exc:
+        logger.error("[bulk-publish] Job %s mislukt: %s", job_id, exc, exc_info=True)
+        db.rollback()
+        _update(job_id, status="failed", error=str(exc),
+                finished_at=datetime.now(timezone.utc).isoformat())
+    finally:
+        db.close()
+
+
+def _publish_chunk(db: Session, employer_id: int, chunk: List[dict], descriptions: Dict[int, str]) -> List[int]:
+    """Maak Vacancy-rijen voor één blok aan en koppel ze. Geeft de ids van de gepubliceerde vacatures terug."""
+    # Opnieuw laden en op status filteren: een parallelle (enkele) publish kan ons voor zijn
+    svs = {
+        sv.id: sv
+        for sv in db.query(models.ScrapedVacancy)
+        .filter(
+            models.ScrapedVacancy.id.in_([it["id"] for it in chunk]),
+            models.ScrapedVacancy.status.in_(PUBLISHABLE_STATUSES),
+        )
+        .all()
+    }
+
+    pairs = []
+    for it in chunk:
+        sv = svs.get(it["id"])
+        if sv is None:
+            continue
+        enriched = enrich_for_publish(
+            title=it["title"],
+            description=it["description"],
+            company_name=it["company_name"],
+            location=it["location"],
+            use_ai=False,  # AI-tekst is hierboven al parallel gemaakt
+        )
+        if it["id"] in descriptions:
+            enriched["description"] = descriptions[it["id"]]
+        vacancy = models.Vacancy(
+            employer_id=employer_id,
+            title=it["title"],
+            source_type="scraped",
+            **enriched,
+        )
+        pairs.append((sv, vacancy))
+
+    db.add_all([v for _, v in pairs])
+    db.flush()  # één INSERT-batch; vult vacancy.id
+
+    now = datetime.now(timezone.utc)
+    for sv, vacancy in pairs:
+        sv.vacancy_id = vacancy.id
+        sv.status = "published"
+        sv.published_at = now
+    return [vacancy.id for _, vacancy in pairs]
@@ -0,0 +1,172 @@
+"""
+Gecachete sollicitatie-context voor Lisa (WebSocket chat, HTTP chat en het
+virtuele interview).
+
+Voorheen werd de context (sollicitatie, kandidaat, vacature, AIResult, CV,
+werkgever, intakevragen — ~7 queries) bij elke chatbeurt opnieuw geladen.
+Nu staat hij per sollicitatie in een in-memory LRU en wordt hij alleen
+opnieuw geladen als:
+
+- een van de onderliggende rijen in dit proces verandert — een SQLAlchemy
+  after_flush-hook ziet inserts/updates/deletes van Application, AIResult,
+  CandidateCV, Vacancy, IntakeQuestion en User en gooit de betreffende
+  entries weg
+- de entry ouder is dan CHAT_CONTEXT_TTL (vangnet voor wijzigingen vanuit
+  een ander proces/worker)
+
+get() geeft steeds hetzelfde dict-object terug zolang de entry geldig is;
+aanroepers behandelen het als read-only (en kunnen op identiteit cachen,
+zoals ws_chat met de system prompt doet).
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.services import cv_digest
+
+logger = logging.getLogger(__name__)
+
+CHAT_CONTEXT_TTL = int(os.getenv("CHAT_CONTEXT_TTL", "300"))
+CHAT_CONTEXT_MAX = 1000
+CV_PROMPT_CHARS = 800
+
+_cache: "OrderedDict[int, Tuple[float, dict]]" = OrderedDict()  # app_id → (geladen_op, ctx)
+_lock = threading.Lock()
+
+
+def load(app_id: int, db: Session) -> Optional[dict]:
+    """Laad de volledige context uit de database (None als de sollicitatie niet bestaat)."""
+    app = db.query(models.Application).filter(models.Application.id == app_id).first()
+    if not app:
+        return None
+
+    candidate = db.query(models.User).filter(models.User.id == app.candidate_id).first()
+    vacancy = db.query(models.Vacancy).filter(models.Vacancy.id == app.vacancy_id).first()
+    ai_result = (
+        db.query(models.AIResult)
+        .filter(models.AIResult.application_id == app_id)
+        .order_by(models.AIResult.id.desc())
+        .first()
+    )
+    cv = (
+        db.query(models.CandidateCV)
+        .filter(models.CandidateCV.candidate_id == app.candidate_id)
+        .order_by(models.CandidateCV.id.desc())
+        .first()
+    )
+    employer = (
+        db.query(models.User).filter(models.User.id == vacancy.employer_id).first()
+        if vacancy else None
+    )
+
+    # Intake vragen die de werkgever heeft ingesteld
+    intake_questions = []
+    if vacancy:
+        intake_questions = [
+            q.question
+            for q in db.query(models.IntakeQuestion).filter(models.IntakeQuestion.vacancy_id == vacancy.id).all()
+        ]
+
+    return {
+        "app_id": app.id,
+        "candidate_id": app.candidate_id,
+        "vacancy_id": app.vacancy_id,
+        "employer_id": vacancy.employer_id if vacancy else None,
+        "candidate_name": candidate.full_name if candidate else "Kandidaat",
+        "candidate_email": candidate.email if candidate else "",
+        "vacancy_title": vacancy.title if vacancy else "Vacature",
+        "vacancy_description": (vacancy.description or "") if vacancy else "",
+        "employer_name": employer.full_name if employer else "VorzaIQ",
+        "match_score": ai_result.match_score if ai_result else None,
+        "gaps": ai_result.gaps if ai_result else "",
+        "strengths": ai_result.strengths if ai_result else "",
+        "suggested_questions": ai_result.suggested_questions if ai_result else "",
+        # CV-digest (zie cv_digest) — geen LLM-call hier, ontbreekt hij nog dan de ingekorte tekst
+        "cv_text": cv_digest.for_prompt(cv, max_chars=CV_PROMPT_CHARS),
+        "cv_summary": cv_digest.summary(cv),
+        "intake_questions": intake_questions,
+    }
+
+
+def get(app_id: int, db: Session) -> Optional[dict]:
+    """Context uit de cache, of geladen (en gecachet) als hij ontbreekt of verlopen is."""
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(app_id)
+        if entry is not None and now - entry[0] <= CHAT_CONTEXT_TTL:
+            _cache.move_to_end(app_id)
+            return entry[1]
+
+    ctx = load(app_id, db)
+    if ctx is None:
+        return None
+    with _lock:
+        _cache[app_id] = (now, ctx)
+        _cache.move_to_end(app_id)
+        while len(_cache) > CHAT_CONTEXT_MAX:
+            _cache.popitem(last=False)
+    return ctx
+
+
+def invalidate(
+    app_id: Optional[int] = None,
+    *,
+    candidate_id: Optional[int] = None,
+    vacancy_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+) -> None:
+    """Gooi entries weg die (via sollicitatie, kandidaat, vacature of werkgever) geraakt zijn."""
+    with _lock:
+        stale = [
+            key
+            for key, (_, ctx) in _cache.items()
+            if key == app_id
+            or (candidate_id is not None and ctx["candidate_id"] == candidate_id)
+            or (vacancy_id is not None and ctx["vacancy_id"] == vacancy_id)
+            or (user_id is not None and user_id in (ctx["candidate_id"], ctx["employer_id"]))
+        ]
+        for key in stale:
+            del _cache[key]
+
+
+def clear() -> None:
+    with _lock:
+        _cache.clear()
+
+
+# ── Automatische invalidatie ──────────────────────────────────────────────────
+
+def _invalidate_for(obj) -> None:
+    if isinstance(obj, models.Application):
+        invalidate(obj.id)
+    elif isinstance(obj, models.AIResult):
+        invalidate(obj.application_id)
+    elif isinstance(obj, models.CandidateCV):
+        invalidate(candidate_id=obj.candidate_id)
+    elif isinstance(obj, models.Vacancy):
+        invalidate(vacancy_id=obj.id)
+    elif isinstance(obj, models.IntakeQuestion):
+        invalidate(vacancy_id=obj.vacancy_id)
+    elif isinstance(obj, models.User):
+        invalidate(user_id=obj.id)
+
+
+@event.listens_for(Session, "after_flush")
+def _on_flush(session: Session, flush_context) -> None:
+    if not _cache:
+        return
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        try:
+            _invalidate_for(obj)
+        except Exception as exc:  # nooit een flush laten mislukken door de cache
+            logger.debug("[chat-context] Invalidatie mislukt: %s", exc)
+            clear()
+            return
@@ -0,0 +1,200 @@
+"""
+Begrensde gespreksgeschiedenis met een doorlopende samenvatting.
+
+Elke chatbeurt (recruiter_chat, ws_chat) en elk interviewantwoord
+(virtual_interview) stuurde de volledige geschiedenis mee, naast een system
+prompt met CV en vacature — prompt en latency groeiden met elke vraag. Nu:
+
+- de laatste HISTORY_KEEP_MESSAGES berichten gaan letterlijk mee
+- oudere berichten staan samengevat in conversation_summaries en gaan als
+  extra system-bericht vóór de letterlijke berichten mee
+- de samenvatting wordt incrementeel bijgewerkt (vorige samenvatting + de
+  nieuw af te sluiten berichten) in een achtergrondtaak ná het antwoord, en
+  alleen als er HISTORY_FOLD_BATCH berichten bij zijn of het letterlijke deel
+  boven HISTORY_TOKEN_BUDGET komt — de beurt zelf wacht er nooit op
+- loopt de samenvatting achter of mislukt hij, dan vallen de oudste
+  letterlijke berichten uit de prompt zodra die boven het budget komt
+
+De prompt per beurt is zo begrensd op system prompt + samenvatting
+(≤ HISTORY_SUMMARY_MAX_TOKENS) + HISTORY_TOKEN_BUDGET, hoe lang het gesprek ook duurt.
+
+Gebruik:
+    history = conversation_memory.prompt_history(db, conversation_memory.CHAT, app_id, full_history)
+    ...antwoord genereren en opslaan...
+    background_tasks.add_task(conversation_memory.fold, conversation_memory.CHAT, app_id)
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, List, Set, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.services import llm
+
+logger = logging.getLogger(__name__)
+
+HISTORY_COMPACTION_ENABLED = os.getenv("HISTORY_COMPACTION_ENABLED", "true").lower() not in ("0", "false", "no")
+HISTORY_KEEP_MESSAGES = int(os.getenv("HISTORY_KEEP_MESSAGES", "8"))
+HISTORY_FOLD_BATCH = int(os.getenv("HISTORY_FOLD_BATCH", "6"))
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "1500"))
+HISTORY_SUMMARY_MAX_TOKENS = int(os.getenv("HISTORY_SUMMARY_MAX_TOKENS", "300"))
+
+CHAT = "chat"            # ref_id = application_id
+INTERVIEW = "interview"  # ref_id = virtual_interview_sessions.id
+
+SUMMARY_PROMPT = (
+    "Je vat een lopend sollicitatiegesprek samen voor de recruiter (Lisa) die het gesprek voortzet. "
+    "Werk de bestaande samenvatting bij met de nieuwe berichten. Bewaar feiten: wat de kandidaat "
+    "antwoordde (ervaring, beschikbaarheid, salaris, motivatie, antwoorden op intakevragen), welke "
+    "vragen Lisa al stelde en gemaakte afspraken. Geen oordeel, niets verzinnen. Kort en zakelijk, "
+    "maximaal 150 woorden, in de taal van het gesprek."
+)
+
+_running: Set[Tuple[str, int]] = set()
+_lock = threading.Lock()
+
+
+def _tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(len(m.get("content") or "") for m in messages) // 4
+
+
+def _state(db: Session, kind: str, ref_id: int) -> Tuple[str, int]:
+    row = (
+        db.query(models.ConversationSummary.summary, models.ConversationSummary.covered)
+        .filter(models.ConversationSummary.kind == kind, models.ConversationSummary.ref_id == ref_id)
+        .first()
+    )
+    return (row.summary, row.covered) if row else ("", 0)
+
+
+def compact(history: List[Dict[str, str]], summary: str, covered: int) -> List[Dict[str, str]]:
+    """Prompt-geschiedenis: samenvatting (indien aanwezig) + de nog niet samengevatte berichten binnen het budget."""
+    recent = history[min(covered, len(history)):] if summary else list(history)
+    # Harde grens als de samenvatting achterloopt; de laatste twee berichten blijven altijd staan
+    while len(recent) > 2 and _tokens(recent) > HISTORY_TOKEN_BUDGET:
+        recent = recent[1:]
+    if not summary:
+        return recent
+    return [{"role": "system", "content": f"Samenvatting van het eerdere gesprek:\n{summary}"}] + recent
+
+
+def prompt_history(db: Session, kind: str, ref_id: int, history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Compacte versie van de volledige geschiedenis [{role, content}] voor de prompt.
+    Leest alleen de samenvatting; er wordt hier nooit een LLM-call gedaan.
+    """
+    if not HISTORY_COMPACTION_ENABLED:
+        return list(history)
+    if len(history) <= HISTORY_KEEP_MESSAGES:
+        return compact(history, "", 0)
+    summary, covered = _state(db, kind, ref_id)
+    return compact(history, summary, covered)
+
+
+def fold_due(history: List[Dict[str, str]], covered: int) -> bool:
+    """Moet de samenvatting bijgewerkt worden? Alles behalve de laatste HISTORY_KEEP_MESSAGES komt erin."""
+    cut = len(history) - HISTORY_KEEP_MESSAGES
+    if cut <= covered:
+        return False
+    return cut - covered >= HISTORY_FOLD_BATCH or _tokens(history[covered:]) > HISTORY_TOKEN_BUDGET
+
+
+# ── Bijwerken (achtergrond) ───────────────────────────────────────────────────
+
+def _load_history(db: Session, kind: str, ref_id: int) -> List[Dict[str, str]]:
+    if kind == CHAT:
+        rows = (
+            db.query(models.RecruiterChatMessage.role, models.RecruiterChatMessage.content)
+            .filter(models.RecruiterChatMessage.application_id == ref_id)
+            .order_by(models.RecruiterChatMessage.created_at.asc(), models.RecruiterChatMessage.id.asc())
+            .all()
+        )
+        return [{"role": "assistant" if r.role == "recruiter" else "user", "content": r.content} for r in rows]
+    rows = (
+        db.query(models.InterviewTurn.role, models.InterviewTurn.content)
+        .filter(models.InterviewTurn.session_id == ref_id)
+        .order_by(models.InterviewTurn.seq.asc())
+        .all()
+    )
+    return [
+        {"role": "assistant" if models.InterviewTurn.ROLES[r.role] == "recruiter" else "user", "content": r.content}
+        for r in rows
+    ]
+
+
+def _summarize(summary: str, messages: List[Dict[str, str]]) -> str:
+    convo = "\n".join(
+        f"{'Lisa' if m['role'] == 'assistant' else 'Kandidaat'}: {m['content']}" for m in messages
+    )
+    text = llm.chat(
+        [
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {
+                "role": "user",
+                "content": f"Bestaande samenvatting:\n{summary or '(nog geen)'}\n\nNieuwe berichten:\n{convo}",
+            },
+        ],
+        max_tokens=HISTORY_SUMMARY_MAX_TOKENS,
+        temperature=0.2,
+        cache=False,
+        feature="conversation_summary",
+    )
+    return (text or "").strip()
+
+
+def fold(kind: str, ref_id: int) -> bool:
+    """
+    Werk de samenvatting bij als dat nodig is (achtergrondtaak, eigen DB-sessie).
+    Geeft True als er een nieuwe samenvatting is opgeslagen. Fouten worden
+    gelogd; de volgende beurt probeert het opnieuw.
+    """
+    from backend.db import SessionLocal
+
+    if not HISTORY_COMPACTION_ENABLED or not llm.is_enabled():
+        return False
+    key = (kind, ref_id)
+    with _lock:
+        if key in _running:
+            return False
+        _running.add(key)
+
+    db = SessionLocal()
+    try:
+        history = _load_history(db, kind, ref_id)
+        row = (
+            db.query(models.ConversationSummary)
+            .filter(models.ConversationSummary.kind == kind, models.ConversationSummary.ref_id == ref_id)
+            .first()
+        )
+        summary, covered = (row.summary, row.covered) if row else ("", 0)
+        covered = min(covered, len(history))
+        if not fold_due(history, covered):
+            return False
+        cut = len(history) - HISTORY_KEEP_MESSAGES
+        new_summary = _summarize(summary, history[covered:cut])
+        if not new_summary:
+            return False
+        if row is None:
+            row = models.ConversationSummary(kind=kind, ref_id=ref_id)
+            db.add(row)
+        row.summary = new_summary
+        row.covered = cut
+        db.commit()
+        return True
+    except IntegrityError:
+        # Ander proces maakte tegelijk de eerste samenvatting
+        db.rollback()
+        return False
+    except Exception as exc:
+        logger.warning("[history] Samenvatten %s %d mislukt: %s", kind, ref_id, exc)
+        db.rollback()
+        return False
+    finally:
+        db.close()
+        with _lock:
+            _running.discard(key)
+
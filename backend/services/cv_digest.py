@@ -0,0 +1,247 @@
+"""
+CV-digest: één keer per CV een gestructureerde, compacte samenvatting.
+
+Elke AI-route sneed de ruwe CandidateCV.extracted_text anders af ([:3000]
+bij solliciteren, [:1500] bij aanbevelingen, [:800] in Lisa's chat, [:300]
+in het interview, alles bij analyseren) en stuurde dezelfde CV-tekst steeds
+opnieuw mee. Nu wordt per CV één keer (na upload/extractie) een digest
+gemaakt en op de CV-rij opgeslagen:
+
+    {"summary": str, "skills": [...], "roles": [{"title", "employer", "years"}],
+     "years_experience": float | None, "education": [...], "languages": [...],
+     "source": "ai" | "local", "version": int}
+
+Prompt-builders gebruiken for_prompt(cv) (± CV_DIGEST_TOKENS tokens) of
+summary(cv) in plaats van een eigen slice. De digest hoort bij een
+specifieke tekst (digest_hash = sha256 van extracted_text): na handmatig
+bewerken van het CV is hij verouderd en wordt hij opnieuw gemaakt.
+
+Zonder OPENAI_API_KEY (of als de LLM faalt) is er een lokale digest: de
+ingekorte CV-tekst. Die wordt vervangen zodra de LLM weer beschikbaar is
+(hooguit eens per LOCAL_RETRY_SECONDS opnieuw geprobeerd).
+
+Bewust NIET via de digest: lexicale scoring en embeddings (lokaal/goedkoop,
+werken beter op de volledige tekst) en CV herschrijven (heeft alles nodig).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.services import llm
+
+logger = logging.getLogger(__name__)
+
+CV_DIGEST_TOKENS = int(os.getenv("CV_DIGEST_TOKENS", "300"))   # budget van for_prompt()
+CV_DIGEST_INPUT_CHARS = int(os.getenv("CV_DIGEST_INPUT_CHARS", "15000"))
+
+DIGEST_VERSION = 1
+CHARS_PER_TOKEN = 4
+SUMMARY_CHARS = 300
+LOCAL_RETRY_SECONDS = 3600  # lokale digest hooguit zo vaak opnieuw via de LLM proberen
+
+DIGEST_PROMPT = """
+Je maakt een feitelijke, compacte samenvatting van een CV voor gebruik in
+recruitment-prompts. Verzin niets: alleen wat in het CV staat.
+
+Geef ALLEEN een JSON-object terug met exact deze keys:
+{
+  "summary": "max 60 woorden: wie is de kandidaat, kernervaring, niveau",
+  "skills": ["max 25 harde vaardigheden, tools, certificaten"],
+  "roles": [{"title": "functie", "employer": "werkgever of leeg", "years": getal of null}],
+  "years_experience": totaal aantal jaren werkervaring (getal) of null,
+  "education": ["max 5 opleidingen, hoogste eerst"],
+  "languages": ["talen"]
+}
+Maximaal 8 rollen, meest recente eerst. Schrijf in het Nederlands.
+""".strip()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def _compact(text: str) -> str:
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def _str_list(value, limit: int) -> list:
+    if not isinstance(value, list):
+        return []
+    return [str(v).strip()[:120] for v in value if str(v).strip()][:limit]
+
+
+def _years(value) -> Optional[float]:
+    try:
+        years = float(value)
+    except (TypeError, ValueError):
+        return None
+    return round(years, 1) if 0 <= years <= 60 else None
+
+
+def _clean(data: dict) -> dict:
+    roles = []
+    for role in data.get("roles") or []:
+        if isinstance(role, dict) and str(role.get("title") or "").strip():
+            roles.append({
+                "title": str(role["title"]).strip()[:120],
+                "employer": str(role.get("employer") or "").strip()[:120],
+                "years": _years(role.get("years")),
+            })
+    return {
+        "summary": _compact(str(data.get("summary") or ""))[:600],
+        "skills": _str_list(data.get("skills"), 25),
+        "roles": roles[:8],
+        "years_experience": _years(data.get("years_experience")),
+        "education": _str_list(data.get("education"), 5),
+        "languages": _str_list(data.get("languages"), 8),
+    }
+
+
+def _local(text: str) -> dict:
+    """Fallback zonder LLM: alleen de ingekorte tekst als samenvatting."""
+    return {
+        "summary": _compact(text)[:CV_DIGEST_TOKENS * CHARS_PER_TOKEN],
+        "skills": [],
+        "roles": [],
+        "years_experience": None,
+        "education": [],
+        "languages": [],
+        "source": "local",
+        "version": DIGEST_VERSION,
+    }
+
+
+def build(text: str) -> dict:
+    """Maak een digest van een CV-tekst (één LLM-call; lokaal als de LLM niet beschikbaar is)."""
+    if not llm.is_enabled() or not (text or "").strip():
+        return _local(text)
+    try:
+        data = llm.chat_json(
+            [
+                {"role": "system", "content": DIGEST_PROMPT},
+                {"role": "user", "content": text[:CV_DIGEST_INPUT_CHARS]},
+            ],
+            temperature=0,
+            feature="cv_digest",
+        )
+    except Exception as exc:
+        logger.warning("[cv-digest] LLM mislukt, lokale digest: %s", exc)
+        return _local(text)
+    digest = _clean(data)
+    if not digest["summary"]:
+        return _local(text)
+    digest.update(source="ai", version=DIGEST_VERSION)
+    return digest
+
+
+def _age_seconds(cv: models.CandidateCV) -> float:
+    stamp = cv.digested_at
+    if stamp is None:
+        return float("inf")
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - stamp).total_seconds()
+
+
+def current(cv: Optional[models.CandidateCV]) -> Optional[dict]:
+    """Opgeslagen digest als die bij de huidige CV-tekst hoort (anders None)."""
+    if cv is None or not cv.digest or cv.digest_hash != text_hash(cv.extracted_text or ""):
+        return None
+    try:
+        digest = json.loads(cv.digest)
+    except ValueError:
+        return None
+    if digest.get("version") != DIGEST_VERSION:
+        return None
+    if digest.get("source") == "local" and llm.is_enabled() and _age_seconds(cv) > LOCAL_RETRY_SECONDS:
+        return None  # upgraden naar een AI-digest
+    return digest
+
+
+def ensure(db: Session, cv: models.CandidateCV) -> Optional[dict]:
+    """Geef de digest van een CV; maak en bewaar hem (commit) als hij ontbreekt of verouderd is."""
+    if cv is None or not (cv.extracted_text or "").strip():
+        return None
+    digest = current(cv)
+    if digest is not None:
+        return digest
+    digest = build(cv.extracted_text)
+    cv.digest = json.dumps(digest, ensure_ascii=False)
+    cv.digest_hash = text_hash(cv.extracted_text)
+    cv.digested_at = datetime.now(timezone.utc)
+    db.commit()
+    return digest
+
+
+def sync_cv(cv_id: int) -> None:
+    """Achtergrondtaak na upload of handmatige bewerking van een CV."""
+    from backend.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        cv = db.query(models.CandidateCV).filter(models.CandidateCV.id == cv_id).first()
+        ensure(db, cv)
+    except Exception as exc:
+        logger.warning("[cv-digest] CV %d mislukt: %s", cv_id, exc)
+        db.rollback()
+    finally:
+        db.close()
+
+
+# ── Voor prompts ──────────────────────────────────────────────────────────────
+
+def render(digest: dict, max_chars: Optional[int] = None) -> str:
+    """Digest als compact tekstblok voor een prompt."""
+    limit = max_chars or CV_DIGEST_TOKENS * CHARS_PER_TOKEN
+    if digest.get("source") == "local":
+        return digest.get("summary", "")[:limit]
+
+    lines = []
+    if digest.get("summary"):
+        lines.append(f"Samenvatting: {digest['summary']}")
+    if digest.get("roles"):
+        roles = []
+        for role in digest["roles"]:
+            label = role["title"] + (f" bij {role['employer']}" if role.get("employer") else "")
+            roles.append(label + (f" ({role['years']:g} jr)" if role.get("years") is not None else ""))
+        lines.append("Functies: " + "; ".join(roles))
+    if digest.get("years_experience") is not None:
+        lines.append(f"Werkervaring: ca. {digest['years_experience']:g} jaar")
+    if digest.get("skills"):
+        lines.append("Vaardigheden: " + ", ".join(digest["skills"]))
+    if digest.get("education"):
+        lines.append("Opleiding: " + "; ".join(digest["education"]))
+    if digest.get("languages"):
+        lines.append("Talen: " + ", ".join(digest["languages"]))
+    return "\n".join(lines)[:limit]
+
+
+def for_prompt(cv: Optional[models.CandidateCV], db: Optional[Session] = None, max_chars: Optional[int] = None) -> str:
+    """
+    CV-blok voor een prompt. Met db wordt een ontbrekende digest meteen
+    gemaakt (en bewaard); zonder db (bv. vanuit de event loop) valt het
+    terug op de ingekorte ruwe tekst.
+    """
+    if cv is None or not (cv.extracted_text or "").strip():
+        return ""
+    digest = ensure(db, cv) if db is not None else current(cv)
+    if digest is None:
+        return _compact(cv.extracted_text)[:max_chars or CV_DIGEST_TOKENS * CHARS_PER_TOKEN]
+    return render(digest, max_chars)
+
+
+def summary(cv: Optional[models.CandidateCV]) -> str:
+    """Korte samenvatting (± SUMMARY_CHARS) voor krappe prompts zoals het interview."""
+    if cv is None or not (cv.extracted_text or "").strip():
+        return ""
+    digest = current(cv)
+    text = digest["summary"] if digest else cv.extracted_text
+    return _compact(text)[:SUMMARY_CHARS]
@@ -0,0 +1,375 @@
+"""
+Embedding-index voor CV → vacature aanbevelingen.
+
+Voorheen kreeg GPT alleen de 8 nieuwste vacatures te zien en moest het zelf
+de top 3 kiezen. Nu:
+
+1. Elke vacature en elk CV krijgt een embedding (bij schrijven, op de
+   achtergrond). Vectoren staan in de tabel `embeddings`.
+2. Per proces staat de actieve catalogus als één genormaliseerde NumPy-matrix
+   in het geheugen (VacancyIndex). Cosine top-k = één matrix·vector product.
+3. Elk schrijfpad (aanmaken, bewerken, publiceren, statuswijziging,
+   verwijderen) voegt vacatures incrementeel toe of haalt ze weg; bulk
+   publish synchroniseert in één batch. Andere workers zien wijzigingen na
+   INDEX_REFRESH_SECONDS: de herlaadronde draait dan in een achtergrondthread
+   (hooguit één tegelijk), nooit in het request.
+4. De LLM legt daarna alleen de laatste paar resultaten uit.
+
+Backends:
+- "openai": llm.embed() (OPENAI_EMBEDDING_MODEL)
+- "local":  feature hashing van woorden + bigrammen (geen netwerk, geen key).
+  Wordt gebruikt als OPENAI_API_KEY ontbreekt of EMBEDDING_BACKEND=local.
+Vectoren van verschillende backends worden nooit gemengd (kolom `model`).
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.services import llm
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai" if llm.is_enabled() else "local")
+LOCAL_DIM = 512
+MAX_CHARS = 6000                # tekst per embedding (≈1500 tokens)
+BATCH_SIZE = 64                 # teksten per embeddings-call
+INDEX_REFRESH_SECONDS = int(os.getenv("EMBEDDING_INDEX_REFRESH_SECONDS", "300"))
+
+ACTIVE_STATUS = "actief"
+
+TOKEN_RE = re.compile(r"[a-zà-ÿ0-9+#]+")
+
+
+def embedding_model() -> str:
+    if EMBEDDING_BACKEND == "openai":
+        return llm.OPENAI_EMBEDDING_MODEL
+    return f"local-hash-{LOCAL_DIM}"
+
+
+# ── Teksten ───────────────────────────────────────────────────────────────────
+
+def vacancy_text(v: models.Vacancy) -> str:
+    parts = [
+        v.title or "",
+        v.location or "",
+        v.employment_type or "",
+        v.work_location or "",
+        v.description or v.extracted_text or "",
+    ]
+    return "\n".join(p for p in parts if p).strip()[:MAX_CHARS]
+
+
+def cv_text(cv: models.CandidateCV) -> str:
+    return (cv.extracted_text or "").strip()[:MAX_CHARS]
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+# ── Embedden ──────────────────────────────────────────────────────────────────
+
+def _normalize(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (m / norms).astype(np.float32)
+
+
+def local_embed(text: str) -> np.ndarray:
+    """Feature hashing: unigrammen + bigrammen, sublineaire tf, teken-hash tegen botsingen."""
+    vec = np.zeros(LOCAL_DIM, dtype=np.float32)
+    tokens = TOKEN_RE.findall(text.lower())
+    counts: Dict[str, int] = {}
+    for tok in tokens:
+        counts[tok] = counts.get(tok, 0) + 1
+    for a, b in zip(tokens, tokens[1:]):
+        key = f"{a} {b}"
+        counts[key] = counts.get(key, 0) + 1
+    for term, n in counts.items():
+        h = zlib.crc32(term.encode("utf-8"))
+        sign = 1.0 if (h >> 31) & 1 else -1.0
+        vec[h % LOCAL_DIM] += sign * (1.0 + np.log(n))
+    return vec
+
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    """(n × d) float32, rijen L2-genormaliseerd. Fouten van de API worden doorgegeven."""
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    if EMBEDDING_BACKEND != "openai":
+        return _normalize(np.vstack([local_embed(t) for t in texts]))
+    rows: List[List[float]] = []
+    for i in range(0, len(texts), BATCH_SIZE):
+        rows.extend(llm.embed([t or " " for t in texts[i:i + BATCH_SIZE]]))
+    return _normalize(np.asarray(rows, dtype=np.float32))
+
+
+# ── Opslag ────────────────────────────────────────────────────────────────────
+
+def ensure_vectors(db: Session, owner_type: str, texts: Dict[int, str]) -> Dict[int, np.ndarray]:
+    """
+    Vectoren voor {owner_id: tekst}. Alleen nieuwe of gewijzigde teksten worden
+    (in batches) ingebed; de rest komt uit de tabel.
+    """
+    if not texts:
+        return {}
+    model = embedding_model()
+    ids = list(texts)
+    rows: Dict[int, models.Embedding] = {}
+    for i in range(0, len(ids), 500):
+        for row in (
+            db.query(models.Embedding)
+            .filter(
+                models.Embedding.owner_type == owner_type,
+                models.Embedding.model == model,
+                models.Embedding.owner_id.in_(ids[i:i + 500]),
+            )
+            .all()
+        ):
+            rows[row.owner_id] = row
+
+    out: Dict[int, np.ndarray] = {}
+    stale: List[int] = []
+    for oid, text in texts.items():
+        row = rows.get(oid)
+        if row is not None and row.content_hash == _content_hash(text):
+            out[oid] = np.frombuffer(row.vector, dtype=np.float32)
+        else:
+            stale.append(oid)
+
+    if stale:
+        try:
+            matrix = embed_texts([texts[oid] for oid in stale])
+        except Exception as exc:
+            logger.warning("[embeddings] Embedden mislukt (%d %s): %s", len(stale), owner_type, exc)
+            return out
+        for oid, vec in zip(stale, matrix):
+            row = rows.get(oid)
+            if row is None:
+                row = models.Embedding(owner_type=owner_type, owner_id=oid, model=model)
+                db.add(row)
+            row.content_hash = _content_hash(texts[oid])
+            row.dim = int(vec.shape[0])
+            row.vector = vec.tobytes()
+            out[oid] = vec
+        try:
+            db.commit()
+        except IntegrityError:
+            # Parallelle worker schreef dezelfde rij — vectoren zijn bruikbaar, opslag niet nodig
+            db.rollback()
+    return out
+
+
+def delete_vectors(db: Session, owner_type: str, owner_ids: Iterable[int]) -> None:
+    db.query(models.Embedding).filter(
+        models.Embedding.owner_type == owner_type,
+        models.Embedding.owner_id.in_(list(owner_ids)),
+    ).delete(synchronize_session=False)
+    db.commit()
+
+
+# ── In-memory index ───────────────────────────────────────────────────────────
+
+class VacancyIndex:
+    """Genormaliseerde matrix van actieve vacatures; rijen worden in-place toegevoegd/verwijderd."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._ids: List[int] = []
+        self._pos: Dict[int, int] = {}
+        self._loaded_at = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self._ids)
+
+    def _grow(self, dim: int) -> None:
+        cap = max(64, self._matrix.shape[0] * 2)
+        grown = np.zeros((cap, dim), dtype=np.float32)
+        if self._matrix.size:
+            grown[: self.size] = self._matrix[: self.size]
+        self._matrix = grown
+
+    def upsert(self, vacancy_id: int, vec: np.ndarray) -> None:
+        with self._lock:
+            pos = self._pos.get(vacancy_id)
+            if pos is not None and self._matrix.shape[1] == vec.shape[0]:
+                self._matrix[pos] = vec
+                return
+            if self._matrix.shape[1] != vec.shape[0]:
+                if self.size:
+                    return  # andere dimensie (backend gewisseld) — volgende reload lost het op
+                self._matrix = np.zeros((0, vec.shape[0]), dtype=np.float32)
+            if self.size >= self._matrix.shape[0]:
+                self._grow(vec.shape[0])
+            self._matrix[self.size] = vec
+            self._pos[vacancy_id] = self.size
+            self._ids.append(vacancy_id)
+
+    def remove(self, vacancy_id: int) -> None:
+        """Swap-remove: laatste rij naar de vrijgekomen plek, O(d)."""
+        with self._lock:
+            pos = self._pos.pop(vacancy_id, None)
+            if pos is None:
+                return
+            last = self.size - 1
+            if pos != last:
+                last_id = self._ids[last]
+                self._matrix[pos] = self._matrix[last]
+                self._ids[pos] = last_id
+                self._pos[last_id] = pos
+            self._ids.pop()
+
+    def replace_all(self, vectors: Dict[int, np.ndarray]) -> None:
+        with self._lock:
+            self._ids = list(vectors)
+            self._pos = {vid: i for i, vid in enumerate(self._ids)}
+            if vectors:
+                self._matrix = np.vstack([vectors[vid] for vid in self._ids]).astype(np.float32)
+            else:
+                self._matrix = np.zeros((0, 0), dtype=np.float32)
+            self._loaded_at = time.monotonic()
+
+    def is_stale(self) -> bool:
+        return time.monotonic() - self._loaded_at > INDEX_REFRESH_SECONDS
+
+    def top_k(self, vec: np.ndarray, k: int, exclude: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        with self._lock:
+            n = self.size
+            if n == 0 or self._matrix.shape[1] != vec.shape[0]:
+                return []
+            scores = self._matrix[:n] @ vec
+            for vid in exclude:
+                pos = self._pos.get(vid)
+                if pos is not None:
+                    scores[pos] = -np.inf
+            k = min(k, n)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self._ids[i], float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+
+index = VacancyIndex()
+_reloading = threading.Lock()
+
+
+def load_index(db: Session) -> None:
+    """(Her)bouw de index vanuit de actieve vacatures; ontbrekende vectoren worden berekend."""
+    texts = {
+        v.id: vacancy_text(v)
+        for v in db.query(models.Vacancy).filter(models.Vacancy.status == ACTIVE_STATUS).all()
+    }
+    vectors = ensure_vectors(db, "vacancy", texts)
+    index.replace_all(vectors)
+    logger.info("[embeddings] Index geladen: %d actieve vacatures (%s)", index.size, embedding_model())
+
+
+def warm_index() -> bool:
+    """(Her)laad de index met een eigen DB-sessie; hooguit één tegelijk. False als er al een loopt."""
+    from backend.db import SessionLocal
+
+    if not _reloading.acquire(blocking=False):
+        return False
+    db = SessionLocal()
+    try:
+        load_index(db)
+    except Exception as exc:
+        logger.warning("[embeddings] Index laden mislukt: %s", exc)
+    finally:
+        db.close()
+        _reloading.release()
+    return True
+
+
+def refresh_index_background() -> bool:
+    """Start warm_index() in een thread (startup, verouderde index). False als er al een reload loopt."""
+    if _reloading.locked():
+        return False
+    threading.Thread(target=warm_index, name="embedding-index", daemon=True).start()
+    return True
+
+
+# ── Achtergrond-hooks (BackgroundTasks) ──────────────────────────────────────
+
+def sync_vacancies(vacancy_ids: List[int]) -> None:
+    """
+    Na aanmaken/bewerken/publiceren/statuswijziging/verwijderen van vacatures.
+    Eén sessie; nieuwe teksten worden in batches van BATCH_SIZE ingebed.
+    """
+    from backend.db import SessionLocal
+
+    if not vacancy_ids:
+        return
+    db = SessionLocal()
+    try:
+        found = {
+            v.id: v
+            for v in db.query(models.Vacancy).filter(models.Vacancy.id.in_(vacancy_ids)).all()
+        }
+        gone = [vid for vid in vacancy_ids if vid not in found]
+        for vid in gone:
+            index.remove(vid)
+        if gone:
+            delete_vectors(db, "vacancy", gone)
+        vectors = ensure_vectors(db, "vacancy", {v.id: vacancy_text(v) for v in found.values()})
+        for v in found.values():
+            vec = vectors.get(v.id)
+            if v.status == ACTIVE_STATUS and vec is not None:
+                index.upsert(v.id, vec)
+            else:
+                index.remove(v.id)
+    except Exception as exc:
+        logger.warning("[embeddings] Sync van %d vacature(s) mislukt: %s", len(vacancy_ids), exc)
+    finally:
+        db.close()
+
+
+def sync_vacancy(vacancy_id: int) -> None:
+    sync_vacancies([vacancy_id])
+
+
+def sync_cv(cv_id: int) -> None:
+    """Na upload of handmatige bewerking van een CV."""
+    from backend.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        cv = db.query(models.CandidateCV).filter(models.CandidateCV.id == cv_id).first()
+        if cv is not None and cv_text(cv):
+            ensure_vectors(db, "cv", {cv.id: cv_text(cv)})
+    except Exception as exc:
+        logger.warning("[embeddings] Sync CV %d mislukt: %s", cv_id, exc)
+    finally:
+        db.close()
+
+
+# ── Zoeken ────────────────────────────────────────────────────────────────────
+
+def recommend(
+    db: Session,
+    cv: models.CandidateCV,
+    k: int = 3,
+    exclude: Optional[Set[int]] = None,
+) -> List[Tuple[int, float]]:
+    """Top-k (vacancy_id, cosine) voor een CV over de volledige actieve catalogus."""
+    if index.is_stale():
+        refresh_index_background()  # dit request gebruikt de huidige index
+    text = cv_text(cv)
+    if not text:
+        return []
+    vec = ensure_vectors(db, "cv", {cv.id: text}).get(cv.id)
+    if vec is None:
+        return []
+    return index.top_k(vec, k, exclude or ())
@@ -0,0 +1,375 @@
+"""
+Afronden van een virtueel interview buiten het HTTP-request.
+
+complete_interview en complete_v2_interview deden alles binnen het request:
+GPT-scoring, meerdere commits, een Teams-vervolgafspraak (MS Graph) en
+e-mails. Eén trage provider hield de "afronden"-klik van de kandidaat vast.
+Nu slaat het request alleen het transcript op (persist), markeert de sessie
+als voltooid en maakt een InterviewCompletionTask aan; deze module voert
+daarna de stappen uit:
+
+    score → decide → schedule → notify_employer → invite
+
+- score: GPT-beoordeling van het transcript → sessie.score/score_summary
+- decide: AIResult bijwerken, interview_completed_at zetten en bepalen of er
+  een vervolgafspraak komt (score ≥ drempel én MS Graph geconfigureerd)
+- schedule: Teams-meeting + InterviewSession (alleen als decide dat wil)
+- notify_employer: mail aan de werkgever
+- invite: agenda-uitnodiging voor de vervolgafspraak
+
+Zelfde opzet als apply_pipeline: elke stap markeert zichzelf in een eigen
+*_at-kolom (idempotent per stap), een mislukte stap gaat terug in de
+wachtrij met backoff + jitter, taken hebben een lease (locked_until) en
+worker_loop() in de lifespan pakt achtergebleven taken op. Bij de laatste
+poging valt scoring terug op de neutrale score en worden plannen/uitnodigen
+overgeslagen (zoals voorheen: niet fataal).
+"""
+
+import asyncio
+import logging
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.services.email import send_interview_completed_notification
+
+logger = logging.getLogger(__name__)
+
+INTERVIEW_COMPLETION_MAX_ATTEMPTS = int(os.getenv("INTERVIEW_COMPLETION_MAX_ATTEMPTS", "5"))
+INTERVIEW_COMPLETION_POLL_SECONDS = float(os.getenv("INTERVIEW_COMPLETION_POLL_SECONDS", "5"))
+INTERVIEW_COMPLETION_LEASE_SECONDS = int(os.getenv("INTERVIEW_COMPLETION_LEASE_SECONDS", "300"))
+
+BATCH_SIZE = 10
+RETRY_BASE_SECONDS = 15       # verdubbelt per poging
+RETRY_MAX_SECONDS = 3600
+FOLLOWUP_DAYS = 3             # vervolgafspraak: over 3 dagen, 09:00 UTC, 45 minuten
+FOLLOWUP_MINUTES = 45
+
+# (naam, kolom die de stap als afgerond markeert)
+STAGES = (
+    ("score", "scored_at"),
+    ("decide", "decided_at"),
+    ("schedule", "followup_checked_at"),
+    ("notify_employer", "employer_notified_at"),
+    ("invite", "invite_sent_at"),
+)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# ── Wachtrij ──────────────────────────────────────────────────────────────────
+
+def enqueue(db: Session, vi_session: models.VirtualInterviewSession, language: str) -> models.InterviewCompletionTask:
+    """
+    Zet het afronden van een sessie in de wachtrij. De aanroeper commit. Een
+    bestaande taak blijft staan (dubbele klik = geen tweede score of mail);
+    alleen een mislukte taak wordt opnieuw klaargezet, afgeronde stappen blijven afgerond.
+    """
+    task = (
+        db.query(models.InterviewCompletionTask)
+        .filter(models.InterviewCompletionTask.session_id == vi_session.id)
+        .first()
+    )
+    if task is None:
+        task = models.InterviewCompletionTask(
+            session_id=vi_session.id,
+            application_id=vi_session.application_id,
+            status="queued",
+            language=language,
+            attempts=0,
+            next_attempt_at=_now(),
+        )
+        db.add(task)
+    elif task.status == "failed":
+        task.status = "queued"
+        task.attempts = 0
+        task.last_error = None
+        task.finished_at = None
+        task.next_attempt_at = _now()
+    return task
+
+
+def _claim(db: Session, task_id: Optional[int] = None, limit: int = 1) -> list:
+    """Claim openstaande taken met een lease. Geeft de geclaimde ids terug."""
+    T = models.InterviewCompletionTask
+    now = _now()
+    free = or_(T.locked_until.is_(None), T.locked_until < now)
+    q = db.query(T.id).filter(T.status.in_(("queued", "running")), T.next_attempt_at <= now, free)
+    if task_id is not None:
+        q = q.filter(T.id == task_id)
+    candidates = [row.id for row in q.order_by(T.next_attempt_at.asc()).limit(limit).all()]
+
+    claimed = []
+    for tid in candidates:
+        updated = (
+            db.query(T)
+            .filter(T.id == tid, free)
+            .update(
+                {"status": "running", "locked_until": now + timedelta(seconds=INTERVIEW_COMPLETION_LEASE_SECONDS)},
+                synchronize_session=False,
+            )
+        )
+        if updated:
+            claimed.append(tid)
+    db.commit()
+    return claimed
+
+
+def _retry_delay(attempts: int) -> float:
+    return random.uniform(0.5, 1.0) * min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * (2 ** (attempts - 1)))
+
+
+# ── Stappen ───────────────────────────────────────────────────────────────────
+
+def merge_interview_score(ai_result: models.AIResult, score: int, summary: Optional[str]) -> None:
+    """Verwerk de interviewscore in een AIResult: de hoogste score telt, de beoordeling komt onder de samenvatting."""
+    block = f"[Video interview score: {score}/100]\n{summary or ''}"
+    ai_result.match_score = max(ai_result.match_score or 0, score)
+    ai_result.summary = f"{ai_result.summary}\n\n{block}" if ai_result.summary else block
+
+
+def _stage_score(db: Session, task, vi_session, ctx: dict, final: bool) -> None:
+    # Helpers horen bij de router; lazy import voorkomt een importcyclus
+    from backend.routers.virtual_interview import _get_transcript, _score_transcript
+
+    transcript = _get_transcript(vi_session, db)
+    score, summary = _score_transcript(ctx, transcript, task.language or "nl", strict=not final)
+    vi_session.score = score
+    vi_session.score_summary = summary
+
+
+def _stage_decide(db: Session, task, vi_session, ctx: dict, final: bool) -> None:
+    from backend.routers.interview_scheduler import MS_ORGANIZER_EMAIL
+    from backend.routers.virtual_interview import SCORE_THRESHOLD
+
+    score = vi_session.score or 0
+    # Het laatste AIResult — hetzelfde dat werkgever en chat tonen
+    ai_result = (
+        db.query(models.AIResult)
+        .filter(models.AIResult.application_id == task.application_id)
+        .order_by(models.AIResult.id.desc())
+        .first()
+    )
+    if ai_result is None:
+        ai_result = models.AIResult(application_id=task.application_id)
+        db.add(ai_result)
+    merge_interview_score(ai_result, score, vi_session.score_summary)
+    application = db.query(models.Application).filter(models.Application.id == task.application_id).first()
+    if application is not None:
+        application.interview_completed_at = _now()
+    task.followup_wanted = bool(score >= SCORE_THRESHOLD and MS_ORGANIZER_EMAIL)
+
+
+def _stage_schedule(db: Session, task, vi_session, ctx: dict, final: bool) -> None:
+    from backend.routers.interview_scheduler import MS_ORGANIZER_EMAIL, _create_teams_online_meeting
+
+    if not task.followup_wanted or vi_session.followup_interview_id:
+        return
+    followup_dt = (_now() + timedelta(days=FOLLOWUP_DAYS)).replace(hour=9, minute=0, second=0, microsecond=0)
+    try:
+        meeting = _create_teams_online_meeting(
+            subject=f"2e gesprek: {ctx['candidate_name']} — {ctx['vacancy_title']}",
+            start_dt=followup_dt,
+            end_dt=followup_dt + timedelta(minutes=FOLLOWUP_MINUTES),
+            organizer_email=MS_ORGANIZER_EMAIL,
+        )
+    except Exception as exc:
+        if not final:
+            raise
+        # Vervolgafspraak mislukt — niet fataal, de werkgever plant zelf
+        logger.warning("[interview] Vervolgafspraak sessie %d definitief mislukt: %s", vi_session.id, exc)
+        return
+    interview_session = models.InterviewSession(
+        application_id=task.application_id,
+        scheduled_at=followup_dt,
+        duration_minutes=FOLLOWUP_MINUTES,
+        interview_type="teams",
+        status="scheduled",
+        teams_meeting_id=meeting.get("id"),
+        teams_join_url=meeting.get("joinWebUrl") or meeting.get("joinUrl"),
+        teams_organizer_email=MS_ORGANIZER_EMAIL,
+        notes=f"Automatisch ingepland na video interview. Score: {vi_session.score}/100",
+    )
+    db.add(interview_session)
+    db.flush()
+    vi_session.followup_interview_id = interview_session.id
+
+
+def _stage_notify_employer(db: Session, task, vi_session, ctx: dict, final: bool) -> None:
+    employer = db.query(models.User).filter(models.User.id == ctx["employer_id"]).first()
+    if not employer:
+        return
+    completed_at = db.query(models.Application.interview_completed_at).filter(
+        models.Application.id == task.application_id
+    ).scalar() or _now()
+    send_interview_completed_notification(
+        employer_email=employer.email,
+        candidate_name=ctx["candidate_name"],
+        vacancy_title=ctx["vacancy_title"],
+        interview_score=vi_session.score or 0,
+        deadline_str=(completed_at + timedelta(days=7)).strftime("%d-%m-%Y"),
+    )
+
+
+def _stage_invite(db: Session, task, vi_session, ctx: dict, final: bool) -> None:
+    from backend.routers.interview_scheduler import MS_ORGANIZER_EMAIL, _send_calendar_invite
+
+    if not vi_session.followup_interview_id:
+        return
+    followup = db.query(models.InterviewSession).filter(
+        models.InterviewSession.id == vi_session.followup_interview_id
+    ).first()
+    if followup is None:
+        return
+    attendees = []
+    employer = db.query(models.User).filter(models.User.id == ctx["employer_id"]).first()
+    if employer:
+        attendees.append(employer.email)
+    if ctx["candidate_email"]:
+        attendees.append(ctx["candidate_email"])
+    try:
+        _send_calendar_invite(
+            organizer_email=MS_ORGANIZER_EMAIL,
+            attendee_emails=attendees,
+            subject=f"2e gesprek: {ctx['candidate_name']} — {ctx['vacancy_title']}",
+            body_html=(
+                f"<p>Beste {ctx['candidate_name']},</p>"
+                f"<p>Gefeliciteerd! Op basis van uw video interview nodigen we u uit "
+                f"voor een 2e gesprek over de functie <strong>{ctx['vacancy_title']}</strong>.</p>"
+                f"<p>Score video interview: <strong>{vi_session.score}/100</strong></p>"
+            ),
+            start_dt=followup.scheduled_at,
+            end_dt=followup.scheduled_at + timedelta(minutes=followup.duration_minutes or FOLLOWUP_MINUTES),
+            teams_join_url=followup.teams_join_url,
+        )
+    except Exception as exc:
+        if not final:
+            raise
+        logger.warning("[interview] Uitnodiging sessie %d definitief mislukt: %s", vi_session.id, exc)
+
+
+_STAGE_FUNCS = {
+    "score": _stage_score,
+    "decide": _stage_decide,
+    "schedule": _stage_schedule,
+    "notify_employer": _stage_notify_employer,
+    "invite": _stage_invite,
+}
+
+
+# ── Uitvoeren ─────────────────────────────────────────────────────────────────
+
+def _process(db: Session, task_id: int) -> None:
+    from backend.services import chat_context
+
+    task = db.query(models.InterviewCompletionTask).filter(models.InterviewCompletionTask.id == task_id).first()
+    if task is None:
+        return
+    vi_session = db.query(models.VirtualInterviewSession).filter(
+        models.VirtualInterviewSession.id == task.session_id
+    ).first()
+    ctx = chat_context.get(task.application_id, db)
+    if vi_session is None or ctx is None:
+        # Sessie of sollicitatie inmiddels verwijderd
+        task.status = "failed"
+        task.last_error = "Sessie of sollicitatie niet gevonden"
+        task.locked_until = None
+        task.finished_at = _now()
+        db.commit()
+        return
+    final = task.attempts + 1 >= INTERVIEW_COMPLETION_MAX_ATTEMPTS
+
+    for name, column in STAGES:
+        if getattr(task, column) is not None:
+            continue
+        try:
+            _STAGE_FUNCS[name](db, task, vi_session, ctx, final)
+            setattr(task, column, _now())
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            task.attempts = (task.attempts or 0) + 1
+            task.last_error = f"{name}: {exc}"[:2000]
+            task.locked_until = None
+            if task.attempts >= INTERVIEW_COMPLETION_MAX_ATTEMPTS:
+                task.status = "failed"
+                task.finished_at = _now()
+                logger.error("[interview] Afronden sessie %d definitief mislukt in '%s': %s",
+                             task.session_id, name, exc)
+            else:
+                task.status = "queued"
+                task.next_attempt_at = _now() + timedelta(seconds=_retry_delay(task.attempts))
+                logger.warning("[interview] Afronden sessie %d stap '%s' mislukt (poging %d): %s",
+                               task.session_id, name, task.attempts, exc)
+            db.commit()
+            return
+
+    task.status = "done"
+    task.locked_until = None
+    task.finished_at = _now()
+    db.commit()
+
+
+def run_task(task_id: int) -> None:
+    """Verwerk één taak direct (BackgroundTask na het request). Eigen DB-sessie."""
+    from backend.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if _claim(db, task_id=task_id):
+            _process(db, task_id)
+    except Exception as exc:
+        logger.error("[interview] Taak %d mislukt: %s", task_id, exc, exc_info=True)
+        db.rollback()
+    finally:
+        db.close()
+
+
+def process_due(limit: int = BATCH_SIZE) -> int:
+    """Verwerk openstaande taken (nieuw, uitgesteld of met verlopen lease)."""
+    from backend.db import SessionLocal
+
+    db = SessionLocal()
+    done = 0
+    try:
+        for task_id in _claim(db, limit=limit):
+            try:
+                _process(db, task_id)
+            except Exception as exc:
+                logger.error("[interview] Taak %d mislukt: %s", task_id, exc, exc_info=True)
+                db.rollback()
+            done += 1
+    finally:
+        db.close()
+    return done
+
+
+async def worker_loop() -> None:
+    """Achtergrondtaak (lifespan) die de wachtrij leegt."""
+    while True:
+        try:
+            busy = await asyncio.to_thread(process_due)
+        except Exception as exc:
+            logger.error("[interview] Worker-ronde mislukt: %s", exc)
+            busy = 0
+        await asyncio.sleep(0.1 if busy else INTERVIEW_COMPLETION_POLL_SECONDS)
+
+
+def status_of(task: Optional[models.InterviewCompletionTask]) -> dict:
+    """Voortgang voor het poll-endpoint."""
+    if task is None:
+        # Sessies die vóór de pipeline zijn afgerond
+        return {"status": "done", "stages": {}, "attempts": 0, "last_error": None}
+    return {
+        "status": task.status,
+        "stages": {name: getattr(task, column) is not None for name, column in STAGES},
+        "attempts": task.attempts or 0,
+        "last_error": task.last_error if task.status == "failed" else None,
+    }
@@ -0,0 +1,323 @@
+"""
+Lokale lexicale matchscore (BM25) tussen CV en vacature.
+
+De apply-flows en matchers hingen volledig af van één GPT-call: bij een trage
+of falende OpenAI werd 0 opgeslagen met een foutmelding. Deze module geeft in
+microseconden een gekalibreerde score 0–100 en wordt gebruikt als:
+
+- directe pre-screen score (altijd berekend)
+- fallback als de LLM-call faalt
+- poort: bij duidelijk irrelevante CV's (score < SKIP_LLM_BELOW) wordt de
+  LLM-call overgeslagen
+
+Werking:
+1. Tokeniseren (NL + EN), stopwoorden eruit, skill-synoniemen naar één
+   canonieke term (js → javascript, verpleegkundige → nurse, ...), lichte
+   suffix-stemming
+2. Documenten als gesorteerde (term_id, tf) NumPy-arrays (sparse); term_id is
+   een crc32-hash zodat er geen gedeelde vocabulaire nodig is
+3. BM25 met de vacaturetermen als query en het CV als document; IDF komt uit
+   de actieve vacaturecatalogus (ververst elke IDF_REFRESH_SECONDS, op de
+   achtergrond — een score wacht nooit op de catalogusquery)
+4. Ratio = BM25 / maximaal haalbare BM25 → logistische kalibratie naar 0–100
+   (CALIBRATION_A/B; herberekenen met calibrate() op (ratio, gpt_score) paren)
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+K1 = 1.2
+B = 0.75
+AVG_DOC_TOKENS = 400          # gemiddelde CV-lengte in tokens (na stopwoorden)
+MAX_CHARS = 12000
+
+CALIBRATION_A = float(os.getenv("LEXICAL_CAL_A", "10"))
+CALIBRATION_B = float(os.getenv("LEXICAL_CAL_B", "0.3"))
+SKIP_LLM_BELOW = int(os.getenv("LEXICAL_SKIP_LLM_BELOW", "12"))
+IDF_REFRESH_SECONDS = 6 * 3600
+
+TOKEN_RE = re.compile(r"[a-zà-ÿ0-9][a-zà-ÿ0-9+#.\-]*[a-zà-ÿ0-9+#]")
+
+STOPWORDS = frozenset("""
+de het een en of maar dat die dit deze wat wie waar hoe als dan ook nog al
+je jij jouw jullie wij we ons onze u uw ik mijn me mij zij ze hun hen hij
+zijn haar is was wordt worden werd bent ben heb hebt heeft hebben had
+van voor naar met op in aan bij uit om over tot door per te er niet geen
+meer veel zeer goed graag wel binnen onder tussen na zo kunnen kan moet
+the a an and or but that this these those what who where how if then also
+you your we our us i my me they them he she his her is was be been are
+have has had of for to with on in at by from about as into not no more
+very well will would can could should must our their its it
+zoeken zoekt zoek bouwt bouwen kennis ervaren ervaring jaar jaren functie
+vacature bedrijf organisatie team werken werkt nieuwe mooie leuke uitdagende
+experience years year job role company looking work working new
+""".split())
+
+# Variant → canonieke term (de canonieke term wordt daarna gestemd, net als elk ander token)
+SKILL_SYNONYMS: Dict[str, str] = {
+    # IT
+    "js": "javascript", "ecmascript": "javascript", "node": "nodejs", "node.js": "nodejs",
+    "ts": "typescript", "py": "python", "reactjs": "react", "react.js": "react",
+    "k8s": "kubernetes", "postgres": "postgresql", "psql": "postgresql",
+    "ms-sql": "sqlserver", "mssql": "sqlserver", "c#": "csharp",
+    "ml": "machinelearning", "ai": "artificialintelligence", "devops": "devops",
+    "ontwikkelaar": "developer", "programmeur": "developer", "engineer": "developer",
+    "softwareontwikkelaar": "developer", "software-ontwikkelaar": "developer",
+    # Zorg
+    "verpleegkundige": "nurse", "verpleger": "nurse", "verpleegster": "nurse",
+    "ziekenverzorgende": "caregiver", "verzorgende": "caregiver", "zorgmedewerker": "caregiver",
+    # Logistiek / techniek
+    "chauffeur": "driver", "vrachtwagenchauffeur": "truckdriver", "heftruckchauffeur": "forklift",
+    "heftruck": "forklift", "magazijnmedewerker": "warehouse", "magazijn": "warehouse",
+    "orderpicker": "warehouse", "monteur": "mechanic", "technicus": "technician",
+    "elektricien": "electrician", "lasser": "welder",
+    # Finance / office
+    "boekhouder": "accountant", "accountancy": "accountant", "financieel": "finance",
+    "administratief": "administrative", "administratie": "administrative",
+    "klantenservice": "customerservice", "callcenter": "customerservice",
+    "verkoper": "sales", "verkoop": "sales", "accountmanager": "sales",
+    "projectleider": "projectmanager", "projectmanagement": "projectmanager",
+    "hr": "humanresources", "personeelszaken": "humanresources",
+    # Onderwijs / niveaus
+    "leraar": "teacher", "docent": "teacher", "onderwijzer": "teacher",
+    "bachelor": "hbo", "master": "wo", "university": "wo", "universiteit": "wo",
+}
+
+# Meerwoordige skills → één token (vóór tokenisatie toegepast)
+PHRASE_SYNONYMS: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r"\bmachine[\s-]learning\b"), "machinelearning"),
+    (re.compile(r"\bproject\s?manag\w*\b"), "projectmanager"),
+    (re.compile(r"\bcustomer\s+service\b"), "customerservice"),
+    (re.compile(r"\bhuman\s+resources\b"), "humanresources"),
+    (re.compile(r"\bsql\s+server\b"), "sqlserver"),
+    (re.compile(r"\bc\s?\+\+"), "cplusplus"),
+    (re.compile(r"(?<![a-z])\.net\b"), "dotnet"),
+    (re.compile(r"\brijbewijs\s+c\s?e\b"), "rijbewijsce"),
+    (re.compile(r"\bbig\s+data\b"), "bigdata"),
+]
+
+# Suffixen (NL + EN), langste eerst; max. 2 rondes
+_SUFFIXES = ("heden", "ingen", "heid", "ing", "ers", "en", "er", "es", "ed", "s", "e")
+_MIN_STEM = 4
+
+
+def stem(token: str) -> str:
+    for _ in range(2):
+        for suf in _SUFFIXES:
+            if token.endswith(suf) and len(token) - len(suf) >= _MIN_STEM:
+                token = token[: -len(suf)]
+                break
+        else:
+            break
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    text = (text or "")[:MAX_CHARS].lower()
+    for pattern, repl in PHRASE_SYNONYMS:
+        text = pattern.sub(repl, text)
+    out: List[str] = []
+    for tok in TOKEN_RE.findall(text):
+        if len(tok) < 2 or tok in STOPWORDS or tok.isdigit():
+            continue
+        out.append(stem(SKILL_SYNONYMS.get(tok, tok)))
+    return out
+
+
+def _term_id(term: str) -> int:
+    return zlib.crc32(term.encode("utf-8"))
+
+
+@dataclass
+class Doc:
+    ids: np.ndarray            # gesorteerde uint32 term-ids
+    tf: np.ndarray             # float32 term frequencies
+    length: int
+    terms: Dict[int, str] = field(default_factory=dict)
+
+
+def to_doc(text: str) -> Doc:
+    tokens = tokenize(text)
+    terms = {_term_id(t): t for t in tokens}
+    if not tokens:
+        return Doc(np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.float32), 0, {})
+    ids, counts = np.unique(np.fromiter((_term_id(t) for t in tokens), dtype=np.uint32), return_counts=True)
+    return Doc(ids, counts.astype(np.float32), len(tokens), terms)
+
+
+@lru_cache(maxsize=256)
+def _job_doc(job_text: str) -> Doc:
+    """Vacatureteksten komen bij elke sollicitatie terug — tokeniseer ze één keer."""
+    return to_doc(job_text)
+
+
+# ── IDF uit de vacaturecatalogus ──────────────────────────────────────────────
+
+class _Idf:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = np.zeros(0, dtype=np.uint32)
+        self._idf = np.zeros(0, dtype=np.float32)
+        self._default = 1.0
+        self._loaded_at = 0.0
+
+    def load(self, texts: Iterable[str]) -> None:
+        df: Dict[int, int] = {}
+        n = 0
+        for text in texts:
+            n += 1
+            for tid in to_doc(text).ids.tolist():
+                df[tid] = df.get(tid, 0) + 1
+        ids = np.fromiter(df.keys(), dtype=np.uint32, count=len(df))
+        counts = np.fromiter(df.values(), dtype=np.float32, count=len(df))
+        order = np.argsort(ids)
+        idf = np.log(1.0 + (n - counts[order] + 0.5) / (counts[order] + 0.5)).astype(np.float32)
+        with self._lock:
+            self._ids, self._idf = ids[order], idf
+            # Onbekende term = zo zeldzaam als een term die in één document voorkomt
+            self._default = math.log(1.0 + (n - 0.5) / 1.5) if n else 1.0
+            self._loaded_at = time.monotonic()
+
+    def lookup(self, ids: np.ndarray) -> np.ndarray:
+        with self._lock:
+            known_ids, known_idf, default = self._ids, self._idf, self._default
+        out = np.full(ids.shape[0], default, dtype=np.float32)
+        if known_ids.size:
+            pos = np.searchsorted(known_ids, ids)
+            pos[pos >= known_ids.size] = 0
+            hit = known_ids[pos] == ids
+            out[hit] = known_idf[pos[hit]]
+        return out
+
+    def is_stale(self) -> bool:
+        return time.monotonic() - self._loaded_at > IDF_REFRESH_SECONDS
+
+
+_idf = _Idf()
+_refreshing = threading.Lock()
+
+
+def refresh_idf() -> None:
+    """Herbereken IDF over de actieve vacatures (eigen DB-sessie)."""
+    from backend import models
+    from backend.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(models.Vacancy.title, models.Vacancy.description, models.Vacancy.extracted_text)
+            .filter(models.Vacancy.status == "actief")
+            .all()
+        )
+        _idf.load(f"{r.title or ''}\n{r.description or r.extracted_text or ''}" for r in rows)
+        logger.info("[lexical] IDF geladen over %d vacatures", len(rows))
+    except Exception as exc:
+        logger.warning("[lexical] IDF laden mislukt: %s", exc)
+        _idf._loaded_at = time.monotonic()  # niet elke call opnieuw proberen
+    finally:
+        db.close()
+
+
+def refresh_idf_background() -> bool:
+    """Start refresh_idf() in een thread; hooguit één tegelijk. False als er al een loopt."""
+    if not _refreshing.acquire(blocking=False):
+        return False
+
+    def _run() -> None:
+        try:
+            refresh_idf()
+        finally:
+            _refreshing.release()
+
+    threading.Thread(target=_run, name="lexical-idf", daemon=True).start()
+    return True
+
+
+# ── Scoren ────────────────────────────────────────────────────────────────────
+
+@dataclass
+class LexicalMatch:
+    score: int                 # 0–100, gekalibreerd
+    ratio: float               # BM25 / max haalbare BM25
+    matched: List[str]
+    missing: List[str]
+
+    @property
+    def clearly_irrelevant(self) -> bool:
+        return self.score < SKIP_LLM_BELOW
+
+    def explanation(self) -> str:
+        parts = [f"Automatische pre-screen (trefwoorden): {self.score}/100."]
+        if self.matched:
+            parts.append("Overlap: " + ", ".join(self.matched) + ".")
+        if self.missing:
+            parts.append("Niet gevonden in CV: " + ", ".join(self.missing) + ".")
+        return " ".join(parts)
+
+
+def calibrate_ratio(ratio: float, a: Optional[float] = None, b: Optional[float] = None) -> int:
+    a = CALIBRATION_A if a is None else a
+    b = CALIBRATION_B if b is None else b
+    return int(round(100.0 / (1.0 + math.exp(-a * (ratio - b)))))
+
+
+def score(cv_text: str, job_text: str, top_terms: int = 6) -> LexicalMatch:
+    """BM25-match van CV (document) op vacature (query)."""
+    if _idf.is_stale():
+        # Tot de nieuwe tabel er is wordt met de huidige (of uniforme) IDF gescoord
+        refresh_idf_background()
+
+    job = _job_doc(job_text or "")
+    cv = to_doc(cv_text)
+    if job.ids.size == 0 or cv.ids.size == 0:
+        return LexicalMatch(0, 0.0, [], [])
+
+    idf = _idf.lookup(job.ids)
+    q_weight = idf * (1.0 + np.log(job.tf))          # herhaalde vacaturetermen wegen zwaarder
+    _, qi, di = np.intersect1d(job.ids, cv.ids, assume_unique=True, return_indices=True)
+
+    norm = K1 * (1.0 - B + B * cv.length / AVG_DOC_TOKENS)
+    tf = cv.tf[di]
+    contrib = q_weight[qi] * tf * (K1 + 1.0) / (tf + norm)
+    max_score = float(q_weight.sum() * (K1 + 1.0))
+    ratio = float(contrib.sum() / max_score) if max_score > 0 else 0.0
+
+    matched_order = qi[np.argsort(-contrib)][:top_terms]
+    missing_mask = np.ones(job.ids.size, dtype=bool)
+    missing_mask[qi] = False
+    missing_idx = np.flatnonzero(missing_mask)
+    missing_order = missing_idx[np.argsort(-q_weight[missing_idx])][:top_terms]
+
+    return LexicalMatch(
+        score=calibrate_ratio(ratio),
+        ratio=round(ratio, 4),
+        matched=[job.terms[int(job.ids[i])] for i in matched_order],
+        missing=[job.terms[int(job.ids[i])] for i in missing_order],
+    )
+
+
+def calibrate(pairs: List[Tuple[float, int]]) -> Tuple[float, float]:
+    """
+    Offline: kies (A, B) die de GPT-scores het best benaderen.
+    pairs = [(LexicalMatch.ratio, gpt_match_score), ...]
+    """
+    best = (CALIBRATION_A, CALIBRATION_B)
+    best_err = float("inf")
+    for a in np.arange(2.0, 20.5, 0.5):
+        for b in np.arange(0.05, 0.65, 0.01):
+            err = sum((calibrate_ratio(r, a, b) - s) ** 2 for r, s in pairs)
+            if err < best_err:
+                best, best_err = (float(a), round(float(b), 2)), err
+    return best
@@ -0,0 +1,185 @@
+"""
+Vooraf gegenereerde openingen van Lisa.
+
+Bij de eerste verbinding met de chat genereerde ws_chat Lisa's openingsbericht
+synchroon — het eerste scherm was een wachttijd van seconden. Nu maakt de
+apply-pipeline (stap "opening", direct na de score) de opening al aan
+zodra sollicitatie en AIResult er zijn.
+
+De opening staat klaar op de ApplicationTask (chat_opening, in
+LISA_OPENING_LANGUAGE — de taal van de kandidaat is pas bij het verbinden
+bekend) en wordt pas bij de eerste verbinding een RecruiterChatMessage: een
+klaargezette opening telt dus niet als gestart gesprek voor de plan-limiet.
+
+Het video-interview krijgt geen vooraf gegenereerde intro: de interviewpagina
+gebruikt de Realtime-sessie, die de intro zelf uitspreekt.
+
+Per (soort, sollicitatie) loopt hooguit één generatie tegelijk in dit proces.
+Een verbinding die binnenkomt terwijl de pipeline nog genereert wacht daarop
+(hooguit LISA_OPENING_WAIT_SECONDS) in plaats van een tweede te starten.
+Tussen processen voorkomt een regel-lock op de taak dubbele openingen.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.services import chat_context, llm
+
+logger = logging.getLogger(__name__)
+
+LISA_OPENING_ENABLED = os.getenv("LISA_OPENING_ENABLED", "true").lower() not in ("0", "false", "no")
+LISA_OPENING_LANGUAGE = os.getenv("LISA_OPENING_LANGUAGE", "nl")
+LISA_OPENING_WAIT_SECONDS = float(os.getenv("LISA_OPENING_WAIT_SECONDS", "30"))
+
+CHAT = "chat"
+
+_inflight: Dict[Tuple[str, int], Future] = {}
+_lock = threading.Lock()
+
+
+# ── Single-flight ─────────────────────────────────────────────────────────────
+
+def begin(kind: str, app_id: int) -> Tuple[Future, bool]:
+    """Registreer een generatie. Geeft (future, eigenaar); alleen de eigenaar genereert en roept finish() aan."""
+    with _lock:
+        fut = _inflight.get((kind, app_id))
+        if fut is not None:
+            return fut, False
+        fut = Future()
+        _inflight[(kind, app_id)] = fut
+        return fut, True
+
+
+def finish(kind: str, app_id: int, fut: Future) -> None:
+    """Markeer de generatie als klaar (ook na een fout); wachtenden lezen daarna de database."""
+    with _lock:
+        if _inflight.get((kind, app_id)) is fut:
+            del _inflight[(kind, app_id)]
+    if not fut.done():
+        fut.set_result(None)
+
+
+def wait(kind: str, app_id: int) -> None:
+    """Wacht op een lopende generatie (synchroon, voor endpoints en threads)."""
+    fut = _inflight.get((kind, app_id))
+    if fut is None:
+        return
+    try:
+        fut.result(timeout=LISA_OPENING_WAIT_SECONDS)
+    except FutureTimeout:
+        logger.warning("[opening] Wachten op %s-opening van sollicitatie %d duurde te lang", kind, app_id)
+
+
+async def await_inflight(kind: str, app_id: int) -> None:
+    """Async variant van wait() voor de WebSocket chat."""
+    fut = _inflight.get((kind, app_id))
+    if fut is None:
+        return
+    try:
+        await asyncio.wait_for(asyncio.wrap_future(fut), LISA_OPENING_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("[opening] Wachten op %s-opening van sollicitatie %d duurde te lang", kind, app_id)
+
+
+# ── Genereren ─────────────────────────────────────────────────────────────────
+
+def _generate(system_prompt: str, instruction: str, max_tokens: int, temperature: float) -> Optional[str]:
+    try:
+        text = llm.chat(
+            [{"role": "system", "content": system_prompt}, {"role": "user", "content": instruction}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            cache=False,
+            feature="lisa_opening",
+        )
+    except Exception as exc:
+        logger.warning("[opening] Genereren mislukt: %s", exc)
+        return None
+    return (text or "").strip() or None
+
+
+def _has_chat(db: Session, app_id: int) -> bool:
+    return db.query(models.RecruiterChatMessage.id).filter(
+        models.RecruiterChatMessage.application_id == app_id
+    ).first() is not None
+
+
+def prepare(db: Session, task: models.ApplicationTask, application: models.Application) -> None:
+    """
+    Pipeline-stap: genereer de chat-opening en zet hem klaar op de taak (commit).
+    Best effort — zonder opening valt de chat terug op live genereren.
+    """
+    # Prompt-builders horen bij de routers; lazy import voorkomt een importcyclus
+    from backend.routers.recruiter_chat import _build_system_prompt, _opening_instruction
+
+    if not LISA_OPENING_ENABLED or not llm.is_enabled():
+        return
+    app_id = application.id
+    language = LISA_OPENING_LANGUAGE
+    ctx = chat_context.get(app_id, db)
+    if ctx is None:
+        return
+    task.opening_language = language
+
+    if not task.chat_opening and not _has_chat(db, app_id):
+        fut, owner = begin(CHAT, app_id)
+        if owner:
+            try:
+                task.chat_opening = _generate(
+                    _build_system_prompt(ctx, language), _opening_instruction(ctx), 300, 0.7
+                )
+                db.commit()
+            finally:
+                finish(CHAT, app_id, fut)
+
+
+# ── Ophalen ───────────────────────────────────────────────────────────────────
+
+def take_chat_opening(db: Session, app_id: int, language: str) -> Optional[models.RecruiterChatMessage]:
+    """
+    Zet een klaarliggende chat-opening om in Lisa's eerste bericht. Geeft het
+    bericht, of None als er niets (in deze taal) klaarligt of de chat al berichten heeft.
+    """
+    task = (
+        db.query(models.ApplicationTask)
+        .filter(models.ApplicationTask.application_id == app_id)
+        .with_for_update()
+        .first()
+    )
+    if task is None or not task.chat_opening:
+        db.rollback()
+        return None
+    if task.opening_language != language or _has_chat(db, app_id):
+        db.rollback()
+        return None
+    msg = models.RecruiterChatMessage(application_id=app_id, role="recruiter", content=task.chat_opening)
+    db.add(msg)
+    task.chat_opening = None
+    db.commit()
+    db.refresh(msg)
+    return msg
+
+
+def load_chat_opening(app_id: int, language: str) -> Optional[dict]:
+    """take_chat_opening met een eigen DB-sessie (vanuit de event loop via asyncio.to_thread)."""
+    from backend.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        msg = take_chat_opening(db, app_id, language)
+        return {"id": msg.id, "content": msg.content} if msg else None
+    except Exception as exc:
+        logger.warning("[opening] Ophalen chat-opening %d mislukt: %s", app_id, exc)
+        db.rollback()
+        return None
+    finally:
+        db.close()
+
@@ -0,0 +1,518 @@
+"""
+LLM gateway — één toegangspunt voor alle OpenAI-calls.
+
+Voorheen maakte elke module (en soms elk request) een eigen OpenAI-client aan,
+zonder timeouts of retries. Deze module:
+
+- deelt één HTTP connection pool (httpx) voor alle sync- resp. async-calls
+- zet per call een timeout (LLM_TIMEOUT, overschrijfbaar per call)
+- herhaalt tijdelijke fouten (timeouts, 429, 5xx) met exponentiële backoff
+  + jitter (LLM_MAX_RETRIES)
+- laat elke call eerst een slot halen bij llm_scheduler: prioriteit per
+  feature (live gesprekken vóór bulkwerk), eerlijk per tenant (werkgever) en
+  binnen het token-budget uit de rate-limit headers (LLM_MAX_CONCURRENCY)
+- kent één modelnaam-config (OPENAI_MODEL)
+- cachet responses op inhoud (zie llm_cache; cache=False voor creatieve calls)
+- registreert per call tokens, latency, cache-hit en fouten onder een
+  feature-naam (feature="lisa_chat", ...; zie llm_usage)
+
+Gebruik:
+    from backend.services import llm
+
+    if llm.is_enabled():
+        text = llm.chat([{"role": "user", "content": "..."}], max_tokens=200, feature="cv_rewrite")
+        data = llm.chat_json(messages)                 # response_format json_object
+        text = await llm.achat(messages)               # vanuit async code
+        async for delta in llm.astream(messages): ...  # token-streaming
+        text = llm.chat(messages, cache=False)         # altijd een nieuw antwoord
+        data = llm.chat_json(messages, feature="ranking", tenant=employer_id)  # bulk, per werkgever
+        mp3 = llm.speech("Hallo!", voice="nova")       # TTS
+        for chunk in llm.speech_stream("Hallo!"): ...  # TTS, chunk voor chunk
+        vecs = llm.embed(["tekst 1", "tekst 2"])      # embeddings
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+import httpx
+import openai
+from openai import AsyncOpenAI, OpenAI
+
+from backend.services import llm_cache, llm_scheduler, llm_usage
+
+logger = logging.getLogger(__name__)
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Andere OpenAI-compatibele endpoint, bv. de lokale stand-in scripts/fake_openai.py
+OPENAI_BASE_URL = (os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1").rstrip("/")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+OPENAI_TTS_MODEL = os.getenv("OPENAI_TTS_MODEL", "tts-1")
+OPENAI_EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "32"))
+
+RETRY_BASE_DELAY = 0.5   # seconden; verdubbelt per poging
+RETRY_MAX_DELAY = 8.0
+
+_RETRYABLE = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class LLMUnavailable(RuntimeError):
+    """OPENAI_API_KEY ontbreekt — de aanroeper kiest zelf een fallback."""
+
+
+# ── Clients (lazy, gedeeld) ───────────────────────────────────────────────────
+
+_client: Optional[OpenAI] = None
+_async_client: Optional[AsyncOpenAI] = None
+_client_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    return bool(OPENAI_API_KEY)
+
+
+def api_url(path: str) -> str:
+    """Volledige URL voor endpoints die niet via de SDK gaan (realtime client_secrets, models)."""
+    return f"{OPENAI_BASE_URL}/{path.lstrip('/')}"
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_POOL_SIZE,
+        max_keepalive_connections=LLM_POOL_SIZE,
+        keepalive_expiry=60,
+    )
+
+
+def _observe(response: httpx.Response) -> None:
+    llm_scheduler.observe(response.headers)
+
+
+async def _aobserve(response: httpx.Response) -> None:
+    llm_scheduler.observe(response.headers)
+
+
+def get_client() -> OpenAI:
+    """Gedeelde sync-client. Retries doen we zelf (met jitter), dus max_retries=0."""
+    global _client
+    if not is_enabled():
+        raise LLMUnavailable("OPENAI_API_KEY niet geconfigureerd")
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OpenAI(
+                    api_key=OPENAI_API_KEY,
+                    base_url=OPENAI_BASE_URL,
+                    timeout=LLM_TIMEOUT,
+                    max_retries=0,
+                    http_client=httpx.Client(
+                        limits=_limits(), timeout=LLM_TIMEOUT, event_hooks={"response": [_observe]}
+                    ),
+                )
+    return _client
+
+
+def get_async_client() -> AsyncOpenAI:
+    global _async_client
+    if not is_enabled():
+        raise LLMUnavailable("OPENAI_API_KEY niet geconfigureerd")
+    if _async_client is None:
+        _async_client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            base_url=OPENAI_BASE_URL,
+            timeout=LLM_TIMEOUT,
+            max_retries=0,
+            http_client=httpx.AsyncClient(
+                limits=_limits(), timeout=LLM_TIMEOUT, event_hooks={"response": [_aobserve]}
+            ),
+        )
+    return _async_client
+
+
+# ── Retry ─────────────────────────────────────────────────────────────────────
+
+def _backoff(attempt: int) -> float:
+    """Full jitter: willekeurig tussen 0 en base·2^attempt (gemaximeerd)."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+def _params(
+    messages: List[Dict[str, Any]],
+    model: Optional[str],
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+    response_format: Optional[dict],
+    timeout: Optional[float],
+) -> Dict[str, Any]:
+    params: Dict[str, Any] = {
+        "model": model or OPENAI_MODEL,
+        "messages": messages,
+        "timeout": timeout or LLM_TIMEOUT,
+    }
+    if temperature is not None:
+        params["temperature"] = temperature
+    if max_tokens is not None:
+        params["max_tokens"] = max_tokens
+    if response_format is not None:
+        params["response_format"] = response_format
+    return params
+
+
+def _cache_key(params: Dict[str, Any]) -> str:
+    return llm_cache.make_key(
+        params["model"],
+        params["messages"],
+        params.get("temperature"),
+        params.get("max_tokens"),
+        params.get("response_format"),
+    )
+
+
+def _cacheable(params: Dict[str, Any], text: str) -> bool:
+    """Lege of (bij json_object) ongeldige responses niet cachen — anders blijft de fout hangen."""
+    if not text:
+        return False
+    if (params.get("response_format") or {}).get("type") == "json_object":
+        try:
+            json.loads(text)
+        except ValueError:
+            return False
+    return True
+
+
+def _estimate_tokens(messages: List[Dict[str, Any]], max_tokens: Optional[int]) -> int:
+    """Grove schatting voor het token-budget: ~4 tekens per token plus de maximale output."""
+    chars = sum(len(m.get("content") or "") if isinstance(m.get("content"), str) else 0 for m in messages)
+    return chars // 4 + (max_tokens or 512)
+
+
+def _slot(feature: str, priority: Optional[str], tenant, tokens: int = 0) -> Dict[str, Any]:
+    return {"feature": feature, "priority": priority, "tenant": tenant, "tokens": tokens}
+
+
+def _with_retry(fn, retries: Optional[int] = None, *, slot: Dict[str, Any]):
+    attempts = (LLM_MAX_RETRIES if retries is None else retries) + 1
+    for attempt in range(attempts):
+        try:
+            with llm_scheduler.slot(**slot):
+                return fn()
+        except _RETRYABLE as exc:
+            if attempt == attempts - 1:
+                raise
+            delay = _backoff(attempt)
+            logger.warning("[llm] %s — retry %d over %.2fs", type(exc).__name__, attempt + 1, delay)
+            time.sleep(delay)
+
+
+async def _awith_retry(fn, retries: Optional[int] = None, slot: Optional[Dict[str, Any]] = None):
+    """Async retry; slot=None betekent dat de aanroeper het scheduler-slot al vasthoudt."""
+    attempts = (LLM_MAX_RETRIES if retries is None else retries) + 1
+    for attempt in range(attempts):
+        try:
+            if slot is None:
+                return await fn()
+            async with llm_scheduler.aslot(**slot):
+                return await fn()
+        except _RETRYABLE as exc:
+            if attempt == attempts - 1:
+                raise
+            delay = _backoff(attempt)
+            logger.warning("[llm] %s — retry %d over %.2fs", type(exc).__name__, attempt + 1, delay)
+            await asyncio.sleep(delay)
+
+
+# ── Telemetrie ────────────────────────────────────────────────────────────────
+
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
+
+
+def _record_usage(feature: str, model: str, started: float, usage=None, **kwargs) -> None:
+    """Meld een call bij llm_usage; usage = het `usage`-object uit de response (of None)."""
+    llm_usage.record(
+        feature,
+        model,
+        _elapsed_ms(started),
+        prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        **kwargs,
+    )
+
+
+# ── Publieke API ──────────────────────────────────────────────────────────────
+
+def chat(
+    messages: List[Dict[str, Any]],
+    *,
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    response_format: Optional[dict] = None,
+    timeout: Optional[float] = None,
+    retries: Optional[int] = None,
+    cache: bool = True,
+    feature: str = "other",
+    priority: Optional[str] = None,
+    tenant: Any = None,
+) -> str:
+    """
+    Chat completion; geeft de (gestripte) tekst van het eerste antwoord terug.
+    cache=False slaat de response-cache over (chatbeurten, creatieve teksten).
+    feature = naam waaronder tokens/latency/kosten worden geteld; bepaalt ook
+    de prioriteit bij de scheduler (priority= overschrijft die).
+    tenant = werkgever-id voor eerlijke verdeling van bulkwerk tussen klanten.
+    """
+    client = get_client()
+    params = _params(messages, model, temperature, max_tokens, response_format, timeout)
+    started = time.perf_counter()
+    key = _cache_key(params) if cache else None
+    if key:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            _record_usage(feature, params["model"], started, cache_hit=True)
+            return cached
+
+    try:
+        resp = _with_retry(
+            lambda: client.chat.completions.create(**params),
+            retries,
+            slot=_slot(feature, priority, tenant, _estimate_tokens(messages, max_tokens)),
+        )
+    except Exception as exc:
+        _record_usage(feature, params["model"], started, error=type(exc).__name__)
+        raise
+    _record_usage(feature, params["model"], started, resp.usage)
+    text = (resp.choices[0].message.content or "").strip()
+    if key and _cacheable(params, text):
+        llm_cache.put(key, params["model"], text)
+    return text
+
+
+def chat_json(messages: List[Dict[str, Any]], **kwargs) -> dict:
+    """Chat completion met response_format json_object; geeft de geparste dict terug."""
+    kwargs.setdefault("response_format", {"type": "json_object"})
+    return json.loads(chat(messages, **kwargs))
+
+
+async def achat(
+    messages: List[Dict[str, Any]],
+    *,
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    response_format: Optional[dict] = None,
+    timeout: Optional[float] = None,
+    retries: Optional[int] = None,
+    cache: bool = True,
+    feature: str = "other",
+    priority: Optional[str] = None,
+    tenant: Any = None,
+) -> str:
+    """Async variant van chat() — blokkeert de event loop niet (cache-DB via een thread)."""
+    client = get_async_client()
+    params = _params(messages, model, temperature, max_tokens, response_format, timeout)
+    started = time.perf_counter()
+    key = _cache_key(params) if cache else None
+    if key:
+        cached = await asyncio.to_thread(llm_cache.get, key)
+        if cached is not None:
+            _record_usage(feature, params["model"], started, cache_hit=True)
+            return cached
+
+    try:
+        resp = await _awith_retry(
+            lambda: client.chat.completions.create(**params),
+            retries,
+            slot=_slot(feature, priority, tenant, _estimate_tokens(messages, max_tokens)),
+        )
+    except Exception as exc:
+        _record_usage(feature, params["model"], started, error=type(exc).__name__)
+        raise
+    _record_usage(feature, params["model"], started, resp.usage)
+    text = (resp.choices[0].message.content or "").strip()
+    if key and _cacheable(params, text):
+        await asyncio.to_thread(llm_cache.put, key, params["model"], text)
+    return text
+
+
+async def achat_json(messages: List[Dict[str, Any]], **kwargs) -> dict:
+    kwargs.setdefault("response_format", {"type": "json_object"})
+    return json.loads(await achat(messages, **kwargs))
+
+
+async def astream(
+    messages: List[Dict[str, Any]],
+    *,
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    response_format: Optional[dict] = None,
+    timeout: Optional[float] = None,
+    retries: Optional[int] = None,
+    feature: str = "other",
+    priority: Optional[str] = None,
+    tenant: Any = None,
+) -> AsyncIterator[str]:
+    """
+    Streaming chat completion: yieldt tekst-delta's zodra ze binnenkomen.
+    Retries alleen bij het openen van de stream (daarna is er al tekst
+    verstuurd). Nooit gecachet. Het scheduler-slot blijft bezet van openen
+    tot de laatste chunk. Token-usage komt uit de laatste chunk (include_usage);
+    bij een afgebroken stream ontbreekt die.
+    """
+    client = get_async_client()
+    params = _params(messages, model, temperature, max_tokens, response_format, timeout)
+    started = time.perf_counter()
+    async with llm_scheduler.aslot(
+        feature, priority=priority, tenant=tenant, tokens=_estimate_tokens(messages, max_tokens)
+    ):
+        try:
+            stream = await _awith_retry(
+                lambda: client.chat.completions.create(
+                    stream=True, stream_options={"include_usage": True}, **params
+                ),
+                retries,
+            )
+        except Exception as exc:
+            _record_usage(feature, params["model"], started, error=type(exc).__name__)
+            raise
+        usage = None
+        error = None
+        try:
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as exc:
+            error = type(exc).__name__
+            raise
+        finally:
+            _record_usage(feature, params["model"], started, usage, error=error)
+            await stream.close()
+
+
+def speech(
+    text: str,
+    *,
+    voice: str = "nova",
+    speed: float = 1.0,
+    model: Optional[str] = None,
+    response_format: str = "mp3",
+    timeout: Optional[float] = None,
+    feature: str = "tts",
+    priority: Optional[str] = None,
+    tenant: Any = None,
+) -> bytes:
+    """OpenAI TTS; geeft de audio-bytes terug (kosten per teken)."""
+    client = get_client()
+    model = model or OPENAI_TTS_MODEL
+    started = time.perf_counter()
+    try:
+        resp = _with_retry(lambda: client.audio.speech.create(
+            model=model,
+            voice=voice,
+            input=text,
+            speed=speed,
+            response_format=response_format,
+            timeout=timeout or LLM_TIMEOUT,
+        ), slot=_slot(feature, priority, tenant))
+    except Exception as exc:
+        _record_usage(feature, model, started, characters=len(text), error=type(exc).__name__)
+        raise
+    _record_usage(feature, model, started, characters=len(text))
+    return resp.content
+
+
+def speech_stream(
+    text: str,
+    *,
+    voice: str = "nova",
+    speed: float = 1.0,
+    model: Optional[str] = None,
+    response_format: str = "mp3",
+    timeout: Optional[float] = None,
+    retries: Optional[int] = None,
+    chunk_size: int = 4096,
+    feature: str = "tts",
+    priority: Optional[str] = None,
+    tenant: Any = None,
+) -> Iterator[bytes]:
+    """
+    Streaming TTS: yieldt audio-chunks zodra OpenAI ze levert. Net als
+    astream() alleen retries zolang er nog niets verstuurd is; het
+    scheduler-slot blijft bezet zolang de stream loopt.
+    """
+    client = get_client()
+    model = model or OPENAI_TTS_MODEL
+    attempts = (LLM_MAX_RETRIES if retries is None else retries) + 1
+    started = time.perf_counter()
+    error = None
+    try:
+        for attempt in range(attempts):
+            sent = False
+            try:
+                with llm_scheduler.slot(feature, priority=priority, tenant=tenant), \
+                        client.audio.speech.with_streaming_response.create(
+                    model=model,
+                    voice=voice,
+                    input=text,
+                    speed=speed,
+                    response_format=response_format,
+                    timeout=timeout or LLM_TIMEOUT,
+                ) as resp:
+                    for chunk in resp.iter_bytes(chunk_size):
+                        sent = True
+                        yield chunk
+                return
+            except _RETRYABLE as exc:
+                if sent or attempt == attempts - 1:
+                    raise
+                delay = _backoff(attempt)
+                logger.warning("[llm] %s — retry %d over %.2fs", type(exc).__name__, attempt + 1, delay)
+                time.sleep(delay)
+    except Exception as exc:
+        error = type(exc).__name__
+        raise
+    finally:
+        _record_usage(feature, model, started, characters=len(text), error=error)
+
+
+def embed(
+    texts: List[str],
+    *,
+    model: Optional[str] = None,
+    timeout: Optional[float] = None,
+    feature: str = "embeddings",
+    priority: Optional[str] = None,
+    tenant: Any = None,
+) -> List[List[float]]:
+    """Embeddings voor een batch teksten (zelfde volgorde als de input)."""
+    client = get_client()
+    model = model or OPENAI_EMBEDDING_MODEL
+    started = time.perf_counter()
+    try:
+        resp = _with_retry(lambda: client.embeddings.create(
+            model=model,
+            input=texts,
+            timeout=timeout or LLM_TIMEOUT,
+        ), slot=_slot(feature, priority, tenant, sum(len(t) for t in texts) // 4))
+    except Exception as exc:
+        _record_usage(feature, model, started, error=type(exc).__name__)
+        raise
+    _record_usage(feature, model, started, resp.usage)
+    return [item.embedding for item in sorted(resp.data, key=lambda d: d.index)]
@@ -0,0 +1,239 @@
+"""
+Content-addressed cache voor LLM-responses.
+
+Dezelfde prompt (zelfde CV tegen dezelfde vacature, dezelfde scraper-tekst,
+dezelfde motivatiebrief-aanvraag) werd steeds opnieuw naar OpenAI gestuurd.
+De sleutel is een sha256 over (model, messages, temperature, max_tokens,
+response_format); de response staat in twee lagen:
+
+1. in-memory LRU per proces (LLM_CACHE_MEMORY_ENTRIES) — microseconden
+2. tabel llm_cache (gedeeld tussen workers/herstarts) — milliseconden
+
+Rijen verlopen na LLM_CACHE_TTL_HOURS. Boven LLM_CACHE_MAX_ENTRIES worden de
+langst niet-gebruikte rijen (last_hit_at) opgeruimd.
+
+Creatieve calls (chatbeurten, vacature genereren) zetten cache=False in
+llm.chat(). Fouten in de cache breken nooit een LLM-call: bij DB-problemen
+gaat de call gewoon door naar OpenAI.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from backend import models
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+LLM_CACHE_TTL_HOURS = int(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "512"))
+
+EVICT_EVERY = 200  # na zoveel nieuwe rijen draait een opruimronde
+
+_memory: "OrderedDict[str, tuple]" = OrderedDict()  # key → (response, opgeslagen_op)
+_lock = threading.Lock()
+
+_stats: Dict[str, int] = {
+    "memory_hits": 0,
+    "db_hits": 0,
+    "misses": 0,
+    "stores": 0,
+    "evicted": 0,
+    "errors": 0,
+}
+
+
+def _incr(key: str, n: int = 1) -> None:
+    with _lock:
+        _stats[key] += n
+
+
+def make_key(
+    model: str,
+    messages: Any,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    response_format: Optional[dict] = None,
+) -> str:
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "response_format": response_format,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ── In-memory laag ────────────────────────────────────────────────────────────
+
+def _memory_get(key: str) -> Optional[str]:
+    with _lock:
+        entry = _memory.get(key)
+        if entry is None:
+            return None
+        response, stored_at = entry
+        if time.time() - stored_at > LLM_CACHE_TTL_HOURS * 3600:
+            del _memory[key]
+            return None
+        _memory.move_to_end(key)
+        return response
+
+
+def _memory_put(key: str, response: str, stored_at: Optional[float] = None) -> None:
+    with _lock:
+        _memory[key] = (response, stored_at or time.time())
+        _memory.move_to_end(key)
+        while len(_memory) > LLM_CACHE_MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+
+
+# ── DB laag ───────────────────────────────────────────────────────────────────
+
+def _db_get(key: str) -> Optional[str]:
+    from backend.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        row = db.query(models.LLMCacheEntry).filter(models.LLMCacheEntry.key == key).first()
+        if row is None:
+            return None
+        created = row.created_at
+        if created is not None and created.tzinfo is None:
+            created = created.replace(tzinfo=timezone.utc)
+        now = datetime.now(timezone.utc)
+        if created is not None and created < now - timedelta(hours=LLM_CACHE_TTL_HOURS):
+            # Verlopen: direct weg, anders botst de nieuwe response in _db_put op de unieke key
+            db.delete(row)
+            db.commit()
+            return None
+        row.hits = (row.hits or 0) + 1
+        row.last_hit_at = now
+        db.commit()
+        _memory_put(key, row.response, created.timestamp() if created else None)
+        return row.response
+    finally:
+        db.close()
+
+
+def _db_put(key: str, model: str, response: str) -> None:
+    from backend.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        db.add(models.LLMCacheEntry(
+            key=key,
+            model=model,
+            response=response,
+            hits=0,
+            last_hit_at=datetime.now(timezone.utc),
+        ))
+        db.commit()
+    except IntegrityError:
+        # Parallelle call met dezelfde prompt was ons voor
+        db.rollback()
+        return
+    finally:
+        db.close()
+
+    with _lock:
+        _stats["stores"] += 1
+        run_eviction = _stats["stores"] % EVICT_EVERY == 0
+    if run_eviction:
+        evict()
+
+
+# ── Publieke API ──────────────────────────────────────────────────────────────
+
+def get(key: str) -> Optional[str]:
+    """Cached response of None. Telt hits/misses mee in stats()."""
+    if not LLM_CACHE_ENABLED:
+        return None
+    response = _memory_get(key)
+    if response is not None:
+        _incr("memory_hits")
+        return response
+    try:
+        response = _db_get(key)
+    except Exception as exc:
+        logger.debug("[llm-cache] Lezen mislukt: %s", exc)
+        _incr("errors")
+        response = None
+    _incr("db_hits" if response is not None else "misses")
+    return response
+
+
+def put(key: str, model: str, response: str) -> None:
+    if not LLM_CACHE_ENABLED or not response:
+        return
+    _memory_put(key, response)
+    try:
+        _db_put(key, model, response)
+    except Exception as exc:
+        logger.debug("[llm-cache] Schrijven mislukt: %s", exc)
+        _incr("errors")
+
+
+def evict() -> int:
+    """Verwijder verlopen rijen en — boven LLM_CACHE_MAX_ENTRIES — de minst recent gebruikte."""
+    from backend.db import SessionLocal
+
+    db = SessionLocal()
+    removed = 0
+    try:
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=LLM_CACHE_TTL_HOURS)
+        removed += (
+            db.query(models.LLMCacheEntry)
+            .filter(models.LLMCacheEntry.created_at < cutoff)
+            .delete(synchronize_session=False)
+        )
+        excess = db.query(models.LLMCacheEntry).count() - LLM_CACHE_MAX_ENTRIES
+        if excess > 0:
+            ids = [
+                row.id
+                for row in db.query(models.LLMCacheEntry.id)
+                .order_by(models.LLMCacheEntry.last_hit_at.asc())
+                .limit(excess)
+                .all()
+            ]
+            removed += (
+                db.query(models.LLMCacheEntry)
+                .filter(models.LLMCacheEntry.id.in_(ids))
+                .delete(synchronize_session=False)
+            )
+        db.commit()
+    except Exception as exc:
+        logger.warning("[llm-cache] Opruimen mislukt: %s", exc)
+        db.rollback()
+    finally:
+        db.close()
+
+    if removed:
+        _incr("evicted", removed)
+        logger.info("[llm-cache] %d rijen opgeruimd", removed)
+    return removed
+
+
+def stats() -> dict:
+    with _lock:
+        data = dict(_stats)
+        data["memory_entries"] = len(_memory)
+    lookups = data["memory_hits"] + data["db_hits"] + data["misses"]
+    data["hit_rate"] = round((data["memory_hits"] + data["db_hits"]) / lookups, 3) if lookups else None
+    data["enabled"] = LLM_CACHE_ENABLED
+    return data
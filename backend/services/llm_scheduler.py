@@ -0,0 +1,304 @@
+"""
+Prioriteits-scheduler voor OpenAI-calls.
+
+Live gesprekken (Lisa-chat, interviewantwoorden) delen dezelfde OpenAI
+rate limit als bulkwerk op de achtergrond (scrape-verrijking, ranking,
+transcript-scoring). Eén bulkjob kon live gesprekken merkbaar vertragen.
+Elke call in llm.py vraagt daarom eerst een slot aan bij deze scheduler:
+
+- prioriteitsklassen: interactive > standard > background; de klasse volgt uit
+  de feature-naam (FEATURE_PRIORITY), per call te overschrijven met priority=
+- per klasse een maximum aan gelijktijdige calls (LLM_STANDARD_CONCURRENCY,
+  LLM_BACKGROUND_CONCURRENCY); totaal nooit meer dan LLM_MAX_CONCURRENCY
+- background wacht zolang er interactieve calls in de rij staan of er al
+  LLM_INTERACTIVE_BUSY interactieve calls lopen
+- token-per-minuut budget uit de x-ratelimit-*-tokens headers van OpenAI:
+  background laat LLM_TPM_BACKGROUND_RESERVE van het budget vrij, standard
+  LLM_TPM_STANDARD_RESERVE; interactive mag het budget opmaken
+- eerlijke verdeling per tenant (werkgever): binnen een klasse gaan de
+  wachtenden round-robin per tenant, zodat de bulk-ranking van één klant
+  die van een ander niet uithongert
+
+Een lopende HTTP-call wordt niet afgebroken; "voorrang" betekent dat
+wachtend achtergrondwerk pas een slot krijgt als het interactief rustig is.
+
+Gebruik (alleen vanuit llm.py):
+    with llm_scheduler.slot("ranking", tenant=employer_id, tokens=1500): ...
+    async with llm_scheduler.aslot("lisa_chat", tokens=800): ...
+"""
+
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+STANDARD = "standard"
+BACKGROUND = "background"
+PRIORITIES = (INTERACTIVE, STANDARD, BACKGROUND)
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_STANDARD_CONCURRENCY = int(os.getenv("LLM_STANDARD_CONCURRENCY", "12"))
+LLM_BACKGROUND_CONCURRENCY = int(os.getenv("LLM_BACKGROUND_CONCURRENCY", "4"))
+LLM_INTERACTIVE_BUSY = int(os.getenv("LLM_INTERACTIVE_BUSY", str(max(1, LLM_MAX_CONCURRENCY // 2))))
+LLM_TPM_BACKGROUND_RESERVE = float(os.getenv("LLM_TPM_BACKGROUND_RESERVE", "0.25"))
+LLM_TPM_STANDARD_RESERVE = float(os.getenv("LLM_TPM_STANDARD_RESERVE", "0.05"))
+
+FEATURE_PRIORITY: Dict[str, str] = {
+    "lisa_chat": INTERACTIVE,
+    "virtual_interview": INTERACTIVE,
+    "tts": INTERACTIVE,
+    "enrichment": BACKGROUND,
+    "ranking": BACKGROUND,
+    "interview_scoring": BACKGROUND,
+    "lisa_evaluation": BACKGROUND,
+    "lisa_opening": BACKGROUND,
+    "cv_digest": BACKGROUND,
+    "conversation_summary": BACKGROUND,
+    "tts_pregenerate": BACKGROUND,
+}
+
+_CAPS = {
+    INTERACTIVE: LLM_MAX_CONCURRENCY,
+    STANDARD: LLM_STANDARD_CONCURRENCY,
+    BACKGROUND: LLM_BACKGROUND_CONCURRENCY,
+}
+_RESERVE = {
+    INTERACTIVE: 0.0,
+    STANDARD: LLM_TPM_STANDARD_RESERVE,
+    BACKGROUND: LLM_TPM_BACKGROUND_RESERVE,
+}
+
+
+class _Waiter:
+    __slots__ = ("priority", "tenant", "tokens", "grant", "granted")
+
+    def __init__(self, priority: str, tenant, tokens: int, grant: Callable[[], None]):
+        self.priority = priority
+        self.tenant = tenant
+        self.tokens = tokens
+        self.grant = grant
+        self.granted = False
+
+
+_lock = threading.Lock()
+# Per klasse: tenant → wachtrij; de volgorde van de tenants is de round-robin
+_queues: Dict[str, "OrderedDict[object, Deque[_Waiter]]"] = {p: OrderedDict() for p in PRIORITIES}
+_running: Dict[str, int] = {p: 0 for p in PRIORITIES}
+_total = 0
+_budget = {"limit": 0, "remaining": 0, "reset_at": 0.0}
+_timer: Optional[threading.Timer] = None
+
+
+def classify(feature: str, priority: Optional[str] = None) -> str:
+    if priority in PRIORITIES:
+        return priority
+    return FEATURE_PRIORITY.get(feature, STANDARD)
+
+
+# ── Token-budget ──────────────────────────────────────────────────────────────
+
+_DURATION = re.compile(r"([\d.]+)(ms|h|m|s)")
+_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def _parse_reset(value: str) -> float:
+    """OpenAI-duur als "6m0s", "1.5s" of "20ms" → seconden."""
+    return sum(float(n) * _UNITS[unit] for n, unit in _DURATION.findall(value or ""))
+
+
+def _remaining_locked(now: float) -> Optional[int]:
+    """Resterende tokens in dit venster; None als er (nog) geen headers gezien zijn."""
+    if not _budget["limit"]:
+        return None
+    if now >= _budget["reset_at"]:
+        return _budget["limit"]
+    return _budget["remaining"]
+
+
+def observe(headers) -> None:
+    """Werk het budget bij met de rate-limit headers van een OpenAI-response (httpx event hook)."""
+    limit = headers.get("x-ratelimit-limit-tokens")
+    remaining = headers.get("x-ratelimit-remaining-tokens")
+    if not limit or remaining is None:
+        return
+    try:
+        limit_i, remaining_i = int(limit), int(remaining)
+    except ValueError:
+        return
+    reset = _parse_reset(headers.get("x-ratelimit-reset-tokens", ""))
+    with _lock:
+        _budget["limit"] = limit_i
+        _budget["remaining"] = remaining_i
+        _budget["reset_at"] = time.monotonic() + reset
+        _dispatch_locked()
+
+
+def _budget_allows_locked(priority: str, tokens: int, now: float) -> bool:
+    remaining = _remaining_locked(now)
+    if remaining is None:
+        return True
+    if priority == INTERACTIVE:
+        return remaining > 0
+    floor = _budget["limit"] * _RESERVE[priority]
+    # Een call groter dan het hele venster moet na een reset alsnog door kunnen
+    return remaining - min(tokens, _budget["limit"] - floor) >= floor
+
+
+def _schedule_refill_locked(now: float) -> None:
+    """Probeer opnieuw zodra het tokenvenster reset (voor wachtenden die op budget wachten)."""
+    global _timer
+    if _timer is not None:
+        return
+    _timer = threading.Timer(max(0.05, _budget["reset_at"] - now), _refill)
+    _timer.daemon = True
+    _timer.start()
+
+
+def _refill() -> None:
+    global _timer
+    with _lock:
+        _timer = None
+        _dispatch_locked()
+
+
+# ── Toewijzen ─────────────────────────────────────────────────────────────────
+
+def _class_open_locked(priority: str) -> bool:
+    if _running[priority] >= _CAPS[priority]:
+        return False
+    if priority == BACKGROUND:
+        if _queues[INTERACTIVE] or _queues[STANDARD]:
+            return False
+        if _running[INTERACTIVE] >= LLM_INTERACTIVE_BUSY:
+            return False
+    return True
+
+
+def _dispatch_locked() -> None:
+    global _total
+    now = time.monotonic()
+    while _total < LLM_MAX_CONCURRENCY:
+        waiter = None
+        budget_blocked = False
+        for priority in PRIORITIES:
+            queues = _queues[priority]
+            if not queues or not _class_open_locked(priority):
+                continue
+            tenant, queue = next(iter(queues.items()))
+            if not _budget_allows_locked(priority, queue[0].tokens, now):
+                budget_blocked = True
+                continue
+            waiter = queue.popleft()
+            if queue:
+                queues.move_to_end(tenant)
+            else:
+                del queues[tenant]
+            break
+        if waiter is None:
+            if budget_blocked:
+                _schedule_refill_locked(now)
+            return
+        waiter.granted = True
+        _running[waiter.priority] += 1
+        _total += 1
+        if _budget["limit"]:
+            # Schatting tot de volgende response-headers; na een reset begint een nieuw venster
+            _budget["remaining"] = max(0, (_remaining_locked(now) or 0) - waiter.tokens)
+            if now >= _budget["reset_at"]:
+                _budget["reset_at"] = now + 60.0
+        waiter.grant()
+
+
+def _enqueue(waiter: _Waiter) -> None:
+    with _lock:
+        _queues[waiter.priority].setdefault(waiter.tenant, deque()).append(waiter)
+        _dispatch_locked()
+
+
+def _release(priority: str) -> None:
+    global _total
+    with _lock:
+        _running[priority] -= 1
+        _total -= 1
+        _dispatch_locked()
+
+
+def _abandon(waiter: _Waiter) -> None:
+    """Wachtende geeft op (annulering): uit de rij halen, of een al toegewezen slot teruggeven."""
+    with _lock:
+        granted = waiter.granted
+        if not granted:
+            queues = _queues[waiter.priority]
+            queue = queues.get(waiter.tenant)
+            if queue is not None and waiter in queue:
+                queue.remove(waiter)
+                if not queue:
+                    del queues[waiter.tenant]
+    if granted:
+        _release(waiter.priority)
+
+
+# ── Publieke API ──────────────────────────────────────────────────────────────
+
+@contextmanager
+def slot(feature: str, *, priority: Optional[str] = None, tenant=None, tokens: int = 0):
+    """Blokkeer tot er een slot vrij is voor deze call (sync code en threads)."""
+    event = threading.Event()
+    waiter = _Waiter(classify(feature, priority), tenant, tokens, event.set)
+    _enqueue(waiter)
+    try:
+        event.wait()
+    except BaseException:
+        _abandon(waiter)
+        raise
+    try:
+        yield
+    finally:
+        _release(waiter.priority)
+
+
+@asynccontextmanager
+async def aslot(feature: str, *, priority: Optional[str] = None, tenant=None, tokens: int = 0):
+    """Async variant van slot(); wachten blokkeert de event loop niet."""
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+
+    def _resolve() -> None:
+        if not fut.done():
+            fut.set_result(None)
+
+    waiter = _Waiter(classify(feature, priority), tenant, tokens, lambda: loop.call_soon_threadsafe(_resolve))
+    _enqueue(waiter)
+    try:
+        await fut
+    except BaseException:
+        _abandon(waiter)
+        raise
+    try:
+        yield
+    finally:
+        _release(waiter.priority)
+
+
+def stats() -> dict:
+    """Momentopname voor /admin: lopende en wachtende calls per klasse, token-budget."""
+    with _lock:
+        now = time.monotonic()
+        return {
+            "max_concurrency": LLM_MAX_CONCURRENCY,
+            "running": dict(_running),
+            "queued": {p: sum(len(q) for q in _queues[p].values()) for p in PRIORITIES},
+            "queued_tenants": {p: len(_queues[p]) for p in PRIORITIES},
+            "caps": dict(_CAPS),
+            "tokens_limit": _budget["limit"] or None,
+            "tokens_remaining": _remaining_locked(now),
+            "tokens_reset_in_s": round(max(0.0, _budget["reset_at"] - now), 2) if _budget["limit"] else None,
+        }
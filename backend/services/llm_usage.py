@@ -0,0 +1,287 @@
+"""
+LLM-telemetrie: tokens, latency, kosten en fouten per feature.
+
+Elke call via backend/services/llm.py meldt zich hier met record(): feature
+(wie roept aan: "lisa_chat", "apply_prescreen", ...), model, tokens uit
+`usage`, latency, cache-hit en foutklasse. Events worden in het geheugen per
+(dag, feature, model) opgeteld en periodiek (LLM_USAGE_FLUSH_SECONDS) in één
+transactie in de rollup-tabel llm_usage_daily bijgeschreven — de hot path
+van een LLM-call raakt de database dus nooit.
+
+Latency wordt als histogram met vaste buckets opgeslagen (LATENCY_BUCKETS_MS);
+p50/p95 zijn de bovengrens van de bucket waarin het percentiel valt. Zo zijn
+rijen van verschillende workers en dagen gewoon op te tellen. Cache-hits
+tellen mee in calls en hit-rate, niet in latency en kosten.
+
+Kosten: PRICES (USD per 1M tokens, TTS per 1M tekens), aan te vullen of te
+overschrijven met LLM_PRICES (JSON: {"model": [input, output]}).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend import models
+
+logger = logging.getLogger(__name__)
+
+LLM_USAGE_ENABLED = os.getenv("LLM_USAGE_ENABLED", "true").lower() not in ("0", "false", "no")
+LLM_USAGE_FLUSH_SECONDS = int(os.getenv("LLM_USAGE_FLUSH_SECONDS", "60"))
+
+# Bovengrenzen in ms; de laatste bucket is "langer dan 60s"
+LATENCY_BUCKETS_MS = [50, 100, 200, 350, 500, 750, 1000, 1500, 2000, 3000, 5000, 8000, 12000, 20000, 30000, 60000]
+
+# USD per 1M tokens (input, output); TTS: per 1M tekens (input, 0)
+PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "text-embedding-3-small": (0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.0),
+    "tts-1": (15.00, 0.0),
+    "tts-1-hd": (30.00, 0.0),
+}
+try:
+    PRICES.update({k: tuple(v) for k, v in json.loads(os.getenv("LLM_PRICES", "") or "{}").items()})
+except (ValueError, TypeError, AttributeError):
+    logger.warning("[llm-usage] LLM_PRICES is geen geldige JSON — standaardprijzen gebruikt")
+
+
+def _new_bucket() -> dict:
+    return {
+        "calls": 0,
+        "cache_hits": 0,
+        "errors": 0,
+        "error_classes": defaultdict(int),
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "characters": 0,
+        "cost_usd": 0.0,
+        "latency_ms_total": 0.0,
+        "latency_hist": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+    }
+
+
+_pending: Dict[Tuple[date, str, str], dict] = defaultdict(_new_bucket)
+_lock = threading.Lock()
+
+
+def price_for(model: str) -> Tuple[float, float]:
+    """Prijs voor een model; gedateerde namen (gpt-4o-mini-2024-07-18) vallen terug op de langste prefix."""
+    if model in PRICES:
+        return PRICES[model]
+    matches = [name for name in PRICES if model.startswith(name)]
+    return PRICES[max(matches, key=len)] if matches else (0.0, 0.0)
+
+
+def cost_of(model: str, prompt_tokens: int = 0, completion_tokens: int = 0, characters: int = 0) -> float:
+    price_in, price_out = price_for(model)
+    return ((prompt_tokens + characters) * price_in + completion_tokens * price_out) / 1_000_000
+
+
+def _bucket_index(latency_ms: float) -> int:
+    for i, bound in enumerate(LATENCY_BUCKETS_MS):
+        if latency_ms <= bound:
+            return i
+    return len(LATENCY_BUCKETS_MS)
+
+
+def record(
+    feature: str,
+    model: str,
+    latency_ms: float,
+    *,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    characters: int = 0,
+    cache_hit: bool = False,
+    error: Optional[str] = None,
+) -> None:
+    """Registreer één LLM-call (goedkoop: alleen een optelling in het geheugen)."""
+    if not LLM_USAGE_ENABLED:
+        return
+    key = (datetime.now(timezone.utc).date(), feature or "other", model or "onbekend")
+    with _lock:
+        b = _pending[key]
+        b["calls"] += 1
+        b["cache_hits"] += int(cache_hit)
+        if error:
+            b["errors"] += 1
+            b["error_classes"][error] += 1
+        b["prompt_tokens"] += prompt_tokens
+        b["completion_tokens"] += completion_tokens
+        b["characters"] += characters
+        if not cache_hit:
+            # Latency en kosten alleen voor echte API-calls — cache-hits zouden p50 flatteren
+            b["cost_usd"] += cost_of(model, prompt_tokens, completion_tokens, characters)
+            b["latency_ms_total"] += latency_ms
+            b["latency_hist"][_bucket_index(latency_ms)] += 1
+
+
+def _merge_json_counts(raw: Optional[str], extra: dict) -> str:
+    counts = json.loads(raw) if raw else {}
+    for name, n in extra.items():
+        counts[name] = counts.get(name, 0) + n
+    return json.dumps(counts)
+
+
+def _add_hist(a: List[int], b: List[int]) -> List[int]:
+    size = max(len(a), len(b))
+    return [x + y for x, y in zip(a + [0] * (size - len(a)), b + [0] * (size - len(b)))]
+
+
+def _write(db: Session, batch: Dict[Tuple[date, str, str], dict]) -> None:
+    for (day, feature, model), b in batch.items():
+        row = (
+            db.query(models.LLMUsageDaily)
+            .filter(
+                models.LLMUsageDaily.day == day,
+                models.LLMUsageDaily.feature == feature,
+                models.LLMUsageDaily.model == model,
+            )
+            .with_for_update()
+            .first()
+        )
+        if row is None:
+            row = models.LLMUsageDaily(
+                day=day, feature=feature, model=model,
+                calls=0, cache_hits=0, errors=0, prompt_tokens=0, completion_tokens=0,
+                characters=0, cost_usd=0.0, latency_ms_total=0.0,
+            )
+            db.add(row)
+        row.calls += b["calls"]
+        row.cache_hits += b["cache_hits"]
+        row.errors += b["errors"]
+        row.prompt_tokens += b["prompt_tokens"]
+        row.completion_tokens += b["completion_tokens"]
+        row.characters += b["characters"]
+        row.cost_usd += b["cost_usd"]
+        row.latency_ms_total += b["latency_ms_total"]
+        if b["error_classes"]:
+            row.error_classes = _merge_json_counts(row.error_classes, b["error_classes"])
+        row.latency_hist = json.dumps(_add_hist(json.loads(row.latency_hist or "[]"), b["latency_hist"]))
+    db.commit()
+
+
+def _requeue(batch: Dict[Tuple[date, str, str], dict]) -> None:
+    with _lock:
+        for key, b in batch.items():
+            target = _pending[key]
+            for field, value in b.items():
+                if field == "error_classes":
+                    for name, n in value.items():
+                        target["error_classes"][name] += n
+                elif field == "latency_hist":
+                    target["latency_hist"] = _add_hist(target["latency_hist"], value)
+                else:
+                    target[field] += value
+
+
+def flush() -> int:
+    """Schrijf de opgetelde events weg (één transactie). Bij een fout blijven ze staan voor de volgende ronde."""
+    from backend.db import SessionLocal
+
+    with _lock:
+        if not _pending:
+            return 0
+        batch = dict(_pending)
+        _pending.clear()
+
+    db = SessionLocal()
+    try:
+        _write(db, batch)
+    except IntegrityError:
+        # Andere worker maakte dezelfde (dag, feature, model)-rij net aan — volgende ronde is het een update
+        db.rollback()
+        _requeue(batch)
+        return 0
+    except Exception as exc:
+        logger.warning("[llm-usage] Wegschrijven mislukt: %s", exc)
+        db.rollback()
+        _requeue(batch)
+        return 0
+    finally:
+        db.close()
+    return sum(b["calls"] for b in batch.values())
+
+
+async def flush_loop() -> None:
+    """Achtergrondtaak (lifespan): periodiek flushen. Bij afsluiten flusht de lifespan zelf nog één keer."""
+    while True:
+        await asyncio.sleep(LLM_USAGE_FLUSH_SECONDS)
+        await asyncio.to_thread(flush)
+
+
+# ── Rapportage ────────────────────────────────────────────────────────────────
+
+def _percentile(hist: List[int], pct: float) -> Optional[int]:
+    total = sum(hist)
+    if not total:
+        return None
+    threshold = total * pct
+    seen = 0
+    for i, n in enumerate(hist):
+        seen += n
+        if seen >= threshold:
+            return LATENCY_BUCKETS_MS[min(i, len(LATENCY_BUCKETS_MS) - 1)]
+    return None
+
+
+def summary(db: Session, days: int = 7, feature: Optional[str] = None) -> List[dict]:
+    """Per dag en feature (modellen opgeteld): calls, hit-rate, fouten, tokens, kosten, p50/p95 latency."""
+    since = datetime.now(timezone.utc).date() - timedelta(days=max(days, 1) - 1)
+    query = db.query(models.LLMUsageDaily).filter(models.LLMUsageDaily.day >= since)
+    if feature:
+        query = query.filter(models.LLMUsageDaily.feature == feature)
+
+    groups: Dict[Tuple[date, str], dict] = {}
+    for row in query.all():
+        g = groups.setdefault((row.day, row.feature), {
+            "day": row.day.isoformat(),
+            "feature": row.feature,
+            "models": [],
+            "calls": 0,
+            "cache_hits": 0,
+            "errors": 0,
+            "error_classes": {},
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "cost_usd": 0.0,
+            "_latency_ms_total": 0.0,
+            "_hist": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+        })
+        g["models"].append(row.model)
+        g["calls"] += row.calls
+        g["cache_hits"] += row.cache_hits
+        g["errors"] += row.errors
+        for name, n in json.loads(row.error_classes or "{}").items():
+            g["error_classes"][name] = g["error_classes"].get(name, 0) + n
+        g["prompt_tokens"] += row.prompt_tokens
+        g["completion_tokens"] += row.completion_tokens
+        g["cost_usd"] += row.cost_usd
+        g["_latency_ms_total"] += row.latency_ms_total
+        g["_hist"] = _add_hist(g["_hist"], json.loads(row.latency_hist or "[]"))
+
+    out = []
+    for g in groups.values():
+        hist = g.pop("_hist")
+        latency_total = g.pop("_latency_ms_total")
+        g["cost_usd"] = round(g["cost_usd"], 4)
+        g["cache_hit_rate"] = round(g["cache_hits"] / g["calls"], 3) if g["calls"] else None
+        api_calls = g["calls"] - g["cache_hits"]
+        g["latency_ms_avg"] = round(latency_total / api_calls) if api_calls else None
+        g["latency_ms_p50"] = _percentile(hist, 0.50)
+        g["latency_ms_p95"] = _percentile(hist, 0.95)
+        out.append(g)
+    out.sort(key=lambda g: (g["day"], g["cost_usd"]), reverse=True)
+    return out
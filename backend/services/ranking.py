@@ -0,0 +1,217 @@
+"""
+Ranking-engine: veel CV's tegen één vacaturetekst scoren.
+
+Voorheen gingen alle CV's (tot 8000 tekens per stuk) in één prompt: bij 50+
+kandidaten liep de context vol, duurde het lang en maakte één kapotte JSON-
+response de hele ranking waardeloos. Nu:
+
+1. Pre-filter met de lokale lexicale score (lexical_match): duidelijk
+   irrelevante CV's gaan niet naar de LLM, en hooguit RANK_MAX_LLM kandidaten
+   (hoogste lexicale score eerst)
+2. De rest wordt in chunks verdeeld op een tokenbudget (RANK_CHUNK_TOKENS,
+   geschat als tekens / 4; CV's afgekapt op RANK_CV_CHARS)
+3. Chunks worden parallel gescoord in een begrensde worker pool
+   (RANK_CONCURRENCY) — de doorlooptijd hangt af van het aantal chunks per
+   worker, niet van het aantal kandidaten
+4. Mislukte chunks (API-fout, ongeldige JSON) worden gehalveerd en één keer
+   opnieuw geprobeerd; wat dan nog ontbreekt krijgt de lexicale score
+5. Scores worden genormaliseerd: geklemd op 0–100, alleen ids uit de eigen
+   chunk, gelijke scores gesorteerd op lexicale score
+
+Elke chunk gebruikt dezelfde absolute rubric, zodat scores tussen chunks
+vergelijkbaar zijn. Opslaan (één commit) doet de aanroeper.
+"""
+
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.services import lexical_match, llm
+
+logger = logging.getLogger(__name__)
+
+RANK_CONCURRENCY = int(os.getenv("RANK_CONCURRENCY", "4"))
+RANK_CHUNK_TOKENS = int(os.getenv("RANK_CHUNK_TOKENS", "6000"))
+RANK_MAX_LLM = int(os.getenv("RANK_MAX_LLM", "60"))
+
+RANK_CV_CHARS = 3000          # per CV in de prompt
+RANK_CHUNK_MAX = 8            # max. kandidaten per chunk, ook als het budget meer toelaat
+CHARS_PER_TOKEN = 4
+
+SYSTEM_PROMPT = (
+    "Je bent een STRENGE, kritische recruitment consultant. "
+    "Je beoordeelt kandidaten objectief op basis van hun CV en de vacaturetekst.\n\n"
+    "SCORINGSRICHTLIJNEN (wees STRENG):\n"
+    "- 0-20: Totaal geen relevante ervaring of opleiding\n"
+    "- 21-40: Minimale overlap — enkele overdraagbare vaardigheden maar geen directe ervaring\n"
+    "- 41-55: Gedeeltelijke match — enige relevante ervaring maar mist belangrijke vereisten\n"
+    "- 56-70: Redelijke match — heeft relevante ervaring maar niet alles\n"
+    "- 71-85: Goede match — voldoet aan de meeste vereisten\n"
+    "- 86-100: Uitstekende match — sterke directe ervaring\n\n"
+    "BELANGRIJK: Beoordeel op HARDE vaardigheden en RELEVANTE werkervaring, niet op soft skills. "
+    "Een CV uit een andere branche zonder relevante skills = MAX 35. "
+    "Geef alleen 70+ bij aantoonbaar relevante werkervaring. "
+    "Geef een matchscore en korte Nederlandse uitleg per kandidaat."
+)
+
+INSTRUCTIONS = (
+    "Geef je antwoord als geldig JSON-object met één key 'rankings', "
+    "die een array bevat van objecten met exact deze velden: "
+    "{'candidate_id': int, 'match_score': int, 'explanation': str}. "
+    "Beoordeel ELKE kandidaat uit de lijst. Gebruik Nederlandse uitleg."
+)
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def make_chunks(job_text: str, items: List[dict]) -> List[List[dict]]:
+    """Verdeel kandidaten over chunks die binnen RANK_CHUNK_TOKENS passen (vacaturetekst zit in elke chunk)."""
+    overhead = _estimate_tokens(SYSTEM_PROMPT + INSTRUCTIONS + job_text)
+    budget = max(RANK_CHUNK_TOKENS - overhead, 1)
+    chunks: List[List[dict]] = []
+    current: List[dict] = []
+    used = 0
+    for item in items:
+        cost = _estimate_tokens(item["cv_text"]) + 20
+        if current and (used + cost > budget or len(current) >= RANK_CHUNK_MAX):
+            chunks.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _score_chunk(job_text: str, chunk: List[dict], tenant=None) -> Dict[int, dict]:
+    """Eén LLM-call voor één chunk. {id: {"match_score", "explanation"}} — alleen ids uit deze chunk."""
+    payload = {
+        "job": job_text,
+        "candidates": [{"id": it["id"], "name": it.get("name") or f"Kandidaat {it['id']}", "cv_text": it["cv_text"]}
+                       for it in chunk],
+        "instructions": INSTRUCTIONS,
+    }
+    data = llm.chat_json(
+        [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": json.dumps(payload, ensure_ascii=False)},
+        ],
+        temperature=0.3,
+        feature="ranking",
+        tenant=tenant,
+    )
+    allowed = {it["id"] for it in chunk}
+    out: Dict[int, dict] = {}
+    for row in data.get("rankings", []):
+        try:
+            cid = int(row.get("candidate_id"))
+            score = int(row.get("match_score"))
+        except (TypeError, ValueError):
+            continue
+        if cid in allowed:
+            out[cid] = {"match_score": max(0, min(100, score)), "explanation": str(row.get("explanation") or "")}
+    if not out:
+        raise ValueError("Geen bruikbare rankings in AI-response")
+    return out
+
+
+def _run_chunks(
+    job_text: str,
+    chunks: List[List[dict]],
+    tenant=None,
+    on_chunk: Optional[Callable[[int], None]] = None,
+) -> Tuple[Dict[int, dict], List[List[dict]]]:
+    """Score chunks parallel. Geeft (scores, mislukte chunks) terug; on_chunk(n) na elke geslaagde chunk."""
+    scores: Dict[int, dict] = {}
+    failed: List[List[dict]] = []
+    if not chunks:
+        return scores, failed
+    with ThreadPoolExecutor(max_workers=min(RANK_CONCURRENCY, len(chunks))) as executor:
+        futures = {executor.submit(_score_chunk, job_text, chunk, tenant): chunk for chunk in chunks}
+        for fut in as_completed(futures):
+            try:
+                result = fut.result()
+            except Exception as exc:
+                logger.warning("[ranking] Chunk van %d kandidaten mislukt: %s", len(futures[fut]), exc)
+                failed.append(futures[fut])
+                continue
+            scores.update(result)
+            if on_chunk is not None:
+                on_chunk(len(result))
+    return scores, failed
+
+
+def _prompt_text(item: dict) -> str:
+    text = item.get("prompt_text")
+    if callable(text):
+        text = text()
+    return text or item["cv_text"]
+
+
+def rank(
+    job_text: str,
+    items: List[dict],
+    max_llm: Optional[int] = None,
+    tenant=None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> List[dict]:
+    """
+    Rangschik kandidaten voor één vacature.
+
+    items: [{"id": int, "cv_text": str, "name": optioneel, "prompt_text": optioneel}]
+    cv_text is de volledige tekst (lexicale score); prompt_text, bv. de CV-digest,
+    gaat in plaats daarvan naar de LLM. prompt_text mag ook een callable zijn:
+    die wordt alleen voor de shortlist aangeroepen (in de aanroepende thread).
+    Geeft [{"id", "match_score", "explanation", "lexical_score", "source"}] terug,
+    gesorteerd van beste naar minst goede kandidaat. source = "ai" | "lexical".
+    tenant: werkgever-id; de LLM-scheduler verdeelt bulk-ranking eerlijk per werkgever.
+    progress(gescoord, shortlist): na elke geslaagde chunk, vanuit de aanroepende thread.
+    """
+    if not items:
+        return []
+    max_llm = RANK_MAX_LLM if max_llm is None else max_llm
+
+    lexical = {it["id"]: lexical_match.score(it["cv_text"] or "", job_text) for it in items}
+
+    shortlist: List[dict] = []
+    if llm.is_enabled() and job_text.strip():
+        relevant = [it for it in items if (it["cv_text"] or "").strip() and not lexical[it["id"]].clearly_irrelevant]
+        relevant.sort(key=lambda it: lexical[it["id"]].score, reverse=True)
+        shortlist = [
+            dict(it, cv_text=_prompt_text(it)[:RANK_CV_CHARS]) for it in relevant[:max_llm]
+        ]
+
+    done = [0]
+
+    def _tick(n: int) -> None:
+        done[0] += n
+        if progress is not None:
+            progress(done[0], len(shortlist))
+
+    scores, failed = _run_chunks(job_text, make_chunks(job_text, shortlist), tenant, _tick)
+
+    # Alleen mislukte chunks opnieuw — gehalveerd, zodat één lastig CV de rest niet meetrekt
+    retry = [half for chunk in failed for half in (chunk[: len(chunk) // 2], chunk[len(chunk) // 2:]) if half]
+    if retry:
+        more, still_failed = _run_chunks(job_text, retry, tenant, _tick)
+        scores.update(more)
+        if still_failed:
+            logger.warning("[ranking] %d chunks definitief mislukt — lexicale score gebruikt", len(still_failed))
+
+    results = []
+    for it in items:
+        lex = lexical[it["id"]]
+        ai = scores.get(it["id"])
+        results.append({
+            "id": it["id"],
+            "match_score": ai["match_score"] if ai else lex.score,
+            "explanation": (ai["explanation"] if ai else "") or lex.explanation(),
+            "lexical_score": lex.score,
+            "source": "ai" if ai else "lexical",
+        })
+    results.sort(key=lambda r: (r["match_score"], r["lexical_score"]), reverse=True)
+    return results
@@ -0,0 +1,133 @@
+"""
+Vooraf aangemaakte OpenAI Realtime-sessies voor Lisa 2.0.
+
+Na de klik op "Start" deed /realtime-token de toegangs- en limietchecks,
+bouwde de context en de instructieprompt en wachtte dan blokkerend op
+/v1/realtime/client_secrets — de kandidaat keek al die tijd naar een
+laadscherm. Nu roept de interviewpagina bij het laden /realtime-prefetch aan:
+
+- de context (chat_context-cache) en de prompt worden dan al opgebouwd
+- het ephemeral token wordt in een achtergrondthread aangemaakt
+- /realtime-token neemt het klaarliggende token (direct), of wacht op de
+  lopende aanvraag (hooguit REALTIME_PREFETCH_WAIT_SECONDS) in plaats van
+  een tweede te starten
+
+Een ephemeral token verloopt (expires_at uit de response; OpenAI geeft
+standaard 10 minuten). Een token dat binnen REALTIME_PREFETCH_MARGIN_SECONDS
+verloopt wordt niet meer uitgegeven — de browser moet er nog mee verbinden.
+Dan, of als de vooraf-aanvraag mislukte, maakt /realtime-token zelf een
+token aan zoals voorheen. De pagina vraagt opnieuw een prefetch aan na
+refresh_in seconden, zodat er ook na lang wachten een vers token klaarligt.
+
+Tokens zijn eenmalig: take() haalt het token uit de cache. De cache is per
+proces; komt "start" bij een andere worker binnen, dan valt die terug op
+direct aanmaken.
+
+Gebruik:
+    realtime_prefetch.prefetch(app_id, language, lambda: _mint_realtime_secret(prompt))
+    minted = realtime_prefetch.take(app_id, language)  # None → zelf aanmaken
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REALTIME_PREFETCH_ENABLED = os.getenv("REALTIME_PREFETCH_ENABLED", "true").lower() not in ("0", "false", "no")
+REALTIME_PREFETCH_WAIT_SECONDS = float(os.getenv("REALTIME_PREFETCH_WAIT_SECONDS", "15"))
+REALTIME_PREFETCH_MARGIN_SECONDS = float(os.getenv("REALTIME_PREFETCH_MARGIN_SECONDS", "30"))
+REALTIME_PREFETCH_WORKERS = int(os.getenv("REALTIME_PREFETCH_WORKERS", "4"))
+# Geldigheid als de response geen expires_at bevat (OpenAI-default)
+REALTIME_SECRET_TTL_SECONDS = int(os.getenv("REALTIME_SECRET_TTL_SECONDS", "600"))
+
+# Zolang er nog niets klaarligt: na zoveel seconden opnieuw aanvragen
+_RETRY_SECONDS = 5
+
+_Key = Tuple[int, str]
+
+_entries: Dict[_Key, Future] = {}
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=REALTIME_PREFETCH_WORKERS, thread_name_prefix="realtime-prefetch")
+
+
+def _fresh(minted: Optional[dict], now: float) -> bool:
+    return bool(minted) and minted["expires_at"] - now > REALTIME_PREFETCH_MARGIN_SECONDS
+
+
+def _result(fut: Future) -> Optional[dict]:
+    """Resultaat van een afgeronde aanvraag; None als die mislukte."""
+    try:
+        return fut.result(timeout=0)
+    except Exception:
+        return None
+
+
+def _prune_locked(now: float) -> None:
+    for key in [k for k, f in _entries.items() if f.done() and not _fresh(_result(f), now)]:
+        del _entries[key]
+
+
+def _run(fut: Future, key: _Key, mint: Callable[[], dict]) -> None:
+    try:
+        data = mint()
+        expires_at = data.get("expires_at") or (time.time() + REALTIME_SECRET_TTL_SECONDS)
+        fut.set_result({"client_secret": data["client_secret"], "expires_at": float(expires_at)})
+    except Exception as exc:
+        logger.warning("[realtime] Vooraf aanmaken sessie %s mislukt: %s", key, exc)
+        fut.set_exception(exc)
+
+
+def prefetch(app_id: int, language: str, mint: Callable[[], dict]) -> dict:
+    """
+    Zorg dat er een token klaarligt of wordt aangemaakt. mint() geeft
+    {client_secret, expires_at (epoch, optioneel)} en draait in een
+    achtergrondthread. Geeft status ("ready"/"minting") en refresh_in: na
+    hoeveel seconden de pagina opnieuw moet aanroepen.
+    """
+    if not REALTIME_PREFETCH_ENABLED:
+        return {"status": "disabled", "refresh_in": None}
+    key = (app_id, language)
+    now = time.time()
+    with _lock:
+        _prune_locked(now)
+        fut = _entries.get(key)
+        if fut is not None and not fut.done():
+            return {"status": "minting", "refresh_in": _RETRY_SECONDS}
+        if fut is not None:
+            minted = _result(fut)
+            return {
+                "status": "ready",
+                "refresh_in": max(_RETRY_SECONDS, int(minted["expires_at"] - now - REALTIME_PREFETCH_MARGIN_SECONDS)),
+            }
+        fut = Future()
+        _entries[key] = fut
+    _executor.submit(_run, fut, key, mint)
+    return {"status": "minting", "refresh_in": _RETRY_SECONDS}
+
+
+def take(app_id: int, language: str) -> Optional[dict]:
+    """
+    Neem het vooraf aangemaakte token (eenmalig). Wacht op een lopende
+    aanvraag; None als er niets is, de aanvraag mislukte of het token
+    (bijna) verlopen is — de aanroeper maakt dan zelf een token aan.
+    """
+    if not REALTIME_PREFETCH_ENABLED:
+        return None
+    with _lock:
+        fut = _entries.pop((app_id, language), None)
+    if fut is None:
+        return None
+    try:
+        minted = fut.result(timeout=REALTIME_PREFETCH_WAIT_SECONDS)
+    except FutureTimeout:
+        logger.warning("[realtime] Vooraf aanmaken sessie %s duurt te lang, direct aanmaken", (app_id, language))
+        return None
+    except Exception:
+        return None
+    return minted if _fresh(minted, time.time()) else None
+
@@ -0,0 +1,319 @@
+"""
+Batch-herberekening van matchscores na een wijziging van de vacaturetekst.
+
+Een AIResult is gebaseerd op de CV-tekst en de vacaturetekst van dat moment.
+Na het bewerken van een vacature bleven de scores staan; bijwerken kon alleen
+per kandidaat via /candidate/analyze. Nu start een bewerking (of het endpoint
+POST /employer/vacancies/{id}/rescore) een RescoreJob:
+
+- alle sollicitaties op de vacature worden bekeken; een sollicitatie wordt
+  overgeslagen als het laatste AIResult dezelfde cv_hash (sha256 van de
+  CV-tekst, de basis van de CV-digest) én vacancy_hash heeft
+- de rest gaat door de ranking-engine (services/ranking.py): lexicale
+  pre-filter, chunks, RANK_CONCURRENCY parallelle calls, retries en
+  lexicale fallback; de LLM krijgt de CV-digest + motivatie (de digest
+  wordt pas gemaakt als de kandidaat op de shortlist staat)
+- het nieuwe AIResult neemt sterke punten, verbeterpunten en intakevragen
+  over van het vorige; na een afgerond video-interview wordt de
+  interviewscore er opnieuw in verwerkt (zoals interview_completion doet)
+- alle nieuwe AIResults worden in één transactie geschreven, samen met de
+  eindstatus van de job; tussentijds worden alleen de tellers bijgewerkt
+  (voortgang voor GET /employer/vacancies/{id}/rescore)
+- wijzigt de vacature tijdens de run, dan volgt direct nog een ronde
+  (hooguit RESCORE_MAX_PASSES)
+
+Per vacature loopt hooguit één job. Een job claimt zichzelf met een lease
+(locked_until); een job die bij een herstart bleef hangen wordt bij de
+volgende aanvraag opnieuw opgepakt.
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.services import cv_digest, interview_completion, ranking
+
+logger = logging.getLogger(__name__)
+
+RESCORE_ON_EDIT = os.getenv("RESCORE_ON_EDIT", "true").lower() not in ("0", "false", "no")
+RESCORE_MAX_LLM = int(os.getenv("RESCORE_MAX_LLM", "200"))
+RESCORE_LEASE_SECONDS = int(os.getenv("RESCORE_LEASE_SECONDS", "900"))
+RESCORE_MAX_PASSES = 3
+
+MOTIVATION_PROMPT_CHARS = 1500  # zoals in de apply-pipeline
+
+ACTIVE = ("queued", "running")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def job_text(vacancy: models.Vacancy) -> str:
+    """De tekst waartegen gescoord wordt (zelfde bron als de apply-pipeline)."""
+    return (vacancy.extracted_text or vacancy.description or "").strip()
+
+
+def vacancy_hash(vacancy: models.Vacancy) -> str:
+    return cv_digest.text_hash(job_text(vacancy))
+
+
+def cv_hash(cv: Optional[models.CandidateCV]) -> str:
+    return cv_digest.text_hash((cv.extracted_text or "") if cv else "")
+
+
+# ── Aanvragen ─────────────────────────────────────────────────────────────────
+
+def _latest_job(db: Session, vacancy_id: int) -> Optional[models.RescoreJob]:
+    return (
+        db.query(models.RescoreJob)
+        .filter(models.RescoreJob.vacancy_id == vacancy_id)
+        .order_by(models.RescoreJob.id.desc())
+        .first()
+    )
+
+
+def start(db: Session, vacancy_id: int, *, requested_by: Optional[int] = None, force: bool = False) -> models.RescoreJob:
+    """
+    Vraag een herberekening aan. Loopt er al een job voor deze vacature, dan
+    wordt die teruggegeven (een wijziging tijdens de run pakt die zelf op).
+    De aanroeper commit en start run_job(job.id) op de achtergrond.
+    """
+    job = _latest_job(db, vacancy_id)
+    if job is not None and job.status in ACTIVE:
+        if force:
+            job.force = True
+        return job
+    job = models.RescoreJob(vacancy_id=vacancy_id, requested_by=requested_by, status="queued", force=force)
+    db.add(job)
+    db.flush()
+    return job
+
+
+def _claim(db: Session, job_id: int) -> bool:
+    """Voorwaardelijke update: bij twee gelijktijdige runs wint er één."""
+    J = models.RescoreJob
+    now = _now()
+    updated = (
+        db.query(J)
+        .filter(J.id == job_id, J.status.in_(ACTIVE), or_(J.locked_until.is_(None), J.locked_until < now))
+        .update(
+            {"status": "running", "locked_until": now + timedelta(seconds=RESCORE_LEASE_SECONDS), "started_at": now},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return bool(updated)
+
+
+# ── Uitvoeren ─────────────────────────────────────────────────────────────────
+
+def _inputs(db: Session, vacancy_id: int) -> List[dict]:
+    """Per sollicitatie: het gebruikte CV, de motivatie, het laatste AIResult en een afgerond interview."""
+    apps = (
+        db.query(models.Application.id, models.Application.candidate_id, models.User.full_name)
+        .join(models.User, models.User.id == models.Application.candidate_id)
+        .filter(models.Application.vacancy_id == vacancy_id)
+        .all()
+    )
+    if not apps:
+        return []
+    app_ids = [a.id for a in apps]
+
+    latest_ids = (
+        db.query(func.max(models.AIResult.id))
+        .filter(models.AIResult.application_id.in_(app_ids))
+        .group_by(models.AIResult.application_id)
+    )
+    latest = {
+        r.application_id: r
+        for r in db.query(models.AIResult).filter(models.AIResult.id.in_(latest_ids)).all()
+    }
+    interviews = {
+        s.application_id: s
+        for s in db.query(
+            models.VirtualInterviewSession.application_id,
+            models.VirtualInterviewSession.score,
+            models.VirtualInterviewSession.score_summary,
+        )
+        .join(models.Application, models.Application.id == models.VirtualInterviewSession.application_id)
+        .filter(
+            models.Application.id.in_(app_ids),
+            models.Application.interview_completed_at.isnot(None),
+            models.VirtualInterviewSession.score.isnot(None),
+        )
+        .all()
+    }
+    tasks = {
+        t.application_id: t
+        for t in db.query(
+            models.ApplicationTask.application_id, models.ApplicationTask.cv_id, models.ApplicationTask.motivation_letter
+        )
+        .filter(models.ApplicationTask.application_id.in_(app_ids))
+        .all()
+    }
+
+    # Het CV waarmee gesolliciteerd is, anders het nieuwste van de kandidaat
+    newest = dict(
+        db.query(models.CandidateCV.candidate_id, func.max(models.CandidateCV.id))
+        .filter(models.CandidateCV.candidate_id.in_({a.candidate_id for a in apps}))
+        .group_by(models.CandidateCV.candidate_id)
+        .all()
+    )
+    chosen = {
+        a.id: (tasks[a.id].cv_id if a.id in tasks and tasks[a.id].cv_id else newest.get(a.candidate_id))
+        for a in apps
+    }
+    cvs: Dict[int, models.CandidateCV] = {
+        cv.id: cv
+        for cv in db.query(models.CandidateCV)
+        .filter(models.CandidateCV.id.in_({cid for cid in chosen.values() if cid} | set(newest.values())))
+        .all()
+    }
+
+    out = []
+    for a in apps:
+        task = tasks.get(a.id)
+        cv = cvs.get(chosen[a.id]) or cvs.get(newest.get(a.candidate_id))
+        prev = latest.get(a.id)
+        out.append({
+            "application_id": a.id,
+            "name": a.full_name,
+            "cv": cv,
+            "motivation": (task.motivation_letter if task else None) or "",
+            "cv_hash": cv_hash(cv),
+            "prev": prev,
+            "prev_cv_hash": prev.cv_hash if prev else None,
+            "prev_vacancy_hash": prev.vacancy_hash if prev else None,
+            "interview": interviews.get(a.id),
+        })
+    return out
+
+
+def _run_pass(db: Session, job: models.RescoreJob, vacancy: models.Vacancy) -> str:
+    """Eén ronde: bepaal wat verouderd is, scoor dat en schrijf alles in één commit. Geeft de gebruikte vacancy_hash."""
+    text = job_text(vacancy)
+    vhash = vacancy_hash(vacancy)
+    inputs = _inputs(db, vacancy.id)
+    stale = [
+        i for i in inputs
+        if job.force or i["prev_cv_hash"] != i["cv_hash"] or i["prev_vacancy_hash"] != vhash
+    ]
+    job.vacancy_hash = vhash
+    job.total = len(inputs)
+    job.skipped = len(inputs) - len(stale)
+    job.processed = 0
+    db.commit()
+
+    def _digest(cv: Optional[models.CandidateCV], motivation: str):
+        # Pas aangeroepen door ranking.rank voor de shortlist. Zonder db: een
+        # ontbrekende digest valt terug op de ingekorte CV-tekst in plaats van
+        # hier serieel een LLM-call plus commit per kandidaat te kosten
+        return lambda: cv_digest.for_prompt(cv) + motivation[:MOTIVATION_PROMPT_CHARS]
+
+    items = []
+    for i in stale:
+        motivation = "\n\nMOTIVATIE:\n" + i["motivation"] if i["motivation"] else ""
+        items.append({
+            "id": i["application_id"],
+            "name": i["name"],
+            "cv_text": ((i["cv"].extracted_text or "") if i["cv"] else "") + motivation,
+            "prompt_text": _digest(i["cv"], motivation),
+        })
+
+    def _progress(done: int, shortlist: int) -> None:
+        job.processed = done
+        job.locked_until = _now() + timedelta(seconds=RESCORE_LEASE_SECONDS)
+        db.commit()
+
+    ranked = ranking.rank(text, items, max_llm=RESCORE_MAX_LLM, tenant=vacancy.employer_id, progress=_progress)
+
+    by_id = {i["application_id"]: i for i in stale}
+    for r in ranked:
+        i = by_id[r["id"]]
+        prev, interview = i["prev"], i["interview"]
+        result = models.AIResult(
+            application_id=r["id"],
+            match_score=r["match_score"],
+            summary=r["explanation"],
+            strengths=prev.strengths if prev else None,
+            gaps=prev.gaps if prev else None,
+            suggested_questions=prev.suggested_questions if prev else None,
+            cv_hash=i["cv_hash"],
+            vacancy_hash=vhash,
+        )
+        if interview is not None:
+            interview_completion.merge_interview_score(result, interview.score, interview.score_summary)
+        db.add(result)
+    job.processed = len(stale)
+    job.written = (job.written or 0) + len(ranked)
+    job.force = False
+    return vhash
+
+
+def _process(db: Session, job_id: int) -> None:
+    job = db.query(models.RescoreJob).filter(models.RescoreJob.id == job_id).first()
+    if job is None:
+        return
+    try:
+        for _ in range(RESCORE_MAX_PASSES):
+            vacancy = db.query(models.Vacancy).filter(models.Vacancy.id == job.vacancy_id).first()
+            if vacancy is None:
+                return  # vacature (en job) inmiddels verwijderd
+            used = _run_pass(db, job, vacancy)
+            db.commit()  # alle AIResults van deze ronde in één transactie
+            db.refresh(vacancy)
+            db.refresh(job)
+            if vacancy_hash(vacancy) == used and not job.force:
+                break
+        job.status = "done"
+        job.last_error = None
+    except Exception as exc:
+        db.rollback()
+        logger.error("[rescore] Job %d (vacature %d) mislukt: %s", job.id, job.vacancy_id, exc, exc_info=True)
+        job.status = "failed"
+        job.last_error = str(exc)[:2000]
+    job.locked_until = None
+    job.finished_at = _now()
+    db.commit()
+
+
+def run_job(job_id: int) -> None:
+    """Voer een job uit (BackgroundTask na het request). Eigen DB-sessie."""
+    from backend.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if _claim(db, job_id):
+            _process(db, job_id)
+    except Exception as exc:
+        logger.error("[rescore] Job %d mislukt: %s", job_id, exc, exc_info=True)
+        db.rollback()
+    finally:
+        db.close()
+
+
+def status_of(job: Optional[models.RescoreJob]) -> dict:
+    """Voortgang voor het poll-endpoint."""
+    if job is None:
+        return {"status": "none"}
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "total": job.total or 0,
+        "skipped": job.skipped or 0,
+        "processed": job.processed or 0,
+        "written": job.written or 0,
+        "last_error": job.last_error if job.status == "failed" else None,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def latest_status(db: Session, vacancy_id: int) -> dict:
+    return status_of(_latest_job(db, vacancy_id))
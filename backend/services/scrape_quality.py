@@ -0,0 +1,209 @@
+"""
+Scrape Quality — snelle lokale kwaliteitsscore voor scraper-items.
+
+Draait vóór _save_batch: navigatiepagina's, categorie-overzichten en afgekapte
+snippets worden weggegooid (geen DB-write, geen admin-review, geen betaalde
+AI-verrijking) of gemarkeerd als 'flagged'.
+
+Score = logistische regressie over:
+- regelkenmerken: titel-heuristieken, lengte beschrijving, JSON-LD aanwezig,
+  e-mailklasse (hr / persoonlijk / generiek / geen)
+- tokenkenmerken: aanwezigheid van vacature- resp. navigatiewoorden
+
+De standaardgewichten (DEFAULT_WEIGHTS) zijn met de hand gezet op basis van
+de heuristieken van de scraper — er is (nog) geen gelabelde dataset en ze
+zijn dus níet getraind. Zodra er gelabelde items zijn (bv. uit de
+admin-review: goedgekeurd = 1, afgewezen = 0) kan train() er echte gewichten
+van maken; SCRAPE_QUALITY_WEIGHTS wijst dan naar dat JSON-bestand.
+
+Training (offline, op gelabelde items):
+    weights = train([(item, 1), (item, 0), ...])
+    json.dump(weights, open("weights.json", "w"))
+"""
+
+import json
+import logging
+import math
+import os
+import re
+from typing import Dict, List, Tuple
+
+from backend.services.scraper import HR_KEYWORDS, _is_personal_work_email
+
+logger = logging.getLogger(__name__)
+
+DROP_BELOW = float(os.getenv("SCRAPE_QUALITY_DROP_BELOW", "0.25"))
+FLAG_BELOW = float(os.getenv("SCRAPE_QUALITY_FLAG_BELOW", "0.5"))
+
+TOKEN_RE = re.compile(r"[a-zà-ÿ0-9/]+")
+
+NAV_TITLE_RE = re.compile(
+    r"^(alle\s+)?(vacatures?|vacancies|jobs|careers?|werken\s+bij.*|home|zoeken|zoekresultaten"
+    r"|overzicht.*|categorie.*|pagina\s*\d+|page\s*\d+|\d+\s+vacatures?.*)$",
+    re.I,
+)
+DEFAULT_TITLES = {"", "vacature", "vacancy", "job", "functie"}
+GENERIC_EMAIL_LOCALS = {"info", "contact", "office", "mail", "kantoor", "receptie"}
+
+# Handmatig gezette startgewichten (niet getraind; features zie extract_features)
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "bias": 0.4,
+    # Regelkenmerken
+    "title_default": -3.0,
+    "title_nav": -2.5,
+    "title_ok": 0.8,
+    "title_too_long": -1.0,
+    "desc_short": -1.5,
+    "desc_long": 0.8,
+    "truncated": -0.7,
+    "has_jsonld": 1.5,
+    "email_hr": 0.8,
+    "email_personal": 0.5,
+    "email_generic": 0.0,
+    "email_none": -0.5,
+    # Tokenkenmerken — vacature-indicatief
+    "tok:m/v": 0.6,
+    "tok:v/m": 0.6,
+    "tok:uur": 0.4,
+    "tok:functie": 0.5,
+    "tok:salaris": 0.6,
+    "tok:ervaring": 0.5,
+    "tok:solliciteer": 0.5,
+    "tok:sollicitatie": 0.4,
+    "tok:taken": 0.4,
+    "tok:profiel": 0.3,
+    "tok:fulltime": 0.4,
+    "tok:parttime": 0.4,
+    "tok:mbo": 0.3,
+    "tok:hbo": 0.3,
+    "tok:wo": 0.2,
+    "tok:requirements": 0.4,
+    "tok:experience": 0.4,
+    "tok:responsibilities": 0.4,
+    # Tokenkenmerken — navigatie / geen vacature
+    "tok:cookies": -0.6,
+    "tok:cookie": -0.5,
+    "tok:privacy": -0.4,
+    "tok:inloggen": -0.5,
+    "tok:login": -0.5,
+    "tok:menu": -0.4,
+    "tok:categorie": -0.6,
+    "tok:overzicht": -0.5,
+    "tok:filter": -0.5,
+    "tok:resultaten": -0.6,
+    "tok:nieuwsbrief": -0.4,
+    "tok:winkelwagen": -0.8,
+}
+
+
+def load_weights() -> Dict[str, float]:
+    path = os.getenv("SCRAPE_QUALITY_WEIGHTS", "").strip()
+    if path:
+        try:
+            with open(path) as f:
+                return {k: float(v) for k, v in json.load(f).items()}
+        except Exception as exc:
+            logger.warning("[quality] Kon gewichten niet laden uit %s: %s", path, exc)
+    return DEFAULT_WEIGHTS
+
+
+_WEIGHTS = load_weights()
+
+
+def _email_class(email: str) -> str:
+    if not email or "@" not in email:
+        return "none"
+    local, domain = email.lower().split("@", 1)
+    if any(kw in local for kw in HR_KEYWORDS):
+        return "hr"
+    if local in GENERIC_EMAIL_LOCALS:
+        return "generic"
+    if _is_personal_work_email(local, domain):
+        return "personal"
+    return "generic"
+
+
+def extract_features(item: dict) -> Dict[str, float]:
+    """Binaire features voor één scraper-item."""
+    title = (item.get("title") or "").strip()
+    desc = (item.get("description") or "").strip()
+    f: Dict[str, float] = {"bias": 1.0}
+
+    title_l = title.lower()
+    if title_l in DEFAULT_TITLES:
+        f["title_default"] = 1.0
+    elif NAV_TITLE_RE.match(title_l):
+        f["title_nav"] = 1.0
+    elif 3 <= len(title) <= 120 and len(title.split()) >= 1:
+        f["title_ok"] = 1.0
+    if len(title) > 150:
+        f["title_too_long"] = 1.0
+
+    if len(desc) < 200:
+        f["desc_short"] = 1.0
+    elif len(desc) >= 800:
+        f["desc_long"] = 1.0
+    if desc.endswith(("...", "…")):
+        f["truncated"] = 1.0
+
+    if item.get("has_jsonld"):
+        f["has_jsonld"] = 1.0
+
+    f["email_" + _email_class(item.get("contact_email") or "")] = 1.0
+
+    for tok in set(TOKEN_RE.findall((title + " " + desc[:1500]).lower())):
+        key = "tok:" + tok
+        if key in _WEIGHTS:
+            f[key] = 1.0
+    return f
+
+
+def _sigmoid(z: float) -> float:
+    if z < -30:
+        return 0.0
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+def score_item(item: dict, weights: Dict[str, float] = None) -> float:
+    """Kans (0–1) dat het item een echte vacature is."""
+    w = weights or _WEIGHTS
+    feats = extract_features(item)
+    return _sigmoid(sum(w.get(k, 0.0) * v for k, v in feats.items()))
+
+
+def filter_batch(raw: list) -> Tuple[list, int]:
+    """
+    Scoor alle items. Geeft (behouden_items, aantal_gedropt) terug.
+    Behouden items krijgen 'quality_score' en — onder FLAG_BELOW — 'quality_flagged'.
+    """
+    kept: list = []
+    dropped = 0
+    for item in raw:
+        score = score_item(item)
+        if score < DROP_BELOW:
+            dropped += 1
+            continue
+        item["quality_score"] = round(score, 3)
+        item["quality_flagged"] = score < FLAG_BELOW
+        kept.append(item)
+    return kept, dropped
+
+
+def train(samples: List[Tuple[dict, int]], epochs: int = 200, lr: float = 0.1, l2: float = 0.001) -> Dict[str, float]:
+    """
+    Offline training: batch gradient descent op gelabelde items
+    (1 = echte vacature, 0 = rommel). Start vanaf DEFAULT_WEIGHTS zodat
+    features zonder voorbeelden hun handmatige waarde houden.
+    """
+    data = [(extract_features(item), label) for item, label in samples]
+    weights = dict(DEFAULT_WEIGHTS)
+    n = max(1, len(data))
+    for _ in range(epochs):
+        grad: Dict[str, float] = {}
+        for feats, label in data:
+            err = _sigmoid(sum(weights.get(k, 0.0) * v for k, v in feats.items())) - label
+            for k, v in feats.items():
+                grad[k] = grad.get(k, 0.0) + err * v
+        for k, g in grad.items():
+            weights[k] = weights.get(k, 0.0) - lr * (g / n + l2 * weights.get(k, 0.0))
+    return {k: round(v, 4) for k, v in weights.items()}
@@ -21,6 +21,9 @@ E-mailaanpak:
   omdat dit voor kleine MKB bedrijven HUN sollicitatie-adres is
 
 Deduplicatie: zelfde source_url OF contact_email+title combinatie wordt niet dubbel opgeslagen.
+
+SerpAPI-bronnen (google_jobs, google_search, company_direct) lopen via
+services/serpapi.py: dag-cache per zoekopdracht + maandbudget (SERPAPI_MONTHLY_QUOTA).
 """
 
 import json
@@ -34,6 +37,8 @@ from typing import Optional
 import requests
 from bs4 import BeautifulSoup
 
+from backend.services.serpapi import serpapi_run
+from backend.services.sitemap import collect_detail_urls, mark_checked, select_changed
 from backend.services.vacancy_enricher import extract_phone
 
 logger = logging.getLogger(__name__)
@@ -239,8 +244,6 @@ def _scrape_google_jobs() -> list:
         logger.warning("[scraper] Google Jobs: SERPAPI_KEY niet ingesteld — sla over")
         return []
 
-    from urllib.parse import quote
-
     GOOGLE_QUERIES = [
         "vacature amsterdam",
         "vacature rotterdam",
@@ -255,59 +258,71 @@ def _scrape_google_jobs() -> list:
     results = []
     seen: set = set()
 
-    for query in GOOGLE_QUERIES[:5]:  # max 5 queries (credits sparen)
-        url = (
-            f"https://serpapi.com/search.json"
-            f"?engine=google_jobs&q={quote(query)}&gl=nl&hl=nl"
-            f"&api_key={SERPAPI_KEY}"
-        )
-        try:
-            resp = requests.get(url, timeout=30)
-            resp.raise_for_status()
-            data = resp.json()
-        except Exception as e:
-            logger.warning("[scraper] SerpAPI Google Jobs '%s' fout: %s", query, e)
-            continue
-
-        for job in data.get("jobs_results", []):
-            job_id = job.get("job_id") or job.get("title", "") + (job.get("company_name") or "")
-            if job_id in seen:
+    with serpapi_run() as serp:
+        # Beste queries eerst — het budget bepaalt hoeveel er daadwerkelijk draaien
+        for query in serp.plan("google_jobs", GOOGLE_QUERIES)[:5]:  # max 5 queries (credits sparen)
+            try:
+                data = serp.search("google_jobs", query)
+            except Exception as e:
+                logger.warning("[scraper] SerpAPI Google Jobs '%s' fout: %s", query, e)
                 continue
-            seen.add(job_id)
+            if data is None:
+                logger.info("[scraper] Google Jobs: SerpAPI budget op — stop")
+                break
 
-            # Beschrijving samenstellen
-            desc = job.get("description") or ""
-            highlights = job.get("job_highlights") or []
-            for hl in highlights:
-                items = hl.get("items") or []
-                title_hl = hl.get("title") or ""
-                if items:
-                    desc += f"\n\n{title_hl}:\n" + "\n".join(f"• {i}" for i in items)
+            before = len(results)
+            results += _parse_google_jobs(data, seen)
+            new_items = results[before:]
+            serp.record_yield(
+                "google_jobs", query,
+                found=len(new_items),
+                emailed=sum(1 for r in new_items if r["contact_email"]),
+            )
+            time.sleep(0.3)
 
-            emails = _extract_emails(desc)
+    logger.info("[scraper] Google Jobs (SerpAPI) → %d vacatures", len(results))
+    return results
 
-            title    = (job.get("title") or "Vacature")[:500]
-            company  = (job.get("company_name") or "")[:500] or None
-            location = (job.get("location") or "Nederland")[:255]
 
-            # Probeer apply link
-            apply_options = job.get("apply_options") or []
-            src_url = apply_options[0].get("link", "") if apply_options else ""
+def _parse_google_jobs(data: dict, seen: set) -> list:
+    """Zet een SerpAPI google_jobs response om naar scraper-items."""
+    results = []
+    for job in data.get("jobs_results", []):
+        job_id = job.get("job_id") or job.get("title", "") + (job.get("company_name") or "")
+        if job_id in seen:
+            continue
+        seen.add(job_id)
 
-            results.append({
-                "title": title,
-                "description": desc[:2000],
-                "company_name": company,
-                "contact_email": emails[0] if emails else None,
-                "contact_phone": extract_phone(desc),
-                "location": location,
-                "source_url": src_url,
-                "source_name": "google_jobs",
-            })
+        # Beschrijving samenstellen
+        desc = job.get("description") or ""
+        highlights = job.get("job_highlights") or []
+        for hl in highlights:
+            items = hl.get("items") or []
+            title_hl = hl.get("title") or ""
+            if items:
+                desc += f"\n\n{title_hl}:\n" + "\n".join(f"• {i}" for i in items)
 
-        time.sleep(0.3)
+        emails = _extract_emails(desc)
+
+        title    = (job.get("title") or "Vacature")[:500]
+        company  = (job.get("company_name") or "")[:500] or None
+        location = (job.get("location") or "Nederland")[:255]
+
+        # Probeer apply link
+        apply_options = job.get("apply_options") or []
+        src_url = apply_options[0].get("link", "") if apply_options else ""
+
+        results.append({
+            "title": title,
+            "description": desc[:2000],
+            "company_name": company,
+            "contact_email": emails[0] if emails else None,
+            "contact_phone": extract_phone(desc),
+            "location": location,
+            "source_url": src_url,
+            "source_name": "google_jobs",
+        })
 
-    logger.info("[scraper] Google Jobs (SerpAPI) → %d vacatures", len(results))
     return results
 
 
@@ -324,7 +339,7 @@ def _scrape_google_search_emails() -> list:
         logger.warning("[scraper] Google Search: SERPAPI_KEY niet ingesteld — sla over")
         return []
 
-    from urllib.parse import quote, urlparse
+    from urllib.parse import urlparse
 
     # Zoek naar vacaturepagina's waarop emails zichtbaar zijn in de snippet.
     # Let op: @ teken in queries werkt NIET goed in Google — Google interpreteert
@@ -355,67 +370,76 @@ def _scrape_google_search_emails() -> list:
 
     results = []
     seen: set = set()
+    budget_exhausted = False
 
-    for query in SEARCH_QUERIES:
-        for start in (0, 10):
-            url = (
-                f"https://serpapi.com/search.json"
-                f"?engine=google&q={quote(query)}&gl=nl&hl=nl&num=10&start={start}"
-                f"&api_key={SERPAPI_KEY}"
-            )
-            try:
-                resp = requests.get(url, timeout=30)
-                resp.raise_for_status()
-                data = resp.json()
-            except Exception as e:
-                logger.warning("[scraper] SerpAPI Search '%s' fout: %s", query, e)
-                break
-
-            for item in data.get("organic_results", []):
-                page_url  = item.get("link", "")
-                snippet   = item.get("snippet", "")
-                raw_title = item.get("title", "Vacature")
+    with serpapi_run() as serp:
+        for query in serp.plan("google", SEARCH_QUERIES):
+            before = len(results)
+            pages_done = 0
+            for start in (0, 10):
+                try:
+                    data = serp.search("google", query, start=start)
+                except Exception as e:
+                    logger.warning("[scraper] SerpAPI Search '%s' fout: %s", query, e)
+                    break
+                if data is None:
+                    budget_exhausted = True
+                    break
+                pages_done += 1
 
-                if not page_url or page_url in seen:
-                    continue
-                seen.add(page_url)
+                for item in data.get("organic_results", []):
+                    page_url  = item.get("link", "")
+                    snippet   = item.get("snippet", "")
+                    raw_title = item.get("title", "Vacature")
 
-                # Probeer eerst email uit snippet
-                emails = _extract_emails(snippet)
+                    if not page_url or page_url in seen:
+                        continue
+                    seen.add(page_url)
 
-                # Fallback: bezoek de pagina zelf als snippet geen email bevat
-                if not emails:
-                    try:
-                        page_resp = requests.get(page_url, timeout=8, headers=HEADERS)
-                        page_resp.raise_for_status()
-                        page_soup = BeautifulSoup(page_resp.text, "html.parser")
-                        page_text = page_soup.get_text(" ", strip=True)
-                        emails = _extract_emails_from_page(page_soup, page_text)
-                        # Gebruik paginatekst als betere beschrijving
-                        if emails:
-                            snippet = page_text[:1000]
-                    except Exception:
-                        pass
+                    # Probeer eerst email uit snippet
+                    emails = _extract_emails(snippet)
 
-                if not emails:
-                    continue
+                    # Fallback: bezoek de pagina zelf als snippet geen email bevat
+                    if not emails:
+                        try:
+                            page_resp = requests.get(page_url, timeout=8, headers=HEADERS)
+                            page_resp.raise_for_status()
+                            page_soup = BeautifulSoup(page_resp.text, "html.parser")
+                            page_text = page_soup.get_text(" ", strip=True)
+                            emails = _extract_emails_from_page(page_soup, page_text)
+                            # Gebruik paginatekst als betere beschrijving
+                            if emails:
+                                snippet = page_text[:1000]
+                        except Exception:
+                            pass
 
-                clean_title = re.sub(r"\s*[\|\-–]\s*.+$", "", raw_title).strip() or raw_title
-                domain  = urlparse(page_url).netloc.replace("www.", "")
-                company = domain.split(".")[0].capitalize()
+                    if not emails:
+                        continue
 
-                results.append({
-                    "title":         clean_title[:500],
-                    "description":   snippet,
-                    "company_name":  company[:500],
-                    "contact_email": emails[0],
-                    "contact_phone": extract_phone(snippet),
-                    "location":      "Nederland",
-                    "source_url":    page_url,
-                    "source_name":   "google_search",
-                })
+                    clean_title = re.sub(r"\s*[\|\-–]\s*.+$", "", raw_title).strip() or raw_title
+                    domain  = urlparse(page_url).netloc.replace("www.", "")
+                    company = domain.split(".")[0].capitalize()
 
-            time.sleep(0.3)
+                    results.append({
+                        "title":         clean_title[:500],
+                        "description":   snippet,
+                        "company_name":  company[:500],
+                        "contact_email": emails[0],
+                        "contact_phone": extract_phone(snippet),
+                        "location":      "Nederland",
+                        "source_url":    page_url,
+                        "source_name":   "google_search",
+                    })
+
+                time.sleep(0.3)
+
+            new_items = results[before:]
+            if pages_done:
+                # Deze bron bewaart alleen items mét e-mail
+                serp.record_yield("google", query, found=len(new_items), emailed=len(new_items))
+            if budget_exhausted:
+                logger.info("[scraper] Google Search: SerpAPI budget op — stop")
+                break
 
     logger.info("[scraper] Google Search (SerpAPI) → %d vacatures met e-mail", len(results))
     return results
@@ -478,7 +502,7 @@ def _scrape_company_career_pages() -> list:
         logger.warning("[scraper] Company Direct: SERPAPI_KEY niet ingesteld — sla over")
         return []
 
-    from urllib.parse import quote, urlparse
+    from urllib.parse import urlparse
 
     SEARCH_QUERIES = [
         # Career-page URL-patronen (breed — email hoeft niet in snippet)
@@ -509,95 +533,105 @@ def _scrape_company_career_pages() -> list:
 
     results = []
     seen: set = set()
+    budget_exhausted = False
 
-    for query in SEARCH_QUERIES:
-        for start in (0, 10):
-            url = (
-                f"https://serpapi.com/search.json"
-                f"?engine=google&q={quote(query)}&gl=nl&hl=nl&num=10&start={start}"
-                f"&api_key={SERPAPI_KEY}"
-            )
-            try:
-                resp = requests.get(url, timeout=30)
-                resp.raise_for_status()
-                data = resp.json()
-            except Exception as e:
-                logger.warning("[scraper] Company Search '%s' fout: %s", query, e)
-                break
-
-            for item in data.get("organic_results", []):
-                page_url  = item.get("link", "")
-                raw_title = item.get("title", "Vacature")
-                snippet   = item.get("snippet", "")
-
-                if not page_url or page_url in seen:
-                    continue
-                seen.add(page_url)
+    with serpapi_run() as serp:
+        for query in serp.plan("google", SEARCH_QUERIES):
+            before = len(results)
+            pages_done = 0
+            for start in (0, 10):
+                try:
+                    data = serp.search("google", query, start=start)
+                except Exception as e:
+                    logger.warning("[scraper] Company Search '%s' fout: %s", query, e)
+                    break
+                if data is None:
+                    budget_exhausted = True
+                    break
+                pages_done += 1
 
-                # Snelle check: staat email al in de snippet?
-                emails_from_snippet = _extract_emails(snippet)
+                for item in data.get("organic_results", []):
+                    page_url  = item.get("link", "")
+                    raw_title = item.get("title", "Vacature")
+                    snippet   = item.get("snippet", "")
 
-                # Bezoek de pagina voor mailto-links en volledige tekst
-                soup      = None
-                page_text = snippet
-                try:
-                    page_resp = requests.get(page_url, timeout=10, headers=HEADERS)
-                    page_resp.raise_for_status()
-                    soup      = BeautifulSoup(page_resp.text, "html.parser")
-                    page_text = soup.get_text(" ", strip=True)
-                except Exception:
-                    # Kon pagina niet ophalen — gebruik snippet-emails als fallback
-                    if emails_from_snippet:
-                        emails = emails_from_snippet
-                    else:
+                    if not page_url or page_url in seen:
                         continue
+                    seen.add(page_url)
 
-                # Email via mailto-links + tekst-regex (als pagina geladen is)
-                if soup is not None:
-                    emails = _extract_emails_from_page(soup, page_text)
-                    # Voeg snippet-emails toe die pagina miste
-                    seen_e: set = set(emails)
-                    for e in emails_from_snippet:
-                        if e not in seen_e:
-                            emails.append(e)
-                            seen_e.add(e)
-
-                if not emails:
-                    continue
+                    # Snelle check: staat email al in de snippet?
+                    emails_from_snippet = _extract_emails(snippet)
 
-                # JSON-LD JobPosting voor gestructureerde data
-                job_ld   = _extract_jsonld_job(soup)
-                company  = ""
-                location = ""
-
-                if job_ld:
-                    title    = (job_ld.get("title") or raw_title)[:500]
-                    desc     = job_ld.get("description") or page_text[:3000]
-                    if isinstance(job_ld.get("jobLocation"), dict):
-                        addr     = job_ld["jobLocation"].get("address") or {}
-                        location = addr.get("addressLocality") or addr.get("addressRegion") or ""
-                    if isinstance(job_ld.get("hiringOrganization"), dict):
-                        company  = job_ld["hiringOrganization"].get("name") or ""
-                else:
-                    title = re.sub(r"\s*[\|\-–]\s*.+$", "", raw_title).strip() or raw_title
-                    desc  = page_text[:3000]
-
-                if not company:
-                    domain  = urlparse(page_url).netloc.replace("www.", "")
-                    company = domain.split(".")[0].capitalize()
+                    # Bezoek de pagina voor mailto-links en volledige tekst
+                    soup      = None
+                    page_text = snippet
+                    try:
+                        page_resp = requests.get(page_url, timeout=10, headers=HEADERS)
+                        page_resp.raise_for_status()
+                        soup      = BeautifulSoup(page_resp.text, "html.parser")
+                        page_text = soup.get_text(" ", strip=True)
+                    except Exception:
+                        # Kon pagina niet ophalen — gebruik snippet-emails als fallback
+                        if emails_from_snippet:
+                            emails = emails_from_snippet
+                        else:
+                            continue
+
+                    # Email via mailto-links + tekst-regex (als pagina geladen is)
+                    if soup is not None:
+                        emails = _extract_emails_from_page(soup, page_text)
+                        # Voeg snippet-emails toe die pagina miste
+                        seen_e: set = set(emails)
+                        for e in emails_from_snippet:
+                            if e not in seen_e:
+                                emails.append(e)
+                                seen_e.add(e)
 
-                results.append({
-                    "title":         title[:500],
-                    "description":   desc,
-                    "company_name":  company[:500],
-                    "contact_email": emails[0],
-                    "contact_phone": extract_phone(page_text),
-                    "location":      location or "Nederland",
-                    "source_url":    page_url,
-                    "source_name":   "company_direct",
-                })
+                    if not emails:
+                        continue
 
-            time.sleep(0.5)
+                    # JSON-LD JobPosting voor gestructureerde data
+                    job_ld   = _extract_jsonld_job(soup)
+                    company  = ""
+                    location = ""
+
+                    if job_ld:
+                        title    = (job_ld.get("title") or raw_title)[:500]
+                        desc     = job_ld.get("description") or page_text[:3000]
+                        if isinstance(job_ld.get("jobLocation"), dict):
+                            addr     = job_ld["jobLocation"].get("address") or {}
+                            location = addr.get("addressLocality") or addr.get("addressRegion") or ""
+                        if isinstance(job_ld.get("hiringOrganization"), dict):
+                            company  = job_ld["hiringOrganization"].get("name") or ""
+                    else:
+                        title = re.sub(r"\s*[\|\-–]\s*.+$", "", raw_title).strip() or raw_title
+                        desc  = page_text[:3000]
+
+                    if not company:
+                        domain  = urlparse(page_url).netloc.replace("www.", "")
+                        company = domain.split(".")[0].capitalize()
+
+                    results.append({
+                        "title":         title[:500],
+                        "description":   desc,
+                        "company_name":  company[:500],
+                        "contact_email": emails[0],
+                        "contact_phone": extract_phone(page_text),
+                        "location":      location or "Nederland",
+                        "source_url":    page_url,
+                        "source_name":   "company_direct",
+                        "has_jsonld":    bool(job_ld),
+                    })
+
+                time.sleep(0.5)
+
+            new_items = results[before:]
+            if pages_done:
+                # Deze bron bewaart alleen items mét e-mail
+                serp.record_yield("google", query, found=len(new_items), emailed=len(new_items))
+            if budget_exhausted:
+                logger.info("[scraper] Company Direct: SerpAPI budget op — stop")
+                break
 
     logger.info("[scraper] Company Direct → %d vacatures met e-mail", len(results))
     return results
@@ -917,9 +951,10 @@ def _scrape_staffing_agencies() -> list:
     Scrapet Nederlandse uitzend-, detacherings- en payrollbureaus direct van hun eigen site.
 
     Strategie per bureau:
-    1. Haal vacaturelijst op (meerdere pagina's indien aanwezig)
-    2. Verzamel vacature-detail-URLs
-    3. Bezoek detail-pagina's PARALLEL via ThreadPoolExecutor
+    1. Verzamel vacature-detail-URLs via de sitemap (robots.txt → sitemap.xml);
+       valt terug op de listing-pagina's als de site geen bruikbare sitemap heeft
+    2. Sla URLs over waarvan <lastmod> sinds de vorige run niet veranderd is
+    3. Bezoek de overige detail-pagina's PARALLEL via ThreadPoolExecutor
     4. Extraheer emails via mailto-links + regex
 
     Alleen bureaus waarvan bevestigd is dat ze emails tonen op hun vacaturepagina's
@@ -929,7 +964,7 @@ def _scrape_staffing_agencies() -> list:
 
     # Bureaus definitie:
     # (name, base_domain, listing_pages, detail_link_regex)
-    # listing_pages: lijst van pagina-URLs om vacaturelinks te verzamelen
+    # listing_pages: lijst van pagina-URLs om vacaturelinks te verzamelen (fallback zonder sitemap)
     # detail_link_regex: regex die onderscheidt echte vacature-detail van categorielinks
     BUREAUS = [
         # ── IT / Tech detachering ──────────────────────────────────────────────
@@ -1105,12 +1140,15 @@ def _scrape_staffing_agencies() -> list:
                 break
         return links
 
-    def _fetch_bureau_detail(name: str, url: str) -> Optional[dict]:
+    fetched_ok: list = []  # (name, url, lastmod) — succesvol opgehaald, voor lastmod-administratie
+
+    def _fetch_bureau_detail(name: str, url: str, lastmod: Optional[str]) -> Optional[dict]:
         """Bezoek één vacature-detailpagina en extraheer info + email."""
         try:
             r = requests.get(url, headers=HEADERS, timeout=8)
             if r.status_code != 200:
                 return None
+            fetched_ok.append((name, url, lastmod))
             soup = BeautifulSoup(r.text, "html.parser")
             text = soup.get_text(separator=" ", strip=True)
             emails = _extract_emails_from_page(soup, text)
@@ -1149,18 +1187,27 @@ def _scrape_staffing_agencies() -> list:
                 "location":      location or "Nederland",
                 "source_url":    url,
                 "source_name":   f"bureau:{name}",
+                "has_jsonld":    bool(job_ld),
             }
         except Exception as e:
             logger.debug("[scraper] Bureau detail fout %s (%s): %s", name, url, e)
             return None
 
-    # ── Stap 1: verzamel alle detail-URLs per bureau (sequentieel per bureau) ──
-    all_tasks: list = []  # (name, url)
+    # ── Stap 1: verzamel alle detail-URLs per bureau (sitemap eerst) ─────────
+    all_tasks: list = []  # (name, url, lastmod)
     for bureau in BUREAUS:
-        links = _collect_vac_links(bureau)
-        logger.info("[scraper] %s listing → %d vacature-URLs", bureau["name"], len(links))
-        for link in links:
-            all_tasks.append((bureau["name"], link))
+        entries = collect_detail_urls(bureau["base"], bureau["detail_re"])
+        via = "sitemap"
+        if not entries:
+            entries = [(link, None) for link in _collect_vac_links(bureau)]
+            via = "listing"
+        changed = select_changed(entries)
+        logger.info(
+            "[scraper] %s %s → %d vacature-URLs, %d nieuw/gewijzigd",
+            bureau["name"], via, len(entries), len(changed),
+        )
+        for url, lastmod in changed:
+            all_tasks.append((bureau["name"], url, lastmod))
 
     logger.info("[scraper] Staffing bureaus totaal → %d detail-URLs", len(all_tasks))
 
@@ -1168,14 +1215,21 @@ def _scrape_staffing_agencies() -> list:
     results: list = []
     with ThreadPoolExecutor(max_workers=15) as executor:
         futures = {
-            executor.submit(_fetch_bureau_detail, name, url): (name, url)
-            for name, url in all_tasks[:500]  # max 500 detail-pagina's per run
+            executor.submit(_fetch_bureau_detail, name, url, lastmod): (name, url)
+            for name, url, lastmod in all_tasks[:500]  # max 500 detail-pagina's per run
         }
         for fut in as_completed(futures):
             item = fut.result()
             if item:
                 results.append(item)
 
+    # ── Stap 3: onthoud lastmod zodat de volgende run alleen wijzigingen ophaalt ──
+    by_site: dict = {}
+    for name, url, lastmod in fetched_ok:
+        by_site.setdefault(name, []).append((url, lastmod))
+    for name, entries in by_site.items():
+        mark_checked(name, entries)
+
     with_email = len(results)  # alle items in results hebben een email (filter in _fetch_bureau_detail)
     logger.info("[scraper] Staffing bureaus → %d vacatures met e-mail", with_email)
     return results
@@ -1280,6 +1334,7 @@ def _scrape_uitzendbureau(max_cities: int = 10) -> list:
                 "location":      location or "Nederland",
                 "source_url":    url,
                 "source_name":   "uitzendbureau",
+                "has_jsonld":    bool(job_ld),
             }
         except Exception as e:
             logger.debug("[scraper] Uitzendbureau detail fout %s: %s", url, e)
@@ -0,0 +1,220 @@
+"""
+SerpAPI client met persistente cache en maandbudget.
+
+SerpAPI rekent per zoekopdracht. De scraper-bronnen google_jobs, google_search
+en company_direct overlappen en stellen elke run dezelfde vragen opnieuw.
+Deze module:
+
+- cachet elke response in de DB, gesleuteld op (engine, query, start, dag):
+  dezelfde zoekopdracht op dezelfde dag kost dus maar één credit
+- bewaakt een maandquotum (SERPAPI_MONTHLY_QUOTA) en spreidt het resterende
+  budget gelijkmatig over de resterende dagen van de maand
+- ordent queries op historische opbrengst (vacatures mét e-mail per run), zodat
+  de beste queries als eerste budget krijgen als het krap wordt
+
+Gebruik:
+    with serpapi_run() as serp:
+        for query in serp.plan("google", QUERIES):
+            data = serp.search("google", query, start=0)
+            if data is None:
+                break  # budget op
+            ...
+            serp.record_yield("google", query, found=n, emailed=m)  # telt alleen live responses
+"""
+
+import calendar
+import json
+import logging
+import math
+import os
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterator, List, Optional
+
+import requests
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend import models
+
+logger = logging.getLogger(__name__)
+
+SERPAPI_KEY = os.getenv("SERPAPI_KEY", "")
+SERPAPI_URL = "https://serpapi.com/search.json"
+
+# Gratis tier = 100 zoekopdrachten per maand
+SERPAPI_MONTHLY_QUOTA = int(os.getenv("SERPAPI_MONTHLY_QUOTA", "100"))
+
+# Cache-rijen ouder dan dit worden opgeruimd (budget telt alleen de huidige maand)
+CACHE_RETENTION_DAYS = 40
+
+
+class SerpApiRun:
+    """Eén scrape-run: deelt een DB-sessie en houdt het run-budget bij."""
+
+    def __init__(self, db: Session, today: Optional[date] = None):
+        self.db = db
+        self.today = today or datetime.now(timezone.utc).date()
+        self.paid_calls = 0
+        self.cache_hits = 0
+        # (engine, query) met minstens één live response in deze run
+        self._live = set()
+        self._allowance = self._compute_allowance()
+
+    # ── Budget ────────────────────────────────────────────────────────────────
+
+    def _count_calls(self, since: date, until: Optional[date] = None) -> int:
+        q = self.db.query(func.count(models.SerpApiCache.id)).filter(
+            models.SerpApiCache.day >= since
+        )
+        if until is not None:
+            q = q.filter(models.SerpApiCache.day < until)
+        return q.scalar() or 0
+
+    def _compute_allowance(self) -> int:
+        """
+        Aantal betaalde calls dat vandaag nog mag.
+        Dagbudget = (quotum − verbruik vóór vandaag) / resterende dagen (incl. vandaag).
+        """
+        month_start = self.today.replace(day=1)
+        days_in_month = calendar.monthrange(self.today.year, self.today.month)[1]
+        days_left = days_in_month - self.today.day + 1
+
+        used_before_today = self._count_calls(month_start, until=self.today)
+        used_today = self._count_calls(self.today)
+
+        remaining_month = max(0, SERPAPI_MONTHLY_QUOTA - used_before_today - used_today)
+        daily = math.ceil(max(0, SERPAPI_MONTHLY_QUOTA - used_before_today) / days_left)
+        return max(0, min(daily - used_today, remaining_month))
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self._allowance - self.paid_calls)
+
+    # ── Query-planning ────────────────────────────────────────────────────────
+
+    def plan(self, engine: str, queries: List[str]) -> List[str]:
+        """
+        Sorteer queries op opbrengst: (emailed + 1) / (runs + 2).
+        Nieuwe queries krijgen zo een optimistische 0.5 en worden dus eerst
+        geprobeerd; bij gelijke score gaat de langst niet-gedraaide query voor.
+        """
+        stats = {
+            s.query: s
+            for s in self.db.query(models.SerpApiQueryStat)
+            .filter(models.SerpApiQueryStat.engine == engine)
+            .all()
+        }
+        epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+        def _key(query: str):
+            s = stats.get(query)
+            if not s:
+                return (-0.5, epoch)
+            score = (s.emailed_results + 1) / (s.runs + 2)
+            last = s.last_run_at or epoch
+            if last.tzinfo is None:
+                last = last.replace(tzinfo=timezone.utc)
+            return (-score, last)
+
+        return sorted(dict.fromkeys(queries), key=_key)
+
+    def record_yield(self, engine: str, query: str, found: int, emailed: int) -> None:
+        """
+        Werk de historische opbrengst van een query bij. Alleen als de query in
+        deze run live is opgevraagd: een cache-replay zou dezelfde opbrengst
+        dubbel tellen en de planning scheeftrekken.
+        """
+        if (engine, query) not in self._live:
+            return
+        stat = (
+            self.db.query(models.SerpApiQueryStat)
+            .filter(
+                models.SerpApiQueryStat.engine == engine,
+                models.SerpApiQueryStat.query == query,
+            )
+            .first()
+        )
+        if not stat:
+            stat = models.SerpApiQueryStat(engine=engine, query=query, runs=0, results=0, emailed_results=0)
+            self.db.add(stat)
+        stat.runs += 1
+        stat.results += found
+        stat.emailed_results += emailed
+        stat.last_run_at = datetime.now(timezone.utc)
+        self.db.commit()
+
+    # ── Zoeken ────────────────────────────────────────────────────────────────
+
+    def search(self, engine: str, query: str, start: int = 0) -> Optional[dict]:
+        """
+        Geeft de SerpAPI JSON-response terug (uit cache indien mogelijk).
+        None = budget voor deze run op. Netwerk-/HTTP-fouten worden doorgegeven.
+        """
+        cached = (
+            self.db.query(models.SerpApiCache)
+            .filter(
+                models.SerpApiCache.engine == engine,
+                models.SerpApiCache.query == query,
+                models.SerpApiCache.start == start,
+                models.SerpApiCache.day == self.today,
+            )
+            .first()
+        )
+        if cached:
+            self.cache_hits += 1
+            return json.loads(cached.response)
+
+        if self.remaining <= 0:
+            return None
+
+        params = {"engine": engine, "q": query, "gl": "nl", "hl": "nl", "api_key": SERPAPI_KEY}
+        if engine == "google":
+            params.update({"num": 10, "start": start})
+        elif start:
+            params["start"] = start
+
+        resp = requests.get(SERPAPI_URL, params=params, timeout=30)
+        resp.raise_for_status()
+        data = resp.json()
+        self.paid_calls += 1
+        self._live.add((engine, query))
+
+        try:
+            self.db.add(models.SerpApiCache(
+                engine=engine,
+                query=query,
+                start=start,
+                day=self.today,
+                response=json.dumps(data, ensure_ascii=False),
+            ))
+            self.db.commit()
+        except IntegrityError:
+            # Parallelle run heeft dezelfde key net opgeslagen — response is gelijk
+            self.db.rollback()
+        return data
+
+    def prune(self) -> None:
+        cutoff = self.today - timedelta(days=CACHE_RETENTION_DAYS)
+        self.db.query(models.SerpApiCache).filter(models.SerpApiCache.day < cutoff).delete()
+        self.db.commit()
+
+
+@contextmanager
+def serpapi_run() -> Iterator[SerpApiRun]:
+    """Open een SerpAPI-run met eigen DB-sessie (scraper draait buiten een request)."""
+    from backend.db import SessionLocal
+
+    db = SessionLocal()
+    run = SerpApiRun(db)
+    try:
+        run.prune()
+        logger.info("[serpapi] Run gestart — budget vandaag: %d calls", run.remaining)
+        yield run
+    finally:
+        logger.info(
+            "[serpapi] Run klaar — %d betaalde calls, %d cache hits",
+            run.paid_calls, run.cache_hits,
+        )
+        db.close()
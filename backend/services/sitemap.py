@@ -0,0 +1,213 @@
+"""
+Sitemap-discovery voor bureau- en carrièresites.
+
+In plaats van listing-pagina's (?page=2, ?page=3 ...) af te lopen en elke
+detailpagina elke run opnieuw op te halen:
+
+1. Lees robots.txt → `Sitemap:` regels (fallback: /sitemap.xml, /sitemap_index.xml)
+2. Parse de sitemap streaming (iterparse) — ook sitemap-indexen en .xml.gz
+3. Selecteer detail-URLs via het bureau-specifieke regex-patroon
+4. Vergelijk <lastmod> met de vorige run (tabel sitemap_urls) en geef alleen
+   nieuwe of gewijzigde URLs terug
+
+Per site kost dit één à twee requests in plaats van tientallen listing-pagina's.
+"""
+
+import gzip
+import io
+import logging
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import requests
+
+from backend import models
+
+logger = logging.getLogger(__name__)
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept": "application/xml,text/xml;q=0.9,*/*;q=0.8",
+}
+
+# Child-sitemaps met deze woorden in de URL worden als eerste gelezen
+JOB_SITEMAP_HINTS = ("vacature", "vacancy", "vacancies", "job", "career", "werken", "position")
+
+MAX_CHILD_SITEMAPS = 20     # per sitemap-index
+MAX_URLS_PER_SITE = 5000    # harde grens per site
+RECHECK_DAYS = 7            # URLs zonder <lastmod> na zoveel dagen opnieuw ophalen
+
+
+def _local(tag: str) -> str:
+    """'{http://www.sitemaps.org/schemas/sitemap/0.9}loc' → 'loc'."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def discover_sitemaps(base: str) -> List[str]:
+    """Zoek sitemap-URLs via robots.txt, met standaardpaden als fallback."""
+    base = base.rstrip("/")
+    found: List[str] = []
+    try:
+        r = requests.get(f"{base}/robots.txt", headers=HEADERS, timeout=10)
+        if r.status_code == 200:
+            for line in r.text.splitlines():
+                if line.lower().startswith("sitemap:"):
+                    url = line.split(":", 1)[1].strip()
+                    if url:
+                        found.append(urljoin(base + "/", url))
+    except Exception as e:
+        logger.debug("[sitemap] robots.txt fout %s: %s", base, e)
+
+    return list(dict.fromkeys(found)) or [f"{base}/sitemap.xml", f"{base}/sitemap_index.xml"]
+
+
+def _open_stream(url: str) -> Optional[io.BufferedReader]:
+    """Open een sitemap als byte-stream; pakt .gz transparant uit."""
+    try:
+        r = requests.get(url, headers=HEADERS, timeout=15, stream=True)
+        if r.status_code != 200:
+            r.close()
+            return None
+        r.raw.decode_content = True  # Content-Encoding: gzip
+        stream = io.BufferedReader(r.raw)
+        # Gzipped bestand (sitemap.xml.gz) herkennen aan de magic bytes
+        if stream.peek(2)[:2] == b"\x1f\x8b":
+            return io.BufferedReader(gzip.GzipFile(fileobj=stream))
+        return stream
+    except Exception as e:
+        logger.debug("[sitemap] Fout bij openen %s: %s", url, e)
+        return None
+
+
+def iter_sitemap(url: str, depth: int = 0) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Levert (loc, lastmod) per <url> entry. Sitemap-indexen worden recursief
+    gevolgd (max. 2 niveaus). Elementen worden direct na verwerking vrijgegeven,
+    zodat ook sitemaps met tienduizenden URLs weinig geheugen kosten.
+    """
+    stream = _open_stream(url)
+    if stream is None:
+        return
+
+    children: List[str] = []
+    loc: Optional[str] = None
+    lastmod: Optional[str] = None
+    try:
+        for _event, elem in ET.iterparse(stream, events=("end",)):
+            tag = _local(elem.tag)
+            if tag == "loc":
+                loc = (elem.text or "").strip()
+            elif tag == "lastmod":
+                lastmod = (elem.text or "").strip() or None
+            elif tag == "url":
+                if loc:
+                    yield loc, lastmod
+                loc = lastmod = None
+                elem.clear()
+            elif tag == "sitemap":
+                if loc:
+                    children.append(loc)
+                loc = lastmod = None
+                elem.clear()
+    except ET.ParseError as e:
+        logger.debug("[sitemap] Parse-fout %s: %s", url, e)
+    finally:
+        stream.close()
+
+    if children and depth < 2:
+        children.sort(key=lambda c: not any(h in c.lower() for h in JOB_SITEMAP_HINTS))
+        for child in children[:MAX_CHILD_SITEMAPS]:
+            yield from iter_sitemap(child, depth + 1)
+
+
+def collect_detail_urls(base: str, detail_re: str) -> List[Tuple[str, Optional[str]]]:
+    """Alle (url, lastmod) uit de sitemaps van een site die matchen op detail_re."""
+    pattern = re.compile(detail_re, re.I)
+    seen: set = set()
+    entries: List[Tuple[str, Optional[str]]] = []
+    for sitemap_url in discover_sitemaps(base):
+        for loc, lastmod in iter_sitemap(sitemap_url):
+            if loc in seen or not pattern.search(loc):
+                continue
+            seen.add(loc)
+            entries.append((loc, lastmod))
+            if len(entries) >= MAX_URLS_PER_SITE:
+                return entries
+        if entries:
+            break  # eerste werkende sitemap is genoeg
+    return entries
+
+
+def select_changed(entries: List[Tuple[str, Optional[str]]]) -> List[Tuple[str, Optional[str]]]:
+    """Filter op URLs die nieuw zijn of een andere <lastmod> hebben dan vorige keer."""
+    if not entries:
+        return []
+    from backend.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        urls = [u for u, _ in entries]
+        known = {}
+        # IN-lijst in blokken — sommige sites hebben duizenden URLs
+        for i in range(0, len(urls), 500):
+            for row in (
+                db.query(models.SitemapUrl.url, models.SitemapUrl.lastmod, models.SitemapUrl.checked_at)
+                .filter(models.SitemapUrl.url.in_(urls[i:i + 500]))
+                .all()
+            ):
+                known[row.url] = row
+    finally:
+        db.close()
+
+    recheck_before = datetime.now(timezone.utc) - timedelta(days=RECHECK_DAYS)
+    changed = []
+    for url, lastmod in entries:
+        prev = known.get(url)
+        if prev is None:
+            changed.append((url, lastmod))
+        elif lastmod:
+            if lastmod != prev.lastmod:
+                changed.append((url, lastmod))
+        else:
+            checked = prev.checked_at
+            if checked is not None and checked.tzinfo is None:
+                checked = checked.replace(tzinfo=timezone.utc)
+            if checked is None or checked < recheck_before:
+                changed.append((url, lastmod))
+    return changed
+
+
+def mark_checked(site: str, entries: List[Tuple[str, Optional[str]]]) -> None:
+    """Sla de lastmod op van URLs die deze run succesvol zijn opgehaald."""
+    if not entries:
+        return
+    from backend.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        by_url = dict(entries)
+        existing = {
+            row.url: row
+            for row in db.query(models.SitemapUrl).filter(models.SitemapUrl.url.in_(list(by_url))).all()
+        }
+        for url, lastmod in by_url.items():
+            row = existing.get(url)
+            if row is None:
+                db.add(models.SitemapUrl(url=url, site=site, lastmod=lastmod, checked_at=now))
+            else:
+                row.lastmod = lastmod
+                row.checked_at = now
+        db.commit()
+    except Exception as e:
+        logger.warning("[sitemap] Opslaan lastmod mislukt (%s): %s", site, e)
+        db.rollback()
+    finally:
+        db.close()
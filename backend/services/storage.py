@@ -15,6 +15,15 @@ class Storage(Protocol):
     def get_public_url(self, storage_key: str) -> Optional[str]:
         """Return public URL if applicable, else None"""
 
+    def put_bytes(self, storage_key: str, data: bytes, content_type: str) -> str:
+        """Schrijf naar een vaste key (overschrijft); return de volledige storage_key, zoals save_bytes"""
+
+    def read_bytes(self, storage_key: str) -> Optional[bytes]:
+        """Return inhoud, of None als de key niet bestaat"""
+
+    def delete(self, storage_key: str) -> None:
+        """Verwijder de key (geen fout als hij niet bestaat)"""
+
 
 @dataclass
 class LocalStorage:
@@ -39,6 +48,31 @@ class LocalStorage:
         # Local files are not publicly accessible by default
         return None
 
+    def put_bytes(self, storage_key: str, data: bytes, content_type: str) -> str:
+        full_path = os.path.join(self.base_dir, storage_key)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+
+        # Eerst naar een tijdelijk bestand: lezers zien nooit een half geschreven bestand
+        tmp_path = f"{full_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, full_path)
+
+        return storage_key
+
+    def read_bytes(self, storage_key: str) -> Optional[bytes]:
+        try:
+            with open(os.path.join(self.base_dir, storage_key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def delete(self, storage_key: str) -> None:
+        try:
+            os.remove(os.path.join(self.base_dir, storage_key))
+        except FileNotFoundError:
+            pass
+
 
 @dataclass
 class S3Storage:
@@ -73,6 +107,27 @@ class S3Storage:
         # Basic URL (works if bucket/object is public or via CloudFront)
         return f"https://{self.bucket}.s3.{self.region}.amazonaws.com/{storage_key}"
 
+    def put_bytes(self, storage_key: str, data: bytes, content_type: str) -> str:
+        # Zoals save_bytes: de teruggegeven key bevat de prefix (get_public_url, read_bytes, delete)
+        key = f"{self.prefix}/{storage_key}".lstrip("/")
+        self._client().put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=data,
+            ContentType=content_type or "application/octet-stream",
+        )
+        return key
+
+    def read_bytes(self, storage_key: str) -> Optional[bytes]:
+        client = self._client()
+        try:
+            return client.get_object(Bucket=self.bucket, Key=storage_key)["Body"].read()
+        except client.exceptions.NoSuchKey:
+            return None
+
+    def delete(self, storage_key: str) -> None:
+        self._client().delete_object(Bucket=self.bucket, Key=storage_key)
+
 
 def get_storage() -> Storage:
     backend = (os.getenv("STORAGE_BACKEND") or "local").lower().strip()
@@ -0,0 +1,238 @@
+"""
+Content-addressed cache voor TTS-audio.
+
+Lisa's vaste zinnen (begroeting, "een moment", afsluiting) werden voor elke
+kandidaat opnieuw door OpenAI TTS gegenereerd. De sleutel is een sha256 over
+(model, voice, speed, format, tekst); de audio staat in drie lagen:
+
+1. in-memory LRU per proces (TTS_CACHE_MEMORY_MB) — voor de veelgebruikte zinnen
+2. storage-backend (lokaal of S3, zie storage.py) onder tts/<key>.mp3
+3. tabel tts_cache met metadata: ETag (sha256 van de audio), grootte, hits
+
+Boven TTS_CACHE_MAX_MB worden de langst niet-gebruikte entries (last_hit_at)
+uit storage en tabel verwijderd. Een nog niet gecachete uitspraak wordt via
+stream() chunk voor chunk doorgegeven en pas na de laatste chunk opgeslagen —
+een afgebroken stream komt dus nooit in de cache. Fouten in de cache breken
+nooit een TTS-call.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from backend import models
+from backend.services import llm
+from backend.services.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "500"))
+TTS_CACHE_MEMORY_MB = int(os.getenv("TTS_CACHE_MEMORY_MB", "32"))
+
+EVICT_EVERY = 50          # na zoveel nieuwe entries draait een opruimronde
+STORAGE_PREFIX = "tts"
+
+_memory: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()  # key → (audio, etag)
+_memory_bytes = 0
+_lock = threading.Lock()
+_stores = 0
+
+
+def make_key(text: str, voice: str, speed: float, model: str, response_format: str = "mp3") -> str:
+    payload = f"{model}\x1f{voice}\x1f{speed:.2f}\x1f{response_format}\x1f{text.strip()}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ── In-memory laag ────────────────────────────────────────────────────────────
+
+def _memory_get(key: str) -> Optional[Tuple[bytes, str]]:
+    with _lock:
+        entry = _memory.get(key)
+        if entry is not None:
+            _memory.move_to_end(key)
+        return entry
+
+
+def _memory_put(key: str, audio: bytes, etag: str) -> None:
+    global _memory_bytes
+    limit = TTS_CACHE_MEMORY_MB * 1024 * 1024
+    if len(audio) > limit:
+        return
+    with _lock:
+        old = _memory.pop(key, None)
+        if old is not None:
+            _memory_bytes -= len(old[0])
+        _memory[key] = (audio, etag)
+        _memory_bytes += len(audio)
+        while _memory_bytes > limit:
+            _, (evicted, _) = _memory.popitem(last=False)
+            _memory_bytes -= len(evicted)
+
+
+def _memory_drop(key: str) -> None:
+    global _memory_bytes
+    with _lock:
+        old = _memory.pop(key, None)
+        if old is not None:
+            _memory_bytes -= len(old[0])
+
+
+# ── Publieke API ──────────────────────────────────────────────────────────────
+
+def get(key: str) -> Optional[Tuple[bytes, str]]:
+    """(audio, etag) uit de cache, of None."""
+    if not TTS_CACHE_ENABLED:
+        return None
+    hit = _memory_get(key)
+    if hit is not None:
+        return hit
+
+    from backend.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        row = db.query(models.TTSCacheEntry).filter(models.TTSCacheEntry.key == key).first()
+        if row is None:
+            return None
+        audio = get_storage().read_bytes(row.storage_key)
+        if audio is None:
+            # Bestand weg (opgeruimd, andere schijf) — metadata ook weg
+            db.delete(row)
+            db.commit()
+            return None
+        row.hits = (row.hits or 0) + 1
+        row.last_hit_at = datetime.now(timezone.utc)
+        db.commit()
+        _memory_put(key, audio, row.etag)
+        return audio, row.etag
+    except Exception as exc:
+        logger.debug("[tts-cache] Lezen mislukt: %s", exc)
+        return None
+    finally:
+        db.close()
+
+
+def put(key: str, audio: bytes, *, text: str, voice: str, speed: float, model: str) -> Optional[str]:
+    """Sla audio op; geeft de ETag terug (None als de cache uit staat of het opslaan mislukt)."""
+    global _stores
+    if not TTS_CACHE_ENABLED or not audio:
+        return None
+    etag = hashlib.sha256(audio).hexdigest()
+    _memory_put(key, audio, etag)
+
+    from backend.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        storage_key = get_storage().put_bytes(f"{STORAGE_PREFIX}/{key}.mp3", audio, "audio/mpeg")
+        db.add(models.TTSCacheEntry(
+            key=key,
+            storage_key=storage_key,
+            etag=etag,
+            model=model,
+            voice=voice,
+            speed=speed,
+            text=text,
+            size_bytes=len(audio),
+            hits=0,
+            last_hit_at=datetime.now(timezone.utc),
+        ))
+        db.commit()
+    except IntegrityError:
+        # Parallelle request met dezelfde zin was ons voor
+        db.rollback()
+        return etag
+    except Exception as exc:
+        logger.debug("[tts-cache] Schrijven mislukt: %s", exc)
+        db.rollback()
+        return None
+    finally:
+        db.close()
+
+    with _lock:
+        _stores += 1
+        run_eviction = _stores % EVICT_EVERY == 0
+    if run_eviction:
+        evict()
+    return etag
+
+
+def stream(key: str, text: str, *, voice: str, speed: float, model: str) -> Iterator[bytes]:
+    """Genereer audio chunk voor chunk en sla hem op zodra de laatste chunk binnen is."""
+    buffer = bytearray()
+    for chunk in llm.speech_stream(text, voice=voice, speed=speed, model=model):
+        buffer += chunk
+        yield chunk
+    put(key, bytes(buffer), text=text, voice=voice, speed=speed, model=model)
+
+
+def pregenerate(phrases: Iterable[str], *, voice: str, speed: float, model: str) -> int:
+    """Genereer ontbrekende audio voor vaste zinnen (bij opstarten/deploy). Geeft het aantal nieuwe entries."""
+    if not TTS_CACHE_ENABLED or not llm.is_enabled():
+        return 0
+    created = 0
+    for text in phrases:
+        key = make_key(text, voice, speed, model)
+        if get(key) is not None:
+            continue
+        try:
+            audio = llm.speech(text, voice=voice, speed=speed, model=model, feature="tts_pregenerate")
+        except Exception as exc:
+            logger.warning("[tts-cache] Voorgenereren mislukt (%s): %s", text[:40], exc)
+            continue
+        if put(key, audio, text=text, voice=voice, speed=speed, model=model):
+            created += 1
+    if created:
+        logger.info("[tts-cache] %d vaste zinnen voorgegenereerd", created)
+    return created
+
+
+def evict() -> int:
+    """Verwijder de minst recent gebruikte entries tot de cache onder TTS_CACHE_MAX_MB zit."""
+    from backend.db import SessionLocal
+
+    db = SessionLocal()
+    removed = 0
+    try:
+        excess = (db.query(func.coalesce(func.sum(models.TTSCacheEntry.size_bytes), 0)).scalar() or 0) \
+            - TTS_CACHE_MAX_MB * 1024 * 1024
+        if excess <= 0:
+            return 0
+        storage = get_storage()
+        rows = (
+            db.query(models.TTSCacheEntry.id, models.TTSCacheEntry.key,
+                     models.TTSCacheEntry.storage_key, models.TTSCacheEntry.size_bytes)
+            .order_by(models.TTSCacheEntry.last_hit_at.asc())
+            .all()
+        )
+        ids = []
+        for row in rows:
+            if excess <= 0:
+                break
+            storage.delete(row.storage_key)
+            _memory_drop(row.key)
+            excess -= row.size_bytes or 0
+            ids.append(row.id)
+        removed = (
+            db.query(models.TTSCacheEntry)
+            .filter(models.TTSCacheEntry.id.in_(ids))
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+    except Exception as exc:
+        logger.warning("[tts-cache] Opruimen mislukt: %s", exc)
+        db.rollback()
+    finally:
+        db.close()
+
+    if removed:
+        logger.info("[tts-cache] %d entries opgeruimd", removed)
+    return removed
@@ -6,13 +6,16 @@ Functies:
 - clean_description(text)      → verwijder contactinfo uit beschrijving
 - parse_metadata(title, desc)  → extract salary, hours, type, locatie via regex
 - ai_enrich(title, desc, co)   → herschrijf beschrijving via OpenAI (met fallback)
+- ai_enrich_batch(items)       → meerdere korte vacatures in één prompt (bulk publish)
 - enrich_for_publish(sv)       → geeft dict terug met alle Vacancy-velden
 """
 
+import json
 import logging
-import os
 import re
 
+from backend.services import llm
+
 logger = logging.getLogger(__name__)
 
 # ── Regex ─────────────────────────────────────────────────────────────────────
@@ -126,8 +129,7 @@ def ai_enrich_description(title: str, description: str, company_name: str) -> st
     Verwijdert contactinfo en maakt er 2-3 professionele alinea's van.
     Fallback naar clean_description() als er geen API key is of bij fout.
     """
-    api_key = os.getenv("OPENAI_API_KEY", "")
-    if not api_key:
+    if not llm.is_enabled():
         return _generate_fallback(title, description, company_name)
 
     raw_text = (description or "").strip()
@@ -149,21 +151,83 @@ def ai_enrich_description(title: str, description: str, company_name: str) -> st
     )
 
     try:
-        import openai
-        client = openai.OpenAI(api_key=api_key)
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=500,
-            temperature=0.4,
+        result = llm.chat(
+            [{"role": "user", "content": prompt}], max_tokens=500, temperature=0.4, feature="enrichment"
         )
-        result = resp.choices[0].message.content
-        return result.strip() if result else _generate_fallback(title, description, company_name)
+        return result if result else _generate_fallback(title, description, company_name)
     except Exception as exc:
         logger.warning("[enricher] OpenAI fout: %s", exc)
         return _generate_fallback(title, description, company_name)
 
 
+# Vacatures met een brontekst korter dan dit worden samen in één prompt verrijkt
+BATCH_SHORT_CHARS = 800
+BATCH_MAX_ITEMS = 4
+
+_ENRICH_INSTRUCTIONS = (
+    "Je bent een recruitment specialist. Herschrijf elke vacaturetekst naar een "
+    "professionele, aantrekkelijke vacature in het Nederlands. "
+    "Verwijder ALLE contactgegevens (emails, telefoonnummers, URLs, namen van contactpersonen). "
+    "Gebruik Markdown opmaak met precies deze 3 secties (vette koptekst + opsommingstekens):\n\n"
+    "**Wat ga je doen?**\n- [taken]\n\n"
+    "**Wat breng je mee?**\n- [eisen]\n\n"
+    "**Wat bieden wij?**\n- [voordelen]\n\n"
+    "Houd het zakelijk en aansprekend."
+)
+
+
+def ai_enrich_batch(items: list) -> dict:
+    """
+    Verrijk meerdere korte vacatures in één OpenAI-call.
+
+    items: [{"id": int, "title": str, "description": str, "company_name": str}, ...]
+    Geeft {id: beschrijving} terug. Items die de AI overslaat of bij een fout
+    ontbreken in het resultaat — de aanroeper valt dan terug op ai_enrich_description().
+    """
+    if not llm.is_enabled() or not items:
+        return {}
+
+    payload = [
+        {
+            "id": it["id"],
+            "functietitel": it["title"],
+            "bedrijf": it.get("company_name") or "Onbekend bedrijf",
+            "originele_tekst": (it.get("description") or "").strip()[:BATCH_SHORT_CHARS]
+            or "(geen omschrijving beschikbaar)",
+        }
+        for it in items
+    ]
+    prompt = (
+        f"{_ENRICH_INSTRUCTIONS}\n\n"
+        f"Geef je antwoord als geldig JSON-object: "
+        f'{{"vacatures": [{{"id": int, "beschrijving": str}}]}} — één entry per vacature.\n\n'
+        f"Vacatures:\n{json.dumps(payload, ensure_ascii=False)}"
+    )
+
+    try:
+        data = llm.chat_json(
+            [{"role": "user", "content": prompt}],
+            max_tokens=500 * len(items),
+            temperature=0.4,
+            feature="enrichment",
+        )
+    except Exception as exc:
+        logger.warning("[enricher] OpenAI batch fout: %s", exc)
+        return {}
+
+    wanted = {it["id"] for it in items}
+    result = {}
+    for entry in data.get("vacatures", []):
+        try:
+            vid = int(entry.get("id"))
+        except (TypeError, ValueError):
+            continue
+        text = (entry.get("beschrijving") or "").strip()
+        if vid in wanted and text:
+            result[vid] = text
+    return result
+
+
 def _generate_fallback(title: str, description: str, company_name: str) -> str:
     """Maak een leesbare beschrijving zonder AI: schoon op en splits in alinea's."""
     cleaned = clean_description(description)
@@ -52,8 +52,9 @@ type Message = {
 };
 
 type InterviewResult = {
-  score: number;
-  summary: string;
+  status: "processing" | "done" | "failed";
+  score: number | null;      // null zolang de score nog berekend wordt
+  summary: string | null;
   followup_scheduled: boolean;
   teams_join_url?: string;
   scheduled_at?: string;
@@ -182,6 +183,28 @@ export default function VideoInterviewPage() {
     anamAudioStreamRef.current = null;
   }, []);
 
+  // Realtime-sessie alvast klaarzetten zolang het startscherm open staat;
+  // de backend geeft aan wanneer het token ververst moet worden (refresh_in)
+  useEffect(() => {
+    if (LISA_MAINTENANCE || !appId) return;
+    let timer: ReturnType<typeof setTimeout> | undefined;
+    let cancelled = false;
+    const prefetch = async () => {
+      if (cancelled || stageRef.current !== "idle") return;
+      try {
+        const res = await fetch(`${BASE}/virtual-interview/session/${appId}/realtime-prefetch`, {
+          method: "POST",
+          headers: { Authorization: `Bearer ${getToken()}`, "Accept-Language": localStorage.getItem("lang") || "nl" },
+        });
+        if (!res.ok) return; // Geen toegang of limiet — de startknop toont de fout
+        const data = await res.json();
+        if (!cancelled && data.refresh_in) timer = setTimeout(prefetch, data.refresh_in * 1000);
+      } catch { /* negeer — start maakt dan zelf een token aan */ }
+    };
+    prefetch();
+    return () => { cancelled = true; if (timer) clearTimeout(timer); };
+  }, [appId]);
+
   // ── Maintenance mode ──────────────────────────────────────────────────────────
   if (LISA_MAINTENANCE) {
     return (
@@ -544,12 +567,23 @@ export default function VideoInterviewPage() {
         body: JSON.stringify({ transcript: messagesRef.current }),
       });
       if (!res.ok) throw new Error(`HTTP ${res.status}`);
-      const data: InterviewResult = await res.json();
+      let data: InterviewResult = await res.json();
       setResult(data);
       setStage("completed");
+
+      // Scoren en afronden gebeurt op de achtergrond — resultaat ophalen zodra het er is
+      for (let i = 0; data.status === "processing" && i < 60; i++) {
+        await new Promise((r) => setTimeout(r, 2000));
+        const poll = await fetch(`${BASE}/virtual-interview/session/${appId}/completion`, {
+          headers: { Authorization: `Bearer ${token}` },
+        });
+        if (!poll.ok) continue;
+        data = await poll.json();
+        setResult(data);
+      }
     } catch (err: unknown) {
       const msg = err instanceof Error ? err.message : "Onbekende fout";
-      setErrorMsg(`Score berekening mislukt: ${msg}`);
+      setErrorMsg(`Interview afronden mislukt: ${msg}`);
       setStage("error");
     }
   };
@@ -575,22 +609,24 @@ export default function VideoInterviewPage() {
   // ── Resultaatscherm ───────────────────────────────────────────────────────────
 
   if (stage === "completed" && result) {
-    const scoreColor = result.score >= 70 ? "#059669" : result.score >= 50 ? "#d97706" : "#dc2626";
-    const scoreBg = result.score >= 70 ? "#d1fae5" : result.score >= 50 ? "#fef3c7" : "#fee2e2";
+    const scored = result.score !== null;
+    const score = result.score ?? 0;
+    const scoreColor = !scored ? "#9ca3af" : score >= 70 ? "#059669" : score >= 50 ? "#d97706" : "#dc2626";
+    const scoreBg = !scored ? "#f3f4f6" : score >= 70 ? "#d1fae5" : score >= 50 ? "#fef3c7" : "#fee2e2";
     return (
       <div style={{ fontFamily: "system-ui, sans-serif", background: "#0f1117", minHeight: "100vh", display: "flex", alignItems: "center", justifyContent: "center", padding: 24 }}>
         <div style={{ background: "#fff", borderRadius: 20, padding: "40px 36px", maxWidth: 520, width: "100%", textAlign: "center" }}>
           <div style={{ fontSize: 48, marginBottom: 16 }}>
-            {result.score >= 70 ? "🎉" : result.score >= 50 ? "👍" : "📋"}
+            {!scored ? "⏳" : score >= 70 ? "🎉" : score >= 50 ? "👍" : "📋"}
           </div>
           <h1 style={{ fontSize: 24, fontWeight: 800, color: "#111827", margin: "0 0 8px" }}>
             Interview afgerond
           </h1>
           <p style={{ fontSize: 14, color: "#6b7280", marginBottom: 20, lineHeight: 1.6 }}>
-            Bedankt voor je tijd! Je score:
+            {scored ? "Bedankt voor je tijd! Je score:" : "Bedankt voor je tijd! Je score wordt berekend..."}
           </p>
           <div style={{ width: 90, height: 90, borderRadius: "50%", background: scoreBg, border: `4px solid ${scoreColor}`, display: "flex", alignItems: "center", justifyContent: "center", margin: "0 auto 20px", fontSize: 26, fontWeight: 900, color: scoreColor }}>
-            {result.score}
+            {scored ? score : "…"}
           </div>
           <div style={{ background: "#f0fdf4", border: "1px solid #bbf7d0", borderRadius: 12, padding: "16px 20px", marginBottom: 24 }}>
             <p style={{ fontSize: 14, color: "#059669", fontWeight: 600, margin: 0 }}>
@@ -25,6 +25,9 @@ type Message = {
   content: string;
 };
 
+// Tijdelijk id van Lisa's antwoord terwijl het binnenstreamt ({"delta": ...}-frames)
+const STREAM_ID = -1;
+
 export default function RecruiterChatPage({ params }: { params: { id: string } }) {
   const router = useRouter();
   const token = useMemo(() => getToken(), []);
@@ -88,6 +91,18 @@ export default function RecruiterChatPage({ params }: { params: { id: string } }
             return;
           }
 
+          if (typeof data.delta === "string") {
+            setMessages((prev) => {
+              const last = prev[prev.length - 1];
+              if (last && last.id === STREAM_ID) {
+                return [...prev.slice(0, -1), { ...last, content: last.content + data.delta }];
+              }
+              return [...prev, { id: STREAM_ID, role: "recruiter", content: data.delta }];
+            });
+            setLoading(false);
+            return;
+          }
+
           if (data.id && seenIds.current.has(data.id)) return;
           if (data.id) seenIds.current.add(data.id);
 
@@ -113,7 +128,8 @@ export default function RecruiterChatPage({ params }: { params: { id: string } }
             content: data.content,
           };
 
-          setMessages((prev) => [...prev, msg]);
+          // Slotbericht vervangt het gestreamde antwoord
+          setMessages((prev) => [...prev.filter((m) => m.id !== STREAM_ID), msg]);
 
           if (data.role === "recruiter") setSending(false);
           if (data.ended) setChatEnded(true);
@@ -305,7 +321,7 @@ export default function RecruiterChatPage({ params }: { params: { id: string } }
             ))}
 
             {/* Typing indicator */}
-            {sending && (
+            {sending && !messages.some((m) => m.id === STREAM_ID) && (
               <div className="flex gap-3">
                 <video
                   src={AMBER_VIDEO_URL}
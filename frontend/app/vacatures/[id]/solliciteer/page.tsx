@@ -17,7 +17,7 @@ function ResultRedirect({
   scoreColor,
   vacancy,
 }: {
-  result: { match_score: number; explanation: string; application_id: number };
+  result: { match_score: number | null; explanation: string; application_id: number };
   scoreColor: string;
   vacancy: PublicVacancyDetail | null;
 }) {
@@ -54,10 +54,12 @@ function ResultRedirect({
       {/* Score */}
       <div style={{ marginBottom: 24 }}>
         <div style={{ width: 100, height: 100, borderRadius: "50%", border: `6px solid ${scoreColor}`, display: "flex", alignItems: "center", justifyContent: "center", margin: "0 auto 16px", fontSize: 28, fontWeight: 800, color: scoreColor }}>
-          {result.match_score}%
+          {result.match_score === null ? "…" : `${result.match_score}%`}
         </div>
         <h2 style={{ fontSize: 18, fontWeight: 700, color: "#111827", margin: "0 0 8px" }}>
-          {result.match_score >= 70 ? "Sterke match!" : result.match_score >= 40 ? "Redelijke match" : "Sollicitatie ingediend"}
+          {result.match_score === null
+            ? "Matchscore wordt berekend"
+            : result.match_score >= 70 ? "Sterke match!" : result.match_score >= 40 ? "Redelijke match" : "Sollicitatie ingediend"}
         </h2>
         <p style={{ fontSize: 14, color: "#6b7280", lineHeight: 1.6, maxWidth: 420, margin: "0 auto" }}>
           {result.explanation}
@@ -164,7 +166,7 @@ export default function SolliciteerPage({ params }: { params: { id: string } })
   const [genLoading, setGenLoading]       = useState(false);
 
   // Resultaat
-  const [result, setResult] = useState<{ match_score: number; explanation: string; application_id: number } | null>(null);
+  const [result, setResult] = useState<{ match_score: number | null; explanation: string; application_id: number } | null>(null);
 
   useEffect(() => {
     const load = async () => {
@@ -233,7 +235,7 @@ export default function SolliciteerPage({ params }: { params: { id: string } })
   const gStep = (label: string) => steps.indexOf(label) + 1;
 
   // ── Score kleur ──
-  const scoreColor = result
+  const scoreColor = result && result.match_score !== null
     ? result.match_score >= 70 ? "#059669" : result.match_score >= 40 ? "#d97706" : "#dc2626"
     : "#6b7280";
 
@@ -244,10 +244,11 @@ export async function applyToVacancy(vacancyId: number, formData: FormData) {
   if (!res.ok) throw new Error(data?.detail || data?.raw || "Sollicitatie mislukt");
   return data as {
     application_id: number;
-    match_score: number;
+    match_score: number | null; // null = score volgt nog (AI-analyse loopt)
     explanation: string;
     access_token: string;
     token_type: string;
+    processing_status: string;
   };
 }
 
@@ -269,9 +270,10 @@ export async function applyToVacancyAuthenticated(
   if (!res.ok) throw new Error(data?.detail || data?.raw || "Sollicitatie mislukt");
   return data as {
     application_id: number;
-    match_score: number;
+    match_score: number | null; // null = score volgt nog (AI-analyse loopt)
     explanation: string;
     access_token: string;
+    processing_status: string;
   };
 }
 
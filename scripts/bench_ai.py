@@ -0,0 +1,356 @@
+"""
+Benchmark van de AI-paden tegen de lokale OpenAI-stand-in (scripts/fake_openai.py).
+
+Start de stand-in en de backend (uvicorn, echte HTTP/WebSocket) in dit proces,
+maakt een Premium-werkgever met een vacature aan en drijft daarna per scenario
+`--iterations` flows met `--concurrency` parallelle clients:
+
+    apply       POST /vacancies/{id}/apply → poll /processing tot de pipeline klaar is
+                (pre-screen, CV-digest, opening)
+    chat        WS /ws/chat: openingsbericht, daarna --turns antwoorden (eerste delta + volledig)
+    interview   virtueel interview: start → --turns × answer → complete, plus realtime-token
+    enrichment  vacancy_enricher: losse verrijking en een batch van 4
+
+Per operatie: aantal, fouten, doorvoer (geslaagd/s over de looptijd van het
+scenario), p50/p95/max latency in ms. De responses van de stand-in zijn
+deterministisch, dus runs zijn onderling vergelijkbaar (gateway, caching,
+streaming); latency en foutinjectie stel je in met dezelfde opties als
+fake_openai.py.
+
+Gebruik:
+    python scripts/bench_ai.py
+    python scripts/bench_ai.py --scenarios chat,interview --concurrency 16 --iterations 50
+    python scripts/bench_ai.py --latency lognormal:900,0.5 --error-rate 0.05 --json bench.json
+    python scripts/bench_ai.py --openai-base-url http://127.0.0.1:8900/v1   # eigen stand-in
+
+Zonder --database-url draait alles op een tijdelijke SQLite-database. Let op:
+SQLite serialiseert schrijfacties; voor hogere concurrency een Postgres-URL gebruiken.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fake_openai  # noqa: E402
+
+SCENARIOS = ("apply", "chat", "interview", "enrichment")
+CV_TEXT = (
+    "Ervaren Python developer met 6 jaar ervaring in Django, FastAPI en PostgreSQL. "
+    "Bouwde REST API's en data-pipelines, werkt met Docker en AWS. HBO Informatica."
+)
+PIPELINE_TIMEOUT = 120.0
+
+
+# ── Metingen ──────────────────────────────────────────────────────────────────
+
+class Recorder:
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[Tuple[float, bool]]] = defaultdict(list)
+        self.windows: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, op: str, ms: float, ok: bool) -> None:
+        with self._lock:
+            self.samples[op].append((ms, ok))
+
+    @contextmanager
+    def measure(self, op: str):
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.add(op, (time.perf_counter() - started) * 1000, ok)
+
+    def report(self) -> List[dict]:
+        rows = []
+        for op, samples in self.samples.items():
+            ok_ms = sorted(ms for ms, ok in samples if ok)
+            window = self.windows.get(op.split(".")[0]) or 0
+            rows.append({
+                "op": op,
+                "n": len(samples),
+                "errors": sum(1 for _, ok in samples if not ok),
+                "ops_per_s": round(len(ok_ms) / window, 2) if window else None,
+                "p50_ms": round(_percentile(ok_ms, 0.50), 1) if ok_ms else None,
+                "p95_ms": round(_percentile(ok_ms, 0.95), 1) if ok_ms else None,
+                "max_ms": round(ok_ms[-1], 1) if ok_ms else None,
+            })
+        return rows
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentiel."""
+    rank = max(1, int(-(-pct * len(sorted_values) // 1)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def print_table(rows: List[dict]) -> None:
+    header = f"{'operatie':<28}{'n':>6}{'fout':>6}{'ops/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        cells = [r["ops_per_s"], r["p50_ms"], r["p95_ms"], r["max_ms"]]
+        print(f"{r['op']:<28}{r['n']:>6}{r['errors']:>6}" + "".join(
+            f"{('-' if c is None else c):>{w}}" for c, w in zip(cells, (9, 10, 10, 10))
+        ))
+
+
+# ── Omgeving ──────────────────────────────────────────────────────────────────
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_backend():
+    """Backend via uvicorn in een thread (met lifespan: apply-worker, telemetrie)."""
+    import uvicorn
+
+    from backend.main import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.time() + 30
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("backend startte niet binnen 30s")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server
+
+
+def create_vacancy() -> int:
+    from backend import models
+    from backend.db import SessionLocal
+    from backend.security import hash_password
+
+    db = SessionLocal()
+    try:
+        employer = models.User(
+            email=f"bench-{uuid.uuid4().hex[:8]}@example.com",
+            full_name="Bench Werkgever",
+            hashed_password=hash_password(uuid.uuid4().hex),
+            role="employer",
+            plan="premium",
+        )
+        db.add(employer)
+        db.flush()
+        vacancy = models.Vacancy(
+            employer_id=employer.id,
+            title="Python developer",
+            description="Wij zoeken een Python developer met ervaring in Django, PostgreSQL en REST API's.",
+            location="Utrecht",
+            status="actief",
+        )
+        db.add(vacancy)
+        db.commit()
+        return vacancy.id
+    finally:
+        db.close()
+
+
+# ── Flows ─────────────────────────────────────────────────────────────────────
+
+def apply_flow(http, vacancy_id: int, rec: Optional[Recorder] = None) -> Tuple[str, int]:
+    """Sollicitatie + wachten tot de pipeline klaar is. Zonder rec: setup voor andere scenario's."""
+    rec = rec or Recorder()
+    started = time.perf_counter()
+    with rec.measure("apply.request"):
+        r = http.post(
+            f"/vacancies/{vacancy_id}/apply",
+            data={
+                "full_name": "Bench Kandidaat",
+                "email": f"kandidaat-{uuid.uuid4().hex[:10]}@example.com",
+                "password": "BenchWachtwoord123",
+                "terms_accepted": "true",
+            },
+            files={"cv_file": ("cv.txt", CV_TEXT.encode(), "text/plain")},
+        )
+        r.raise_for_status()
+    token, app_id = r.json()["access_token"], r.json()["application_id"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    status = None
+    while time.perf_counter() - started < PIPELINE_TIMEOUT:
+        status = http.get(f"/candidate/applications/{app_id}/processing", headers=headers).json().get("status")
+        if status in ("done", "failed"):
+            break
+        time.sleep(0.05)
+    rec.add("apply.pipeline", (time.perf_counter() - started) * 1000, status == "done")
+    return token, app_id
+
+
+def chat_flow(http, ws_base: str, vacancy_id: int, turns: int, rec: Recorder) -> None:
+    from websockets.sync.client import connect
+
+    token, app_id = apply_flow(http, vacancy_id)
+
+    def until(ws, predicate) -> dict:
+        while True:
+            frame = json.loads(ws.recv(timeout=PIPELINE_TIMEOUT))
+            if frame.get("error"):
+                raise RuntimeError(frame["error"])
+            if predicate(frame):
+                return frame
+
+    with rec.measure("chat.connect_opening"):
+        ws = connect(f"{ws_base}/ws/chat/{app_id}?token={token}&lang=nl", open_timeout=30)
+        until(ws, lambda f: f.get("role") == "recruiter" and "id" in f)
+    with ws:
+        for i in range(turns):
+            started = time.perf_counter()
+            ws.send(json.dumps({"content": f"Antwoord {i + 1}: ik werk graag in een team aan API's."}))
+            with rec.measure("chat.first_delta"):
+                until(ws, lambda f: "delta" in f)
+            final = until(ws, lambda f: f.get("role") == "recruiter" and "id" in f)
+            rec.add("chat.reply", (time.perf_counter() - started) * 1000, True)
+            if final.get("ended"):
+                break
+
+
+def interview_flow(http, vacancy_id: int, turns: int, rec: Recorder) -> None:
+    token, app_id = apply_flow(http, vacancy_id)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def post(op: str, path: str, **kwargs):
+        with rec.measure(op):
+            r = http.post(f"/virtual-interview/session/{app_id}{path}", headers=headers, **kwargs)
+            r.raise_for_status()
+            return r.json()
+
+    start = post("interview.start", "/start")
+    post("interview.speak", "/speak", json={"text": start.get("opening_text") or "Welkom bij het interview!"})
+    for i in range(turns):
+        result = post("interview.answer", "/answer", json={"transcript": f"Antwoord {i + 1} over mijn ervaring."})
+        if result.get("ended"):
+            break
+    post("interview.complete", "/complete")
+    post("interview.realtime_token", "/realtime-token")
+
+
+def enrichment_flow(i: int, rec: Recorder) -> None:
+    from backend.services import vacancy_enricher
+
+    description = f"Vacature {i}: magazijnmedewerker, orderpicken, 32-40 uur. Bel 06-12345678."
+    with rec.measure("enrichment.single"):
+        vacancy_enricher.ai_enrich_description("Magazijnmedewerker", description, "Logistiek BV")
+    items = [
+        {"id": i * 10 + n, "title": f"Functie {n}", "description": f"Korte tekst {i}-{n}", "company_name": "Bedrijf BV"}
+        for n in range(4)
+    ]
+    with rec.measure("enrichment.batch4"):
+        if len(vacancy_enricher.ai_enrich_batch(items)) != len(items):
+            raise RuntimeError("batch onvolledig")
+
+
+def run_scenario(name: str, args, http_factory, ws_base: str, vacancy_id: int, rec: Recorder) -> None:
+    def job(i: int) -> None:
+        try:
+            if name == "enrichment":
+                enrichment_flow(i, rec)
+                return
+            with http_factory() as http:
+                if name == "apply":
+                    apply_flow(http, vacancy_id, rec)
+                elif name == "chat":
+                    chat_flow(http, ws_base, vacancy_id, args.turns, rec)
+                elif name == "interview":
+                    interview_flow(http, vacancy_id, args.turns, rec)
+        except Exception as exc:
+            rec.add(f"{name}.flow_error", 0.0, False)
+            if args.verbose:
+                print(f"[bench] {name} #{i}: {exc!r}", file=sys.stderr)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(job, range(args.iterations)))
+    rec.windows[name] = time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=10, help="flows per scenario")
+    parser.add_argument("--turns", type=int, default=3, help="antwoorden per chat/interview")
+    parser.add_argument("--database-url", default="")
+    parser.add_argument("--openai-base-url", default="", help="bestaande stand-in gebruiken")
+    parser.add_argument("--json", default="", help="resultaten ook als JSON naar dit bestand")
+    parser.add_argument("--verbose", action="store_true")
+    fake_openai.add_config_arguments(parser)
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"onbekende scenario's: {', '.join(sorted(unknown))}")
+
+    fake_server = None
+    base_url = args.openai_base_url
+    if not base_url:
+        base_url, fake_server = fake_openai.serve_in_thread(fake_openai.config_from_args(args))
+
+    # Vóór het importeren van de backend: modules lezen hun config bij import
+    tmpdir = tempfile.mkdtemp(prefix="bench-ai-")
+    os.environ["OPENAI_API_KEY"] = "bench-fake-key"
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    os.environ.setdefault("UPLOAD_DIR", os.path.join(tmpdir, "uploads"))
+    os.environ.setdefault("TTS_PREGENERATE_ON_START", "false")
+
+    import httpx
+
+    backend_url, backend_server = start_backend()
+    ws_base = backend_url.replace("http://", "ws://")
+    vacancy_id = create_vacancy()
+
+    def http_factory():
+        return httpx.Client(base_url=backend_url, timeout=PIPELINE_TIMEOUT)
+
+    fake_admin = base_url.rsplit("/v1", 1)[0]
+    httpx.post(f"{fake_admin}/_fake/reset")
+
+    rec = Recorder()
+    for name in scenarios:
+        print(f"[bench] {name}: {args.iterations} flows, concurrency {args.concurrency}", file=sys.stderr)
+        run_scenario(name, args, http_factory, ws_base, vacancy_id, rec)
+
+    rows = rec.report()
+    fake_stats = httpx.get(f"{fake_admin}/_fake/stats").json()
+    print()
+    print_table(rows)
+    print()
+    print("Stand-in calls:", json.dumps(fake_stats))
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({
+                "config": {k: v for k, v in vars(args).items() if k != "json"},
+                "results": rows,
+                "fake_openai": fake_stats,
+            }, fh, indent=2)
+
+    backend_server.should_exit = True
+    if fake_server is not None:
+        fake_server.should_exit = True
+    time.sleep(0.5)
+
+
+if __name__ == "__main__":
+    main()
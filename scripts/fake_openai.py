@@ -0,0 +1,443 @@
+"""
+Lokale, OpenAI-compatibele stand-in voor load- en benchmarktests.
+
+Beantwoordt de endpoints die de backend gebruikt, zonder echte (betaalde) calls:
+
+    POST /v1/chat/completions           tekst, JSON mode (response_format) en streaming (SSE,
+                                        incl. stream_options.include_usage)
+    POST /v1/audio/speech               nep-mp3, in chunks gestreamd
+    POST /v1/embeddings                 genormaliseerde vectoren (float of base64)
+    POST /v1/realtime/client_secrets    ephemeral token voor Lisa 2.0
+    GET  /v1/models
+
+Antwoorden zijn deterministisch: dezelfde request geeft altijd dezelfde tekst,
+score en vector (seed = sha256 van de body). Latency volgt een instelbare
+verdeling, foutinjectie (HTTP-status of een hangende request) gebruikt een
+eigen geseedde RNG. Beheer tijdens een run:
+
+    GET  /_fake/stats     calls, fouten en gemiddelde gesimuleerde latency per endpoint
+    POST /_fake/reset     tellers op nul
+    POST /_fake/config    instellingen wijzigen, bv. {"error_rate": 0.1}
+
+Starten:
+    python scripts/fake_openai.py --port 8900 --latency lognormal:600,0.4 --error-rate 0.02
+
+De backend ernaar laten wijzen:
+    OPENAI_API_KEY=fake OPENAI_BASE_URL=http://127.0.0.1:8900/v1 uvicorn backend.main:app
+
+Latency-notatie: fixed:MS | uniform:LO,HI | normal:GEM,SD | lognormal:MEDIAAN,SIGMA (ms).
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import random
+import re
+import struct
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import asdict, dataclass, fields
+from typing import Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+
+@dataclass
+class FakeConfig:
+    latency: str = "lognormal:500,0.35"        # volledige response (niet-streaming) / tot eerste token
+    token_latency: str = "normal:15,5"         # tussen stream-chunks
+    speech_latency: str = "lognormal:300,0.3"  # tot de eerste audio-chunk
+    embedding_latency: str = "normal:80,20"
+    reply_tokens: int = 60                     # lengte van een tekstantwoord (begrensd door max_tokens)
+    error_rate: float = 0.0                    # kans op een HTTP-fout per request
+    error_statuses: str = "429,500,503"
+    hang_rate: float = 0.0                     # kans dat een request hangt (client-timeout testen)
+    hang_seconds: float = 120.0
+    seed: int = 42
+
+
+def parse_distribution(spec: str) -> Tuple[str, Tuple[float, ...]]:
+    kind, _, args = spec.partition(":")
+    values = tuple(float(v) for v in args.split(",") if v.strip())
+    expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+    if kind not in expected or len(values) != expected[kind]:
+        raise ValueError(f"Ongeldige latency-verdeling: {spec!r}")
+    return kind, values
+
+
+def sample_ms(spec: str, rng: random.Random) -> float:
+    kind, v = parse_distribution(spec)
+    if kind == "fixed":
+        value = v[0]
+    elif kind == "uniform":
+        value = rng.uniform(v[0], v[1])
+    elif kind == "normal":
+        value = rng.gauss(v[0], v[1])
+    else:
+        value = v[0] * math.exp(rng.gauss(0, v[1]))
+    return max(0.0, value)
+
+
+# ── Deterministische inhoud ───────────────────────────────────────────────────
+
+WORDS = (
+    "ervaring team project klanten ontwikkeling kwaliteit planning overleg resultaat "
+    "verantwoordelijkheid analyse processen samenwerking communicatie oplossing leren "
+    "motivatie uitdaging vaardigheden functie organisatie verbetering doelen aanpak"
+).split()
+
+QUESTIONS = [
+    "Kun je een voorbeeld geven van een project waar je trots op bent?",
+    "Hoe ga je om met tegenstrijdige prioriteiten?",
+    "Wat spreekt je het meest aan in deze functie?",
+    "Hoe zou je collega's je omschrijven?",
+]
+
+
+def _rng_for(payload) -> random.Random:
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(max(words, 3)))
+    return text[0].upper() + text[1:] + "."
+
+
+def _text_reply(rng: random.Random, tokens: int) -> str:
+    parts, used = [], 0
+    while used < tokens:
+        n = rng.randint(6, 14)
+        parts.append(_sentence(rng, n))
+        used += n
+    parts.append(rng.choice(QUESTIONS))
+    return " ".join(parts)
+
+
+def _json_reply(rng: random.Random, prompt: str) -> dict:
+    """Eén object met de keys die de prompts van de backend verwachten (extra keys worden genegeerd)."""
+    score = rng.randint(35, 92)
+    data = {
+        "match_score": score,
+        "score": score,
+        "explanation": _sentence(rng, 18),
+        "summary": _sentence(rng, 20),
+        "strengths": _sentence(rng, 10),
+        "gaps": _sentence(rng, 10),
+        "suggested_questions": " ".join(rng.sample(QUESTIONS, 2)),
+        "skills": rng.sample(WORDS, 6),
+        "roles": [{"title": "Medewerker " + rng.choice(WORDS), "employer": "Bedrijf BV", "years": rng.randint(1, 8)}],
+        "years_experience": rng.randint(1, 15),
+        "education": ["HBO " + rng.choice(WORDS)],
+        "languages": ["Nederlands", "Engels"],
+        "quality": rng.choice(["goed", "voldoende", "onvoldoende"]),
+    }
+    # Batch-verrijking: één entry per vacature-id uit de prompt
+    ids = list(dict.fromkeys(int(i) for i in re.findall(r'"id":\s*(\d+)', prompt)))
+    if ids:
+        data["vacatures"] = [{"id": i, "beschrijving": _text_reply(rng, 40)} for i in ids]
+    return data
+
+
+def _wants_json(body: dict, prompt: str) -> bool:
+    if (body.get("response_format") or {}).get("type") in ("json_object", "json_schema"):
+        return True
+    # Prompts die zonder JSON mode toch strikt JSON vragen (bv. interview-scoring)
+    return "JSON" in prompt and bool(re.search(r"\b(ALLEEN|ONLY|uitsluitend)\b", prompt))
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+# ── Server ────────────────────────────────────────────────────────────────────
+
+def create_app(config: Optional[FakeConfig] = None) -> FastAPI:
+    app = FastAPI(title="fake-openai", docs_url=None, redoc_url=None)
+    app.state.config = config or FakeConfig()
+    app.state.fault_rng = random.Random(app.state.config.seed)
+    app.state.latency_rng = random.Random(app.state.config.seed + 1)
+    app.state.stats = defaultdict(lambda: {"calls": 0, "errors": 0, "hangs": 0, "latency_ms_total": 0.0})
+    lock = threading.Lock()
+
+    def cfg() -> FakeConfig:
+        return app.state.config
+
+    def latency(spec: str) -> float:
+        with lock:
+            return sample_ms(spec, app.state.latency_rng)
+
+    def fault(endpoint: str) -> Optional[str]:
+        """'hang', een HTTP-status als string, of None."""
+        with lock:
+            stats = app.state.stats[endpoint]
+            stats["calls"] += 1
+            roll = app.state.fault_rng.random()
+            if roll < cfg().hang_rate:
+                stats["hangs"] += 1
+                return "hang"
+            if roll < cfg().hang_rate + cfg().error_rate:
+                stats["errors"] += 1
+                statuses = [s.strip() for s in cfg().error_statuses.split(",") if s.strip()]
+                return app.state.fault_rng.choice(statuses)
+        return None
+
+    def record_latency(endpoint: str, ms: float) -> None:
+        with lock:
+            app.state.stats[endpoint]["latency_ms_total"] += ms
+
+    async def inject(endpoint: str) -> Optional[Response]:
+        outcome = fault(endpoint)
+        if outcome == "hang":
+            await asyncio.sleep(cfg().hang_seconds)
+            return JSONResponse({"error": {"message": "hang", "type": "timeout"}}, status_code=504)
+        if outcome:
+            status = int(outcome)
+            kind = "rate_limit_exceeded" if status == 429 else "server_error"
+            return JSONResponse(
+                {"error": {"message": f"Geïnjecteerde fout ({status})", "type": kind, "code": kind}},
+                status_code=status,
+                headers={"retry-after": "0"} if status == 429 else None,
+            )
+        return None
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        error = await inject("chat")
+        if error is not None:
+            return error
+
+        messages = body.get("messages") or []
+        prompt = "\n".join(str(m.get("content") or "") for m in messages)
+        rng = _rng_for(body)
+        model = body.get("model") or "gpt-4o-mini"
+        max_tokens = body.get("max_tokens") or body.get("max_completion_tokens") or 1000
+        if _wants_json(body, prompt):
+            content = json.dumps(_json_reply(rng, prompt), ensure_ascii=False)
+        else:
+            content = _text_reply(rng, min(cfg().reply_tokens, max_tokens))
+        usage = {
+            "prompt_tokens": _count_tokens(prompt),
+            "completion_tokens": _count_tokens(content),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        first_ms = latency(cfg().latency)
+        record_latency("chat", first_ms)
+
+        if not body.get("stream"):
+            await asyncio.sleep(first_ms / 1000)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                    "logprobs": None,
+                }],
+                "usage": usage,
+            }
+
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+        pieces = re.findall(r"\S+\s*", content)
+
+        def chunk(delta: dict, finish: Optional[str] = None, with_usage: bool = False) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [] if with_usage else [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }
+            if with_usage:
+                payload["usage"] = usage
+            return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+        async def events():
+            await asyncio.sleep(first_ms / 1000)
+            yield chunk({"role": "assistant", "content": ""})
+            for piece in pieces:
+                yield chunk({"content": piece})
+                await asyncio.sleep(latency(cfg().token_latency) / 1000)
+            yield chunk({}, finish="stop")
+            if include_usage:
+                yield chunk({}, with_usage=True)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1/audio/speech")
+    async def speech(request: Request):
+        body = await request.json()
+        error = await inject("speech")
+        if error is not None:
+            return error
+
+        text = str(body.get("input") or "")
+        # ± 200 bytes per teken (ruwweg tts-1 mp3), deterministisch per (tekst, stem, snelheid)
+        seed = hashlib.sha256(json.dumps(body, sort_keys=True).encode()).digest()
+        size = max(1024, len(text) * 200)
+        audio = b"ID3" + (seed * (size // len(seed) + 1))[: size - 3]
+        first_ms = latency(cfg().speech_latency)
+        record_latency("speech", first_ms)
+
+        async def chunks():
+            await asyncio.sleep(first_ms / 1000)
+            for start in range(0, len(audio), 4096):
+                yield audio[start:start + 4096]
+                await asyncio.sleep(latency(cfg().token_latency) / 1000)
+
+        return StreamingResponse(chunks(), media_type="audio/mpeg")
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        error = await inject("embeddings")
+        if error is not None:
+            return error
+
+        inputs = body.get("input")
+        inputs = [inputs] if isinstance(inputs, str) else list(inputs or [])
+        dims = int(body.get("dimensions") or 1536)
+        wait_ms = latency(cfg().embedding_latency)
+        record_latency("embeddings", wait_ms)
+        await asyncio.sleep(wait_ms / 1000)
+
+        data = []
+        for i, text in enumerate(inputs):
+            rng = _rng_for({"embedding": text, "dims": dims})
+            vec = [rng.gauss(0, 1) for _ in range(dims)]
+            norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+            vec = [x / norm for x in vec]
+            if body.get("encoding_format") == "base64":
+                embedding = base64.b64encode(struct.pack(f"<{dims}f", *vec)).decode()
+            else:
+                embedding = vec
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        tokens = sum(_count_tokens(str(t)) for t in inputs)
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model") or "text-embedding-3-small",
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    @app.post("/v1/realtime/client_secrets")
+    async def client_secrets(request: Request):
+        body = await request.json()
+        error = await inject("realtime")
+        if error is not None:
+            return error
+        wait_ms = latency(cfg().latency)
+        record_latency("realtime", wait_ms)
+        await asyncio.sleep(wait_ms / 1000)
+        return {
+            "value": f"ek_fake_{uuid.uuid4().hex}",
+            "expires_at": int(time.time()) + 60,
+            "session": body.get("session") or {},
+        }
+
+    @app.get("/v1/models")
+    async def list_models():
+        names = ["gpt-4o-mini", "gpt-4o", "tts-1", "text-embedding-3-small", "gpt-realtime-2"]
+        return {"object": "list", "data": [{"id": n, "object": "model", "owned_by": "fake"} for n in names]}
+
+    @app.get("/_fake/stats")
+    async def stats():
+        with lock:
+            out = {}
+            for endpoint, s in app.state.stats.items():
+                served = s["calls"] - s["errors"] - s["hangs"]
+                out[endpoint] = {
+                    "calls": s["calls"],
+                    "errors": s["errors"],
+                    "hangs": s["hangs"],
+                    "latency_ms_avg": round(s["latency_ms_total"] / served, 1) if served else None,
+                }
+            return out
+
+    @app.post("/_fake/reset")
+    async def reset():
+        with lock:
+            app.state.stats.clear()
+            app.state.fault_rng = random.Random(cfg().seed)
+            app.state.latency_rng = random.Random(cfg().seed + 1)
+        return {"ok": True}
+
+    @app.post("/_fake/config")
+    async def update_config(request: Request):
+        changes = await request.json()
+        current = asdict(cfg())
+        unknown = set(changes) - set(current)
+        if unknown:
+            return JSONResponse({"error": f"Onbekende instellingen: {sorted(unknown)}"}, status_code=400)
+        current.update(changes)
+        for spec in (current["latency"], current["token_latency"], current["speech_latency"], current["embedding_latency"]):
+            parse_distribution(spec)
+        app.state.config = FakeConfig(**current)
+        return current
+
+    return app
+
+
+def serve_in_thread(config: Optional[FakeConfig] = None, host: str = "127.0.0.1", port: int = 0):
+    """Start de stand-in in een achtergrondthread. Geeft (base_url, server); stoppen met server.should_exit = True."""
+    import socket
+
+    import uvicorn
+
+    if not port:
+        with socket.socket() as sock:
+            sock.bind((host, 0))
+            port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(create_app(config), host=host, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("fake_openai startte niet binnen 10s")
+        time.sleep(0.02)
+    return f"http://{host}:{port}/v1", server
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = FakeConfig()
+    for f in fields(FakeConfig):
+        parser.add_argument(
+            "--" + f.name.replace("_", "-"),
+            type=type(getattr(defaults, f.name)),
+            default=getattr(defaults, f.name),
+        )
+
+
+def config_from_args(args: argparse.Namespace) -> FakeConfig:
+    config = FakeConfig(**{f.name: getattr(args, f.name) for f in fields(FakeConfig)})
+    for spec in (config.latency, config.token_latency, config.speech_latency, config.embedding_latency):
+        parse_distribution(spec)
+    return config
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_app(config_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Regressietest: GET /employer/applications doet een vast aantal queries,
+ongeacht het aantal sollicitaties (geen N+1 per sollicitatie/AIResult).
+
+Draait tegen een tijdelijke SQLite-database, zonder API keys. Telt de
+statements met een before_cursor_execute-listener op de engine.
+
+Gebruik:
+  python3 test_employer_applications.py
+  python3 -m pytest -q test_employer_applications.py
+"""
+
+import os
+import sys
+import tempfile
+
+# Eigen database — nooit de DATABASE_URL uit de omgeving (seeden schrijft rijen)
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test_employer_applications.db")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from backend import models  # noqa: E402
+from backend.db import SessionLocal, engine  # noqa: E402
+from backend.main import app  # noqa: E402
+from backend.security import create_access_token  # noqa: E402
+
+SMALL = 10
+LARGE = 300
+
+client = TestClient(app)  # zonder "with": geen lifespan (workers)
+_tokens = {}
+
+
+def _employer_with(applications: int) -> str:
+    """
+    Werkgever met één vacature en `applications` sollicitaties, elk met twee
+    AIResults (alleen het laatste hoort in de lijst). Eenmalig per aantal; geeft het token.
+    """
+    if applications in _tokens:
+        return _tokens[applications]
+    db = SessionLocal()
+    try:
+        employer = models.User(
+            email=f"werkgever{applications}@test.nl", full_name="Werkgever", hashed_password="x", role="employer"
+        )
+        db.add(employer)
+        db.flush()
+        vacancy = models.Vacancy(employer_id=employer.id, title="Verpleegkundige", description="Nachtdienst")
+        db.add(vacancy)
+        db.flush()
+        for n in range(applications):
+            candidate = models.User(
+                email=f"kandidaat{applications}-{n}@test.nl", full_name=f"Kandidaat {n}", hashed_password="x", role="candidate"
+            )
+            db.add(candidate)
+            db.flush()
+            application = models.Application(candidate_id=candidate.id, vacancy_id=vacancy.id, status="applied")
+            db.add(application)
+            db.flush()
+            db.add_all([
+                models.AIResult(application_id=application.id, match_score=n % 50, summary="oud"),
+                models.AIResult(application_id=application.id, match_score=n % 100, summary="nieuw"),
+            ])
+        db.commit()
+        _tokens[applications] = create_access_token(str(employer.id))
+    finally:
+        db.close()
+    return _tokens[applications]
+
+
+def _count_statements(token: str, path: str) -> tuple:
+    """Geeft (aantal statements, response) voor één request."""
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        response = client.get(path, headers={"Authorization": f"Bearer {token}"})
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+    assert response.status_code == 200, response.text
+    return len(statements), response
+
+
+def test_statement_count_is_constant():
+    small, response = _count_statements(_employer_with(SMALL), "/employer/applications")
+    assert len(response.json()) == SMALL
+
+    large, response = _count_statements(_employer_with(LARGE), "/employer/applications")
+    rows = response.json()
+    assert len(rows) == LARGE
+    assert all(r["ai_summary"] == "nieuw" for r in rows), "niet het laatste AIResult"
+    assert large == small, f"{SMALL} sollicitaties: {small} statements, {LARGE}: {large}"
+
+
+def test_paginated_statement_count_is_constant():
+    token = _employer_with(LARGE)
+    first, response = _count_statements(token, "/employer/applications?sort=match_score&limit=50")
+    cursor = response.headers["X-Next-Cursor"]
+    scores = [r["match_score"] for r in response.json()]
+    assert scores == sorted(scores, reverse=True)
+
+    following, response = _count_statements(token, f"/employer/applications?sort=match_score&limit=50&cursor={cursor}")
+    assert len(response.json()) == 50
+    assert response.json()[0]["match_score"] <= scores[-1]
+    assert following == first, f"eerste pagina: {first} statements, volgende: {following}"
+
+
+def _main() -> int:
+    failed = 0
+    for name, fn in sorted(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"\033[92m✓ PASS\033[0m {name}")
+            except AssertionError as exc:
+                failed += 1
+                print(f"\033[91m✗ FAIL\033[0m {name}: {exc}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Unit tests voor de lexicale pre-screen (backend/services/lexical_match.py).
+
+Draait lokaal, zonder database of API keys.
+
+Gebruik:
+  python3 test_lexical_match.py
+  python3 -m pytest -q test_lexical_match.py
+"""
+
+import sys
+
+from backend.services import lexical_match
+
+# Synoniem ↔ canonieke term (of een verbuiging daarvan) moeten dezelfde tokens opleveren
+SYNONYM_PAIRS = [
+    ("verpleegkundige", "nurse"),
+    ("k8s engineer", "kubernetes developer"),
+    ("magazijnmedewerker", "warehouse"),
+    ("verkoper", "sales"),
+    ("docent", "teacher"),
+    ("boekhouder", "accountant"),
+]
+
+
+def test_synonym_pairs_overlap():
+    for variant, canonical in SYNONYM_PAIRS:
+        a, b = lexical_match.tokenize(variant), lexical_match.tokenize(canonical)
+        assert a == b, f"{variant!r} → {a}, {canonical!r} → {b}"
+
+
+def test_synonym_scores_as_match():
+    # IDF vullen, anders start score() een refresh tegen de database
+    lexical_match._idf.load(["Verpleegkundige gezocht voor de nachtdienst", "Chauffeur met rijbewijs C"])
+    match = lexical_match.score("Ervaren nurse, werkzaam in de nachtdienst", "Verpleegkundige nachtdienst")
+    assert "nurs" in match.matched, match
+    assert not match.missing, match
+
+
+def _main() -> int:
+    failed = 0
+    for name, fn in sorted(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"\033[92m✓ PASS\033[0m {name}")
+            except AssertionError as exc:
+                failed += 1
+                print(f"\033[91m✗ FAIL\033[0m {name}: {exc}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())